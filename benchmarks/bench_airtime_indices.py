@@ -0,0 +1,104 @@
+#! /usr/bin/env python3
+"""
+Compares the airtime index computation of the in air detector, which finds the indices of an
+airtime by a binary search on the sorted timestamps, to comparing all timestamps against every
+airtime.
+"""
+import argparse
+import os
+import timeit
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+import numpy as np
+from pyulog import ULog
+
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
+from tests.synthetic_ulog import write_synthetic_ulog
+
+_START_TIMESTAMP = 1000000
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the airtime index computation.')
+    parser.add_argument('--duration', type=float, default=3600.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--rate', type=float, default=100.0, help='sample rate in Hz')
+    parser.add_argument('--n-flights', type=int, nargs='+', default=[1, 10, 100, 500],
+                        help='the numbers of flights to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repetitions')
+    return parser.parse_args()
+
+
+def airtime_per_phase_where(
+        in_air_detector: InAirDetector, timestamps: np.ndarray) -> list:
+    """
+    the reference implementation: compares all timestamps against every airtime.
+    :param in_air_detector:
+    :param timestamps:
+    :return:
+    """
+    return [np.where(((timestamps - _START_TIMESTAMP) * 1.0e-6 >= airtime.take_off) &
+                     ((timestamps - _START_TIMESTAMP) * 1.0e-6 < airtime.landing))[0]
+            for airtime in in_air_detector.airtimes]
+
+
+def create_in_air_detector(tmp_dir: str, duration_s: float, n_flights: int) -> InAirDetector:
+    """
+    creates an in air detector on a synthetic log with n_flights evenly spaced flights.
+    :param tmp_dir:
+    :param duration_s:
+    :param n_flights:
+    :return:
+    """
+    filename = os.path.join(tmp_dir, f'flights_{n_flights:d}.ulg')
+    period_s = duration_s / n_flights
+    flights = [(i * period_s + 0.1 * period_s, (i + 1) * period_s - 0.1 * period_s)
+               for i in range(n_flights)]
+    # the airtime computation does not depend on the estimator topics: keep the log short
+    write_synthetic_ulog(filename, duration_s=duration_s, rate_hz=1.0, flights=flights,
+                         start_timestamp=_START_TIMESTAMP)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        return InAirDetector(ULog(filename))
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+    timestamps = np.arange(
+        _START_TIMESTAMP, _START_TIMESTAMP + args.duration * 1.0e6, 1.0e6 / args.rate,
+        dtype=np.float64).astype(np.uint64)
+
+    print(f'{timestamps.shape[0]:d} samples')
+    print(f'{"flights":>8s} {"np.where [ms]":>14s} {"searchsorted [ms]":>18s} {"speedup":>8s}')
+    with TemporaryDirectory() as tmp_dir:
+        for n_flights in args.n_flights:
+            in_air_detector = create_in_air_detector(tmp_dir, args.duration, n_flights)
+            assert len(in_air_detector.airtimes) == n_flights
+
+            for phase, reference in zip(
+                    in_air_detector.get_airtime_per_phase_for_timestamp(
+                        timestamps, start_time=_START_TIMESTAMP, conversion_factor=1.0e-6),
+                    airtime_per_phase_where(in_air_detector, timestamps)):
+                assert np.array_equal(phase, reference)
+
+            where_time = min(timeit.repeat(
+                lambda: airtime_per_phase_where(in_air_detector, timestamps),
+                number=1, repeat=args.repeat))
+            search_time = min(timeit.repeat(
+                lambda: in_air_detector.get_airtime_per_phase_for_timestamp(
+                    timestamps, start_time=_START_TIMESTAMP, conversion_factor=1.0e-6),
+                number=1, repeat=args.repeat))
+            print(f'{n_flights:8d} {1e3 * where_time:14.2f} {1e3 * search_time:18.2f} '
+                  f'{where_time / search_time:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
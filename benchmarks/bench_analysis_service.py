@@ -0,0 +1,123 @@
+#! /usr/bin/env python3
+"""
+Compares the latency of analysing small logs one at a time with the process_logdata_ekf command
+line script and with requests to the local analysis service.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from typing import Callable, List
+
+import numpy as np
+import simplejson as json
+
+from ecl_ekf_analysis.serve_logdata_ekf import AnalysisServer, AnalysisService
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the latency of the analysis service vs. the command line script.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--n-requests', type=int, default=20,
+                        help='the number of analyses per method')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='the number of worker processes of the service')
+    return parser.parse_args()
+
+
+def measure_latencies(analyse: Callable[[], None], n_requests: int, n_clients: int = 1
+                      ) -> List[float]:
+    """
+    :param analyse: analyses the log once
+    :param n_requests:
+    :param n_clients: the number of clients sending requests concurrently
+    :return: the latencies of the analyses in seconds
+    """
+    def timed_analyse(_) -> float:
+        start = time.perf_counter()
+        analyse()
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=n_clients) as executor:
+        return list(executor.map(timed_analyse, range(n_requests)))
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = args.filename
+        if filename is None:
+            filename = os.path.join(tmp_dir, 'synthetic.ulg')
+            write_synthetic_ulog(filename, duration_s=args.duration)
+        with open(filename, 'rb') as file:
+            log_data = file.read()
+
+        def analyse_cli() -> None:
+            subprocess.run(
+                [sys.executable, '-m', 'ecl_ekf_analysis.process_logdata_ekf', filename],
+                stdout=subprocess.DEVNULL, check=False)
+
+        service = AnalysisService(n_workers=args.jobs, max_queued=args.n_requests)
+        start = time.perf_counter()
+        service.warm_up()
+        warm_up_time = time.perf_counter() - start
+        server = AnalysisServer(('127.0.0.1', 0), service, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]:d}/analyse'
+
+        def analyse_path() -> None:
+            request = urllib.request.Request(
+                url, data=json.dumps({'filename': filename}).encode(),
+                headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request) as response:
+                response.read()
+
+        def analyse_upload() -> None:
+            request = urllib.request.Request(
+                url, data=log_data, headers={'Content-Type': 'application/octet-stream'})
+            with urllib.request.urlopen(request) as response:
+                response.read()
+
+        methods = [('cli', analyse_cli, 1), ('service, path', analyse_path, 1),
+                   ('service, upload', analyse_upload, 1)]
+        if args.jobs > 1:
+            methods.append((f'service, {args.jobs:d} clients', analyse_path, args.jobs))
+
+        print(f'log file: {os.path.getsize(filename) / 1e6:.1f} MB, {args.n_requests:d} '
+              f'analyses per method, {args.jobs:d} workers warmed up in {warm_up_time:.2f} s')
+        print(f'{"method":>22s} {"p50 [ms]":>9s} {"p95 [ms]":>9s} {"logs per second":>16s}')
+        try:
+            for name, analyse, n_clients in methods:
+                start = time.perf_counter()
+                latencies = measure_latencies(analyse, args.n_requests, n_clients=n_clients)
+                throughput = args.n_requests / (time.perf_counter() - start)
+                latency_p50, latency_p95 = np.percentile(latencies, [50.0, 95.0])
+                print(f'{name:>22s} {1e3 * latency_p50:9.1f} {1e3 * latency_p95:9.1f} '
+                      f'{throughput:16.1f}')
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+"""
+Compares the time to find the log files to analyse in an archive of already analysed logs by
+the manifest of the incremental batch processing with the recursive glob and the lookup of a
+.json file per log.
+"""
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+from ecl_ekf_analysis.batch_process_logdata_ekf import find_ulog_files
+from ecl_ekf_analysis.log_processing.batch_manifest import BatchManifest
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the scan of an analysed log archive by the batch manifest.')
+    parser.add_argument('--n-files', type=int, default=50000,
+                        help='the number of log files in the archive')
+    parser.add_argument('--n-dirs', type=int, default=500,
+                        help='the number of directories of the archive')
+    parser.add_argument('--file-size', type=int, default=1 << 16,
+                        help='the size of the log files in bytes')
+    parser.add_argument('--changed-fraction', type=float, default=0.01,
+                        help='the fraction of log files that are modified before the re-scan')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        archive_dir = os.path.join(tmp_dir, 'archive')
+        ulog_files = []
+        for i in range(args.n_files):
+            log_dir = os.path.join(archive_dir, f'{i % args.n_dirs:04d}')
+            os.makedirs(log_dir, exist_ok=True)
+            ulog_file = os.path.join(log_dir, f'log_{i:d}.ulg')
+            # sparse files, the content is only read when hashing
+            with open(ulog_file, 'wb') as file:
+                file.truncate(args.file_size)
+                file.write(i.to_bytes(8, 'little'))
+            with open(f'{os.path.splitext(ulog_file)[0]:s}.json', 'w') as file:
+                file.write('[]')
+            ulog_files.append(ulog_file)
+
+        with BatchManifest(os.path.join(tmp_dir, 'manifest.db')) as manifest:
+            start = time.perf_counter()
+            for ulog_file in ulog_files:
+                manifest.record(ulog_file, 'Pass')
+            record_time = time.perf_counter() - start
+
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                start = time.perf_counter()
+                assert find_ulog_files(archive_dir) == []
+                glob_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            assert manifest.scan(archive_dir) == []
+            scan_time = time.perf_counter() - start
+
+            n_changed = int(args.n_files * args.changed_fraction)
+            for ulog_file in ulog_files[:n_changed]:
+                with open(ulog_file, 'r+b') as file:
+                    file.write(b'changed!')
+            start = time.perf_counter()
+            assert len(manifest.scan(archive_dir)) == n_changed
+            changed_scan_time = time.perf_counter() - start
+
+    print(f'{args.n_files:d} analysed log files in {args.n_dirs:d} directories, '
+          f'{args.file_size / 1e6:.1f} MB per file')
+    print(f'{"method":>36s} {"time [s]":>9s}')
+    print(f'{"record in the manifest":>36s} {record_time:9.2f}')
+    print(f'{"glob and .json lookup":>36s} {glob_time:9.2f}')
+    print(f'{"manifest scan, unchanged":>36s} {scan_time:9.2f}')
+    print(f'{f"manifest scan, {n_changed:d} changed":>36s} {changed_scan_time:9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#! /usr/bin/env python3
+"""
+Compares the throughput of the serial batch processing loop to the process pool.
+"""
+import argparse
+import os
+import shutil
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+from ecl_ekf_analysis.batch_process_logdata_ekf import analyse_ulog_files
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the batch processing throughput.')
+    parser.add_argument('--n-files', type=int, default=16, help='number of log files')
+    parser.add_argument('--duration', type=float, default=300.0,
+                        help='duration of the synthetic logs in seconds')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()],
+                        help='the numbers of worker processes to benchmark')
+    return parser.parse_args()
+
+
+def run_batch(log_directory: str, jobs: int) -> float:
+    """
+    analyses all logs in the directory and returns the elapsed wall time.
+    :param log_directory:
+    :param jobs:
+    :return:
+    """
+    ulog_files = sorted(
+        os.path.join(log_directory, filename) for filename in os.listdir(log_directory)
+        if filename.endswith('.ulg'))
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        n_skipped = analyse_ulog_files(ulog_files, jobs=jobs)
+    elapsed = time.perf_counter() - start
+    assert n_skipped == 0, f'{n_skipped:d} files were skipped'
+    return elapsed
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        template = os.path.join(tmp_dir, 'template.ulg')
+        write_synthetic_ulog(template, duration_s=args.duration)
+        log_directory = os.path.join(tmp_dir, 'logs')
+        os.makedirs(log_directory)
+        for i in range(args.n_files):
+            shutil.copy(template, os.path.join(log_directory, f'log_{i:04d}.ulg'))
+
+        print(f'{"jobs":>6s} {"time [s]":>10s} {"logs/s":>10s} {"speedup":>10s}')
+        serial_time = None
+        for jobs in args.jobs:
+            elapsed = run_batch(log_directory, jobs)
+            serial_time = elapsed if serial_time is None else serial_time
+            print(f'{jobs:6d} {elapsed:10.2f} {args.n_files / elapsed:10.2f} '
+                  f'{serial_time / elapsed:10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#! /usr/bin/env python3
+"""
+Tracks the memory allocated by every check of the ecl check runner, selecting the airtime samples
+of the signals by slices (views) compared to selecting them by index arrays (copies).
+"""
+import argparse
+import os
+import tracemalloc
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Dict
+
+from pyulog import ULog
+
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the memory allocated per check.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=1800.0,
+                        help='duration of the synthetic log in seconds')
+    return parser.parse_args()
+
+
+def track_check_allocations(ulog: ULog) -> Dict[str, float]:
+    """
+    runs the checks one by one and tracks the peak of the memory allocated by each.
+    :param ulog:
+    :return: the peak memory in MB per check
+    """
+    allocations = {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        ecl_check_runner = EclCheckRunner(ulog)
+        for check in ecl_check_runner.checks:
+            tracemalloc.start()
+            try:
+                check.run()
+            except Exception:  # pylint: disable=broad-except
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            allocations[type(check).__name__] = peak / 1e6
+
+    return allocations
+
+
+def track_check_allocations_with_copies(ulog: ULog) -> Dict[str, float]:
+    """
+    as track_check_allocations, but selects the airtime samples by index arrays.
+    :param ulog:
+    :return:
+    """
+    get_airtime_selection = InAirDetector.get_airtime_selection
+    get_airtime_selection_per_phase = InAirDetector.get_airtime_selection_per_phase
+    InAirDetector.get_airtime_selection = InAirDetector.get_airtime
+    InAirDetector.get_airtime_selection_per_phase = InAirDetector.get_airtime_per_phase
+    try:
+        return track_check_allocations(ulog)
+    finally:
+        InAirDetector.get_airtime_selection = get_airtime_selection
+        InAirDetector.get_airtime_selection_per_phase = get_airtime_selection_per_phase
+
+
+def run_benchmark(filename: str) -> None:
+    """
+    :param filename:
+    :return:
+    """
+    topics = sorted(EclCheckRunner.required_topics())
+    copies = track_check_allocations_with_copies(
+        ULog(filename, message_name_filter_list=topics))
+    views = track_check_allocations(ULog(filename, message_name_filter_list=topics))
+
+    print(f'log file: {filename:s}')
+    print(f'{"check":>28s} {"peak copies [MB]":>17s} {"peak views [MB]":>16s}')
+    for check_name, peak_copies in copies.items():
+        print(f'{check_name:>28s} {peak_copies:17.2f} {views[check_name]:16.2f}')
+    print(f'{"sum":>28s} {sum(copies.values()):17.2f} {sum(views.values()):16.2f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    if args.filename is not None:
+        run_benchmark(args.filename)
+        return
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'synthetic.ulg')
+        write_synthetic_ulog(filename, duration_s=args.duration)
+        run_benchmark(filename)
+
+
+if __name__ == '__main__':
+    main()
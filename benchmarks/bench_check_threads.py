@@ -0,0 +1,90 @@
+#! /usr/bin/env python3
+"""
+Measures the latency of running the checks of a single log one after the other compared to running
+them concurrently on thread pools of different sizes.
+"""
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import List
+
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the latency of the checks of a log versus the thread pool size.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=3600.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='the thread pool sizes')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the number of repetitions, the fastest is reported')
+    return parser.parse_args()
+
+
+def time_run_checks(ulog: ULog, n_threads: int, repeat: int) -> float:
+    """
+    :param ulog:
+    :param n_threads:
+    :param repeat:
+    :return: the fastest time of running all checks in seconds
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            # a new runner per repetition, such that the cached airtimes are not reused
+            ecl_check_runner = EclCheckRunner(ulog)
+            start = time.perf_counter()
+            ecl_check_runner.run_checks(n_threads=n_threads)
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmark(filename: str, threads: List[int], repeat: int) -> None:
+    """
+    :param filename:
+    :param threads:
+    :param repeat:
+    :return:
+    """
+    ulog = ULog(filename, message_name_filter_list=sorted(EclCheckRunner.required_topics()))
+    serial_time = time_run_checks(ulog, 1, repeat)
+
+    print(f'log file: {filename:s}, {os.cpu_count():d} cpus')
+    print(f'{"threads":>8s} {"latency [ms]":>13s} {"speedup":>8s}')
+    for n_threads in threads:
+        run_time = serial_time if n_threads == 1 else time_run_checks(ulog, n_threads, repeat)
+        print(f'{n_threads:8d} {1e3 * run_time:13.1f} {serial_time / run_time:8.2f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    if args.filename is not None:
+        run_benchmark(args.filename, args.threads, args.repeat)
+        return
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'synthetic.ulg')
+        write_synthetic_ulog(filename, duration_s=args.duration)
+        run_benchmark(filename, args.threads, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+"""
+Measures the time and the peak allocated memory of the analysis of a log file in blocks within
+memory budgets, compared to the analysis of the complete log, for logs of different durations.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Callable, Tuple
+
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf, analyse_logdata_ekf_chunked
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the analysis of a log in blocks within a memory budget.')
+    parser.add_argument('--durations', type=float, nargs='+', default=[600.0, 1800.0, 3600.0],
+                        help='the durations of the synthetic logs in seconds')
+    parser.add_argument('--memory-budgets', type=float, nargs='+', default=[8.0, 32.0, 128.0],
+                        help='the memory budgets of the chunked analysis in MB')
+    return parser.parse_args()
+
+
+def measure_analysis(analysis: Callable[[], object]) -> Tuple[float, float]:
+    """
+    :param analysis:
+    :return: the wall time in seconds and the peak allocated memory in MB of the analysis. The
+    memory is traced in a separate run, as tracing slows down the analysis.
+    """
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        analysis()
+        duration = time.perf_counter() - start
+
+        tracemalloc.start()
+        analysis()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return duration, peak / 1e6
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    print(f'{"duration [s]":>12s} {"file [MB]":>10s} {"analysis":>14s} {"time [s]":>9s} '
+          f'{"peak [MB]":>10s}')
+    with TemporaryDirectory() as tmp_dir:
+        for duration in args.durations:
+            filename = os.path.join(tmp_dir, 'synthetic.ulg')
+            write_synthetic_ulog(filename, duration_s=duration)
+            file_size = os.path.getsize(filename) / 1e6
+
+            analyses = [('complete', lambda: analyse_logdata_ekf(ULog(
+                filename, message_name_filter_list=sorted(EclCheckRunner.required_topics()))))]
+            analyses += [(f'{memory_budget:.0f} MB budget',
+                          lambda memory_budget=memory_budget: analyse_logdata_ekf_chunked(
+                              filename, memory_budget_mb=memory_budget))
+                         for memory_budget in args.memory_budgets]
+            for name, analysis in analyses:
+                analysis_time, peak = measure_analysis(analysis)
+                print(f'{duration:12.0f} {file_size:10.1f} {name:>14s} {analysis_time:9.2f} '
+                      f'{peak:10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#! /usr/bin/env python3
+"""
+Compares the statistics of the estimator_status_flags computed on the flag arrays of pyulog with
+the statistics computed on the bit-packed flag matrix over log durations:
+- the innovation reject statistics of all reject flags (the percentage of the in air samples with
+  a rejection and its maximum short and long windowed percentages, see EstimatorCheck), computed
+  by thresholding and smoothing every flag vs. the popcounts of the packed flags, including the
+  one-off packing of the flags read by the checks,
+- the "any fault" test of the NumericalCheck,
+- the bits of the gps_check_fail_flags as integer arrays (the former get_gps_check_fail_flags)
+  vs. packed into a flag matrix.
+The memory is reported as the size of the flags read by the checks (one byte per sample and flag)
+vs. the size of the flag matrix, as the peak memory allocated by the innovation reject statistics
+and as the size of the gps check fail flags.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Callable, List, Tuple
+
+import numpy as np
+from pyulog import ULog
+
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
+from ecl_ekf_analysis.analysis.post_processing import GPS_CHECK_FAIL_FLAGS, \
+    get_gps_check_fail_flag_matrix
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.numerical_analysis import NumericalCheck
+from ecl_ekf_analysis.config.analysis_config import default_config
+from ecl_ekf_analysis.log_processing.analysis import calculate_flag_percentage, \
+    calculate_stat_from_signal, calculate_windowed_flag_percentages_per_airphase, \
+    calculate_windowed_mean_per_airphase
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
+from tests.synthetic_ulog import REJECT_STATUS_FLAGS, write_synthetic_ulog
+
+DATASET = 'estimator_status_flags'
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the bit-packed flag matrix.')
+    parser.add_argument('--durations', type=float, nargs='+', default=[600.0, 3600.0, 7200.0],
+                        help='the durations of the synthetic logs in seconds (at 100 Hz)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the number of repetitions, the fastest is reported')
+    return parser.parse_args()
+
+
+def flag_arrays(data: dict, in_air_detector: InAirDetector, window_lens_s: List[float]) -> list:
+    """
+    the innovation reject statistics and the any fault test on the flag arrays.
+    :param data:
+    :param in_air_detector:
+    :param window_lens_s:
+    :return:
+    """
+    statistics = []
+    for flag in REJECT_STATUS_FLAGS:
+        statistics.append(calculate_stat_from_signal(
+            data, DATASET, flag, in_air_detector, lambda x: 100.0 * np.mean(x > 0.5)))
+        # the windowed percentages of both window lengths are kept, as by the check
+        windowed_percentages = [calculate_windowed_mean_per_airphase(
+            data, DATASET, flag, in_air_detector, threshold=0.5, window_len_s=window_len_s)
+                                for window_len_s in window_lens_s]
+        statistics.extend(max(np.max(metric) for _, metric in windowed)
+                          for windowed in windowed_percentages)
+    statistics.append(any(np.any(data[flag]) for flag in NumericalCheck.filter_fault_flags))
+    return statistics
+
+
+def flag_matrix(data: dict, in_air_detector: InAirDetector, window_lens_s: List[float]) -> list:
+    """
+    the innovation reject statistics and the any fault test on the flag matrix of the flags read
+    by the checks.
+    :param data:
+    :param in_air_detector:
+    :param window_lens_s:
+    :return:
+    """
+    flags = FlagMatrix.from_fields(data, EclCheckRunner.required_status_flags())
+    statistics = []
+    for flag in REJECT_STATUS_FLAGS:
+        statistics.append(calculate_flag_percentage(flags, DATASET, flag, in_air_detector))
+        statistics.extend(max(np.max(metric) for _, metric in windowed)
+                          for windowed in calculate_windowed_flag_percentages_per_airphase(
+                              flags, DATASET, flag, in_air_detector, window_lens_s))
+    statistics.append(flags.any(NumericalCheck.filter_fault_flags))
+    return statistics
+
+
+def gps_check_fail_flags_bitwise(estimator_status: dict) -> dict:
+    """
+    the former get_gps_check_fail_flags: an integer array per bit.
+    :param estimator_status:
+    :return:
+    """
+    return {flag: ((2 ** i & estimator_status['gps_check_fail_flags']) > 0) * 1
+            for i, flag in enumerate(GPS_CHECK_FAIL_FLAGS)}
+
+
+def time_function(function: Callable[[], object], repeat: int) -> Tuple[float, float, object]:
+    """
+    :param function:
+    :param repeat:
+    :return: the fastest time of the function in milliseconds, its peak memory in MB and result
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return 1e3 * min(times), peak / 1e6, result
+
+
+def run_benchmark(tmp_dir: str, durations: List[float], repeat: int) -> None:
+    """
+    :param tmp_dir:
+    :param durations:
+    :param repeat:
+    :return:
+    """
+    params = default_config().params
+    window_lens_s = [params.ecl_short_rolling_window_len_s, params.ecl_long_rolling_window_len_s]
+
+    print(f'{"duration":>9s} {"samples":>8s} {"flags [MB]":>11s} {"matrix [MB]":>12s} '
+          f'{"arrays [ms]":>12s} {"matrix [ms]":>12s} {"speedup":>8s} {"arrays peak [MB]":>17s} '
+          f'{"matrix peak [MB]":>17s} {"gps arrays [ms / MB]":>21s} '
+          f'{"gps matrix [ms / MB]":>21s}')
+    for duration in durations:
+        filename = os.path.join(tmp_dir, f'flags_{duration:.0f}.ulg')
+        write_synthetic_ulog(filename, duration_s=duration, n_flag_toggles=int(duration))
+        ulog = ULog(filename, message_name_filter_list=['vehicle_land_detected', DATASET])
+        data = ulog.get_dataset(DATASET).data
+        in_air_detector = InAirDetector(ulog, in_air_margin_seconds=0.3)
+        in_air_detector.get_airtime_bounds(DATASET)
+
+        n_samples = len(data['timestamp'])
+        status_flags = EclCheckRunner.required_status_flags()
+        flags_size = sum(data[field].nbytes for field in status_flags)
+        matrix_size = FlagMatrix.from_fields(data, status_flags).nbytes
+
+        arrays_time, arrays_peak, expected = time_function(
+            lambda: flag_arrays(data, in_air_detector, window_lens_s), repeat)
+        matrix_time, matrix_peak, result = time_function(
+            lambda: flag_matrix(data, in_air_detector, window_lens_s), repeat)
+        assert result == expected
+
+        estimator_status = {'gps_check_fail_flags': np.random.RandomState(0).randint(
+            0, 2**10, size=n_samples).astype(np.uint16)}
+        gps_arrays_time, _, gps_arrays = time_function(
+            lambda: gps_check_fail_flags_bitwise(estimator_status), repeat)
+        gps_matrix_time, _, gps_matrix = time_function(
+            lambda: get_gps_check_fail_flag_matrix(estimator_status), repeat)
+        assert all(np.array_equal(gps_matrix.get_flag(flag), gps_arrays[flag])
+                   for flag in GPS_CHECK_FAIL_FLAGS)
+        gps_arrays_size = sum(gps_flag.nbytes for gps_flag in gps_arrays.values())
+
+        print(f'{duration:9.0f} {n_samples:8d} {flags_size / 1e6:11.2f} {matrix_size / 1e6:12.2f} '
+              f'{arrays_time:12.1f} {matrix_time:12.1f} {arrays_time / matrix_time:8.1f} '
+              f'{arrays_peak:17.2f} {matrix_peak:17.2f} '
+              f'{gps_arrays_time:13.1f} / {gps_arrays_size / 1e6:5.2f} '
+              f'{gps_matrix_time:13.1f} / {gps_matrix.nbytes / 1e6:5.2f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        run_benchmark(tmp_dir, args.durations, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
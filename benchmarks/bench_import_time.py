@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+"""
+Measures the import time of the command line entry points with python -X importtime in fresh
+interpreters and fails if an entry point exceeds the import time budget.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# the modules of the command line entry points, see setup.py
+ENTRY_POINTS = [
+    'ecl_ekf_analysis.process_logdata_ekf',
+    'ecl_ekf_analysis.batch_process_logdata_ekf',
+    'ecl_ekf_analysis.live_process_logdata_ekf',
+    'ecl_ekf_analysis.rethreshold_logdata_ekf',
+    'ecl_ekf_analysis.serve_logdata_ekf',
+    'ecl_ekf_analysis.log_processing.topic_cache',
+    'ecl_ekf_analysis.log_processing.results_store',
+]
+
+_IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the import time of the command line entry points.')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='the number of fresh interpreters per entry point')
+    parser.add_argument('--budget', type=float, default=150.0,
+                        help='the import time budget per entry point in ms')
+    parser.add_argument('--top', type=int, default=5,
+                        help='the number of the slowest top level packages listed per entry point')
+    return parser.parse_args()
+
+
+def measure_import(module: Optional[str]) -> Dict[str, float]:
+    """
+    imports the module in a fresh interpreter.
+    :param module: the module or None for the interpreter start-up
+    :return: the cumulative import time of the module and the sum of the self import times of
+    the modules of every top level package in ms
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f'import {module:s}' if module is not None else 'pass'],
+        stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, check=True, universal_newlines=True)
+    import_times = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match is None:
+            continue
+        name = match.group(3)
+        if name == module:
+            import_times[name] = int(match.group(2)) / 1e3
+        package = name.split('.')[0]
+        if package != 'ecl_ekf_analysis':
+            import_times[package] = import_times.get(package, 0.0) + int(match.group(1)) / 1e3
+    return import_times
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    print(f'{"entry point":>46s} {"import [ms]":>12s}  slowest packages [ms]')
+    over_budget: List[str] = []
+    # the modules imported by the interpreter start-up
+    start_up_modules = set(measure_import(None))
+    for module in ENTRY_POINTS:
+        measurements = [measure_import(module) for _ in range(args.repeats)]
+        import_time = float(np.median([measurement[module] for measurement in measurements]))
+        packages = {name: float(np.median([measurement.get(name, 0.0)
+                                           for measurement in measurements]))
+                    for name in measurements[0]
+                    if name not in start_up_modules | {module}}
+        slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f'{module:>46s} {import_time:12.1f}  ' +
+              ', '.join(f'{name:s} {package_time:.1f}' for name, package_time in slowest))
+        if import_time > args.budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f'{", ".join(over_budget):s} exceeded the import time budget of '
+              f'{args.budget:.0f} ms')
+        sys.exit(1)
+    print(f'all entry points within the import time budget of {args.budget:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#! /usr/bin/env python3
+"""
+Compares the phases above a min ground distance of a noisy range finder signal and the indices of
+the samples within these phases (see PositionAnalyzer) computed with python-intervals, i.e. the
+union of one closed interval at a time and a comparison of all sample times per interval, with the
+array based IntervalSet, i.e. a vectorized union and a binary search of the sample indices. The
+number of phases grows with the noise of the range finder.
+
+requires python-intervals (pip install python-intervals), the former interval dependency.
+"""
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+import intervals
+import numpy as np
+
+from ecl_ekf_analysis.analysis.interval_set import IntervalSet
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the interval set against python-intervals.')
+    parser.add_argument('--duration', type=float, default=1800.0,
+                        help='duration of the range finder signal in seconds')
+    parser.add_argument('--phases', type=int, nargs='+', default=[10, 100, 1000, 4000],
+                        help='the numbers of phases above the min ground distance')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the number of repetitions, the fastest is reported')
+    return parser.parse_args()
+
+
+def create_phases(duration: float, n_phases: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param duration:
+    :param n_phases:
+    :return: the starts and ends of the phases above the min ground distance of a range finder
+    signal at 50 Hz and the sample times of a 200 Hz signal
+    """
+    range_finder_time = np.arange(0.0, duration, 0.02)
+    toggles = np.sort(np.random.RandomState(0).choice(
+        np.arange(1, len(range_finder_time) - 1), size=2 * n_phases, replace=False))
+    return range_finder_time[toggles[0::2]], range_finder_time[toggles[1::2] - 1], \
+        np.arange(0.0, duration, 0.005)
+
+
+def python_intervals(
+        starts: np.ndarray, ends: np.ndarray, times: np.ndarray, margin: float) -> List[np.ndarray]:
+    """
+    :param starts:
+    :param ends:
+    :param times:
+    :param margin:
+    :return: the sample indices per phase, computed as by PositionAnalyzer with python-intervals
+    """
+    phases = intervals.empty()
+    for start, end in zip(starts, ends):
+        if (end - margin) - (start + margin) >= 0.0:
+            phases = phases | intervals.closed(start + margin, end - margin)
+    return [np.where((times >= phase.lower) & (times < phase.upper))[0] for phase in phases]
+
+
+def interval_set(
+        starts: np.ndarray, ends: np.ndarray, times: np.ndarray, margin: float) -> List[np.ndarray]:
+    """
+    :param starts:
+    :param ends:
+    :param times:
+    :param margin:
+    :return: the sample indices per phase, computed with IntervalSet
+    """
+    phases = IntervalSet(starts, ends).shrink(margin).filter_min_duration(0.0)
+    return phases.get_indices_per_interval(times)
+
+
+def time_function(function: Callable[[], List[np.ndarray]], repeat: int) -> Tuple[float, list]:
+    """
+    :param function:
+    :param repeat:
+    :return: the fastest time of the function in seconds and its result
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def run_benchmark(duration: float, phases: List[int], repeat: int) -> None:
+    """
+    :param duration:
+    :param phases:
+    :param repeat:
+    :return:
+    """
+    print(f'signal duration: {duration:.0f} s')
+    print(f'{"phases":>7s} {"python-intervals [ms]":>22s} {"IntervalSet [ms]":>17s} '
+          f'{"speedup":>8s}')
+    for n_phases in phases:
+        starts, ends, times = create_phases(duration, n_phases)
+        reference_time, reference = time_function(
+            lambda: python_intervals(starts, ends, times, 0.01), repeat)
+        interval_set_time, result = time_function(
+            lambda: interval_set(starts, ends, times, 0.01), repeat)
+        assert len(result) == len(reference) and all(
+            np.array_equal(indices, expected) for indices, expected in zip(result, reference))
+        print(f'{n_phases:7d} {1e3 * reference_time:22.2f} {1e3 * interval_set_time:17.2f} '
+              f'{reference_time / interval_set_time:8.1f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+    run_benchmark(args.duration, args.phases, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
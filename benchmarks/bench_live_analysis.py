@@ -0,0 +1,101 @@
+#! /usr/bin/env python3
+"""
+Measures the latency of the updates of the live analysis of a growing log and the memory it
+allocates for logs of different durations, compared to the batch analysis of the complete log.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+
+import numpy as np
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.live_check_runner import LiveEclCheckRunner
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the update latency and the memory of the live analysis.')
+    parser.add_argument('--durations', type=float, nargs='+', default=[600.0, 1800.0, 3600.0],
+                        help='the durations of the synthetic logs in seconds')
+    parser.add_argument('--update-interval', type=float, default=1.0,
+                        help='the log time in seconds appended to the file between updates')
+    return parser.parse_args()
+
+
+def run_live_analysis(
+        source_filename: str, filename: str, chunk_size: int) -> Tuple[List[float], float]:
+    """
+    appends the source log to the file in chunks and updates the live analysis after every chunk.
+    :param source_filename:
+    :param filename:
+    :param chunk_size:
+    :return: the update latencies in seconds and the peak allocated memory in MB
+    """
+    latencies = []
+    with open(source_filename, 'rb') as source_file, open(filename, 'wb') as file:
+        tracemalloc.start()
+        live_check_runner = LiveEclCheckRunner(filename)
+        for chunk in iter(lambda: source_file.read(chunk_size), b''):
+            file.write(chunk)
+            file.flush()
+            start = time.perf_counter()
+            live_check_runner.update()
+            live_check_runner.results  # pylint: disable=pointless-statement
+            latencies.append(time.perf_counter() - start)
+        live_check_runner.finish()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return latencies, peak / 1e6
+
+
+def run_batch_analysis(filename: str) -> float:
+    """
+    :param filename:
+    :return: the peak memory in MB allocated by parsing and analysing the complete log
+    """
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        tracemalloc.start()
+        analyse_logdata_ekf(
+            ULog(filename, message_name_filter_list=sorted(EclCheckRunner.required_topics())))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / 1e6
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    print(f'{"duration [s]":>12s} {"updates":>8s} {"p50 [ms]":>9s} {"p95 [ms]":>9s} '
+          f'{"live [MB]":>10s} {"batch [MB]":>11s}')
+    with TemporaryDirectory() as tmp_dir:
+        for duration in args.durations:
+            source_filename = os.path.join(tmp_dir, 'synthetic.ulg')
+            write_synthetic_ulog(source_filename, duration_s=duration)
+            chunk_size = int(os.path.getsize(source_filename) * args.update_interval / duration)
+
+            latencies, live_memory = run_live_analysis(
+                source_filename, os.path.join(tmp_dir, 'growing.ulg'), chunk_size)
+            batch_memory = run_batch_analysis(source_filename)
+            latency_p50, latency_p95 = np.percentile(latencies, [50.0, 95.0])
+            print(f'{duration:12.0f} {len(latencies):8d} {1e3 * latency_p50:9.2f} '
+                  f'{1e3 * latency_p95:9.2f} {live_memory:10.1f} {batch_memory:11.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#! /usr/bin/env python3
+"""
+Measures the time of analysing all estimator instances of multi-EKF logs: one analysis per
+instance (parsing the log and running the checks of the instance) compared to the multi-EKF
+check runner, which parses the log and detects the airtimes once for all instances.
+The time per number of instances is reported relative to a single instance.
+"""
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Callable, List
+
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.multi_ekf_check_runner import MultiEkfCheckRunner
+from ecl_ekf_analysis.log_processing.estimator_instances import EstimatorInstanceULog
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the analysis of all estimator instances of multi-EKF logs.')
+    parser.add_argument('--duration', type=float, default=1800.0,
+                        help='duration of the synthetic logs in seconds')
+    parser.add_argument('--instances', type=int, nargs='+', default=[1, 2, 4, 6],
+                        help='the numbers of estimator instances')
+    parser.add_argument('--threads', type=int, default=os.cpu_count(),
+                        help='the thread pool size of the multi-EKF analysis')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the number of repetitions, the fastest is reported')
+    return parser.parse_args()
+
+
+def analyse_per_instance(filename: str, n_instances: int) -> None:
+    """
+    analyses every estimator instance on its own, as running the analysis once per instance.
+    :param filename:
+    :param n_instances:
+    :return:
+    """
+    for instance in range(n_instances):
+        ulog = ULog(filename, message_name_filter_list=sorted(EclCheckRunner.required_topics()))
+        EclCheckRunner(EstimatorInstanceULog(ulog, instance)).run_checks()
+
+
+def analyse_multi_ekf(filename: str, n_threads: int) -> None:
+    """
+    analyses all estimator instances with a single parse and one thread pool.
+    :param filename:
+    :param n_threads:
+    :return:
+    """
+    ulog = ULog(filename, message_name_filter_list=sorted(EclCheckRunner.required_topics()))
+    MultiEkfCheckRunner(ulog).run_checks(n_threads=n_threads)
+
+
+def time_analysis(analyse: Callable[[], None], repeat: int) -> float:
+    """
+    :param analyse:
+    :param repeat:
+    :return: the fastest time of the analysis in seconds
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            analyse()
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmark(
+        tmp_dir: str, duration: float, instances: List[int], n_threads: int,
+        repeat: int) -> None:
+    """
+    :param tmp_dir:
+    :param duration:
+    :param instances:
+    :param n_threads:
+    :param repeat:
+    :return:
+    """
+    print(f'log duration: {duration:.0f} s, {n_threads:d} threads, {os.cpu_count():d} cpus')
+    print(f'{"instances":>9s} {"per instance [s]":>17s} {"relative":>9s} '
+          f'{"multi-EKF [s]":>14s} {"relative":>9s}')
+    single_times = None
+    for n_instances in instances:
+        filename = os.path.join(tmp_dir, f'multi_ekf_{n_instances:d}.ulg')
+        write_synthetic_ulog(filename, duration_s=duration, n_estimator_instances=n_instances)
+        per_instance_time = time_analysis(
+            lambda: analyse_per_instance(filename, n_instances), repeat)
+        multi_ekf_time = time_analysis(lambda: analyse_multi_ekf(filename, n_threads), repeat)
+        if single_times is None:
+            single_times = per_instance_time, multi_ekf_time
+        print(f'{n_instances:9d} {per_instance_time:17.2f} '
+              f'{per_instance_time / single_times[0]:9.2f} {multi_ekf_time:14.2f} '
+              f'{multi_ekf_time / single_times[1]:9.2f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        run_benchmark(tmp_dir, args.duration, args.instances, args.threads, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#! /usr/bin/env python3
+"""
+Compares the windowed means per airphase and the medians / means / maxima of the vector signals
+of the IMU checks (vibe, the gyro and accelerometer biases and the output tracking errors)
+computed field by field with the batched computation, which gathers the in air samples of all
+fields of a vector signal once into an (n_samples, n_channels) block.
+"""
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from typing import Callable, List, Tuple
+
+import numpy as np
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.imu_analysis import IMU_Bias_Check, IMU_Output_Predictor_Check, \
+    IMU_Vibration_Check
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
+from ecl_ekf_analysis.log_processing.analysis import calculate_multi_channel_statistics, \
+    calculate_stat_from_signal, calculate_windowed_mean_per_airphase
+from tests.synthetic_ulog import write_synthetic_ulog
+
+# the vector signals of the IMU checks and their statistics
+VECTOR_SIGNALS = [
+    ('estimator_status', [signal for signal, _ in IMU_Vibration_Check.vibration_signals],
+     [np.amax, np.mean]),
+    ('estimator_sensor_bias', list(IMU_Bias_Check.bias_signals), [np.median]),
+    ('estimator_status',
+     [signal for signal, _ in IMU_Output_Predictor_Check.output_tracking_error_signals],
+     [np.median]),
+]
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the batched statistics of vector signals.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='a ulog file. synthetic logs of the durations are created if not '
+                             'specified.')
+    parser.add_argument('--durations', type=float, nargs='+', default=[600.0, 1800.0, 3600.0],
+                        help='durations of the synthetic logs in seconds')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='the number of repetitions, the fastest is reported')
+    return parser.parse_args()
+
+
+def statistics_per_field(ulog: ULog, in_air_detector: InAirDetector) -> None:
+    """
+    computes the statistics of the vector signals field by field.
+    :param ulog:
+    :param in_air_detector:
+    :return:
+    """
+    for dataset, variables, stat_functions in VECTOR_SIGNALS:
+        data = ulog.get_dataset(dataset).data
+        for variable in variables:
+            calculate_windowed_mean_per_airphase(data, dataset, variable, in_air_detector)
+            for stat_function in stat_functions:
+                calculate_stat_from_signal(data, dataset, variable, in_air_detector, stat_function)
+
+
+def statistics_batched(ulog: ULog, in_air_detector: InAirDetector) -> None:
+    """
+    computes the statistics of all fields of every vector signal at once.
+    :param ulog:
+    :param in_air_detector:
+    :return:
+    """
+    for dataset, variables, stat_functions in VECTOR_SIGNALS:
+        data = ulog.get_dataset(dataset).data
+        calculate_multi_channel_statistics(
+            data, dataset, variables, in_air_detector, stat_functions)
+
+
+def time_statistics(compute: Callable[[], None], repeat: int) -> float:
+    """
+    :param compute:
+    :param repeat:
+    :return: the fastest time of the computation in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compute()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmark(filenames: List[str], repeat: int) -> None:
+    """
+    :param filenames:
+    :param repeat:
+    :return:
+    """
+    print(f'{"duration [s]":>12s} {"per field [ms]":>15s} {"batched [ms]":>13s} '
+          f'{"speedup":>8s}')
+    for filename in filenames:
+        ulog = ULog(filename)
+        duration = (ulog.last_timestamp - ulog.start_timestamp) / 1e6
+        in_air_detector = InAirDetector(ulog, min_flight_time_seconds=5.0,
+                                        in_air_margin_seconds=5.0)
+        times: Tuple[float, float] = tuple(
+            time_statistics(lambda compute=compute: compute(ulog, in_air_detector), repeat)
+            for compute in [statistics_per_field, statistics_batched])
+        print(f'{duration:12.0f} {1e3 * times[0]:15.2f} {1e3 * times[1]:13.2f} '
+              f'{times[0] / times[1]:8.2f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    if args.filename is not None:
+        run_benchmark([args.filename], args.repeat)
+        return
+
+    with TemporaryDirectory() as tmp_dir:
+        filenames = []
+        for duration in args.durations:
+            filenames.append(os.path.join(tmp_dir, f'synthetic_{duration:.0f}.ulg'))
+            write_synthetic_ulog(filenames[-1], duration_s=duration)
+        run_benchmark(filenames, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+"""
+Compares the throughput of writing and reading the check results of many logs as indented .json
+files with the structured arrays of the .npz results files, and the memory of the check result
+objects with the structured arrays.
+"""
+import argparse
+import io
+import os
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Callable, List, Tuple
+
+import numpy as np
+from pyulog import ULog
+import simplejson as json
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult
+from ecl_ekf_analysis.check_data_interfaces.check_data_utils import check_results_to_arrays, \
+    deserialize_check_results, deserialized_results_from_arrays, serialize_check_results
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the serialization of the check results.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=60.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--n-logs', type=int, default=2000,
+                        help='the number of logs whose results are serialized')
+    return parser.parse_args()
+
+
+def write_json(check_results: List[CheckResult]) -> bytes:
+    """
+    :param check_results:
+    :return: the indented .json results file
+    """
+    return json.dumps(deserialize_check_results(check_results), indent=2).encode()
+
+
+def read_json(content: bytes) -> List[dict]:
+    """
+    :param content: a .json results file
+    :return: the deserialized check results
+    """
+    return json.loads(content)
+
+
+def write_npz(check_results: List[CheckResult]) -> bytes:
+    """
+    :param check_results:
+    :return: the .npz results file, see results_file
+    """
+    results, statistics = check_results_to_arrays(check_results)
+    file = io.BytesIO()
+    np.savez(file, results=results, statistics=statistics)
+    return file.getvalue()
+
+
+def read_npz(content: bytes) -> List[dict]:
+    """
+    :param content: a .npz results file
+    :return: the deserialized check results
+    """
+    with np.load(io.BytesIO(content), allow_pickle=False) as arrays:
+        return deserialized_results_from_arrays(arrays['results'], arrays['statistics'])
+
+
+def measure_throughput(function: Callable, inputs: list) -> Tuple[float, list]:
+    """
+    :param function:
+    :param inputs: the inputs of the function, one per log
+    :return: the logs per second and the outputs
+    """
+    start = time.perf_counter()
+    outputs = [function(value) for value in inputs]
+    return len(inputs) / (time.perf_counter() - start), outputs
+
+
+def measure_memory(create: Callable[[], object]) -> float:
+    """
+    :param create:
+    :return: the memory in kB allocated by the created object
+    """
+    tracemalloc.start()
+    value = create()  # pylint: disable=unused-variable
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / 1e3
+
+
+def run_benchmark(filename: str, n_logs: int) -> None:
+    """
+    :param filename:
+    :param n_logs:
+    :return:
+    """
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        ecl_check_runner = EclCheckRunner(ULog(filename))
+        ecl_check_runner.run_checks()
+    check_results = ecl_check_runner.results
+    test_results = deserialize_check_results(check_results)
+    n_statistics = sum(len(check_result.statistics) for check_result in check_results)
+    logs = [serialize_check_results(test_results) for _ in range(n_logs)]
+
+    print(f'log file: {filename:s}, {len(check_results):d} checks with {n_statistics:d} '
+          f'statistics, {n_logs:d} logs')
+    print(f'{"format":>8s} {"write [logs/s]":>15s} {"read [logs/s]":>14s} {"file size [kB]":>15s} '
+          f'{"memory [kB]":>12s}')
+    for name, write, read, model in [
+            ('json', write_json, read_json, lambda: serialize_check_results(test_results)),
+            ('npz', write_npz, read_npz, lambda: check_results_to_arrays(check_results))]:
+        write_throughput, files = measure_throughput(write, logs)
+        read_throughput, _ = measure_throughput(read, files)
+        print(f'{name:>8s} {write_throughput:15.1f} {read_throughput:14.1f} '
+              f'{len(files[0]) / 1e3:15.1f} {measure_memory(model):12.1f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = args.filename
+        if filename is None:
+            filename = os.path.join(tmp_dir, 'synthetic.ulg')
+            write_synthetic_ulog(filename, duration_s=args.duration)
+        run_benchmark(filename, args.n_logs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+"""
+Compares a fleet-wide query (all logs with a failed check in the last month) over the results
+store with walking and parsing one .json result file per log.
+"""
+import argparse
+import glob
+import os
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import simplejson as json
+
+from ecl_ekf_analysis.log_processing.results_store import ResultsStore
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf
+from tests.synthetic_ulog import write_synthetic_ulog
+
+_DAY = 86400.0
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark fleet-wide queries over the results store vs. .json files.')
+    parser.add_argument('--n-logs', type=int, default=10000,
+                        help='the number of analysed logs')
+    parser.add_argument('--fail-fraction', type=float, default=0.05,
+                        help='the fraction of logs with a failed MAGNETOMETER_STATUS check')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='the number of repetitions of the queries')
+    return parser.parse_args()
+
+
+def query_json_files(result_dir: str, check_type: str, status: str, since: float):
+    """
+    :param result_dir:
+    :param check_type:
+    :param status:
+    :param since:
+    :return: the result files of the logs with a check of the given type and status
+    """
+    filenames = []
+    for result_file in glob.glob(os.path.join(result_dir, '**/*.json'), recursive=True):
+        if os.path.getmtime(result_file) < since:
+            continue
+        with open(result_file, 'r') as file:
+            test_results = json.load(file)
+        if any(test_result['type'] == check_type and test_result['status'] == status
+               for test_result in test_results):
+            filenames.append(result_file)
+    return filenames
+
+
+def min_time(function, repeats: int) -> float:
+    """
+    :param function:
+    :param repeats:
+    :return: the minimum wall time of the function in seconds
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+    rng = np.random.RandomState(0)
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'synthetic.ulg')
+        write_synthetic_ulog(filename, duration_s=60.0)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            test_results = process_logdata_ekf(filename, write_json=False)
+
+        # the logs of the last 90 days
+        now = time.time()
+        log_times = now - rng.uniform(0.0, 90.0 * _DAY, args.n_logs)
+        failed = rng.uniform(size=args.n_logs) < args.fail_fraction
+        logs = []
+        for i, fail in enumerate(failed):
+            status = 'FAIL' if fail else 'PASS'
+            logs.append((os.path.join(tmp_dir, 'logs', f'log_{i:d}.ulg'), [
+                dict(test_result, status=status)
+                if test_result['type'] == 'MAGNETOMETER_STATUS' else test_result
+                for test_result in test_results]))
+
+        start = time.perf_counter()
+        os.makedirs(os.path.join(tmp_dir, 'logs'))
+        for (log_file, log_results), log_time in zip(logs, log_times):
+            result_file = f'{os.path.splitext(log_file)[0]:s}.json'
+            with open(result_file, 'w') as file:
+                json.dump(log_results, file, indent=2)
+            os.utime(result_file, (log_time, log_time))
+        json_write_time = time.perf_counter() - start
+
+        database = os.path.join(tmp_dir, 'results.db')
+        with ResultsStore(database) as results_store:
+            start = time.perf_counter()
+            n_statistics = results_store.add_results(logs, log_times=log_times)
+            store_write_time = time.perf_counter() - start
+
+            since = now - 30.0 * _DAY
+            n_expected = int(np.sum(failed & (log_times >= since)))
+            assert len(results_store.query_logs(
+                'MAGNETOMETER_STATUS', status='FAIL', since=since)) == n_expected
+            assert len(query_json_files(
+                os.path.join(tmp_dir, 'logs'), 'MAGNETOMETER_STATUS', 'FAIL', since)) == \
+                n_expected
+
+            store_query_time = min_time(lambda: results_store.query_logs(
+                'MAGNETOMETER_STATUS', status='FAIL', since=since), args.repeats)
+            statistics_query_time = min_time(lambda: results_store.query_statistics(
+                check_type='MAGNETOMETER_STATUS', status='FAIL', since=since), args.repeats)
+        json_query_time = min_time(lambda: query_json_files(
+            os.path.join(tmp_dir, 'logs'), 'MAGNETOMETER_STATUS', 'FAIL', since), args.repeats)
+
+        json_size = sum(os.path.getsize(result_file) for result_file in glob.glob(
+            os.path.join(tmp_dir, 'logs', '*.json')))
+        store_size = sum(os.path.getsize(store_file)
+                         for store_file in glob.glob(f'{database:s}*'))
+
+    print(f'{args.n_logs:d} logs, {n_statistics:d} statistics, '
+          f'{n_expected:d} logs with MAGNETOMETER_STATUS FAIL in the last 30 days')
+    print(f'{"":>28s} {"json files":>12s} {"results store":>14s}')
+    print(f'{"write [s]":>28s} {json_write_time:12.2f} {store_write_time:14.2f}')
+    print(f'{"size [MB]":>28s} {json_size / 1e6:12.1f} {store_size / 1e6:14.1f}')
+    print(f'{"query logs [ms]":>28s} {1e3 * json_query_time:12.1f} '
+          f'{1e3 * store_query_time:14.2f}')
+    print(f'{"query statistics [ms]":>28s} {"":>12s} {1e3 * statistics_query_time:14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+"""
+Compares the throughput of re-applying thresholds to stored check results with the throughput of
+analysing the log files again.
+"""
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+import simplejson as json
+
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf
+from ecl_ekf_analysis.rethreshold_logdata_ekf import rethreshold_result_files
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the re-evaluation of stored check results.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=600.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--n-files', type=int, default=2000,
+                        help='the number of result files to re-evaluate')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='the number of worker processes of the parallel re-evaluation')
+    return parser.parse_args()
+
+
+def run_benchmark(filename: str, result_dir: str, n_files: int, jobs: int) -> None:
+    """
+    :param filename:
+    :param result_dir: the directory of the result files
+    :param n_files:
+    :param jobs:
+    :return:
+    """
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        test_results = process_logdata_ekf(filename)
+        analysis_time = time.perf_counter() - start
+
+    result_files = []
+    for i in range(n_files):
+        result_file = os.path.join(result_dir, f'log_{i:d}.json')
+        with open(result_file, 'w') as file:
+            json.dump(test_results, file, indent=2)
+        result_files.append(result_file)
+
+    print(f'log file: {filename:s}, {n_files:d} result files')
+    print(f'{"method":>24s} {"time per log [ms]":>18s} {"logs per second":>16s}')
+    print(f'{"analysis":>24s} {1e3 * analysis_time:18.2f} {1.0 / analysis_time:16.1f}')
+    for n_jobs in sorted({1, jobs}):
+        start = time.perf_counter()
+        rethreshold_result_files(result_files, jobs=n_jobs)
+        rethreshold_time = (time.perf_counter() - start) / n_files
+        method = f'rethreshold ({n_jobs:d} jobs)'
+        print(f'{method:>24s} {1e3 * rethreshold_time:18.2f} {1.0 / rethreshold_time:16.1f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = args.filename
+        if filename is None:
+            filename = os.path.join(tmp_dir, 'synthetic.ulg')
+            write_synthetic_ulog(filename, duration_s=args.duration)
+        result_dir = os.path.join(tmp_dir, 'results')
+        os.makedirs(result_dir)
+        run_benchmark(filename, result_dir, args.n_files, args.jobs)
+
+
+if __name__ == '__main__':
+    main()
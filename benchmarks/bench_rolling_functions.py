@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+"""
+Compares the vectorized rolling reductions of apply_rolling_fun_1d to applying the function window
+by window with np.apply_along_axis.
+"""
+import argparse
+import functools
+import timeit
+
+import numpy as np
+
+from ecl_ekf_analysis.signal_processing.smooth_filt_rolling import apply_rolling_fun_1d, \
+    rolling_window_1d
+
+_FUNCTIONS = {
+    'mean': np.mean,
+    'max': np.amax,
+    'min': np.amin,
+    'median': np.median,
+    'std': np.std,
+    'percentile': functools.partial(np.percentile, q=95.0),
+}
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the rolling reductions.')
+    parser.add_argument('--n-samples', type=int, default=20000, help='the signal length')
+    parser.add_argument('--window-len', type=int, nargs='+', default=[51, 501],
+                        help='the window lengths to benchmark (odd)')
+    parser.add_argument('--functions', nargs='+', default=list(_FUNCTIONS),
+                        choices=list(_FUNCTIONS), help='the functions to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+    input_signal = np.random.RandomState(0).normal(size=args.n_samples)
+
+    print(f'{args.n_samples:d} samples')
+    print(f'{"function":>10s} {"window":>8s} {"apply_along_axis [ms]":>22s} '
+          f'{"vectorized [ms]":>16s} {"speedup":>8s}')
+    for name in args.functions:
+        fun = _FUNCTIONS[name]
+        for window_len in args.window_len:
+            def apply_along_axis(fun=fun, window_len=window_len):
+                return np.apply_along_axis(
+                    fun, 1, rolling_window_1d(input_signal, window_len))
+
+            def vectorized(fun=fun, window_len=window_len):
+                return apply_rolling_fun_1d(input_signal, fun, window_len)
+
+            np.testing.assert_allclose(vectorized(), apply_along_axis(), rtol=1e-9, atol=1e-12)
+            apply_time = min(timeit.repeat(apply_along_axis, number=1, repeat=args.repeat))
+            vectorized_time = min(timeit.repeat(vectorized, number=1, repeat=args.repeat))
+            print(f'{name:>10s} {window_len:8d} {1e3 * apply_time:22.2f} '
+                  f'{1e3 * vectorized_time:16.2f} {apply_time / vectorized_time:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
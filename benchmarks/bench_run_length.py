@@ -0,0 +1,185 @@
+#! /usr/bin/env python3
+"""
+Compares the run length encoding of flags with thousands of toggles: the former detection of the
+flag value changes (two np.diff passes and the edge cases fixed up on Python lists) with the
+vectorized runs of find_runs, for
+- a single flag over the number of toggles,
+- the airtimes of the InAirDetector of logs with many flights,
+- all flags of the estimator_status_flags, one at a time vs. find_runs_of_fields.
+"""
+import argparse
+import os
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from typing import Callable, List
+
+import numpy as np
+from pyulog import ULog
+
+from ecl_ekf_analysis.analysis.in_air_detector import Airtime, InAirDetector
+from ecl_ekf_analysis.signal_processing.run_length import find_runs, find_runs_of_fields
+from tests.synthetic_ulog import CONTROL_STATUS_FLAGS, FAULT_STATUS_FLAGS, REJECT_STATUS_FLAGS, \
+    write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the run length encoding of flags.')
+    parser.add_argument('--duration', type=float, default=3600.0,
+                        help='duration of the flags in seconds (at 100 Hz)')
+    parser.add_argument('--toggles', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='the numbers of flag toggles')
+    parser.add_argument('--flights', type=int, nargs='+', default=[10, 100, 1000],
+                        help='the numbers of flights of the synthetic logs')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='the number of repetitions, the fastest is reported')
+    return parser.parse_args()
+
+
+def detect_flag_value_changes_lists(flag: np.ndarray) -> tuple:
+    """
+    the former detect_flag_value_changes.
+    :param flag:
+    :return: the indices of the first and the last sample per phase
+    """
+    phase_starts = []
+    phase_ends = []
+    if np.any(flag > 0):
+        phase_starts = np.where(np.diff(flag) > 0)[0].tolist()
+        phase_ends = np.where(np.diff(flag) < 0)[0].tolist()
+        if len(phase_starts) == 0 or \
+                ((len(phase_ends) > 0) and (phase_ends[0] < phase_starts[0])):
+            phase_starts = [-1] + phase_starts
+        phase_starts = [phase_start + 1 for phase_start in phase_starts]
+        if len(phase_ends) < len(phase_starts):
+            phase_ends += [len(flag) - 1]
+    return phase_starts, phase_ends
+
+
+def detect_airtime_lists(ulog: ULog) -> List[Airtime]:
+    """
+    the former InAirDetector._detect_airtime without the in air margin and min flight time.
+    :param ulog:
+    :return: the airtimes
+    """
+    vehicle_land_detected = ulog.get_dataset('vehicle_land_detected').data
+    landed = vehicle_land_detected['landed']
+    if (landed > 0).all():
+        return []
+    take_offs = np.where(np.diff(landed) < 0)[0].tolist()
+    landings = np.where(np.diff(landed) > 0)[0].tolist()
+    if len(take_offs) == 0 or ((len(landings) > 0) and (landings[0] < take_offs[0])):
+        take_offs = [-1] + take_offs
+    take_offs = [take_off + 1 for take_off in take_offs]
+    if len(landings) < len(take_offs):
+        landings += [len(landed) - 2]
+    landings = [landing + 1 for landing in landings]
+
+    in_air = []
+    for take_off, landing in zip(take_offs, landings):
+        if vehicle_land_detected['timestamp'][landing] / 1e6 - \
+                vehicle_land_detected['timestamp'][take_off] / 1e6 >= 0.0:
+            in_air.append(Airtime(
+                take_off=(vehicle_land_detected['timestamp'][take_off] -
+                          ulog.start_timestamp) / 1.0e6,
+                landing=(vehicle_land_detected['timestamp'][landing] -
+                         ulog.start_timestamp) / 1.0e6))
+    return in_air
+
+
+def time_function(function: Callable[[], object], repeat: int) -> float:
+    """
+    :param function:
+    :param repeat:
+    :return: the fastest time of the function in milliseconds
+    """
+    times = []
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+    return 1e3 * min(times)
+
+
+def create_flags(n_samples: int, n_toggles: int, random_state: np.random.RandomState) -> np.ndarray:
+    """
+    :param n_samples:
+    :param n_toggles:
+    :param random_state:
+    :return: a flag toggling at n_toggles random samples
+    """
+    toggles = np.zeros(n_samples, dtype=np.int8)
+    toggles[random_state.choice(np.arange(1, n_samples), size=n_toggles, replace=False)] = 1
+    return (np.cumsum(toggles) % 2).astype(bool)
+
+
+def run_benchmark(
+        tmp_dir: str, duration: float, toggles: List[int], flights: List[int],
+        repeat: int) -> None:
+    """
+    :param tmp_dir:
+    :param duration:
+    :param toggles:
+    :param flights:
+    :param repeat:
+    :return:
+    """
+    random_state = np.random.RandomState(0)
+    n_samples = int(100 * duration)
+
+    print(f'single flag, {n_samples:d} samples')
+    print(f'{"toggles":>8s} {"lists [ms]":>11s} {"find_runs [ms]":>15s} {"speedup":>8s}')
+    for n_toggles in toggles:
+        flag = create_flags(n_samples, n_toggles, random_state).astype(int)
+        lists_time = time_function(lambda: detect_flag_value_changes_lists(flag), repeat)
+        runs_time = time_function(lambda: find_runs(flag), repeat)
+        print(f'{n_toggles:8d} {lists_time:11.2f} {runs_time:15.2f} '
+              f'{lists_time / runs_time:8.1f}')
+
+    print(f'\nairtimes, {duration:.0f} s logs')
+    print(f'{"flights":>8s} {"lists [ms]":>11s} {"InAirDetector [ms]":>19s} {"speedup":>8s}')
+    for n_flights in flights:
+        filename = os.path.join(tmp_dir, f'flights_{n_flights:d}.ulg')
+        flight_starts = np.linspace(1.0, duration - 1.0, n_flights, endpoint=False)
+        flight_duration = 0.5 * (flight_starts[1] - flight_starts[0]) if n_flights > 1 else 1.0
+        write_synthetic_ulog(filename, duration_s=duration, flights=[
+            (start, start + flight_duration) for start in flight_starts])
+        ulog = ULog(filename, message_name_filter_list=['vehicle_land_detected'])
+        lists_time = time_function(lambda: detect_airtime_lists(ulog), repeat)
+        detector_time = time_function(lambda: InAirDetector(ulog), repeat)
+        print(f'{n_flights:8d} {lists_time:11.2f} {detector_time:19.2f} '
+              f'{lists_time / detector_time:8.1f}')
+
+    fields = CONTROL_STATUS_FLAGS + FAULT_STATUS_FLAGS + REJECT_STATUS_FLAGS
+    print(f'\nestimator_status_flags, {len(fields):d} flags, {n_samples:d} samples')
+    print(f'{"toggles":>8s} {"lists [ms]":>11s} {"find_runs [ms]":>15s} '
+          f'{"find_runs_of_fields [ms]":>25s} {"speedup":>8s}')
+    for n_toggles in toggles:
+        data = {field: create_flags(n_samples, n_toggles, random_state) for field in fields}
+        lists_time = time_function(
+            lambda: [detect_flag_value_changes_lists(data[field].astype(int))
+                     for field in fields], repeat)
+        runs_time = time_function(lambda: [find_runs(data[field]) for field in fields], repeat)
+        batch_time = time_function(lambda: find_runs_of_fields(data, fields), repeat)
+        print(f'{n_toggles:8d} {lists_time:11.2f} {runs_time:15.2f} {batch_time:25.2f} '
+              f'{lists_time / batch_time:8.1f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        run_benchmark(tmp_dir, args.duration, args.toggles, args.flights, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+"""
+Compares the flat window smoothing of smooth_1d_boundaries by prefix sums to the smoothing by
+convolution over signal lengths and window lengths.
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from ecl_ekf_analysis.signal_processing.smooth_filt_rolling import smooth_1d_boundaries, \
+    convolve_1d_boundaries
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the flat window smoothing.')
+    parser.add_argument('--n-samples', type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help='the signal lengths to benchmark')
+    parser.add_argument('--window-len', type=int, nargs='+', default=[51, 501, 3001, 30001],
+                        help='the window lengths to benchmark (odd)')
+    parser.add_argument('--mode', default='valid', choices=['valid', 'same', 'mirror'])
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions')
+    return parser.parse_args()
+
+
+def smooth_by_convolution(input_signal: np.ndarray, window_len: int, mode: str) -> np.ndarray:
+    """
+    the flat window smoothing by convolution.
+    :param input_signal:
+    :param window_len:
+    :param mode:
+    :return:
+    """
+    c_filter = np.ones(window_len, dtype='float32')
+    return convolve_1d_boundaries(input_signal, c_filter / c_filter.sum(), mode=mode)
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+    rng = np.random.RandomState(0)
+
+    print(f'{"samples":>10s} {"window":>8s} {"convolution [ms]":>17s} {"prefix sum [ms]":>16s} '
+          f'{"speedup":>8s} {"max rel. error":>15s}')
+    for n_samples in args.n_samples:
+        # a thresholded signal, as used for the windowed percentages
+        input_signal = 100.0 * (rng.uniform(size=n_samples) > 0.9)
+        for window_len in args.window_len:
+            if window_len > n_samples:
+                continue
+            expected = smooth_by_convolution(input_signal, window_len, args.mode)
+            smoothed = smooth_1d_boundaries(input_signal, window_len=window_len, mode=args.mode)
+            error = np.max(np.abs(smoothed - expected) / np.maximum(np.abs(expected), 1e-12))
+
+            convolution_time = min(timeit.repeat(
+                lambda: smooth_by_convolution(input_signal, window_len, args.mode),
+                number=1, repeat=args.repeat))
+            prefix_sum_time = min(timeit.repeat(
+                lambda: smooth_1d_boundaries(input_signal, window_len=window_len, mode=args.mode),
+                number=1, repeat=args.repeat))
+            print(f'{n_samples:10d} {window_len:8d} {1e3 * convolution_time:17.2f} '
+                  f'{1e3 * prefix_sum_time:16.2f} {convolution_time / prefix_sum_time:8.1f} '
+                  f'{error:15.1e}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+"""
+Compares loading the topics required by the checks by parsing the ulog file to loading them from
+the topic cache.
+"""
+import argparse
+import os
+import timeit
+from tempfile import TemporaryDirectory
+
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.log_processing.topic_cache import TopicCache
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the topic cache.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=1800.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions')
+    return parser.parse_args()
+
+
+def run_benchmark(filename: str, cache_dir: str, repeat: int) -> None:
+    """
+    :param filename:
+    :param cache_dir:
+    :param repeat:
+    :return:
+    """
+    topics = sorted(EclCheckRunner.required_topics())
+    topic_cache = TopicCache(cache_dir)
+
+    parse_time = min(timeit.repeat(
+        lambda: ULog(filename, message_name_filter_list=topics), number=1, repeat=repeat))
+    cold_time = timeit.timeit(lambda: topic_cache.load_ulog(filename, topics=topics), number=1)
+    warm_time = min(timeit.repeat(
+        lambda: topic_cache.load_ulog(filename, topics=topics), number=1, repeat=repeat))
+
+    print(f'log file: {filename:s} ({os.path.getsize(filename) / 1e6:.1f} MB), '
+          f'cache entry: {topic_cache.size() / 1e6:.1f} MB')
+    print(f'{"parse [s]":>10s} {"cold cache [s]":>15s} {"warm cache [s]":>15s} {"speedup":>8s}')
+    print(f'{parse_time:10.3f} {cold_time:15.3f} {warm_time:15.3f} '
+          f'{parse_time / warm_time:8.1f}')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = args.filename
+        if filename is None:
+            filename = os.path.join(tmp_dir, 'synthetic.ulg')
+            write_synthetic_ulog(filename, duration_s=args.duration)
+        run_benchmark(filename, os.path.join(tmp_dir, 'cache'), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+"""
+Compares the parse time and the peak memory of loading all topics of a ulog file to loading only
+the topics required by the ecl checks.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+
+from tests.synthetic_ulog import write_synthetic_ulog
+
+_PARSE_SCRIPT = '''
+import json, sys, time, tracemalloc
+from pyulog import ULog
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+topics = sorted(EclCheckRunner.required_topics()) if sys.argv[2] == 'filtered' else None
+start = time.perf_counter()
+ulog = ULog(sys.argv[1], message_name_filter_list=topics)
+elapsed = time.perf_counter() - start
+# parse a second time with tracing enabled, as tracemalloc slows down the parsing
+del ulog
+tracemalloc.start()
+ulog = ULog(sys.argv[1], message_name_filter_list=topics)
+peak = tracemalloc.get_traced_memory()[1]
+print(json.dumps({'time': elapsed, 'peak_bytes': peak,
+                  'topics': len(ulog.data_list)}))
+'''
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the selective topic loading.')
+    parser.add_argument('filename', nargs='?', default=None,
+                        help='the ulog file. a synthetic log is created if not specified.')
+    parser.add_argument('--duration', type=float, default=1800.0,
+                        help='duration of the synthetic log in seconds')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions')
+    return parser.parse_args()
+
+
+def parse(filename: str, mode: str) -> dict:
+    """
+    parses the log in a fresh interpreter, such that the runs are independent. The peak memory is
+    the peak of the memory allocated during the parsing as traced by tracemalloc, i.e. without the
+    memory used by the imports.
+    :param filename:
+    :param mode: 'all' or 'filtered'
+    :return:
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', _PARSE_SCRIPT, filename, mode], check=True,
+        stdout=subprocess.PIPE).stdout
+    return json.loads(output.decode().splitlines()[-1])
+
+
+def run_benchmark(filename: str, repeat: int) -> None:
+    """
+    :param filename:
+    :param repeat:
+    :return:
+    """
+    print(f'log file: {filename:s} ({os.path.getsize(filename) / 1e6:.1f} MB)')
+    print(f'{"topics":>10s} {"#topics":>8s} {"time [s]":>10s} {"peak memory [MB]":>17s}')
+    results = {}
+    for mode in ['all', 'filtered']:
+        runs = [parse(filename, mode) for _ in range(repeat)]
+        results[mode] = (min(run['time'] for run in runs),
+                         min(run['peak_bytes'] for run in runs) / 1e6)
+        print(f'{mode:>10s} {runs[0]["topics"]:8d} {results[mode][0]:10.2f} '
+              f'{results[mode][1]:17.1f}')
+    print(f'saved {100.0 * (1.0 - results["filtered"][0] / results["all"][0]):.0f} % parse time '
+          f'and {results["all"][1] - results["filtered"][1]:.1f} MB peak memory')
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    if args.filename is not None:
+        run_benchmark(args.filename, args.repeat)
+        return
+
+    with TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'synthetic.ulg')
+        write_synthetic_ulog(filename, duration_s=args.duration)
+        run_benchmark(filename, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
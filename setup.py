@@ -41,7 +41,7 @@ setup(
     license='BSD 3-Clause',
     classifiers=[_f for _f in CLASSIFIERS.split('\n') if _f],
     platforms=["Windows", "Linux", "Solaris", "Mac OS-X", "Unix"],
-    install_requires=['pyulog', 'matplotlib', 'python-intervals', 'simplejson', 'scipy'],
+    install_requires=['pyulog', 'simplejson', 'scipy'],
     tests_require=['pytest'],
     test_suite='pytest',
     package_dir = {'': 'src'},
@@ -49,7 +49,12 @@ setup(
     entry_points = {
             'console_scripts': [
                 'batch_process_logdata_ekf=ecl_ekf_analysis.batch_process_logdata_ekf:main',
-                'process_logdata_ekf=ecl_ekf_analysis.process_logdata_ekf:main'
+                'live_process_logdata_ekf=ecl_ekf_analysis.live_process_logdata_ekf:main',
+                'process_logdata_ekf=ecl_ekf_analysis.process_logdata_ekf:main',
+                'prune_topic_cache=ecl_ekf_analysis.log_processing.topic_cache:main',
+                'query_results_store=ecl_ekf_analysis.log_processing.results_store:main',
+                'rethreshold_logdata_ekf=ecl_ekf_analysis.rethreshold_logdata_ekf:main',
+                'serve_logdata_ekf=ecl_ekf_analysis.serve_logdata_ekf:main'
             ],
     },
     include_package_data=True,
@@ -2,11 +2,14 @@
 """
 a class for airtime detection.
 """
-from typing import Optional, List
+import copy
+from typing import Optional, List, Dict, Tuple, Union
 import numpy as np
 from pyulog import ULog
 
+from ecl_ekf_analysis.analysis.interval_set import IntervalSet, get_index_bounds
 from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
+from ecl_ekf_analysis.signal_processing.run_length import find_runs
 
 
 #pylint: disable=too-few-public-methods
@@ -25,6 +28,8 @@ class InAirDetector():
     this class handles airtime detection.
     """
 
+    required_topics = ('vehicle_land_detected',)
+
     def __init__(
             self, ulog: ULog, min_flight_time_seconds: float = 0.0,
             in_air_margin_seconds: float = 0.0) -> None:
@@ -55,58 +60,62 @@ class InAirDetector():
 
         self._in_air = self._detect_airtime()
 
+        self._clear_airtime_caches()
+
+    def _clear_airtime_caches(self) -> None:
+        """
+        clears the airtime indices per (dataset, multi_instance).
+        :return:
+        """
+        self._airtime_cache = {}
+        self._airtime_per_phase_cache = {}
+        self._airtime_bounds_cache = {}
+        self._airtime_selection_cache = {}
+
+    def with_ulog(self, ulog: ULog) -> 'InAirDetector':
+        """
+        returns a detector with the airtimes of this detector, which looks up the datasets in
+        another view of the same log (e.g. an EstimatorInstanceULog) instead of detecting the
+        airtimes again.
+        :param ulog: a view of the ulog of this detector
+        :return:
+        """
+        in_air_detector = copy.copy(self)
+        in_air_detector._ulog = ulog
+        in_air_detector._clear_airtime_caches()
+        return in_air_detector
+
     def _detect_airtime(self) -> List[Airtime]:
         """
         detects the airtime take_off and landing of a ulog.
         :return: a named tuple of ('Airtime', ['take_off', 'landing']) or None.
         """
 
+        # the runs of in air samples, the landing is the first landed sample after a run
+        in_air_runs = find_runs(self._landed <= 0)
+
         # test whether flight was in air at all
-        if (self._landed > 0).all():
+        if len(in_air_runs) == 0:
             print('InAirDetector: always on ground.')
             return []
 
-        # find the indices of all take offs and landings
-        take_offs = np.where(np.diff(self._landed) < 0)[0].tolist()
-        landings = np.where(np.diff(self._landed) > 0)[0].tolist()
-
-        # check for start in air.
-        if len(take_offs) == 0 or (
-            (len(landings) > 0) and (
-                landings[0] < take_offs[0])):
-
+        if in_air_runs.starts[0] == 0:
             print('Started in air. Take first timestamp value as start point.')
-            take_offs = [-1] + take_offs
-
-        # correct for offset: add 1 to take_off list
-        take_offs = [take_off + 1 for take_off in take_offs]
-        if len(landings) < len(take_offs):
+        if in_air_runs.ends[-1] == len(self._landed):
             print('No final landing detected. Assume last timestamp is landing.')
-            landings += [len(self._landed) - 2]
-        # correct for offset: add 1 to landing list
-        landings = [landing + 1 for landing in landings]
-
-        assert len(landings) == len(
-            take_offs), 'InAirDetector: different number of take offs' ' and landings.'
-
-        in_air = []
-        for take_off, landing in zip(take_offs, landings):
-            if (self._vehicle_land_detected['timestamp'][landing] / 1e6 -
-                    self._in_air_margin_seconds) - \
-                    (self._vehicle_land_detected['timestamp'][take_off] / 1e6 +
-                     self._in_air_margin_seconds) >= self._min_flight_time_seconds:
-                in_air.append(
-                    Airtime(
-                        take_off=(
-                            self._vehicle_land_detected['timestamp'][take_off] -
-                            self._ulog.start_timestamp) /
-                        1.0e6 +
-                        self._in_air_margin_seconds,
-                        landing=(
-                            self._vehicle_land_detected['timestamp'][landing] -
-                            self._ulog.start_timestamp) /
-                        1.0e6 -
-                        self._in_air_margin_seconds))
+
+        timestamp = self._vehicle_land_detected['timestamp']
+        take_offs = in_air_runs.get_start_times(timestamp)
+        landings = in_air_runs.get_end_times(timestamp)
+        is_long_enough = (landings / 1e6 - self._in_air_margin_seconds) - \
+            (take_offs / 1e6 + self._in_air_margin_seconds) >= self._min_flight_time_seconds
+
+        in_air = [
+            Airtime(take_off=take_off + self._in_air_margin_seconds,
+                    landing=landing - self._in_air_margin_seconds)
+            for take_off, landing in zip(
+                (take_offs[is_long_enough] - self._ulog.start_timestamp) / 1.0e6,
+                (landings[is_long_enough] - self._ulog.start_timestamp) / 1.0e6)]
         if len(in_air) == 0:
             print('InAirDetector: no airtime detected.')
 
@@ -120,6 +129,15 @@ class InAirDetector():
         """
         return self._in_air
 
+    @property
+    def airtime_intervals(self) -> IntervalSet:
+        """
+        airtimes as an interval set, e.g. to intersect them with other phases of the flight
+        :return:
+        """
+        return IntervalSet([airtime.take_off for airtime in self.airtimes],
+                           [airtime.landing for airtime in self.airtimes])
+
     @property
     def take_off(self) -> Optional[float]:
         """
@@ -200,51 +218,69 @@ class InAirDetector():
 
         return airtime_indices
 
-    def get_total_airtime_for_timestamp(
+    def get_airtime_bounds_for_timestamp(
             self, timestamps: np.ndarray, start_time: Optional[float] = None,
-            conversion_factor: Optional[float] = None) -> list:
+            conversion_factor: Optional[float] = None) -> Optional[List[Tuple[int, int]]]:
         """
+        returns the index bounds [start, end) of the timestamps per airtime. As the timestamps of a
+        dataset are sorted, the indices of an airtime are contiguous and are found by a binary
+        search instead of comparing every timestamp against every airtime.
         :param timestamps:
         :param start_time: an optional start time (in the same unit as timestamps). if not
         specified, the first entry of timestamps is assumed to be the start time.
         :param conversion_factor: the factor to convert the timestamps into seconds. if not
         specified, it's assumed the timestamps are in seconds.
-        :return:
+        :return: the index bounds per airtime or None, if the timestamps are not sorted.
         """
-        airtime_indices = []
         start_timestamp = timestamps[0] if start_time is None else start_time
         convert = 1.0 if conversion_factor is None else conversion_factor
 
-        if self.airtimes is not None:
-            for airtime in self.airtimes:
-                airtime_indices.extend(
-                    np.where(
-                        ((timestamps - start_timestamp) * convert >= airtime.take_off) &
-                        ((timestamps - start_timestamp) * convert < airtime.landing))[0])
+        relative_time = (timestamps - start_timestamp) * convert
+        bounds = get_index_bounds(
+            relative_time, [airtime.take_off for airtime in self.airtimes],
+            [airtime.landing for airtime in self.airtimes])
+        if bounds is None:
+            return None
 
-        return airtime_indices
+        return [(start, end) for start, end in bounds.tolist()]
 
-    def get_airtime(self, dataset: str, multi_instance: int = 0) -> list:
+    def get_total_airtime_for_timestamp(
+            self, timestamps: np.ndarray, start_time: Optional[float] = None,
+            conversion_factor: Optional[float] = None) -> np.ndarray:
         """
-        return all indices of the log file that are in air
+        :param timestamps:
+        :param start_time: an optional start time (in the same unit as timestamps). if not
+        specified, the first entry of timestamps is assumed to be the start time.
+        :param conversion_factor: the factor to convert the timestamps into seconds. if not
+        specified, it's assumed the timestamps are in seconds.
+        :return:
+        """
+        airtime_indices = self.get_airtime_per_phase_for_timestamp(
+            timestamps, start_time=start_time, conversion_factor=conversion_factor)
+
+        if not airtime_indices:
+            return np.array([], dtype=np.intp)
+
+        return np.concatenate(airtime_indices)
+
+    def get_airtime(self, dataset: str, multi_instance: int = 0) -> np.ndarray:
+        """
+        return all indices of the log file that are in air. The indices are computed once per
+        dataset and cached.
         :param dataset:
         :return:
         """
-        try:
-            data = self._ulog.get_dataset(
-                dataset, multi_instance=multi_instance).data
-        except Exception as e:
-            raise PreconditionError(
-                f'InAirDetector: {dataset:s} not found in log.') from e
+        key = (dataset, multi_instance)
+        if key not in self._airtime_cache:
+            airtime_indices = self.get_airtime_per_phase(dataset, multi_instance=multi_instance)
+            self._airtime_cache[key] = np.concatenate(airtime_indices) if airtime_indices \
+                else np.array([], dtype=np.intp)
 
-        return self.get_total_airtime_for_timestamp(
-            data['timestamp'],
-            start_time=self._ulog.start_timestamp,
-            conversion_factor=1.0e-6)
+        return self._airtime_cache[key]
 
     def get_airtime_per_phase_for_timestamp(
             self, timestamps: np.ndarray, start_time: Optional[float] = None,
-            conversion_factor: Optional[float] = None) -> list:
+            conversion_factor: Optional[float] = None) -> List[np.ndarray]:
         """
         :param timestamps:
         :param start_time: an optional start time (in the same unit as timestamps). if not
@@ -253,29 +289,110 @@ class InAirDetector():
         specified, it's assumed the timestamps are in seconds.
         :return:
         """
-        airtime_indices = []
+        bounds = self.get_airtime_bounds_for_timestamp(
+            timestamps, start_time=start_time, conversion_factor=conversion_factor)
+
+        if bounds is not None:
+            return [np.arange(start, end) for start, end in bounds]
+
+        # unsorted timestamps: fall back to comparing all timestamps per airtime
         start_timestamp = timestamps[0] if start_time is None else start_time
         convert = 1.0 if conversion_factor is None else conversion_factor
+        relative_time = (timestamps - start_timestamp) * convert
 
-        if self.airtimes is not None:
-            for airtime in self.airtimes:
-                airtime_indices.append(
-                    np.where(
-                        ((timestamps - start_timestamp) * convert >= airtime.take_off) &
-                        ((timestamps - start_timestamp) * convert < airtime.landing))[0])
+        return [np.where((relative_time >= airtime.take_off) &
+                         (relative_time < airtime.landing))[0] for airtime in self.airtimes]
 
-        return airtime_indices
+    def get_airtime_bounds(
+            self, dataset: str, multi_instance: int = 0) -> Optional[List[Tuple[int, int]]]:
+        """
+        return the index bounds [start, end) per airtime of a dataset, see
+        get_airtime_bounds_for_timestamp. The bounds are computed once per dataset and cached.
+        :param dataset:
+        :param multi_instance:
+        :return: the index bounds per airtime or None, if the timestamps are not sorted.
+        """
+        key = (dataset, multi_instance)
+        if key not in self._airtime_bounds_cache:
+            self._airtime_bounds_cache[key] = self.get_airtime_bounds_for_timestamp(
+                self._get_timestamps(dataset, multi_instance),
+                start_time=self._ulog.start_timestamp,
+                conversion_factor=1.0e-6)
+
+        return self._airtime_bounds_cache[key]
 
     def get_airtime_per_phase(
             self,
             dataset: str,
-            multi_instance: int = 0) -> List[list]:
+            multi_instance: int = 0) -> List[np.ndarray]:
+        """
+        return all indices of the log file that are in air. The indices are computed once per
+        dataset and cached.
+        :param dataset:
+        :param multi_instance:
+        :return:
+        """
+        key = (dataset, multi_instance)
+        if key not in self._airtime_per_phase_cache:
+            bounds = self.get_airtime_bounds(dataset, multi_instance=multi_instance)
+            if bounds is not None:
+                self._airtime_per_phase_cache[key] = [
+                    np.arange(start, end) for start, end in bounds]
+            else:
+                self._airtime_per_phase_cache[key] = self.get_airtime_per_phase_for_timestamp(
+                    self._get_timestamps(dataset, multi_instance),
+                    start_time=self._ulog.start_timestamp,
+                    conversion_factor=1.0e-6)
+
+        return self._airtime_per_phase_cache[key]
+
+    def get_airtime_selection(
+            self, dataset: str, multi_instance: int = 0) -> Union[slice, np.ndarray]:
+        """
+        return an index selecting all samples of the dataset that are in air. If these samples
+        are contiguous (e.g. a single flight), the index is a slice and indexing a signal with
+        it returns a view instead of a copy. Otherwise, the airtime indices are returned.
+        :param dataset:
+        :param multi_instance:
+        :return:
         """
-        return all indices of the log file that are in air
+        key = (dataset, multi_instance)
+        if key not in self._airtime_selection_cache:
+            bounds = self.get_airtime_bounds(dataset, multi_instance=multi_instance)
+            non_empty_bounds = [(start, end) for start, end in bounds or [] if end > start]
+            if bounds is not None and all(
+                    end == next_start for (_, end), (next_start, _) in zip(
+                        non_empty_bounds[:-1], non_empty_bounds[1:])):
+                self._airtime_selection_cache[key] = slice(
+                    non_empty_bounds[0][0], non_empty_bounds[-1][1]) if non_empty_bounds \
+                    else slice(0, 0)
+            else:
+                self._airtime_selection_cache[key] = self.get_airtime(
+                    dataset, multi_instance=multi_instance)
+
+        return self._airtime_selection_cache[key]
+
+    def get_airtime_selection_per_phase(
+            self, dataset: str, multi_instance: int = 0) -> List[Union[slice, np.ndarray]]:
+        """
+        return an index per airtime selecting the samples of the dataset in air: slices if the
+        timestamps are sorted, the airtime indices otherwise.
         :param dataset:
         :param multi_instance:
         :return:
         """
+        bounds = self.get_airtime_bounds(dataset, multi_instance=multi_instance)
+        if bounds is not None:
+            return [slice(start, end) for start, end in bounds]
+
+        return self.get_airtime_per_phase(dataset, multi_instance=multi_instance)
+
+    def _get_timestamps(self, dataset: str, multi_instance: int) -> np.ndarray:
+        """
+        :param dataset:
+        :param multi_instance:
+        :return: the timestamps of the dataset
+        """
         try:
             data = self._ulog.get_dataset(
                 dataset, multi_instance=multi_instance).data
@@ -283,7 +400,177 @@ class InAirDetector():
             raise PreconditionError(
                 f'InAirDetector: {dataset:s} not found in log.') from e
 
-        return self.get_airtime_per_phase_for_timestamp(
-            data['timestamp'],
-            start_time=self._ulog.start_timestamp,
-            conversion_factor=1.0e-6)
+        return data['timestamp']
+
+
+class InAirDetectorRegistry():
+    """
+    hands out InAirDetector instances that are shared for a ulog: the airtime detection runs
+    only once per set of detector parameters instead of once per check.
+    """
+
+    def __init__(self, ulog: ULog) -> None:
+        """
+        initializes an empty registry for a ulog.
+        :param ulog:
+        """
+        self._ulog = ulog
+        self._in_air_detectors: Dict[Tuple[float, float], InAirDetector] = {}
+        # the registry detecting the airtimes, if the ulog is a view of its log (see for_view)
+        self._shared: Optional[InAirDetectorRegistry] = None
+
+    def for_view(self, ulog: ULog) -> 'InAirDetectorRegistry':
+        """
+        returns a registry for a view of the same log (e.g. an EstimatorInstanceULog), whose
+        detectors share the airtimes detected by this registry, see InAirDetector.with_ulog.
+        :param ulog: a view of the ulog of this registry
+        :return:
+        """
+        registry = InAirDetectorRegistry(ulog)
+        registry._shared = self
+        return registry
+
+    def get(
+            self, min_flight_time_seconds: float = 0.0,
+            in_air_margin_seconds: float = 0.0) -> InAirDetector:
+        """
+        returns the in air detector for the parameters and creates it on the first request.
+        :param min_flight_time_seconds: see InAirDetector
+        :param in_air_margin_seconds: see InAirDetector
+        :return:
+        """
+        key = (min_flight_time_seconds, in_air_margin_seconds)
+        if key not in self._in_air_detectors:
+            if self._shared is not None:
+                self._in_air_detectors[key] = self._shared.get(
+                    min_flight_time_seconds=min_flight_time_seconds,
+                    in_air_margin_seconds=in_air_margin_seconds).with_ulog(self._ulog)
+            else:
+                self._in_air_detectors[key] = InAirDetector(
+                    self._ulog, min_flight_time_seconds=min_flight_time_seconds,
+                    in_air_margin_seconds=in_air_margin_seconds)
+
+        return self._in_air_detectors[key]
+
+
+class StreamingInAirDetector():
+    """
+    an in air detector for a log that is still being written: the landed state is appended in
+    chunks and the airtimes are detected as by InAirDetector on the samples received so far.
+    Whether a sample is in air is only decided once the land detector has progressed past the
+    sample by the in air margin, as the margin removes the time before a (future) landing.
+    """
+
+    def __init__(
+            self, start_timestamp: int, min_flight_time_seconds: float = 0.0,
+            in_air_margin_seconds: float = 0.0) -> None:
+        """
+        :param start_timestamp: the start timestamp of the log
+        :param min_flight_time_seconds: see InAirDetector
+        :param in_air_margin_seconds: see InAirDetector
+        """
+        self._start_timestamp = start_timestamp
+        self._min_flight_time_seconds = min_flight_time_seconds
+        self._in_air_margin_seconds = in_air_margin_seconds
+        # the take off and landing timestamps per flight, the landing is None while in air
+        self._flights: List[List[Optional[int]]] = []
+        self._last_timestamp: Optional[int] = None
+        self._last_landed: Optional[int] = None
+        self._finished = False
+
+    def update(self, timestamps: np.ndarray, landed: np.ndarray) -> None:
+        """
+        appends a chunk of the vehicle_land_detected samples.
+        :param timestamps:
+        :param landed:
+        :return:
+        """
+        if len(timestamps) == 0:
+            return
+
+        previous_landed = landed[0] if self._last_landed is None else self._last_landed
+        changes = np.diff(np.concatenate(([previous_landed], landed)).astype(np.int64))
+        if self._last_landed is None and landed[0] <= 0:
+            # started in air
+            changes[0] = -1
+        for index in np.nonzero(changes)[0]:
+            if changes[index] < 0 and (not self._flights or self._flights[-1][1] is not None):
+                self._flights.append([timestamps[index], None])
+            elif changes[index] > 0 and self._flights and self._flights[-1][1] is None:
+                self._flights[-1][1] = timestamps[index]
+
+        self._last_timestamp = timestamps[-1]
+        self._last_landed = landed[-1]
+
+    def finish(self) -> None:
+        """
+        ends the log: a flight without a landing ends at the last land detector sample.
+        :return:
+        """
+        if self._flights and self._flights[-1][1] is None:
+            self._flights[-1][1] = self._last_timestamp
+        self._finished = True
+
+    def get_airtime(self, flight_index: int) -> Airtime:
+        """
+        :param flight_index:
+        :return: the airtime of the flight (relative to the log start), which is open ended while
+        in air
+        """
+        take_off, landing = self._flights[flight_index]
+        return Airtime(
+            take_off=(take_off - self._start_timestamp) / 1.0e6 + self._in_air_margin_seconds,
+            landing=(landing - self._start_timestamp) / 1.0e6 - self._in_air_margin_seconds
+            if landing is not None else np.inf)
+
+    def flight_qualifies(self, flight_index: int) -> Optional[bool]:
+        """
+        :param flight_index:
+        :return: whether the flight is at least min_flight_time_seconds long, None if this can't
+        be decided yet
+        """
+        take_off, landing = self._flights[flight_index]
+        if landing is None:
+            # the flight lasts at least until the last sample of the land detector
+            if (self._last_timestamp / 1e6 - self._in_air_margin_seconds) - \
+                    (take_off / 1e6 + self._in_air_margin_seconds) >= \
+                    self._min_flight_time_seconds:
+                return True
+            return None
+        return bool((landing / 1e6 - self._in_air_margin_seconds) -
+                    (take_off / 1e6 + self._in_air_margin_seconds) >=
+                    self._min_flight_time_seconds)
+
+    @property
+    def airtimes(self) -> List[Airtime]:
+        """
+        :return: the airtimes of the flights that are known to be at least min_flight_time_seconds
+        long. The airtime of an ongoing flight is open ended.
+        """
+        return [self.get_airtime(i) for i in range(len(self._flights)) if self.flight_qualifies(i)]
+
+    def get_decided_count(self, relative_time: np.ndarray) -> int:
+        """
+        :param relative_time: the sorted sample times of a signal in seconds since the log start
+        :return: the number of leading samples for which the in air state is decided
+        """
+        if self._finished:
+            return len(relative_time)
+        if self._last_timestamp is None:
+            return 0
+        decided_until = (self._last_timestamp - self._start_timestamp) / 1.0e6 - \
+            self._in_air_margin_seconds
+        return int(np.searchsorted(relative_time, decided_until, side='left'))
+
+    def get_flight_indices(self, relative_time: np.ndarray) -> np.ndarray:
+        """
+        :param relative_time: sample times in seconds since the log start. the in air state of
+        the samples needs to be decided, see get_decided_count.
+        :return: the index of the flight per sample, -1 for samples that are not in air
+        """
+        flight_indices = np.full(len(relative_time), -1, dtype=np.intp)
+        for i in range(len(self._flights)):
+            airtime = self.get_airtime(i)
+            flight_indices[(relative_time >= airtime.take_off) &
+                           (relative_time < airtime.landing)] = i
+        return flight_indices
@@ -0,0 +1,213 @@
+# /usr/bin/env/ python3
+"""
+an array based set of closed time intervals, e.g. the phases of a flight above a minimum ground
+distance. The intervals are kept as sorted arrays of the interval starts and ends, such that the
+set operations and the lookup of the sample indices of the intervals are vectorized instead of
+combining interval objects one at a time.
+"""
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def get_index_bounds(
+        times: np.ndarray, starts: Union[Sequence[float], np.ndarray],
+        ends: Union[Sequence[float], np.ndarray]) -> Optional[np.ndarray]:
+    """
+    returns the index bounds [start, end) of the samples per interval, i.e. the samples with
+    start <= time < end. As the sample times are sorted, the samples of an interval are contiguous
+    and are found by a binary search for all intervals at once.
+    :param times: the sample times
+    :param starts: the interval starts
+    :param ends: the interval ends
+    :return: the (n_intervals, 2) index bounds or None, if the sample times are not sorted.
+    """
+    if np.any(times[1:] < times[:-1]):
+        return None
+
+    start_indices = np.searchsorted(times, starts, side='left')
+    end_indices = np.maximum(start_indices, np.searchsorted(times, ends, side='left'))
+
+    return np.stack((start_indices, end_indices), axis=-1).astype(np.intp).reshape(-1, 2)
+
+
+class IntervalSet():
+    """
+    a set of closed intervals [start, end], stored as sorted arrays of the starts and ends of
+    disjoint intervals. Overlapping and touching intervals are merged and empty intervals
+    (start > end) are dropped.
+    """
+
+    def __init__(
+            self, starts: Union[Sequence[float], np.ndarray] = (),
+            ends: Union[Sequence[float], np.ndarray] = ()) -> None:
+        """
+        initializes the set as the union of the intervals [starts[i], ends[i]].
+        :param starts: the interval starts
+        :param ends: the interval ends
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1)
+        if starts.shape != ends.shape:
+            raise ValueError('IntervalSet: different number of interval starts and ends.')
+
+        self._starts, self._ends = self._merge(starts, ends)
+
+    @staticmethod
+    def _merge(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param starts:
+        :param ends:
+        :return: the starts and ends of the union of the intervals as sorted disjoint intervals
+        """
+        non_empty = starts <= ends
+        starts, ends = starts[non_empty], ends[non_empty]
+        if len(starts) == 0:
+            return starts, ends
+
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+
+        # an interval starts a new merged interval if it starts after all previous intervals end
+        max_ends = np.maximum.accumulate(ends)
+        is_first = np.empty(len(starts), dtype=bool)
+        is_first[0] = True
+        is_first[1:] = starts[1:] > max_ends[:-1]
+        is_last = np.empty(len(starts), dtype=bool)
+        is_last[:-1] = is_first[1:]
+        is_last[-1] = True
+
+        return starts[is_first], max_ends[is_last]
+
+    @classmethod
+    def closed(cls, start: float, end: float) -> 'IntervalSet':
+        """
+        :param start:
+        :param end:
+        :return: the set of the single closed interval [start, end], empty if start > end
+        """
+        return cls([start], [end])
+
+    @property
+    def starts(self) -> np.ndarray:
+        """
+        :return: the sorted interval starts
+        """
+        return self._starts
+
+    @property
+    def ends(self) -> np.ndarray:
+        """
+        :return: the interval ends
+        """
+        return self._ends
+
+    @property
+    def durations(self) -> np.ndarray:
+        """
+        :return: the durations of the intervals
+        """
+        return self._ends - self._starts
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return zip(self._starts.tolist(), self._ends.tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return np.array_equal(self._starts, other.starts) and \
+            np.array_equal(self._ends, other.ends)
+
+    def __repr__(self) -> str:
+        return f'IntervalSet({list(self)!r})'
+
+    def is_empty(self) -> bool:
+        """
+        :return: whether the set doesn't contain any interval
+        """
+        return len(self._starts) == 0
+
+    def union(self, other: 'IntervalSet') -> 'IntervalSet':
+        """
+        :param other:
+        :return: the intervals contained in either set
+        """
+        return IntervalSet(
+            np.concatenate((self._starts, other.starts)), np.concatenate((self._ends, other.ends)))
+
+    def intersection(self, other: 'IntervalSet') -> 'IntervalSet':
+        """
+        the intersection of two sets. The intervals of the other set that overlap an interval of
+        this set are found by a binary search, the overlapping pairs are intersected at once.
+        :param other:
+        :return: the intervals contained in both sets
+        """
+        # the range of intervals of the other set overlapping each interval of this set
+        first_overlaps = np.searchsorted(other.ends, self._starts, side='left')
+        last_overlaps = np.searchsorted(other.starts, self._ends, side='right')
+        n_overlaps = np.maximum(last_overlaps - first_overlaps, 0)
+
+        own_indices = np.repeat(np.arange(len(self)), n_overlaps)
+        other_indices = np.arange(len(own_indices)) - \
+            np.repeat(np.cumsum(n_overlaps) - n_overlaps, n_overlaps) + \
+            np.repeat(first_overlaps, n_overlaps)
+
+        return IntervalSet(
+            np.maximum(self._starts[own_indices], other.starts[other_indices]),
+            np.minimum(self._ends[own_indices], other.ends[other_indices]))
+
+    def __or__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self.union(other)
+
+    def __and__(self, other: 'IntervalSet') -> 'IntervalSet':
+        return self.intersection(other)
+
+    def shrink(self, margin: float) -> 'IntervalSet':
+        """
+        :param margin: the time removed at the start and the end of every interval, e.g. to
+        avoid the effects of a phase change. a negative margin extends the intervals.
+        :return: the shrunk intervals. intervals shorter than twice the margin are removed.
+        """
+        return IntervalSet(self._starts + margin, self._ends - margin)
+
+    def filter_min_duration(self, min_duration: float) -> 'IntervalSet':
+        """
+        :param min_duration:
+        :return: the intervals that are at least min_duration long
+        """
+        is_long_enough = self.durations >= min_duration
+        return IntervalSet(self._starts[is_long_enough], self._ends[is_long_enough])
+
+    def get_index_bounds(self, times: np.ndarray) -> Optional[np.ndarray]:
+        """
+        :param times: the sample times
+        :return: the index bounds [start, end) of the samples per interval, see get_index_bounds.
+        The end of the intervals is excluded, as by the airtime selection of InAirDetector.
+        """
+        return get_index_bounds(times, self._starts, self._ends)
+
+    def get_indices_per_interval(self, times: np.ndarray) -> List[np.ndarray]:
+        """
+        :param times: the sample times
+        :return: the indices of the samples with start <= time < end per interval
+        """
+        bounds = self.get_index_bounds(times)
+        if bounds is not None:
+            return [np.arange(start, end) for start, end in bounds.tolist()]
+
+        # unsorted sample times: fall back to comparing all sample times per interval
+        return [np.where((times >= start) & (times < end))[0] for start, end in self]
+
+    def get_indices(self, times: np.ndarray) -> np.ndarray:
+        """
+        :param times: the sample times
+        :return: the indices of the samples within any interval, see get_indices_per_interval
+        """
+        indices_per_interval = self.get_indices_per_interval(times)
+        if not indices_per_interval:
+            return np.array([], dtype=np.intp)
+
+        return np.concatenate(indices_per_interval)
@@ -6,10 +6,10 @@ from typing import List
 
 import numpy as np
 from pyulog import ULog
-import intervals
 
+from ecl_ekf_analysis.analysis.interval_set import IntervalSet
 from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
-from ecl_ekf_analysis.signal_processing.flag_analysis import detect_flag_value_changes
+from ecl_ekf_analysis.signal_processing.run_length import find_runs
 
 
 class PositionAnalyzer():
@@ -17,6 +17,8 @@ class PositionAnalyzer():
     this class is used for analyzing UAS position.
     """
 
+    required_topics = ('vehicle_local_position',)
+
     def __init__(self, ulog: ULog) -> None:
         """
         initializes a PositionAnalyzer instance.
@@ -24,7 +26,7 @@ class PositionAnalyzer():
         """
 
         self._ulog = ulog
-        self._position_intervals = intervals.empty()
+        self._position_intervals = IntervalSet()
         self._vehicle_local_position = None
 
         try:
@@ -34,17 +36,16 @@ class PositionAnalyzer():
             raise PreconditionError(
                 'PositionAnalyzer: Could not find vehicle local position message.') from e
 
-        self._position_intervals = intervals.closed(
+        self._position_intervals = IntervalSet.closed(
             0.0, (self._ulog.last_timestamp - self._ulog.start_timestamp) / 1.0e6)
 
     def _above_min_ground_distance_intervals(
             self, ground_distance_meters: float, phase_change_margin_seconds: float = 0.0,
-            min_interval_duration_seconds: float = 0.0) -> intervals.Interval:
+            min_interval_duration_seconds: float = 0.0) -> IntervalSet:
         """
         :param ground_distance_meters:
         :return:
         """
-        intervals_above_min_ground_distance = intervals.empty()
         if 'dist_bottom' not in self._vehicle_local_position:
             raise PreconditionError(
                 'Could not find dist_bottom in vehicle_local_position data.')
@@ -57,22 +58,13 @@ class PositionAnalyzer():
             dist_bottom = dist_bottom[np.where(
                 self._vehicle_local_position['dist_bottom_valid'])]
 
-        above_min_ground_distance = dist_bottom > ground_distance_meters
-
-        interval_starts, interval_ends = detect_flag_value_changes(
-            above_min_ground_distance.astype(int))
+        runs_above_min_ground_distance = find_runs(dist_bottom > ground_distance_meters)
 
-        for interval_start, interval_end in zip(
-                interval_starts, interval_ends):
-            if (timestamp[interval_end] / 1.0e6 - phase_change_margin_seconds) - \
-                    (timestamp[interval_start] / 1.0e6 +
-                     phase_change_margin_seconds) >= min_interval_duration_seconds:
-                intervals_above_min_ground_distance = intervals_above_min_ground_distance | \
-                    intervals.closed(
-                        (timestamp[interval_start] - self._ulog.start_timestamp) /
-                        1.0e6 + phase_change_margin_seconds,
-                        (timestamp[interval_end] - self._ulog.start_timestamp) /
-                        1.0e6 - phase_change_margin_seconds)
+        relative_time = (timestamp - self._ulog.start_timestamp) / 1.0e6
+        intervals_above_min_ground_distance = IntervalSet(
+            relative_time[runs_above_min_ground_distance.starts],
+            relative_time[runs_above_min_ground_distance.last_indices]).shrink(
+                phase_change_margin_seconds).filter_min_duration(min_interval_duration_seconds)
 
         if intervals_above_min_ground_distance.is_empty():
             print('PositionAnalyzer: flag was never activated.')
@@ -111,19 +103,8 @@ class PositionAnalyzer():
                 f'PositionAnalyzer: {dataset:s} not found in log.'
             ) from e
 
-        valid_position_indices = []
-
-        for interval in self._position_intervals:
-            valid_position_indices.extend(
-                np.where(
-                    ((data['timestamp'] -
-                      self._ulog.start_timestamp) /
-                     1.0e6 >= interval.lower) & (
-                        (data['timestamp'] -
-                         self._ulog.start_timestamp) /
-                        1.0e6 < interval.upper))[0])
-
-        return valid_position_indices
+        return self._position_intervals.get_indices(
+            (data['timestamp'] - self._ulog.start_timestamp) / 1.0e6).tolist()
 
     def get_position_intervals(
             self,
@@ -143,16 +124,5 @@ class PositionAnalyzer():
                 f'PositionAnalyzer: {dataset:s} not found in log.'
             ) from e
 
-        position_intervals = []
-
-        for interval in self._position_intervals:
-            position_intervals.append(
-                np.where(
-                    ((data['timestamp'] -
-                      self._ulog.start_timestamp) /
-                     1.0e6 >= interval.lower) & (
-                        (data['timestamp'] -
-                         self._ulog.start_timestamp) /
-                        1.0e6 < interval.upper))[0])
-
-        return position_intervals
+        return self._position_intervals.get_indices_per_interval(
+            (data['timestamp'] - self._ulog.start_timestamp) / 1.0e6)
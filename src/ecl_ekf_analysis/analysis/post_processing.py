@@ -7,44 +7,42 @@ from typing import Tuple
 
 import numpy as np
 
-def get_gps_check_fail_flags(estimator_status: dict) -> dict:
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
+
+
+# the bits of the gps_check_fail_flags of the estimator_status, starting with the least
+# significant bit:
+# 0 : insufficient fix type (no 3D solution)
+# 1 : minimum required sat count fail
+# 2 : maximum allowed PDOP fail
+# 3 : maximum allowed horizontal position error fail
+# 4 : maximum allowed vertical position error fail
+# 5 : maximum allowed speed error fail
+# 6 : maximum allowed horizontal position drift fail
+# 7 : maximum allowed vertical position drift fail
+# 8 : maximum allowed horizontal speed fail
+# 9 : maximum allowed vertical velocity discrepancy fail
+GPS_CHECK_FAIL_FLAGS = (
+    'gfix_fail', 'nsat_fail', 'gdop_fail', 'herr_fail', 'verr_fail', 'serr_fail', 'hdrift_fail',
+    'vdrift_fail', 'hspd_fail', 'veld_diff_fail')
+
+
+def get_gps_check_fail_flag_matrix(estimator_status: dict) -> FlagMatrix:
     """
     :param estimator_status:
-    :return:
+    :return: the packed bits of the gps_check_fail_flags
     """
-    gps_fail_flags = {}
+    return FlagMatrix.from_bitfield(
+        estimator_status['gps_check_fail_flags'], GPS_CHECK_FAIL_FLAGS)
 
-    # 0 : insufficient fix type (no 3D solution)
-    # 1 : minimum required sat count fail
-    # 2 : maximum allowed PDOP fail
-    # 3 : maximum allowed horizontal position error fail
-    # 4 : maximum allowed vertical position error fail
-    # 5 : maximum allowed speed error fail
-    # 6 : maximum allowed horizontal position drift fail
-    # 7 : maximum allowed vertical position drift fail
-    # 8 : maximum allowed horizontal speed fail
-    # 9 : maximum allowed vertical velocity discrepancy fail
-    gps_fail_flags['gfix_fail'] = (
-        (2 ** 0 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['nsat_fail'] = (
-        (2 ** 1 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['gdop_fail'] = (
-        (2 ** 2 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['herr_fail'] = (
-        (2 ** 3 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['verr_fail'] = (
-        (2 ** 4 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['serr_fail'] = (
-        (2 ** 5 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['hdrift_fail'] = (
-        (2 ** 6 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['vdrift_fail'] = (
-        (2 ** 7 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['hspd_fail'] = (
-        (2 ** 8 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    gps_fail_flags['veld_diff_fail'] = (
-        (2 ** 9 & estimator_status['gps_check_fail_flags']) > 0) * 1
-    return gps_fail_flags
+
+def get_gps_check_fail_flags(estimator_status: dict) -> dict:
+    """
+    :param estimator_status:
+    :return: the bits of the gps_check_fail_flags as integer arrays (0 or 1)
+    """
+    gps_fail_flags = get_gps_check_fail_flag_matrix(estimator_status)
+    return {flag: gps_fail_flags.get_flag(flag) * 1 for flag in GPS_CHECK_FAIL_FLAGS}
 
 
 def magnetic_field_estimates_from_states(
@@ -2,18 +2,37 @@
 """
 Runs process_logdata_ekf.py on the .ulg files in the supplied directory. ulog files are
 skipped from the analysis, if a
- corresponding .pdf file already exists (unless the overwrite flag was set).
+ corresponding .pdf file already exists (unless the overwrite flag was set). The files can be
+ analysed in parallel on a pool of worker processes (--jobs). With a manifest (--manifest), only
+ new or changed files are analysed.
 """
 # -*- coding: utf-8 -*-
 
-from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf, \
+    get_master_status_from_test_results, add_topic_cache_arguments, get_topic_cache, \
+    add_timings_argument, add_threads_argument, add_memory_budget_argument, add_config_arguments, \
+    get_config, add_output_format_argument, add_all_instances_argument, \
+    check_all_instances_argument
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.log_processing.batch_manifest import BatchManifest, LogFileState, \
+    STATUS_ERROR, get_analyzer_version, get_log_file_state
+from ecl_ekf_analysis.log_processing.instrumentation import Instrumentation, summarize_timings, \
+    format_timing_summary
+from ecl_ekf_analysis.log_processing.results_file import get_results_filename
+from ecl_ekf_analysis.log_processing.results_store import ResultsStore
+from ecl_ekf_analysis.log_processing.topic_cache import TopicCache
 import argparse
 import sys
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 
+# the number of analysed files whose results are inserted into the results store at once
+RESULTS_STORE_BATCH_SIZE = 100
+
 
 def get_arguments():
     """
@@ -29,19 +48,54 @@ def get_arguments():
         help='Whether to overwrite an already analysed file. If a file with .pdf extension exists '
              'for a .ulg file, the log file will be skipped from analysis unless this flag has '
              'been set.')
-    return parser.parse_args()
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='The number of worker processes used to analyse the log files in parallel. '
+             'Defaults to 1, which analyses the files one after the other in this process.')
+    add_topic_cache_arguments(parser)
+    add_timings_argument(parser)
+    add_threads_argument(parser)
+    add_memory_budget_argument(parser)
+    add_config_arguments(parser)
+    add_output_format_argument(parser)
+    add_all_instances_argument(parser)
+    parser.add_argument(
+        '--results-db', default=None,
+        help='Store the results of all log files in this SQLite database, which can be queried '
+             'with query_results_store. Log files already in the database are skipped unless '
+             'the overwrite flag has been set.')
+    parser.add_argument(
+        '--no-json', action='store_true',
+        help='Do not write a results file per log file, e.g. if the results are stored '
+             'in a database (--results-db).')
+    parser.add_argument(
+        '--manifest', default=None,
+        help='Record the size, modification time, content hash, analyzer version and result '
+             'status of the analysed log files in this database. Only new or changed log files '
+             'and files analysed by another analyzer version are analysed again, instead of '
+             'skipping the log files with a results file.')
+    parser.add_argument(
+        '--retry-failed', action='store_true',
+        help='Analyse the log files again whose analysis failed according to the manifest.')
+    args = parser.parse_args()
+    check_all_instances_argument(parser, args)
+    return args
 
 
-def main() -> None:
+def find_ulog_files(
+        ulog_directory: str, overwrite: bool = False,
+        results_store: Optional[ResultsStore] = None, output_format: str = 'json') -> List[str]:
     """
-    the main entry point
+    returns all ulog files found in the directory and its subdirectories. Already analysed files
+    are skipped unless overwrite is set.
+    :param ulog_directory:
+    :param overwrite:
+    :param results_store: if specified, the files in the results store are considered analysed
+    as well
+    :param output_format: the log files with a results file of this format are considered
+    analysed
     :return:
     """
-
-    args = get_arguments()
-
-    ulog_directory = args.directory_path
-
     # get all the ulog files found in the specified directory and in
     # subdirectories
     ulog_files = glob.glob(
@@ -54,33 +108,206 @@ def main() -> None:
     # remove the files already analysed unless the overwrite flag was specified. A
     # ulog file is consired to be analysed if # a corresponding .pdf file
     # exists.'
-    if not args.overwrite:
+    if not overwrite:
         print("skipping already analysed ulg files.")
         ulog_files = [ulog_file for ulog_file in ulog_files if not os.path.exists(
-            f'{os.path.splitext(ulog_file)[0]:s}.json')]
+            get_results_filename(ulog_file, output_format))]
+        if results_store is not None:
+            stored_files = set(results_store.filenames())
+            ulog_files = [ulog_file for ulog_file in ulog_files
+                          if ResultsStore.log_key(ulog_file) not in stored_files]
 
-    n_files = len(ulog_files)
+    return ulog_files
 
-    print(f"analysing the {n_files:d} .ulg files")
 
-    i = 1
+def analyse_ulog_file(
+        ulog_file: str, topic_cache: Optional[TopicCache] = None, record_timings: bool = False,
+        track_memory: bool = False, n_threads: int = 1, memory_budget_mb: Optional[float] = None,
+        write_json: bool = True, return_results: bool = False,
+        config: Optional[AnalysisConfig] = None, output_format: str = 'json',
+        all_instances: bool = False, capture_file_state: bool = False
+) -> Tuple[Optional[str], Optional[Dict[str, dict]], Optional[List[dict]], Optional[LogFileState]]:
+    """
+    runs the analysis for a single file. Exceptions are caught, such that a single file can't
+    stop the analysis of the other files.
+    :param ulog_file:
+    :param topic_cache: an optional cache of the decoded topics
+    :param record_timings: record the time used by the stages and the checks
+    :param track_memory: record the peak allocated memory as well
+    :param n_threads: the number of threads running the checks of the log concurrently
+    :param memory_budget_mb: analyse the log in blocks within this memory budget in MB
+    :param write_json: write the results file next to the log file
+    :param return_results: return the check results, e.g. to insert them into a results store
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :param output_format: the format of the results file, see process_logdata_ekf
+    :param all_instances: analyse all estimator instances of multi-EKF logs
+    :param capture_file_state: capture the state of the file before it is analysed, e.g. to
+    record it in a manifest
+    :return: None if the file was analysed, the error message otherwise, the timings of the
+    analysis (see Instrumentation.to_dict), if recorded, the check results, if requested, and
+    the state of the analysed file (see get_log_file_state), if captured.
+    """
+    instrumentation = Instrumentation(track_memory=track_memory) if record_timings else None
+    file_state = None
+    try:
+        if capture_file_state:
+            file_state = get_log_file_state(ulog_file)
+        test_results = process_logdata_ekf(
+            ulog_file, topic_cache=topic_cache, instrumentation=instrumentation,
+            n_threads=n_threads, memory_budget_mb=memory_budget_mb, write_json=write_json,
+            config=config, output_format=output_format, all_instances=all_instances)
+    except Exception as e:
+        return str(e), None, None, file_state
+
+    return None, instrumentation.to_dict() if instrumentation is not None else None, \
+        test_results if return_results else None, file_state
+
+
+def analyse_ulog_files(
+        ulog_files: List[str], jobs: int = 1, topic_cache: Optional[TopicCache] = None,
+        timings: Optional[List[Dict[str, dict]]] = None, track_memory: bool = False,
+        n_threads: int = 1, memory_budget_mb: Optional[float] = None,
+        results_store: Optional[ResultsStore] = None, write_json: bool = True,
+        manifest: Optional[BatchManifest] = None,
+        config: Optional[AnalysisConfig] = None, output_format: str = 'json',
+        all_instances: bool = False) -> int:
+    """
+    analyses the ulog files either one after the other or on a pool of worker processes. The
+    progress is reported in the order of completion.
+    :param ulog_files:
+    :param jobs: the number of worker processes. 1 runs the analysis in this process.
+    :param topic_cache: an optional cache of the decoded topics
+    :param timings: if specified, the timings of every analysed file are recorded and appended
+    to this list.
+    :param track_memory: record the peak allocated memory in the timings as well
+    :param n_threads: the number of threads running the checks of a log concurrently
+    :param memory_budget_mb: analyse every log in blocks within this memory budget in MB
+    :param results_store: if specified, the results of the analysed files are inserted into the
+    results store in batches of RESULTS_STORE_BATCH_SIZE files.
+    :param write_json: write the results of every file to a results file next to the log file
+    :param manifest: if specified, the analysis of every file is recorded in the manifest
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :param output_format: the format of the results files, see process_logdata_ekf
+    :param all_instances: analyse all estimator instances of multi-EKF logs
+    :return: the number of skipped files.
+    """
+    n_files = len(ulog_files)
     n_skipped = 0
-    # analyse all ulog files
-    for ulog_file in ulog_files:
-        print(f'analysing file {i:d}/{n_files:d}: {ulog_file:s}')
+    record_timings = timings is not None
+    return_results = results_store is not None or manifest is not None
+    capture_file_state = manifest is not None
+    pending_results = []
 
-        try:
-            _ = process_logdata_ekf(ulog_file)
+    def store_results(
+            ulog_file: str, error_message: Optional[str], test_results: Optional[List[dict]],
+            file_state: Optional[LogFileState]) -> None:
+        if manifest is not None:
+            manifest.record(ulog_file, STATUS_ERROR if error_message is not None
+                            else get_master_status_from_test_results(test_results),
+                            file_state=file_state)
+        if results_store is None or error_message is not None:
+            return
+        pending_results.append((ulog_file, test_results))
+        if len(pending_results) >= RESULTS_STORE_BATCH_SIZE:
+            results_store.add_results(pending_results)
+            pending_results.clear()
 
-        except Exception as e:
-            print(str(e))
-            print(f'an exception occurred, skipping file {ulog_file:s}')
-            n_skipped = n_skipped + 1
+    if jobs <= 1:
+        # analyse all ulog files
+        for i, ulog_file in enumerate(ulog_files, start=1):
+            print(f'analysing file {i:d}/{n_files:d}: {ulog_file:s}')
+            error_message, file_timings, test_results, file_state = analyse_ulog_file(
+                ulog_file, topic_cache=topic_cache, record_timings=record_timings,
+                track_memory=track_memory, n_threads=n_threads,
+                memory_budget_mb=memory_budget_mb, write_json=write_json,
+                return_results=return_results, config=config, output_format=output_format,
+                all_instances=all_instances, capture_file_state=capture_file_state)
+            store_results(ulog_file, error_message, test_results, file_state)
+            if error_message is not None:
+                print(error_message)
+                print(f'an exception occurred, skipping file {ulog_file:s}')
+                n_skipped = n_skipped + 1
+            elif record_timings:
+                timings.append(file_timings)
+        if pending_results:
+            results_store.add_results(pending_results)
+        return n_skipped
 
-        i = i + 1
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(analyse_ulog_file, ulog_file, topic_cache, record_timings,
+                            track_memory, n_threads, memory_budget_mb, write_json,
+                            return_results, config, output_format, all_instances,
+                            capture_file_state): ulog_file
+            for ulog_file in ulog_files}
+        for i, future in enumerate(as_completed(futures), start=1):
+            ulog_file = futures[future]
+            try:
+                error_message, file_timings, test_results, file_state = future.result()
+            except Exception as e:
+                # the worker process itself failed, e.g. it was killed
+                error_message, test_results, file_state = str(e), None, None
+            store_results(ulog_file, error_message, test_results, file_state)
+            if error_message is None:
+                print(f'analysed file {i:d}/{n_files:d}: {ulog_file:s}')
+                if record_timings:
+                    timings.append(file_timings)
+            else:
+                print(error_message)
+                print(f'an exception occurred, skipping file {i:d}/{n_files:d}: {ulog_file:s}')
+                n_skipped = n_skipped + 1
+    if pending_results:
+        results_store.add_results(pending_results)
+
+    return n_skipped
+
+
+def main() -> None:
+    """
+    the main entry point
+    :return:
+    """
+
+    args = get_arguments()
+
+    results_store = ResultsStore(args.results_db) if args.results_db is not None else None
+
+    config = get_config(args)
+
+    manifest = BatchManifest(
+        args.manifest, analyzer_version=get_analyzer_version(config)) \
+        if args.manifest is not None else None
+
+    if manifest is not None:
+        ulog_files = manifest.scan(
+            args.directory_path, overwrite=args.overwrite, retry_failed=args.retry_failed)
+    else:
+        ulog_files = find_ulog_files(
+            args.directory_path, overwrite=args.overwrite, results_store=results_store,
+            output_format=args.output_format)
+
+    n_files = len(ulog_files)
+
+    print(f"analysing the {n_files:d} .ulg files")
+
+    timings = [] if args.timings or args.timings_memory else None
+    n_skipped = analyse_ulog_files(
+        ulog_files, jobs=args.jobs, topic_cache=get_topic_cache(args), timings=timings,
+        track_memory=args.timings_memory, n_threads=args.threads,
+        memory_budget_mb=args.memory_budget, results_store=results_store,
+        write_json=not args.no_json, manifest=manifest, config=config,
+        output_format=args.output_format, all_instances=args.all_instances)
+
+    if results_store is not None:
+        results_store.close()
+    if manifest is not None:
+        manifest.close()
 
     print(f'{n_files - n_skipped:d}/{n_files:d} files analysed, {n_skipped:d} skipped.')
 
+    if timings:
+        print(format_timing_summary(summarize_timings(timings)))
+
 
 if __name__ == '__main__':
     main()
@@ -12,6 +12,8 @@ class Thresholds():
     """
     threshold struct.
     """
+    __slots__ = ('warning', 'failure')
+
     def __init__(self, warning: Optional[float] = None, failure: Optional[float] = None) -> None:
         self.warning = warning
         self.failure = failure
@@ -66,8 +68,10 @@ class CheckStatisticType(IntEnum):
 
 class CheckStatistic():
     """
-    check statistic struct.
+    check statistic struct. The slots avoid a dict per statistic, a log has a few hundred.
     """
+    __slots__ = ('statistic_type', 'statistic_instance', 'value', 'thresholds')
+
     def __init__(
             self, statistic_type: CheckStatisticType = CheckStatisticType.UNDEFINED,
             value: Optional[float] = None, thresholds: Optional[Thresholds] = None,
@@ -159,6 +163,8 @@ class CheckResult():
     """
     check statistic struct.
     """
+    __slots__ = ('status', 'check_type', 'statistics')
+
     def __init__(
             self, status: CheckStatus = CheckStatus.UNDEFINED,
             check_type: CheckType = CheckType.UNDEFINED) -> None:
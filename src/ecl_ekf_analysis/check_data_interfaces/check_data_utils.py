@@ -2,11 +2,32 @@
 """
 utility functions for check data.
 """
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
+
 from ecl_ekf_analysis.check_data_interfaces.check_data import (CheckResult, CheckStatistic,
                                                                CheckStatisticType, CheckStatus,
                                                                CheckType)
 
+# the check results as a structured array: one record per check, the statistics of the checks are
+# stored one after the other in an array of CHECK_STATISTIC_DTYPE records
+CHECK_RESULT_DTYPE = np.dtype([('check_type', 'u1'), ('status', 'u1'), ('n_statistics', '<u4')])
+CHECK_STATISTIC_DTYPE = np.dtype([
+    ('statistic_type', 'u1'), ('instance', '<u2'), ('flags', 'u1'), ('value', '<f8'),
+    ('warning', '<f8'), ('failure', '<f8')])
+
+# the bits of the flags of a statistic record, which tell a value from None
+HAS_VALUE = 1
+HAS_WARNING = 2
+HAS_FAILURE = 4
+
+# the enum names indexed by the enum values
+_CHECK_TYPE_NAMES = np.array([check_type.name for check_type in CheckType], dtype=object)
+_CHECK_STATUS_NAMES = np.array([status.name for status in CheckStatus], dtype=object)
+_STATISTIC_TYPE_NAMES = np.array(
+    [statistic_type.name for statistic_type in CheckStatisticType], dtype=object)
+
 def deserialize_check_statistic(check_statistic: CheckStatistic) -> dict:
     """
     deserialize a CheckStatistic proto structure into a python dictionary.
@@ -56,7 +77,8 @@ def serialize_check_statistic(check_statistic_dict: dict) -> CheckStatistic:
     :return:
     """
     check_statistic = CheckStatistic()
-    check_statistic.type = CheckStatisticType[check_statistic_dict.get('type', 'UNDEFINED')]
+    check_statistic.statistic_type = CheckStatisticType[
+        check_statistic_dict.get('type', 'UNDEFINED')]
     check_statistic.value = check_statistic_dict.get('value')
     check_statistic.statistic_instance = check_statistic_dict.get('instance', 0)
     check_statistic.thresholds.warning = check_statistic_dict.get('thresholds').get('warning')
@@ -72,7 +94,7 @@ def serialize_check_result(check_result_dict: dict) -> CheckResult:
     """
     check_result = CheckResult()
     check_result.status = CheckStatus[check_result_dict.get('status', 'UNDEFINED')]
-    check_result.type = CheckType[check_result_dict.get('type', 'UNDEFINED')]
+    check_result.check_type = CheckType[check_result_dict.get('type', 'UNDEFINED')]
     check_result.statistics.extend(
         [serialize_check_statistic(check_statistic)
          for check_statistic in check_result_dict.get('statistics')]
@@ -87,3 +109,110 @@ def serialize_check_results(check_results: List[dict]) -> List[CheckResult]:
     :return:
     """
     return [serialize_check_result(check_result) for check_result in check_results]
+
+
+def _statistics_to_array(
+        statistics: List[Tuple[int, int, float, float, float]]) -> np.ndarray:
+    """
+    :param statistics: the type, instance, value, warning and failure threshold of every
+    statistic, None for the values that are not set
+    :return: the statistics as CHECK_STATISTIC_DTYPE records
+    """
+    array = np.zeros(len(statistics), dtype=CHECK_STATISTIC_DTYPE)
+    if not statistics:
+        return array
+    columns = list(zip(*statistics))
+    array['statistic_type'] = columns[0]
+    array['instance'] = columns[1]
+    for name, flag, column in [('value', HAS_VALUE, columns[2]),
+                               ('warning', HAS_WARNING, columns[3]),
+                               ('failure', HAS_FAILURE, columns[4])]:
+        values = np.array(column, dtype=object)
+        is_set = values != None  # pylint: disable=singleton-comparison
+        array[name][is_set] = values[is_set].astype(np.float64)
+        array['flags'] |= np.where(is_set, flag, 0).astype(np.uint8)
+    return array
+
+
+def check_results_to_arrays(check_results: List[CheckResult]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    converts CheckResult structures into structured arrays, which are written in a single
+    block instead of one object per statistic.
+    :param check_results:
+    :return: the CHECK_RESULT_DTYPE records of the checks and the CHECK_STATISTIC_DTYPE records
+    of their statistics
+    """
+    results = np.array(
+        [(check_result.check_type, check_result.status, len(check_result.statistics))
+         for check_result in check_results], dtype=CHECK_RESULT_DTYPE)
+    statistics = _statistics_to_array([
+        (statistic.statistic_type, statistic.statistic_instance, statistic.value,
+         statistic.thresholds.warning, statistic.thresholds.failure)
+        for check_result in check_results for statistic in check_result.statistics])
+    return results, statistics
+
+
+def deserialized_results_to_arrays(test_results: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    converts deserialized check results (see deserialize_check_results) into structured arrays.
+    Additional entries of the check results (e.g. the timings) are not converted.
+    :param test_results:
+    :return: see check_results_to_arrays
+    """
+    results = np.array(
+        [(CheckType[test_result['type']], CheckStatus[test_result['status']],
+          len(test_result['statistics'])) for test_result in test_results],
+        dtype=CHECK_RESULT_DTYPE)
+    statistics = _statistics_to_array([
+        (CheckStatisticType[statistic['type']], statistic['instance'], statistic['value'],
+         statistic['thresholds']['warning'], statistic['thresholds']['failure'])
+        for test_result in test_results for statistic in test_result['statistics']])
+    return results, statistics
+
+
+def _nullable_column(statistics: np.ndarray, name: str, flag: int) -> list:
+    """
+    :param statistics: CHECK_STATISTIC_DTYPE records
+    :param name: the field name
+    :param flag: the flag telling whether the field is set
+    :return: the field as python floats, None where it is not set
+    """
+    values = statistics[name].astype(object)
+    values[(statistics['flags'] & flag) == 0] = None
+    return values.tolist()
+
+
+def deserialized_results_from_arrays(results: np.ndarray, statistics: np.ndarray) -> List[dict]:
+    """
+    converts the structured arrays of check results into deserialized check results, equal to
+    deserialize_check_results of the original check results.
+    :param results: CHECK_RESULT_DTYPE records
+    :param statistics: CHECK_STATISTIC_DTYPE records
+    :return:
+    """
+    statistic_dicts = [
+        {'type': statistic_type, 'value': value, 'instance': instance,
+         'thresholds': {'warning': warning, 'failure': failure}}
+        for statistic_type, value, instance, warning, failure in zip(
+            _STATISTIC_TYPE_NAMES[statistics['statistic_type']].tolist(),
+            _nullable_column(statistics, 'value', HAS_VALUE),
+            statistics['instance'].tolist(),
+            _nullable_column(statistics, 'warning', HAS_WARNING),
+            _nullable_column(statistics, 'failure', HAS_FAILURE))]
+
+    ends = np.cumsum(results['n_statistics']).tolist()
+    starts = [0] + ends[:-1]
+    return [{'status': status, 'type': check_type, 'statistics': statistic_dicts[start:end]}
+            for status, check_type, start, end in zip(
+                _CHECK_STATUS_NAMES[results['status']].tolist(),
+                _CHECK_TYPE_NAMES[results['check_type']].tolist(), starts, ends)]
+
+
+def check_results_from_arrays(results: np.ndarray, statistics: np.ndarray) -> List[CheckResult]:
+    """
+    converts the structured arrays of check results into CheckResult structures.
+    :param results: CHECK_RESULT_DTYPE records
+    :param statistics: CHECK_STATISTIC_DTYPE records
+    :return:
+    """
+    return serialize_check_results(deserialized_results_from_arrays(results, statistics))
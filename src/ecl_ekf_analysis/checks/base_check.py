@@ -2,11 +2,15 @@
 """
 base classes for running checks
 """
+from typing import Optional, Tuple
+
 from pyulog import ULog
 
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetectorRegistry
 from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult, CheckStatistic, \
     CheckType, CheckStatisticType, CheckStatus
-from ecl_ekf_analysis.log_processing.custom_exceptions import capture_message
+from ecl_ekf_analysis.checks.check_thresholds import apply_thresholds, evaluate_check_status
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig, default_config
 
 
 class Check():
@@ -14,16 +18,30 @@ class Check():
     A check interface.
     """
 
+    # the ulog topics read by the check (including topics that are only tested for existence)
+    required_topics: Tuple[str, ...] = ()
+    # the flags of the estimator_status_flags read by the check
+    required_status_flags: Tuple[str, ...] = ()
+
     def __init__(
             self,
             ulog: ULog,
-            check_type: CheckType = CheckType.UNDEFINED) -> None:
+            check_type: CheckType = CheckType.UNDEFINED,
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         Initializes the check interface.
         :param ulog: a handle to the open ulog file
         :param thresholds: a dictionary
+        :param in_air_detectors: a registry of in air detectors shared between the checks of
+        a log. if not specified, the check uses its own registry.
+        :param config: the parameters and thresholds of the check, the current configuration of
+        the params and thresholds modules (see default_config) if not specified
         """
         self.ulog = ulog
+        self._config = config if config is not None else default_config()
+        self._in_air_detectors = in_air_detectors if in_air_detectors is not None else \
+            InAirDetectorRegistry(ulog)
         self._check_result = CheckResult()
         self._check_result.check_type = check_type
         self._error_message = ''
@@ -64,6 +82,13 @@ class Check():
         """
         return self._check_result
 
+    @property
+    def config(self) -> AnalysisConfig:
+        """
+        :return: the parameters and thresholds of the check
+        """
+        return self._config
+
     @property
     def check_type(self) -> CheckType:
         """
@@ -86,7 +111,8 @@ class Check():
 
     def run(self) -> None:
         """
-        runs the check functions for calculating the statistics and calculates the check status
+        runs the check functions for calculating the statistics, applies the thresholds of the
+        statistics and calculates the check status
         :return:
         """
         self._does_apply = self.run_precondition()
@@ -96,19 +122,5 @@ class Check():
 
         self.calc_statistics()
 
-        for statistic in self._check_result.statistics:
-
-            if statistic.statistic_type == CheckStatisticType.UNDEFINED:
-                capture_message('Warning: check statistics type is undefined')
-
-            if self._check_result.status == CheckStatus.UNDEFINED:
-                self._check_result.status = CheckStatus.PASS
-
-            if statistic.value is not None:
-                if statistic.thresholds.failure is not None and \
-                        statistic.value > statistic.thresholds.failure:
-                    self._check_result.status = CheckStatus.FAIL
-                if statistic.thresholds.warning is not None and \
-                        statistic.value > statistic.thresholds.warning:
-                    if self._check_result.status != CheckStatus.FAIL:
-                        self._check_result.status = CheckStatus.WARNING
+        apply_thresholds(self._check_result, config=self._config)
+        evaluate_check_status(self._check_result)
@@ -3,7 +3,8 @@
 base check runner class
 """
 
-from typing import List, Set, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set, Dict, Optional, Tuple
 from enum import IntEnum
 
 from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError, capture_exception
@@ -11,6 +12,7 @@ from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult, Check
 from ecl_ekf_analysis.check_data_interfaces.check_data_utils import deserialize_check_results, \
     deserialize_check_result
 from ecl_ekf_analysis.checks.base_check import Check
+from ecl_ekf_analysis.log_processing.instrumentation import Instrumentation, measure, CHECKS
 
 
 class AnalysisStatus(IntEnum):
@@ -37,10 +39,13 @@ class CheckRunner():
     a runner class for checks
     """
 
-    def __init__(self):
+    def __init__(self, instrumentation: Optional[Instrumentation] = None):
         """
         initialize the class
+        :param instrumentation: records the time and memory used by every check if specified
         """
+        self._instrumentation = instrumentation
+        self._n_threads = 1
         self._checks = []
         self._analysis_status = AnalysisStatus.SUCCESS
         self._error_message = ''
@@ -68,35 +73,59 @@ class CheckRunner():
 
         return results_table
 
-    def run_checks(self):
+    def _get_check_name(self, check: Check) -> str:
+        """
+        :param check:
+        :return: the name of the check in the instrumentation
+        """
+        return check.check_type.name
+
+    def _run_check(self, check: Check) -> Tuple[AnalysisStatus, Optional[str]]:
+        """
+        runs a single check. Exceptions are caught, such that a single check can't stop the
+        other checks.
+        :param check:
+        :return: the analysis status of the check and the error message, if it failed
+        """
+        try:
+            # the memory of concurrent checks can't be told apart
+            with measure(self._instrumentation, self._get_check_name(check), group=CHECKS,
+                         track_memory=self._n_threads <= 1):
+                check.run()
+            return AnalysisStatus.SUCCESS, None
+        except PreconditionError as e:
+            analysis_status, error = AnalysisStatus.PRECONDITION_ERROR, e
+        except RuntimeError as e:
+            analysis_status, error = AnalysisStatus.RUNTIME_ERROR, e
+        except Exception as e:
+            analysis_status, error = AnalysisStatus.UNEXPECTED_ERROR, e
+        capture_exception(error)
+        check.status = CheckStatus.DOES_NOT_APPLY
+        print(error)
+        return analysis_status, str(error)
+
+    def run_checks(self, n_threads: int = 1):
         """
         runs the checks appended to this check runner.
+        :param n_threads: the number of threads running the checks concurrently. The checks only
+        read the log and spend most of their time in numpy, which releases the GIL. The results
+        are in the order of the checks in any case. 1 runs the checks one after the other.
         :return:
         """
+        self._n_threads = n_threads
+        if n_threads > 1 and len(self._checks) > 1:
+            with ThreadPoolExecutor(max_workers=min(n_threads, len(self._checks))) as executor:
+                check_outcomes = list(executor.map(self._run_check, self._checks))
+        else:
+            check_outcomes = [self._run_check(check) for check in self._checks]
+
         analyses_statuses = []
-        for check in self._checks:
-            try:
-                check.run()
+        for check, (analysis_status, error_message) in zip(self._checks, check_outcomes):
+            analyses_statuses.append(analysis_status)
+            if analysis_status == AnalysisStatus.SUCCESS:
                 self._check_results.append(check.result)
-                analyses_statuses.append(AnalysisStatus.SUCCESS)
-            except PreconditionError as e:
-                analyses_statuses.append(AnalysisStatus.PRECONDITION_ERROR)
-                capture_exception(e)
-                check.status = CheckStatus.DOES_NOT_APPLY
-                self._error_message += str(e) + '; '
-                print(e)
-            except RuntimeError as e:
-                analyses_statuses.append(AnalysisStatus.RUNTIME_ERROR)
-                capture_exception(e)
-                check.status = CheckStatus.DOES_NOT_APPLY
-                self._error_message += str(e) + '; '
-                print(e)
-            except Exception as e:
-                analyses_statuses.append(AnalysisStatus.UNEXPECTED_ERROR)
-                capture_exception(e)
-                check.status = CheckStatus.DOES_NOT_APPLY
-                self._error_message += str(e) + '; '
-                print(e)
+            else:
+                self._error_message += error_message + '; '
 
         # merge statuses
         if len(analyses_statuses) > 0:
@@ -112,6 +141,30 @@ class CheckRunner():
             else:
                 self._analysis_status = max(analyses_statuses)
 
+    @property
+    def checks(self) -> List[Check]:
+        """
+        :return: the checks appended to this check runner
+        """
+        return self._checks
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        """
+        :return: the instrumentation of the runner or None, if it is not instrumented
+        """
+        return self._instrumentation
+
+    @property
+    def timings(self) -> Optional[Dict[str, Dict[str, dict]]]:
+        """
+        :return: the wall time, cpu time and peak memory of the checks (and the stages measured
+        by the caller) by group and name, None if the runner is not instrumented
+        """
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.to_dict()
+
     @property
     def results(self) -> List[CheckResult]:
         """
@@ -0,0 +1,188 @@
+# /usr/bin/env python3
+"""
+the thresholds of the check statistics and the evaluation of the check status. The thresholds only
+depend on the check type and the statistic type, such that they can be (re-)applied to check
+results without running the checks again.
+"""
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult, CheckStatisticType, \
+    CheckStatus, CheckType
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig, default_config
+from ecl_ekf_analysis.log_processing.custom_exceptions import capture_message
+
+# the threshold ids of the estimator checks in thresholds.ini
+ESTIMATOR_CHECK_IDS: Dict[CheckType, str] = {
+    CheckType.MAGNETOMETER_STATUS: 'magnetometer',
+    CheckType.MAGNETIC_HEADING_STATUS: 'yaw',
+    CheckType.VELOCITY_SENSOR_STATUS: 'velocity',
+    CheckType.GPS_VELOCITY_STATUS: 'gps_velocity',
+    CheckType.EXTERNAL_VISION_VELOCITY_STATUS: 'ev_velocity',
+    CheckType.POSITION_SENSOR_STATUS: 'position',
+    CheckType.GPS_POSITION_STATUS: 'gps_position',
+    CheckType.EXTERNAL_VISION_POSITION_STATUS: 'ev_position',
+    CheckType.HEIGHT_SENSOR_STATUS: 'height',
+    CheckType.GPS_HEIGHT_STATUS: 'gps_height',
+    CheckType.EXTERNAL_VISION_HEIGHT_STATUS: 'ev_height',
+    CheckType.BAROMETER_HEIGHT_STATUS: 'baro_height',
+    CheckType.RANGE_SENSOR_HEIGHT_STATUS: 'range_sensor_height',
+    CheckType.HEIGHT_ABOVE_GROUND_SENSOR_STATUS: 'height_above_ground',
+    CheckType.AIRSPEED_SENSOR_STATUS: 'airspeed',
+    CheckType.SIDESLIP_SENSOR_STATUS: 'side_slip',
+    CheckType.OPTICAL_FLOW_STATUS: 'optical_flow',
+}
+
+# the (warning, failure) thresholds of the estimator check statistics as the names of the
+# thresholds in thresholds.ini, formatted with the check id
+_ESTIMATOR_THRESHOLDS: Dict[CheckStatisticType, Tuple[Optional[str], Optional[str]]] = {
+    CheckStatisticType.INNOVATION_AMBER_PCT: (
+        '{:s}_amber_warning_pct', '{:s}_amber_failure_pct'),
+    CheckStatisticType.INNOVATION_AMBER_WINDOWED_PCT: (
+        '{:s}_amber_warning_windowed_pct', '{:s}_amber_failure_windowed_pct'),
+    CheckStatisticType.FAIL_RATIO_PCT: (None, '{:s}_innovation_failure_pct'),
+    CheckStatisticType.FAIL_RATIO_SHORT_WINDOW_PCT: (
+        None, '{:s}_short_rolling_innovation_failure_pct'),
+    CheckStatisticType.FAIL_RATIO_LONG_WINDOW_PCT: (
+        '{:s}_long_rolling_innovation_warning_pct', None),
+}
+
+# the warning and failure thresholds by check type and statistic type
+ThresholdTable = Dict[
+    Tuple[CheckType, CheckStatisticType], Tuple[Optional[float], Optional[float]]]
+
+# the names of the warning thresholds of the imu check statistics
+_IMU_WARNING_THRESHOLDS: Dict[CheckStatisticType, str] = {
+    CheckStatisticType.IMU_DELTA_ANGLE_BIAS_AVG: 'imu_delta_angle_bias_warning_avg',
+    CheckStatisticType.IMU_DELTA_VELOCITY_BIAS_AVG: 'imu_delta_velocity_bias_warning_avg',
+    CheckStatisticType.IMU_OBSERVED_ANGLE_ERROR_AVG: 'imu_observed_angle_error_warning_avg',
+    CheckStatisticType.IMU_OBSERVED_VELOCITY_ERROR_AVG:
+        'imu_observed_velocity_error_warning_avg',
+    CheckStatisticType.IMU_OBSERVED_POSITION_ERROR_AVG:
+        'imu_observed_position_error_warning_avg',
+    CheckStatisticType.IMU_CONING_MAX: 'imu_coning_warning_max',
+    CheckStatisticType.IMU_CONING_WINDOWED_AVG: 'imu_coning_warning_rolling_avg',
+    CheckStatisticType.IMU_HIGH_FREQ_DELTA_ANGLE_MAX: 'imu_high_freq_delta_angle_warning_max',
+    CheckStatisticType.IMU_HIGH_FREQ_DELTA_ANGLE_WINDOWED_AVG:
+        'imu_high_freq_delta_angle_warning_rolling_avg',
+    CheckStatisticType.IMU_HIGH_FREQ_DELTA_VELOCITY_MAX:
+        'imu_high_freq_delta_velocity_warning_max',
+    CheckStatisticType.IMU_HIGH_FREQ_DELTA_VELOCITY_WINDOWED_AVG:
+        'imu_high_freq_delta_velocity_warning_rolling_avg',
+}
+
+# the names of all thresholds in thresholds.ini which are looked up by the checks, including those
+# which are not configured by default
+THRESHOLD_NAMES: FrozenSet[str] = frozenset(
+    [threshold_name.format(check_id) for check_id in ESTIMATOR_CHECK_IDS.values()
+     for threshold_names in _ESTIMATOR_THRESHOLDS.values()
+     for threshold_name in threshold_names if threshold_name is not None] +
+    list(_IMU_WARNING_THRESHOLDS.values()) + ['filter_fault_flag_failure'])
+
+
+def _get_threshold(
+        config: AnalysisConfig, threshold_name: Optional[str], check_id: str) -> Optional[float]:
+    """
+    :param config:
+    :param threshold_name: the name of the threshold, formatted with the check id
+    :param check_id:
+    :return: the threshold of the check or None, if it is not configured
+    """
+    if threshold_name is None:
+        return None
+    return config.threshold(threshold_name.format(check_id))
+
+
+def get_statistic_thresholds(
+        check_type: CheckType, statistic_type: CheckStatisticType,
+        config: Optional[AnalysisConfig] = None) -> Tuple[Optional[float], Optional[float]]:
+    """
+    looks up the thresholds of a check statistic in a configuration.
+    :param check_type:
+    :param statistic_type:
+    :param config: the configuration of the thresholds, the current thresholds configuration
+    (see default_config) if not specified
+    :return: the warning and the failure threshold, None if the statistic has no such threshold
+    """
+    if config is None:
+        config = default_config()
+
+    if check_type in ESTIMATOR_CHECK_IDS:
+        check_id = ESTIMATOR_CHECK_IDS[check_type]
+        warning, failure = _ESTIMATOR_THRESHOLDS.get(statistic_type, (None, None))
+        return _get_threshold(config, warning, check_id), \
+            _get_threshold(config, failure, check_id)
+
+    if statistic_type in _IMU_WARNING_THRESHOLDS:
+        return config.threshold(_IMU_WARNING_THRESHOLDS[statistic_type]), None
+
+    if statistic_type == CheckStatisticType.FILTER_FAULT_FLAG:
+        return None, config.threshold('filter_fault_flag_failure')
+
+    return None, None
+
+
+def get_threshold_table(config: Optional[AnalysisConfig] = None) -> ThresholdTable:
+    """
+    looks up the thresholds of all statistics of all checks at once, which is much faster than
+    looking them up one by one when applying the thresholds to many check results.
+    :param config: the configuration of the thresholds, the current thresholds configuration
+    (see default_config) if not specified
+    :return: the warning and failure thresholds by check type and statistic type
+    """
+    if config is None:
+        config = default_config()
+    return {(check_type, statistic_type):
+            get_statistic_thresholds(check_type, statistic_type, config=config)
+            for check_type in CheckType for statistic_type in CheckStatisticType}
+
+
+def apply_thresholds(
+        check_result: CheckResult, threshold_table: Optional[ThresholdTable] = None,
+        config: Optional[AnalysisConfig] = None) -> None:
+    """
+    sets the thresholds of all statistics of a check result from a thresholds configuration.
+    :param check_result:
+    :param threshold_table: the thresholds from get_threshold_table. they are looked up in the
+    thresholds configuration if not specified.
+    :param config: the configuration of the thresholds if no threshold table is specified, the
+    current thresholds configuration (see default_config) if not specified
+    :return:
+    """
+    if threshold_table is None and config is None:
+        config = default_config()
+    for statistic in check_result.statistics:
+        if threshold_table is not None:
+            thresholds_pair = threshold_table[(check_result.check_type, statistic.statistic_type)]
+        else:
+            thresholds_pair = get_statistic_thresholds(
+                check_result.check_type, statistic.statistic_type, config=config)
+        statistic.thresholds.warning, statistic.thresholds.failure = thresholds_pair
+
+
+def evaluate_check_status(check_result: CheckResult) -> None:
+    """
+    sets the status of a check result by comparing the statistic values to their thresholds.
+    The status of checks that don't apply is kept.
+    :param check_result:
+    :return:
+    """
+    if check_result.status == CheckStatus.DOES_NOT_APPLY:
+        return
+
+    check_result.status = CheckStatus.UNDEFINED
+    for statistic in check_result.statistics:
+
+        if statistic.statistic_type == CheckStatisticType.UNDEFINED:
+            capture_message('Warning: check statistics type is undefined')
+
+        if check_result.status == CheckStatus.UNDEFINED:
+            check_result.status = CheckStatus.PASS
+
+        if statistic.value is not None:
+            if statistic.thresholds.failure is not None and \
+                    statistic.value > statistic.thresholds.failure:
+                check_result.status = CheckStatus.FAIL
+            if statistic.thresholds.warning is not None and \
+                    statistic.value > statistic.thresholds.warning:
+                if check_result.status != CheckStatus.FAIL:
+                    check_result.status = CheckStatus.WARNING
@@ -0,0 +1,499 @@
+# /usr/bin/env/ python3
+"""
+a runner evaluating the checks of the EclCheckRunner on a log file in bounded memory
+"""
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ecl_ekf_analysis.analysis.in_air_detector import Airtime, StreamingInAirDetector
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult, CheckStatisticType, \
+    CheckStatus, CheckType
+from ecl_ekf_analysis.checks.check_thresholds import apply_thresholds, evaluate_check_status
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.live_check_runner import LIVE_ESTIMATOR_CHECKS, LiveEclCheckRunner
+from ecl_ekf_analysis.checks.numerical_analysis import NumericalCheck
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
+from ecl_ekf_analysis.log_processing.data_version_handling import \
+    get_output_tracking_error_message
+from ecl_ekf_analysis.log_processing.streaming_analysis import AirphaseWindowedMean, \
+    StreamingMedian, StreamingSignal, StreamingSignalStatistics, StreamingWindowedMean
+from ecl_ekf_analysis.log_processing.ulog_stream import ULogStream
+
+DEFAULT_MEMORY_BUDGET_MB = 256.0
+
+# the smallest block of the log file decoded at once
+_MIN_BLOCK_SIZE = 1 << 16
+
+_VIBRATION_SIGNALS = (
+    ('vibe[0]', CheckStatisticType.IMU_CONING_MAX, CheckStatisticType.IMU_CONING_AVG,
+     CheckStatisticType.IMU_CONING_WINDOWED_AVG),
+    ('vibe[1]', CheckStatisticType.IMU_HIGH_FREQ_DELTA_ANGLE_MAX,
+     CheckStatisticType.IMU_HIGH_FREQ_DELTA_ANGLE_AVG,
+     CheckStatisticType.IMU_HIGH_FREQ_DELTA_ANGLE_WINDOWED_AVG),
+    ('vibe[2]', CheckStatisticType.IMU_HIGH_FREQ_DELTA_VELOCITY_MAX,
+     CheckStatisticType.IMU_HIGH_FREQ_DELTA_VELOCITY_AVG,
+     CheckStatisticType.IMU_HIGH_FREQ_DELTA_VELOCITY_WINDOWED_AVG),
+)
+
+_BIAS_SIGNALS = (
+    (('gyro_bias[0]', 'gyro_bias[1]', 'gyro_bias[2]'),
+     CheckStatisticType.IMU_DELTA_ANGLE_BIAS_AVG,
+     CheckStatisticType.IMU_DELTA_ANGLE_BIAS_WINDOWED_AVG),
+    (('accel_bias[0]', 'accel_bias[1]', 'accel_bias[2]'),
+     CheckStatisticType.IMU_DELTA_VELOCITY_BIAS_AVG,
+     CheckStatisticType.IMU_DELTA_VELOCITY_BIAS_WINDOWED_AVG),
+)
+
+_OUTPUT_TRACKING_ERROR_SIGNALS = (
+    ('output_tracking_error[0]', CheckStatisticType.IMU_OBSERVED_ANGLE_ERROR_AVG,
+     CheckStatisticType.IMU_OBSERVED_ANGLE_ERROR_WINDOWED_AVG),
+    ('output_tracking_error[1]', CheckStatisticType.IMU_OBSERVED_VELOCITY_ERROR_AVG,
+     CheckStatisticType.IMU_OBSERVED_VELOCITY_ERROR_WINDOWED_AVG),
+    ('output_tracking_error[2]', CheckStatisticType.IMU_OBSERVED_POSITION_ERROR_AVG,
+     CheckStatisticType.IMU_OBSERVED_POSITION_ERROR_WINDOWED_AVG),
+)
+
+# the signals of the medians by topic
+_MEDIAN_SIGNALS = {
+    'estimator_sensor_bias': [
+        signal for signals, _, _ in _BIAS_SIGNALS for signal in signals],
+    'estimator_status': [signal for signal, _, _ in _OUTPUT_TRACKING_ERROR_SIGNALS],
+    'ekf2_innovations': [signal for signal, _, _ in _OUTPUT_TRACKING_ERROR_SIGNALS],
+}
+
+
+class _AirphaseSamples():
+    """
+    the number of in air samples of a topic per flight and the value range of its median signals
+    per flight. Receives the samples of a StreamingSignal as StreamingSignalStatistics.
+    """
+
+    def __init__(self) -> None:
+        self.n_samples_per_flight: Dict[int, int] = {}
+        self.value_ranges: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._flight_index = -1
+
+    def start_flight(self, flight_index: int, airtime: Airtime) -> None:
+        """
+        :param flight_index: the index of the flight in the in air detector
+        :param airtime: the airtime of the flight
+        :return:
+        """
+        # pylint: disable=unused-argument
+        self._flight_index = flight_index
+        self.n_samples_per_flight[flight_index] = 0
+
+    def append(self, relative_time: np.ndarray, values: np.ndarray) -> None:
+        """
+        :param relative_time: the sorted sample times in seconds
+        :param values: the samples of the median signals, one column per signal
+        :return:
+        """
+        # pylint: disable=unused-argument
+        if len(values) == 0:
+            return
+        self.n_samples_per_flight[self._flight_index] += len(values)
+        minima, maxima = np.amin(values, axis=0), np.amax(values, axis=0)
+        if self._flight_index in self.value_ranges:
+            flight_minima, flight_maxima = self.value_ranges[self._flight_index]
+            minima, maxima = np.minimum(minima, flight_minima), np.maximum(maxima, flight_maxima)
+        self.value_ranges[self._flight_index] = (minima, maxima)
+
+    def end_flight(self, keep: bool) -> None:
+        """
+        the samples of all flights are counted, the in air detector decides which flights count.
+        :param keep:
+        :return:
+        """
+
+
+#pylint: disable=too-few-public-methods
+class _ImuSignal():
+    """
+    the statistics and the median of a signal of the imu checks.
+    """
+
+    def __init__(
+            self, statistics: StreamingSignal, median: Optional[StreamingMedian],
+            median_signal: Optional[StreamingSignal]) -> None:
+        self.statistics = statistics
+        self.median = median
+        self.median_signal = median_signal
+
+    @property
+    def signals(self) -> List[StreamingSignal]:
+        """
+        :return:
+        """
+        return [self.statistics] + ([self.median_signal] if self.median_signal else [])
+
+
+def _add_statistic(
+        check_result: CheckResult, statistic_type: CheckStatisticType, value: float) -> None:
+    """
+    :param check_result:
+    :param statistic_type:
+    :param value:
+    :return:
+    """
+    statistic = check_result.statistics.add()
+    statistic.statistic_type = statistic_type
+    statistic.statistic_instance = 0
+    statistic.value = float(value)
+
+
+class ChunkedEclCheckRunner(LiveEclCheckRunner):
+    """
+    evaluates the checks of the EclCheckRunner on a complete log file in bounded memory, e.g. for
+    multi-hour logs. The log is decoded twice in blocks of bytes, i.e. in blocks of log time:
+    1. the airtimes are detected and the in air samples of the topics are counted per flight,
+       which gives the window lengths of the batch analysis, as well as the value ranges of the
+       signals of the medians.
+    2. the statistics are updated per block as by the LiveEclCheckRunner, but with the final
+       airtimes. The rolling windows carry their last samples over to the next block (see
+       AirphaseWindowedMean), such that they are the windows of the batch analysis.
+
+    The medians of the imu checks are exact if their samples fit into an eighth of the memory
+    budget and approximated from a histogram otherwise, see StreamingMedian. The other statistics
+    equal those of the batch analysis up to the summation order of the means.
+
+    The memory budget bounds the memory allocated by the analysis: the decoded blocks (a
+    sixteenth of the budget is read at once, decoding a block takes a few times its size), the
+    samples of the exact medians and the samples of the rolling windows. The rolling windows take
+    a few MB independent of the budget, such that the budget should be at least 8 MB. The memory
+    does not grow with the length of the log.
+    """
+
+    required_topics = tuple(sorted(EclCheckRunner.required_topics()))
+
+    def __init__(
+            self, filename: str, memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+            config: Optional[AnalysisConfig] = None) -> None:
+        """
+        :param filename: the ulog file
+        :param memory_budget_mb: the memory budget of the analysis in MB
+        :param config: the parameters and thresholds of the checks, see LiveEclCheckRunner
+        """
+        memory_budget = int(memory_budget_mb * 1e6)
+        self._filename = filename
+        self._block_size = max(_MIN_BLOCK_SIZE, memory_budget // 16)
+        self._max_median_bytes = memory_budget // 8
+        super().__init__(filename, max_read_size=self._block_size, config=config)
+        self._airphase_samples: Dict[Tuple[str, bool], _AirphaseSamples] = {}
+        self._messages: Set[str] = set()
+        self._filter_faults: Dict[str, bool] = {}
+        self._imu_signals: Dict[Tuple[str, str], _ImuSignal] = {}
+        self._output_tracking_error_message: Optional[str] = None
+
+    def _count_airphase_samples(self) -> None:
+        """
+        the first pass over the log: detects the airtimes, counts the in air samples of the topics
+        per flight and evaluates the fault flags of the numerical check.
+        :return:
+        """
+        signals: Dict[Tuple[str, bool], StreamingSignal] = {}
+        while True:
+            bytes_read = self._stream.bytes_read
+            datasets = {dataset.name: dataset for dataset in self._stream.poll()
+                        if dataset.multi_id == 0}
+            if not datasets:
+                if self._stream.bytes_read == bytes_read:
+                    break
+                continue
+            if not self._in_air_detectors:
+                for no_ground_effects in [False, True]:
+                    self._in_air_detectors[no_ground_effects] = \
+                        super()._create_in_air_detector(no_ground_effects)
+
+            if 'vehicle_land_detected' in datasets:
+                super()._update_in_air_detectors(datasets['vehicle_land_detected'].data)
+
+            if 'estimator_status_flags' in datasets:
+                status_flags = datasets['estimator_status_flags'].data
+                for flag in NumericalCheck.filter_fault_flags:
+                    if flag in status_flags:
+                        self._filter_faults[flag] = self._filter_faults.get(flag, False) or \
+                            bool(np.any(status_flags[flag]))
+
+            for name, dataset in datasets.items():
+                data = dataset.data
+                if 'timestamp' not in data:
+                    continue
+                relative_time = (data['timestamp'] - self._stream.start_timestamp) * 1.0e-6
+                fields = [field for field in _MEDIAN_SIGNALS.get(name, []) if field in data]
+                values = np.column_stack([data[field] for field in fields]) if fields \
+                    else np.zeros((len(relative_time), 0))
+                for no_ground_effects, in_air_detector in self._in_air_detectors.items():
+                    key = (name, no_ground_effects)
+                    if key not in signals:
+                        self._airphase_samples[key] = _AirphaseSamples()
+                        signals[key] = StreamingSignal(
+                            in_air_detector, self._airphase_samples[key])
+                    signals[key].append(relative_time, values)
+                    signals[key].update()
+
+        for in_air_detector in self._in_air_detectors.values():
+            in_air_detector.finish()
+        for signal in signals.values():
+            signal.update(finished=True)
+        self._messages = {dataset.name for dataset in self._stream.data_list
+                          if dataset.multi_id == 0 and dataset.n_samples > 0}
+
+    def run_checks(self) -> None:
+        """
+        runs the checks on the log file.
+        :return:
+        """
+        self._count_airphase_samples()
+        self._stream = ULogStream(
+            self._filename, message_name_filter_list=self.required_topics,
+            max_read_size=self._block_size)
+        self.finish()
+
+    def _create_in_air_detector(self, no_ground_effects: bool) -> StreamingInAirDetector:
+        """
+        :param no_ground_effects: use the in air margin
+        :return: the in air detector of the first pass, which knows the airtimes of the log
+        """
+        return self._in_air_detectors[no_ground_effects]
+
+    def _update_in_air_detectors(self, land_detected: dict) -> None:
+        """
+        the airtimes are known from the first pass.
+        :param land_detected:
+        :return:
+        """
+
+    def _create_windowed_mean(
+            self, window_len_s: float, message: str,
+            no_ground_effects: bool) -> StreamingWindowedMean:
+        """
+        :param window_len_s:
+        :param message: the topic of the signal
+        :param no_ground_effects: the signal uses the in air detector with the in air margin
+        :return: the windowed mean of the batch analysis
+        """
+        airphase_samples = self._airphase_samples.get((message, no_ground_effects))
+        return AirphaseWindowedMean(
+            window_len_s,
+            airphase_samples.n_samples_per_flight if airphase_samples is not None else {})
+
+    def _create_median(
+            self, message: str, column: int, dtype: np.dtype, exact: bool) -> StreamingMedian:
+        """
+        :param message:
+        :param column: the index of the signal in the median signals of the message
+        :param dtype:
+        :param exact: keep the samples for the exact median
+        :return: the median of the in air samples of a signal
+        """
+        in_air_detector = self._in_air_detectors[True]
+        airphase_samples = self._airphase_samples.get((message, True), _AirphaseSamples())
+        n_samples = sum(airphase_samples.n_samples_per_flight.values())
+        value_ranges = [value_range for flight_index, value_range in
+                        airphase_samples.value_ranges.items()
+                        if in_air_detector.flight_qualifies(flight_index)]
+        value_range = (min(float(minima[column]) for minima, _ in value_ranges),
+                       max(float(maxima[column]) for _, maxima in value_ranges)) \
+            if value_ranges else (0.0, 0.0)
+        return StreamingMedian(
+            n_samples, value_range, dtype, max_samples=n_samples if exact else 0)
+
+    def _get_dtype(self, message: str, signal: str) -> Optional[np.dtype]:
+        """
+        :param message:
+        :param signal:
+        :return: the type of the signal, None if the log has no data of the signal
+        """
+        if message not in self._messages:
+            return None
+        try:
+            return self._stream.get_dataset(message).data[signal].dtype
+        except (IndexError, KeyError):
+            return None
+
+    def _init_checks(self) -> None:
+        """
+        creates the signals of the estimator checks and of the imu checks.
+        :return:
+        """
+        super()._init_checks()
+
+        try:
+            self._output_tracking_error_message = get_output_tracking_error_message(self._stream)
+        except PreconditionError:
+            self._output_tracking_error_message = None
+
+        imu_signals = [('estimator_status', signal, False) for signal, _, _, _ in
+                       _VIBRATION_SIGNALS]
+        imu_signals += [('estimator_sensor_bias', signal, True)
+                        for signal in _MEDIAN_SIGNALS['estimator_sensor_bias']]
+        if self._output_tracking_error_message is not None:
+            imu_signals += [(self._output_tracking_error_message, signal, True)
+                            for signal, _, _ in _OUTPUT_TRACKING_ERROR_SIGNALS]
+
+        dtypes = {(message, signal): self._get_dtype(message, signal)
+                  for message, signal, _ in imu_signals}
+        imu_signals = [(message, signal, has_median) for message, signal, has_median in
+                       imu_signals if dtypes[(message, signal)] is not None]
+        median_bytes = sum(
+            sum(self._airphase_samples[(message, True)].n_samples_per_flight.values()) *
+            dtypes[(message, signal)].itemsize
+            for message, signal, has_median in imu_signals if has_median)
+
+        for message, signal, has_median in imu_signals:
+            median = self._create_median(
+                message, _MEDIAN_SIGNALS[message].index(signal), dtypes[(message, signal)],
+                exact=median_bytes <= self._max_median_bytes) if has_median else None
+            self._imu_signals[(message, signal)] = _ImuSignal(
+                StreamingSignal(self._in_air_detectors[True], StreamingSignalStatistics(
+                    windows=[(None, self._create_windowed_mean(
+                        self._config.params.ecl_window_len_s, message, True))])),
+                median,
+                StreamingSignal(self._in_air_detectors[True], median) if has_median else None)
+
+    def _append_data(self, datasets: dict) -> None:
+        """
+        :param datasets: the datasets with new data by name
+        :return:
+        """
+        super()._append_data(datasets)
+        for (message, signal), imu_signal in self._imu_signals.items():
+            if message in datasets:
+                data = datasets[message].data
+                relative_time = (data['timestamp'] - self._stream.start_timestamp) * 1.0e-6
+                for streaming_signal in imu_signal.signals:
+                    streaming_signal.append(relative_time, data[signal])
+                    streaming_signal.update()
+
+    def finish(self) -> None:
+        """
+        decodes the rest of the log file and ends the last flight.
+        :return:
+        """
+        super().finish()
+        for imu_signal in self._imu_signals.values():
+            for streaming_signal in imu_signal.signals:
+                streaming_signal.update(finished=True)
+
+    def _evaluate(self, check_result: CheckResult) -> CheckResult:
+        """
+        :param check_result:
+        :return: the check result with the thresholds applied and the check status
+        """
+        apply_thresholds(check_result, threshold_table=self._threshold_table)
+        evaluate_check_status(check_result)
+        return check_result
+
+    def _get_vibration_result(self) -> Optional[CheckResult]:
+        """
+        :return: the result of the IMU_Vibration_Check, None if it failed
+        """
+        check_result = CheckResult(check_type=CheckType.IMU_VIBRATION_STATUS)
+        for signal, max_type, avg_type, windowed_avg_type in _VIBRATION_SIGNALS:
+            if ('estimator_status', signal) not in self._imu_signals:
+                return None
+            statistics = self._imu_signals[
+                ('estimator_status', signal)].statistics.get_statistics()
+            if statistics.n_samples == 0:
+                return None
+            _add_statistic(check_result, max_type, statistics.max)
+            _add_statistic(check_result, avg_type, statistics.mean if statistics.max > 0.0 else 0.0)
+            _add_statistic(check_result, windowed_avg_type, statistics.windowed_max[0])
+        return self._evaluate(check_result)
+
+    def _get_median_statistics(
+            self, message: str,
+            signals: Tuple[str, ...]) -> Optional[Tuple[List[float], List[float]]]:
+        """
+        :param message:
+        :param signals:
+        :return: the medians and the max of the windowed means of the signals, None if a signal
+        has no in air samples
+        """
+        medians = []
+        windowed_maxima = []
+        for signal in signals:
+            if (message, signal) not in self._imu_signals:
+                return None
+            imu_signal = self._imu_signals[(message, signal)]
+            statistics = imu_signal.statistics.get_statistics()
+            if statistics.n_samples == 0:
+                return None
+            medians.append(imu_signal.median.median)
+            windowed_maxima.append(statistics.windowed_max[0])
+        return medians, windowed_maxima
+
+    def _get_bias_result(self) -> Optional[CheckResult]:
+        """
+        :return: the result of the IMU_Bias_Check, None if it failed
+        """
+        check_result = CheckResult(check_type=CheckType.IMU_BIAS_STATUS)
+        if 'estimator_sensor_bias' not in self._messages:
+            check_result.status = CheckStatus.DOES_NOT_APPLY
+            return check_result
+
+        for signals, avg_type, windowed_avg_type in _BIAS_SIGNALS:
+            median_statistics = self._get_median_statistics('estimator_sensor_bias', signals)
+            if median_statistics is None:
+                return None
+            medians, windowed_maxima = median_statistics
+            _add_statistic(check_result, avg_type, np.sqrt(np.sum(
+                [np.square(median) for median in medians])))
+            _add_statistic(check_result, windowed_avg_type, np.sqrt(np.sum(
+                [np.square(windowed_max) for windowed_max in windowed_maxima])))
+        return self._evaluate(check_result)
+
+    def _get_output_predictor_result(self) -> Optional[CheckResult]:
+        """
+        :return: the result of the IMU_Output_Predictor_Check, None if it failed
+        """
+        if self._output_tracking_error_message is None:
+            return None
+        check_result = CheckResult(check_type=CheckType.IMU_OUTPUT_PREDICTOR_STATUS)
+        for signal, avg_type, windowed_avg_type in _OUTPUT_TRACKING_ERROR_SIGNALS:
+            median_statistics = self._get_median_statistics(
+                self._output_tracking_error_message, (signal,))
+            if median_statistics is None:
+                return None
+            (median,), (windowed_max,) = median_statistics
+            _add_statistic(check_result, avg_type, median)
+            _add_statistic(check_result, windowed_avg_type, windowed_max)
+        return self._evaluate(check_result)
+
+    def _get_numerical_result(self) -> Optional[CheckResult]:
+        """
+        :return: the result of the NumericalCheck, None if it failed
+        """
+        check_result = CheckResult(check_type=CheckType.FILTER_FAULT_STATUS)
+        filter_fault = 0.0
+        for flag in NumericalCheck.filter_fault_flags:
+            if flag not in self._filter_faults:
+                return None
+            if self._filter_faults[flag]:
+                filter_fault = 1.0
+                break
+        _add_statistic(check_result, CheckStatisticType.FILTER_FAULT_FLAG, filter_fault)
+        return self._evaluate(check_result)
+
+    @property
+    def results(self) -> List[CheckResult]:
+        """
+        :return: the results of the checks in the order of the EclCheckRunner. As by the
+        EclCheckRunner, there are no results if the estimator status is missing and checks that
+        fail (e.g. without in air data) are left out.
+        """
+        if not self._checks or \
+                not {'estimator_status', 'estimator_status_flags'} <= self._messages:
+            return []
+        estimator_results = super().results
+        other_results = [check_result for check_result in [
+            self._get_vibration_result(), self._get_bias_result(),
+            self._get_output_predictor_result(), self._get_numerical_result()]
+                         if check_result is not None]
+        # the imu and the numerical checks follow the optical flow check
+        index = [definition.check_type for definition in LIVE_ESTIMATOR_CHECKS].index(
+            CheckType.OPTICAL_FLOW_STATUS) + 1
+        return estimator_results[:index] + other_results + estimator_results[index:]
@@ -2,17 +2,24 @@
 """
 an estimator check runner class
 """
+from typing import List, Optional, Set
+
 from pyulog import ULog
 
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector, InAirDetectorRegistry
 from ecl_ekf_analysis.checks.base_runner import CheckRunner, AnalysisStatus
-from ecl_ekf_analysis.checks.estimator_analysis import MagnetometerCheck, MagneticHeadingCheck, \
-    VelocityCheck, PositionCheck, HeightCheck, HeightAboveGroundCheck, AirspeedCheck, \
-    SideSlipCheck, OpticalFlowCheck, GPSVelocityCheck, GPSPositionCheck, EVVelocityCheck, \
-    EVPositionCheck, GPSHeightCheck, EVHeightCheck, BarometerHeightCheck, RangeSensorHeightCheck
+from ecl_ekf_analysis.checks.estimator_analysis import EstimatorCheck, MagnetometerCheck, \
+    MagneticHeadingCheck, VelocityCheck, PositionCheck, HeightCheck, HeightAboveGroundCheck, \
+    AirspeedCheck, SideSlipCheck, OpticalFlowCheck, GPSVelocityCheck, GPSPositionCheck, \
+    EVVelocityCheck, EVPositionCheck, GPSHeightCheck, EVHeightCheck, BarometerHeightCheck, \
+    RangeSensorHeightCheck
 from ecl_ekf_analysis.checks.imu_analysis import IMU_Vibration_Check, IMU_Bias_Check, \
     IMU_Output_Predictor_Check
 from ecl_ekf_analysis.checks.numerical_analysis import NumericalCheck
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig, default_config
 from ecl_ekf_analysis.log_processing.custom_exceptions import capture_message
+from ecl_ekf_analysis.log_processing.instrumentation import Instrumentation, measure
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
 
 class EclCheckRunner(CheckRunner):
     """
@@ -20,12 +27,57 @@ class EclCheckRunner(CheckRunner):
 
     """
 
-    def __init__(self, ulog: ULog):
+    # the checks in the order of the results
+    check_classes = (
+        MagnetometerCheck,
+        MagneticHeadingCheck,
+        VelocityCheck,
+        PositionCheck,
+        HeightCheck,
+        HeightAboveGroundCheck,
+        AirspeedCheck,
+        SideSlipCheck,
+        OpticalFlowCheck,
+        IMU_Vibration_Check,
+        IMU_Bias_Check,
+        IMU_Output_Predictor_Check,
+        NumericalCheck,
+        GPSVelocityCheck,
+        EVVelocityCheck,
+        GPSPositionCheck,
+        EVPositionCheck,
+        GPSHeightCheck,
+        EVHeightCheck,
+        BarometerHeightCheck,
+        RangeSensorHeightCheck,
+    )
+
+    def __init__(
+            self, ulog: ULog, instrumentation: Optional[Instrumentation] = None,
+            config: Optional[AnalysisConfig] = None):
         """
         :param ulog:
+        :param instrumentation: records the time and memory used by the construction of the checks
+        (stage 'init') and by every check if specified
+        :param config: the parameters and thresholds of the checks, the current configuration of
+        the params and thresholds modules (see default_config) if not specified
         """
-        super().__init__()
+        super().__init__(instrumentation=instrumentation)
 
+        with measure(instrumentation, 'init'):
+            self._init_checks(ulog, config if config is not None else default_config())
+
+    def _init_checks(
+            self, ulog: ULog, config: AnalysisConfig,
+            in_air_detectors: Optional[InAirDetectorRegistry] = None) -> None:
+        """
+        constructs the checks of the log.
+        :param ulog:
+        :param config:
+        :param in_air_detectors: the in air detectors of the log, created for the log if not
+        specified
+        :return:
+        """
         try:
             estimator_status_data = ulog.get_dataset('estimator_status').data
             print('found estimator_status data')
@@ -33,52 +85,51 @@ class EclCheckRunner(CheckRunner):
             estimator_status_flags = ulog.get_dataset('estimator_status_flags').data
             print('found estimator_status_flags data')
 
-            self.append(
-                MagnetometerCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(
-                MagneticHeadingCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(VelocityCheck(ulog, estimator_status_flags))
-            self.append(PositionCheck(ulog, estimator_status_flags))
-            self.append(HeightCheck(ulog, estimator_status_flags))
-            self.append(
-                HeightAboveGroundCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(AirspeedCheck(ulog, estimator_status_flags))
-            self.append(SideSlipCheck(ulog, estimator_status_flags))
-            self.append(
-                OpticalFlowCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(IMU_Vibration_Check(ulog))
-            self.append(IMU_Bias_Check(ulog))
-            self.append(IMU_Output_Predictor_Check(ulog))
-            self.append(NumericalCheck(ulog))
-            self.append(
-                GPSVelocityCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(EVVelocityCheck(ulog, estimator_status_flags))
-            self.append(
-                GPSPositionCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(EVPositionCheck(ulog, estimator_status_flags))
-            self.append(GPSHeightCheck(ulog, estimator_status_flags))
-            self.append(EVHeightCheck(ulog, estimator_status_flags))
-            self.append(
-                BarometerHeightCheck(
-                    ulog,
-                    estimator_status_flags))
-            self.append(
-                RangeSensorHeightCheck(
-                    ulog,
-                    estimator_status_flags))
+            # the in air detectors and the packed status flags are shared between all checks of
+            # the log. only the flags read by the checks are packed, flags missing in the log
+            # fail the checks reading them.
+            if in_air_detectors is None:
+                in_air_detectors = InAirDetectorRegistry(ulog)
+            status_flags = FlagMatrix.from_fields(estimator_status_flags, [
+                field for field in self.required_status_flags()
+                if field in estimator_status_flags])
+
+            for check_class in self.check_classes:
+                if issubclass(check_class, EstimatorCheck):
+                    self.append(check_class(
+                        ulog, status_flags, in_air_detectors=in_air_detectors, config=config))
+                elif issubclass(check_class, NumericalCheck):
+                    self.append(check_class(
+                        ulog, in_air_detectors=in_air_detectors, config=config,
+                        status_flags=status_flags))
+                else:
+                    self.append(check_class(
+                        ulog, in_air_detectors=in_air_detectors, config=config))
         except Exception as e:
             capture_message(str(e))
             self.error_message = str(e)
             self.analysis_status = AnalysisStatus.PRECONDITION_ERROR
+
+    @classmethod
+    def required_topics(cls) -> Set[str]:
+        """
+        the ulog topics needed by the runner and its checks. Loading only these topics saves the
+        time and memory for decoding the other (high rate) topics of a log.
+        :return:
+        """
+        topics = {'estimator_status', 'estimator_status_flags'}
+        topics.update(InAirDetector.required_topics)
+        for check_class in cls.check_classes:
+            topics.update(check_class.required_topics)
+        return topics
+
+    @classmethod
+    def required_status_flags(cls) -> List[str]:
+        """
+        the flags of the estimator_status_flags read by the checks, which are packed into the flag
+        matrix shared between the checks.
+        :return: the flags in the order of the checks
+        """
+        return list(dict.fromkeys(
+            field for check_class in cls.check_classes
+            for field in check_class.required_status_flags))
@@ -2,20 +2,20 @@
 """
 the estimator analysis
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 from pyulog import ULog
 import numpy as np
 
 from ecl_ekf_analysis.checks.base_check import Check
 from ecl_ekf_analysis.check_data_interfaces.check_data import CheckType, CheckStatisticType
-from ecl_ekf_analysis.log_processing.analysis import calculate_windowed_mean_per_airphase, \
-    calculate_stat_from_signal
-from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
-from ecl_ekf_analysis.config import params
-from ecl_ekf_analysis.config import thresholds
+from ecl_ekf_analysis.log_processing.analysis import calculate_flag_percentage, \
+    calculate_windowed_flag_percentages_per_airphase, calculate_test_ratio_statistics
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetectorRegistry
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
 from ecl_ekf_analysis.log_processing.data_version_handling import \
     get_innovation_message_and_field_names
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
 
 
 class EstimatorCheck(Check):
@@ -23,39 +23,52 @@ class EstimatorCheck(Check):
     the attitude check.
     """
 
+    required_topics = (
+        'estimator_status', 'estimator_status_flags', 'estimator_innovations',
+        'estimator_innovation_test_ratios')
+
     def __init__(self,
                  ulog: ULog,
-                 status_flags: Dict[str, float],
+                 status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
                  check_type: CheckType = CheckType.UNDEFINED,
                  check_id: str = '',
                  test_ratio_name: Optional[str] = '',
-                 innov_fail_names: Optional[List[str]] = None):
+                 innov_fail_names: Optional[List[str]] = None,
+                 in_air_detectors: Optional[InAirDetectorRegistry] = None,
+                 config: Optional[AnalysisConfig] = None):
         """
         :param ulog:
-        :param status_flags:
+        :param status_flags: the packed estimator_status_flags shared between the checks of a log
+        or the estimator_status_flags data, whose required_status_flags are then packed by the
+        check.
         :param check_type:
         :param check_id:
         :param test_ratio_name:
         :param innov_fail_names:
+        :param in_air_detectors: a registry of in air detectors shared between the checks of
+        a log. if not specified, the check uses its own registry.
+        :param config:
         """
         super().__init__(
-            ulog, check_type=check_type)
-        self._status_flags = status_flags
+            ulog, check_type=check_type, in_air_detectors=in_air_detectors, config=config)
+        self._status_flags = status_flags if isinstance(status_flags, FlagMatrix) else \
+            FlagMatrix.from_fields(status_flags, [
+                field for field in self.required_status_flags if field in status_flags])
         self._check_id = check_id
         self._test_ratio_name = test_ratio_name
         self._test_ratio_message, self._test_ratio_names = None, []
 
         self._innov_fail_names = innov_fail_names if innov_fail_names is not None else []
 
-        self._in_air_detector_no_ground_effects = InAirDetector(
-            ulog, min_flight_time_seconds=params.iad_min_flight_duration_seconds(),
-            in_air_margin_seconds=params.iad_in_air_margin_seconds())
+        self._in_air_detector_no_ground_effects = self._in_air_detectors.get(
+            min_flight_time_seconds=self._config.params.iad_min_flight_duration_seconds,
+            in_air_margin_seconds=self._config.params.iad_in_air_margin_seconds)
 
         if check_id in ['magnetometer', 'height', 'yaw', 'optical_flow']:
             self._in_air_detector = self._in_air_detector_no_ground_effects
         else:
-            self._in_air_detector = InAirDetector(
-                ulog, min_flight_time_seconds=params.iad_min_flight_duration_seconds())
+            self._in_air_detector = self._in_air_detectors.get(
+                min_flight_time_seconds=self._config.params.iad_min_flight_duration_seconds)
 
     def init_test_ratio_message_and_names(self):
         """
@@ -67,35 +80,6 @@ class EstimatorCheck(Check):
                     self.ulog, self._test_ratio_name, topic='innovation_test_ratio'
                 )
 
-    def calc_test_ratio_metrics(self, test_ratio_name: str) -> Dict[str, list]:
-        """
-        calculates the estimator status metrics
-        :return:
-        """
-        test_ratio_metrics = {}
-
-        test_ratio_data = self.ulog.get_dataset(self._test_ratio_message).data
-
-        # add windowed metrics
-        test_ratio_metrics[f'{self._check_id:s}_percentage_red_windowed'] = \
-            calculate_windowed_mean_per_airphase(
-                test_ratio_data, self._test_ratio_message, test_ratio_name,
-                self._in_air_detector, threshold=params.ecl_red_thresh(),
-                window_len_s=params.ecl_window_len_s())
-
-        test_ratio_metrics[f'{self._check_id:s}_percentage_amber_windowed'] = \
-            calculate_windowed_mean_per_airphase(
-                test_ratio_data, self._test_ratio_message, test_ratio_name,
-                self._in_air_detector, threshold=params.ecl_amb_thresh(),
-                window_len_s=params.ecl_window_len_s())
-
-        test_ratio_metrics[f'{self._check_id:s}_test_windowed_mean'] = \
-            calculate_windowed_mean_per_airphase(
-                test_ratio_data, self._test_ratio_message, test_ratio_name,
-                self._in_air_detector, window_len_s=params.ecl_window_len_s())
-
-        return test_ratio_metrics
-
     def calc_innovation_metrics(self) -> Dict[str, list]:
         """
         calculates the innovation metrics
@@ -104,16 +88,13 @@ class EstimatorCheck(Check):
         innovation_metrics = {}
 
         for innov_fail_name in self._innov_fail_names:
-            innovation_metrics[f'{innov_fail_name:s}_fail_short_window_mean'] = \
-                calculate_windowed_mean_per_airphase(
+            innovation_metrics[f'{innov_fail_name:s}_fail_short_window_mean'], \
+                innovation_metrics[f'{innov_fail_name:s}_fail_long_window_mean'] = \
+                calculate_windowed_flag_percentages_per_airphase(
                     self._status_flags, 'estimator_status_flags', innov_fail_name,
-                    self._in_air_detector_no_ground_effects, threshold=0.5,
-                    window_len_s=params.ecl_short_rolling_window_len_s())
-            innovation_metrics[f'{innov_fail_name:s}_fail_long_window_mean'] = \
-                calculate_windowed_mean_per_airphase(
-                    self._status_flags, 'estimator_status_flags', innov_fail_name,
-                    self._in_air_detector_no_ground_effects, threshold=0.5,
-                    window_len_s=params.ecl_long_rolling_window_len_s())
+                    self._in_air_detector_no_ground_effects, window_lens_s=[
+                        self._config.params.ecl_short_rolling_window_len_s,
+                        self._config.params.ecl_long_rolling_window_len_s])
 
         return innovation_metrics
 
@@ -122,77 +103,50 @@ class EstimatorCheck(Check):
         :return:
         """
         for i, test_ratio_name in enumerate(self._test_ratio_names):
-            test_ratio_metrics = self.calc_test_ratio_metrics(test_ratio_name)
             test_ratio_data = self.ulog.get_dataset(
                 self._test_ratio_message).data
+            test_ratio_statistics = calculate_test_ratio_statistics(
+                test_ratio_data, self._test_ratio_message, test_ratio_name,
+                self._in_air_detector, red_threshold=self._config.params.ecl_red_thresh,
+                amber_threshold=self._config.params.ecl_amb_thresh,
+                window_len_s=self._config.params.ecl_window_len_s)
 
             innov_red_pct = self.add_statistic(
                 CheckStatisticType.INNOVATION_RED_PCT, statistic_instance=i)
-            innov_red_pct.value = float(
-                calculate_stat_from_signal(
-                    test_ratio_data,
-                    self._test_ratio_message,
-                    test_ratio_name,
-                    self._in_air_detector,
-                    lambda x: 100.0 *
-                    np.mean(
-                        x > params.ecl_red_thresh())))
+            innov_red_pct.value = float(test_ratio_statistics.red_pct)
 
             # TODO: remove subtraction of innov_red_pct and tune parameters
             innov_amber_pct = self.add_statistic(
                 CheckStatisticType.INNOVATION_AMBER_PCT, statistic_instance=i)
-            innov_amber_pct.value = float(calculate_stat_from_signal(
-                test_ratio_data, self._test_ratio_message, test_ratio_name, self._in_air_detector,
-                lambda x: 100.0 * np.mean(x > params.ecl_amb_thresh()))) - innov_red_pct.value
-            if thresholds.ecl_amber_warning_pct_exists(self._check_id):
-                innov_amber_pct.thresholds.warning = \
-                    thresholds.ecl_amber_warning_pct(self._check_id)
-            if thresholds.ecl_amber_failure_pct_exists(self._check_id):
-                innov_amber_pct.thresholds.failure = \
-                    thresholds.ecl_amber_failure_pct(self._check_id)
+            innov_amber_pct.value = float(test_ratio_statistics.amber_pct) - innov_red_pct.value
 
             innov_red_windowed_pct = self.add_statistic(
                 CheckStatisticType.INNOVATION_RED_WINDOWED_PCT, statistic_instance=i)
             innov_red_windowed_pct.value = float(max(
-                [np.max(metric) for _, metric in test_ratio_metrics[
-                    f'{self._check_id:s}_percentage_red_windowed']]))
+                [np.max(metric) for _, metric in test_ratio_statistics.red_windowed]))
 
             innov_amber_windowed_pct = self.add_statistic(
                 CheckStatisticType.INNOVATION_AMBER_WINDOWED_PCT, statistic_instance=i)
             innov_amber_windowed_pct.value = float(max(
-                [np.max(metric) for _, metric in test_ratio_metrics[
-                    f'{self._check_id:s}_percentage_amber_windowed']]))
-            if thresholds.ecl_amber_warning_windowed_pct_exists(
-                    self._check_id):
-                innov_amber_windowed_pct.thresholds.warning = \
-                    thresholds.ecl_amber_warning_windowed_pct(self._check_id)
-            if thresholds.ecl_amber_failure_windowed_pct_exists(
-                    self._check_id):
-                innov_amber_windowed_pct.thresholds.failure = \
-                    thresholds.ecl_amber_failure_windowed_pct(self._check_id)
+                [np.max(metric) for _, metric in test_ratio_statistics.amber_windowed]))
 
             # the max and mean ratio of samples above / below std dev
             test_ratio_max = self.add_statistic(
                 CheckStatisticType.ESTIMATOR_FAILURE_MAX, statistic_instance=i)
-            test_ratio_max.value = float(calculate_stat_from_signal(
-                test_ratio_data, self._test_ratio_message, test_ratio_name,
-                self._in_air_detector, np.amax))
+            test_ratio_max.value = float(test_ratio_statistics.max)
 
             test_ratio_avg = self.add_statistic(
                 CheckStatisticType.ESTIMATOR_FAILURE_AVG, statistic_instance=i)
             test_ratio_avg.value = float(0.0)
 
             if test_ratio_max.value > 0.0:
-                test_ratio_avg.value = float(calculate_stat_from_signal(
-                    test_ratio_data, self._test_ratio_message, test_ratio_name,
-                    self._in_air_detector, np.mean))
+                test_ratio_avg.value = float(test_ratio_statistics.mean)
 
             test_ratio_windowed_avg = self.add_statistic(
                 CheckStatisticType.ESTIMATOR_FAILURE_WINDOWED_AVG, statistic_instance=i)
 
             test_ratio_windowed_avg.value = float(max(
-                [float(np.mean(metric)) for _, metric in test_ratio_metrics[
-                    f'{self._check_id:s}_test_windowed_mean']]
+                [float(np.mean(metric)) for _, metric in test_ratio_statistics.windowed_mean]
             ))
 
     def calc_innovation_statistics(self) -> None:
@@ -205,12 +159,9 @@ class EstimatorCheck(Check):
             innov_stats_fail_pct = self.add_statistic(
                 CheckStatisticType.FAIL_RATIO_PCT, statistic_instance=i)
 
-            innov_stats_fail_pct.value = float(calculate_stat_from_signal(
+            innov_stats_fail_pct.value = calculate_flag_percentage(
                 self._status_flags, 'estimator_status_flags', innov_fail_name,
-                self._in_air_detector_no_ground_effects, lambda x: 100.0 * np.mean(x > 0.5)))
-            if thresholds.ecl_innovation_failure_pct_exists(self._check_id):
-                innov_stats_fail_pct.thresholds.failure = thresholds.ecl_innovation_failure_pct(
-                    self._check_id)
+                self._in_air_detector_no_ground_effects)
 
             innov_stats_fail_short_window_pct = self.add_statistic(
                 CheckStatisticType.FAIL_RATIO_SHORT_WINDOW_PCT, statistic_instance=i)
@@ -218,10 +169,6 @@ class EstimatorCheck(Check):
                 [np.max(metric) for _, metric in innovation_metrics[
                     f'{innov_fail_name:s}_fail_short_window_mean']]
             ))
-            if thresholds.ecl_short_rolling_innovation_failure_pct_exists(
-                    self._check_id):
-                innov_stats_fail_short_window_pct.thresholds.failure = \
-                    thresholds.ecl_short_rolling_innovation_failure_pct(self._check_id)
 
             innov_stats_fail_long_window_pct = self.add_statistic(
                 CheckStatisticType.FAIL_RATIO_LONG_WINDOW_PCT, statistic_instance=i)
@@ -229,10 +176,6 @@ class EstimatorCheck(Check):
                 [np.max(metric) for _, metric in innovation_metrics[
                     f'{innov_fail_name:s}_fail_long_window_mean']]
             ))
-            if thresholds.ecl_long_rolling_innovation_warning_pct_exists(
-                    self._check_id):
-                innov_stats_fail_long_window_pct.thresholds.warning = \
-                    thresholds.ecl_long_rolling_innovation_warning_pct(self._check_id)
 
     def calc_statistics(self) -> None:
         """
@@ -247,9 +190,17 @@ class MagnetometerCheck(EstimatorCheck):
     """
     the compass check
     """
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+
+    required_status_flags = ('cs_yaw_align', 'reject_mag_x', 'reject_mag_y', 'reject_mag_z')
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog,
@@ -260,13 +211,14 @@ class MagnetometerCheck(EstimatorCheck):
             innov_fail_names=[
                 'reject_mag_x',
                 'reject_mag_y',
-                'reject_mag_z'])
+                'reject_mag_z'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
         :return:
         """
-        return np.amax(self._status_flags['cs_yaw_align']) > 0.5
+        return self._status_flags.any(['cs_yaw_align'])
 
 
 class MagneticHeadingCheck(EstimatorCheck):
@@ -274,9 +226,16 @@ class MagneticHeadingCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_yaw_align', 'reject_yaw')
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         messages = {elem.name for elem in ulog.data_list}
         test_ratio_name = 'heading' if 'estimator_innovation_test_ratios' in messages else None
@@ -286,13 +245,14 @@ class MagneticHeadingCheck(EstimatorCheck):
             check_type=CheckType.MAGNETIC_HEADING_STATUS,
             check_id='yaw',
             test_ratio_name=test_ratio_name,
-            innov_fail_names=['reject_yaw'])
+            innov_fail_names=['reject_yaw'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
         :return:
         """
-        return np.amax(self._status_flags['cs_yaw_align']) > 0.5
+        return self._status_flags.any(['cs_yaw_align'])
 
 
 class VelocityCheck(EstimatorCheck):
@@ -300,21 +260,29 @@ class VelocityCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_gps', 'reject_hor_vel', 'reject_ver_vel')
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.VELOCITY_SENSOR_STATUS,
             check_id='velocity', test_ratio_name='vel',
-            innov_fail_names=['reject_hor_vel', 'reject_ver_vel'])
+            innov_fail_names=['reject_hor_vel', 'reject_ver_vel'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
         :return:
         """
-        return np.amax(self._status_flags['cs_gps']) > 0.5
+        return self._status_flags.any(['cs_gps'])
 
 
 class GPSVelocityCheck(EstimatorCheck):
@@ -322,14 +290,22 @@ class GPSVelocityCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_gps',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.GPS_VELOCITY_STATUS,
-            check_id='gps_velocity', test_ratio_name='gps_vel')
+            check_id='gps_velocity', test_ratio_name='gps_vel',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -337,7 +313,7 @@ class GPSVelocityCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_gps']) > 0.5
+               self._status_flags.any(['cs_gps'])
 
 
 class EVVelocityCheck(EstimatorCheck):
@@ -345,14 +321,22 @@ class EVVelocityCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_ev_vel',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.EXTERNAL_VISION_VELOCITY_STATUS,
-            check_id='ev_velocity', test_ratio_name='ev_vel')
+            check_id='ev_velocity', test_ratio_name='ev_vel',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -360,7 +344,7 @@ class EVVelocityCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_ev_vel']) > 0.5
+               self._status_flags.any(['cs_ev_vel'])
 
 
 class PositionCheck(EstimatorCheck):
@@ -368,23 +352,30 @@ class PositionCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_gps', 'cs_ev_pos', 'reject_hor_pos')
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.POSITION_SENSOR_STATUS,
             check_id='position', test_ratio_name='pos',
-            innov_fail_names=['reject_hor_pos'])
+            innov_fail_names=['reject_hor_pos'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
         :return:
         """
-        return params.ecl_pos_checks_when_sensors_not_fused() or np.amax(
-            self._status_flags['cs_gps']) > 0.5 or np.amax(
-                self._status_flags['cs_ev_pos']) > 0.5
+        return self._config.params.ecl_pos_checks_when_sensors_not_fused or \
+            self._status_flags.any(['cs_gps', 'cs_ev_pos'])
 
 
 class GPSPositionCheck(EstimatorCheck):
@@ -392,14 +383,22 @@ class GPSPositionCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_gps',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.GPS_POSITION_STATUS,
-            check_id='gps_position', test_ratio_name='gps_hpos')
+            check_id='gps_position', test_ratio_name='gps_hpos',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -407,7 +406,7 @@ class GPSPositionCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_gps']) > 0.5
+               self._status_flags.any(['cs_gps'])
 
 
 class EVPositionCheck(EstimatorCheck):
@@ -415,14 +414,22 @@ class EVPositionCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_ev_pos',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.EXTERNAL_VISION_POSITION_STATUS,
-            check_id='ev_position', test_ratio_name='ev_hpos')
+            check_id='ev_position', test_ratio_name='ev_hpos',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -430,7 +437,7 @@ class EVPositionCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_ev_pos']) > 0.5
+               self._status_flags.any(['cs_ev_pos'])
 
 
 class HeightCheck(EstimatorCheck):
@@ -438,15 +445,23 @@ class HeightCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('reject_ver_pos',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.HEIGHT_SENSOR_STATUS,
             check_id='height', test_ratio_name='hgt',
-            innov_fail_names=['reject_ver_pos'])
+            innov_fail_names=['reject_ver_pos'],
+            in_air_detectors=in_air_detectors, config=config)
 
 
 class GPSHeightCheck(EstimatorCheck):
@@ -454,14 +469,22 @@ class GPSHeightCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_gps_hgt',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.GPS_HEIGHT_STATUS,
-            check_id='gps_height', test_ratio_name='gps_vpos')
+            check_id='gps_height', test_ratio_name='gps_vpos',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -469,7 +492,7 @@ class GPSHeightCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_gps_hgt']) > 0.5
+               self._status_flags.any(['cs_gps_hgt'])
 
 
 class EVHeightCheck(EstimatorCheck):
@@ -477,14 +500,22 @@ class EVHeightCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_ev_hgt',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.EXTERNAL_VISION_HEIGHT_STATUS,
-            check_id='ev_height', test_ratio_name='ev_vpos')
+            check_id='ev_height', test_ratio_name='ev_vpos',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -492,7 +523,7 @@ class EVHeightCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_ev_hgt']) > 0.5
+               self._status_flags.any(['cs_ev_hgt'])
 
 
 class BarometerHeightCheck(EstimatorCheck):
@@ -500,14 +531,22 @@ class BarometerHeightCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_baro_hgt',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.BAROMETER_HEIGHT_STATUS,
-            check_id='baro_height', test_ratio_name='baro_vpos')
+            check_id='baro_height', test_ratio_name='baro_vpos',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -515,7 +554,7 @@ class BarometerHeightCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_baro_hgt']) > 0.5
+               self._status_flags.any(['cs_baro_hgt'])
 
 
 class RangeSensorHeightCheck(EstimatorCheck):
@@ -523,14 +562,22 @@ class RangeSensorHeightCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_rng_hgt',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.RANGE_SENSOR_HEIGHT_STATUS,
-            check_id='range_sensor_height', test_ratio_name='rng_vpos')
+            check_id='range_sensor_height', test_ratio_name='rng_vpos',
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -538,7 +585,7 @@ class RangeSensorHeightCheck(EstimatorCheck):
         """
         messages = {elem.name for elem in self.ulog.data_list}
         return 'estimator_innovations' in messages and \
-               np.amax(self._status_flags['cs_rng_hgt']) > 0.5
+               self._status_flags.any(['cs_rng_hgt'])
 
 
 class HeightAboveGroundCheck(EstimatorCheck):
@@ -546,15 +593,23 @@ class HeightAboveGroundCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('reject_hagl',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.HEIGHT_ABOVE_GROUND_SENSOR_STATUS,
             check_id='height_above_ground', test_ratio_name='hagl',
-            innov_fail_names=['reject_hagl'])
+            innov_fail_names=['reject_hagl'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -571,15 +626,23 @@ class AirspeedCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('reject_airspeed',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.AIRSPEED_SENSOR_STATUS,
             check_id='airspeed', test_ratio_name='airspeed',
-            innov_fail_names=['reject_airspeed'])
+            innov_fail_names=['reject_airspeed'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -596,15 +659,23 @@ class SideSlipCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('reject_sideslip',)
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.SIDESLIP_SENSOR_STATUS,
             check_id='side_slip', test_ratio_name='beta',
-            innov_fail_names=['reject_sideslip'])
+            innov_fail_names=['reject_sideslip'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
@@ -621,18 +692,26 @@ class OpticalFlowCheck(EstimatorCheck):
     the compass check
     """
 
-    def __init__(self, ulog: ULog, status_flags: Dict[str, float]) -> None:
+    required_status_flags = ('cs_opt_flow', 'reject_optflow_x', 'reject_optflow_y')
+
+    def __init__(
+            self, ulog: ULog, status_flags: Union[Dict[str, np.ndarray], FlagMatrix],
+            in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None) -> None:
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
         super().__init__(
             ulog, status_flags,
             check_type=CheckType.OPTICAL_FLOW_STATUS,
             check_id='optical_flow', test_ratio_name=None,
-            innov_fail_names=['reject_optflow_x', 'reject_optflow_y'])
+            innov_fail_names=['reject_optflow_x', 'reject_optflow_y'],
+            in_air_detectors=in_air_detectors, config=config)
 
     def run_precondition(self) -> bool:
         """
         :return:
         """
-        return np.amax(self._status_flags['cs_opt_flow']) > 0.5
+        return self._status_flags.any(['cs_opt_flow'])
@@ -2,7 +2,7 @@
 """
 the imu analysis
 """
-from typing import Dict
+from typing import Dict, Optional
 
 from pyulog import ULog
 import numpy as np
@@ -13,15 +13,13 @@ from ecl_ekf_analysis.check_data_interfaces.check_data import (
     CheckStatisticType,
 )
 from ecl_ekf_analysis.log_processing.analysis import (
-    calculate_windowed_mean_per_airphase,
-    calculate_stat_from_signal,
+    calculate_multi_channel_statistics,
 )
 from ecl_ekf_analysis.log_processing.data_version_handling import (
     get_output_tracking_error_message,
 )
-from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
-from ecl_ekf_analysis.config import params
-from ecl_ekf_analysis.config import thresholds
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetectorRegistry
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
 
 
 class IMU_Bias_Check(Check):
@@ -29,15 +27,32 @@ class IMU_Bias_Check(Check):
     the attitude check.
     """
 
-    def __init__(self, ulog: ULog):
+    required_topics = ('estimator_sensor_bias',)
+
+    # the bias signals of the gyro and the accelerometer axes
+    bias_signals = (
+        "gyro_bias[0]",
+        "gyro_bias[1]",
+        "gyro_bias[2]",
+        "accel_bias[0]",
+        "accel_bias[1]",
+        "accel_bias[2]",
+    )
+
+    def __init__(
+            self, ulog: ULog, in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None):
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
-        super().__init__(ulog, check_type=CheckType.IMU_BIAS_STATUS)
-        self._in_air_detector_no_ground_effects = InAirDetector(
-            ulog,
-            min_flight_time_seconds=params.iad_min_flight_duration_seconds(),
-            in_air_margin_seconds=params.iad_in_air_margin_seconds(),
+        super().__init__(
+            ulog, check_type=CheckType.IMU_BIAS_STATUS, in_air_detectors=in_air_detectors,
+            config=config)
+        self._in_air_detector_no_ground_effects = self._in_air_detectors.get(
+            min_flight_time_seconds=self._config.params.iad_min_flight_duration_seconds,
+            in_air_margin_seconds=self._config.params.iad_in_air_margin_seconds,
         )
 
         self._estimator_sensor_bias_msg = "estimator_sensor_bias"
@@ -63,25 +78,20 @@ class IMU_Bias_Check(Check):
         estimator_sensor_bias_data = self.ulog.get_dataset(
             self._estimator_sensor_bias_msg).data
 
-        imu_metrics = {}
+        # the windowed means and the in air medians of the gyro and accelerometer biases
+        windowed_means, [medians] = calculate_multi_channel_statistics(
+            estimator_sensor_bias_data,
+            self._estimator_sensor_bias_msg,
+            self.bias_signals,
+            self._in_air_detector_no_ground_effects,
+            [np.median],
+            window_len_s=self._config.params.ecl_window_len_s,
+        )
 
-        for signal in [
-            "gyro_bias[0]",
-            "gyro_bias[1]",
-            "gyro_bias[2]",
-            "accel_bias[0]",
-            "accel_bias[1]",
-            "accel_bias[2]",
-        ]:
-            imu_metrics[
-                f"{signal:s}_windowed_mean"
-            ] = calculate_windowed_mean_per_airphase(
-                estimator_sensor_bias_data,
-                self._estimator_sensor_bias_msg,
-                signal,
-                self._in_air_detector_no_ground_effects,
-                window_len_s=params.ecl_window_len_s(),
-            )
+        imu_metrics = {}
+        for i, signal in enumerate(self.bias_signals):
+            imu_metrics[f"{signal:s}_windowed_mean"] = windowed_means[signal]
+            imu_metrics[f"{signal:s}_median"] = float(medians[i])
 
         return imu_metrics
 
@@ -91,20 +101,10 @@ class IMU_Bias_Check(Check):
         """
         imu_metrics = self.calculate_metrics()
 
-        estimator_sensor_bias_data = self.ulog.get_dataset(
-            self._estimator_sensor_bias_msg).data
-
         # summarize biases from all six possible states
         imu_sensor_bias_metrics = {}
 
-        for signal in [
-            "gyro_bias[0]",
-            "gyro_bias[1]",
-            "gyro_bias[2]",
-            "accel_bias[0]",
-            "accel_bias[1]",
-            "accel_bias[2]",
-        ]:
+        for signal in self.bias_signals:
             imu_sensor_bias_metrics[f"{signal:s}_windowed_mean"] = float(
                 max(
                     [
@@ -114,31 +114,17 @@ class IMU_Bias_Check(Check):
                 )
             )
 
+        # the in air medians of the gyro and accelerometer biases
+        bias_medians = np.array(
+            [imu_metrics[f"{signal:s}_median"] for signal in self.bias_signals])
+
         # delta angle bias windowed
         imu_delta_angle_bias_avg = self.add_statistic(
             CheckStatisticType.IMU_DELTA_ANGLE_BIAS_AVG, statistic_instance=0
         )
 
         imu_delta_angle_bias_avg.value = float(
-            np.sqrt(
-                np.sum(
-                    [
-                        np.square(
-                            calculate_stat_from_signal(
-                                estimator_sensor_bias_data,
-                                self._estimator_sensor_bias_msg,
-                                signal,
-                                self._in_air_detector_no_ground_effects,
-                                np.median,
-                            )
-                        )
-                        for signal in ["gyro_bias[0]", "gyro_bias[1]", "gyro_bias[2]"]
-                    ]
-                )
-            )
-        )
-        imu_delta_angle_bias_avg.thresholds.warning = (
-            thresholds.imu_delta_angle_bias_warning_avg()
+            np.sqrt(np.sum(np.square(bias_medians[:3])))
         )
 
         # delta angle bias windowed
@@ -165,25 +151,7 @@ class IMU_Bias_Check(Check):
             CheckStatisticType.IMU_DELTA_VELOCITY_BIAS_AVG, statistic_instance=0)
 
         imu_delta_velocity_bias_avg.value = float(
-            np.sqrt(
-                np.sum(
-                    [
-                        np.square(
-                            calculate_stat_from_signal(
-                                estimator_sensor_bias_data,
-                                self._estimator_sensor_bias_msg,
-                                signal,
-                                self._in_air_detector_no_ground_effects,
-                                np.median,
-                            )
-                        )
-                        for signal in ["accel_bias[0]", "accel_bias[1]", "accel_bias[2]"]
-                    ]
-                )
-            )
-        )
-        imu_delta_velocity_bias_avg.thresholds.warning = (
-            thresholds.imu_delta_velocity_bias_warning_avg()
+            np.sqrt(np.sum(np.square(bias_medians[3:])))
         )
 
         # delta velocity bias windowed
@@ -213,15 +181,29 @@ class IMU_Output_Predictor_Check(Check):
     the attitude check.
     """
 
-    def __init__(self, ulog: ULog):
+    required_topics = ('estimator_status', 'estimator_innovations', 'ekf2_innovations')
+
+    # the output tracking error signals and the names of their metrics
+    output_tracking_error_signals = (
+        ("output_tracking_error[0]", "output_obs_ang_err_median"),
+        ("output_tracking_error[1]", "output_obs_vel_err_median"),
+        ("output_tracking_error[2]", "output_obs_pos_err_median"),
+    )
+
+    def __init__(
+            self, ulog: ULog, in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None):
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
-        super().__init__(ulog, check_type=CheckType.IMU_OUTPUT_PREDICTOR_STATUS)
-        self._in_air_detector_no_ground_effects = InAirDetector(
-            ulog,
-            min_flight_time_seconds=params.iad_min_flight_duration_seconds(),
-            in_air_margin_seconds=params.iad_in_air_margin_seconds(),
+        super().__init__(
+            ulog, check_type=CheckType.IMU_OUTPUT_PREDICTOR_STATUS,
+            in_air_detectors=in_air_detectors, config=config)
+        self._in_air_detector_no_ground_effects = self._in_air_detectors.get(
+            min_flight_time_seconds=self._config.params.iad_min_flight_duration_seconds,
+            in_air_margin_seconds=self._config.params.iad_in_air_margin_seconds,
         )
 
     def calculate_metrics(self) -> Dict[str, list]:
@@ -235,25 +217,22 @@ class IMU_Output_Predictor_Check(Check):
             output_tracking_error_msg
         ).data
 
-        imu_metrics = {}
+        # calculate a windowed version of the stat:
+        # TODO: currently takes the mean instead of median
+        # and the medians of the output tracking error ekf innovations
+        windowed_means, [medians] = calculate_multi_channel_statistics(
+            output_tracking_error_data,
+            output_tracking_error_msg,
+            [signal for signal, _ in self.output_tracking_error_signals],
+            self._in_air_detector_no_ground_effects,
+            [np.median],
+            window_len_s=self._config.params.ecl_window_len_s,
+        )
 
-        # calculates the median of the output tracking error ekf innovations
-        for signal, result in [
-            ("output_tracking_error[0]", "output_obs_ang_err_median"),
-            ("output_tracking_error[1]", "output_obs_vel_err_median"),
-            ("output_tracking_error[2]", "output_obs_pos_err_median"),
-        ]:
-            # calculate a windowed version of the stat:
-            # TODO: currently takes the mean instead of median
-            imu_metrics[
-                f"{result:s}_windowed_mean"
-            ] = calculate_windowed_mean_per_airphase(
-                output_tracking_error_data,
-                output_tracking_error_msg,
-                signal,
-                self._in_air_detector_no_ground_effects,
-                window_len_s=params.ecl_window_len_s(),
-            )
+        imu_metrics = {}
+        for i, (signal, result) in enumerate(self.output_tracking_error_signals):
+            imu_metrics[f"{result:s}_windowed_mean"] = windowed_means[signal]
+            imu_metrics[result] = float(medians[i])
 
         return imu_metrics
 
@@ -263,27 +242,10 @@ class IMU_Output_Predictor_Check(Check):
         """
         imu_metrics = self.calculate_metrics()
 
-        output_tracking_error_msg = get_output_tracking_error_message(
-            self.ulog)
-        output_tracking_error_data = self.ulog.get_dataset(
-            output_tracking_error_msg
-        ).data
-
         # observed angle error statistic average
         imu_observed_angle_error_avg = self.add_statistic(
             CheckStatisticType.IMU_OBSERVED_ANGLE_ERROR_AVG, statistic_instance=0)
-        imu_observed_angle_error_avg.value = float(
-            calculate_stat_from_signal(
-                output_tracking_error_data,
-                output_tracking_error_msg,
-                "output_tracking_error[0]",
-                self._in_air_detector_no_ground_effects,
-                np.median,
-            )
-        )
-        imu_observed_angle_error_avg.thresholds.warning = (
-            thresholds.imu_observed_angle_error_warning_avg()
-        )
+        imu_observed_angle_error_avg.value = imu_metrics["output_obs_ang_err_median"]
 
         # observed angle error statistic average windowed
         imu_observed_angle_error_windowed_avg = self.add_statistic(
@@ -305,18 +267,7 @@ class IMU_Output_Predictor_Check(Check):
         # observed velocity error statistic average
         imu_observed_velocity_error_avg = self.add_statistic(
             CheckStatisticType.IMU_OBSERVED_VELOCITY_ERROR_AVG, statistic_instance=0)
-        imu_observed_velocity_error_avg.value = float(
-            calculate_stat_from_signal(
-                output_tracking_error_data,
-                output_tracking_error_msg,
-                "output_tracking_error[1]",
-                self._in_air_detector_no_ground_effects,
-                np.median,
-            )
-        )
-        imu_observed_velocity_error_avg.thresholds.warning = (
-            thresholds.imu_observed_velocity_error_warning_avg()
-        )
+        imu_observed_velocity_error_avg.value = imu_metrics["output_obs_vel_err_median"]
 
         # observed velocity error statistic average windowed
         imu_observed_velocity_error_windowed_avg = self.add_statistic(
@@ -338,18 +289,7 @@ class IMU_Output_Predictor_Check(Check):
         # observed position error statistic average
         imu_observed_position_error_avg = self.add_statistic(
             CheckStatisticType.IMU_OBSERVED_POSITION_ERROR_AVG, statistic_instance=0)
-        imu_observed_position_error_avg.value = float(
-            calculate_stat_from_signal(
-                output_tracking_error_data,
-                output_tracking_error_msg,
-                "output_tracking_error[2]",
-                self._in_air_detector_no_ground_effects,
-                np.median,
-            )
-        )
-        imu_observed_position_error_avg.thresholds.warning = (
-            thresholds.imu_observed_position_error_warning_avg()
-        )
+        imu_observed_position_error_avg.value = imu_metrics["output_obs_pos_err_median"]
 
         # observed position error statistic average windowed
         imu_observed_position_error_windowed_avg = self.add_statistic(
@@ -374,15 +314,29 @@ class IMU_Vibration_Check(Check):
     the attitude check.
     """
 
-    def __init__(self, ulog: ULog):
+    required_topics = ('estimator_status',)
+
+    # the vibration signals and the names of their metrics
+    vibration_signals = (
+        ("vibe[0]", "imu_coning"),
+        ("vibe[1]", "imu_hfdang"),
+        ("vibe[2]", "imu_hfdvel"),
+    )
+
+    def __init__(
+            self, ulog: ULog, in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None):
         """
         :param ulog:
+        :param in_air_detectors:
+        :param config:
         """
-        super().__init__(ulog, check_type=CheckType.IMU_VIBRATION_STATUS)
-        self._in_air_detector_no_ground_effects = InAirDetector(
-            ulog,
-            min_flight_time_seconds=params.iad_min_flight_duration_seconds(),
-            in_air_margin_seconds=params.iad_in_air_margin_seconds(),
+        super().__init__(
+            ulog, check_type=CheckType.IMU_VIBRATION_STATUS, in_air_detectors=in_air_detectors,
+            config=config)
+        self._in_air_detector_no_ground_effects = self._in_air_detectors.get(
+            min_flight_time_seconds=self._config.params.iad_min_flight_duration_seconds,
+            in_air_margin_seconds=self._config.params.iad_in_air_margin_seconds,
         )
 
     def calculate_metrics(self) -> Dict[str, list]:
@@ -391,50 +345,37 @@ class IMU_Vibration_Check(Check):
         :return:
         """
         estimator_status_data = self.ulog.get_dataset("estimator_status").data
+        signals = [signal for signal, _ in self.vibration_signals]
 
-        imu_metrics = {}
+        # calculates the windowed mean, peak and mean for IMU vibration checks
+        windowed_means, [maxima, means] = calculate_multi_channel_statistics(
+            estimator_status_data,
+            "estimator_status",
+            signals,
+            self._in_air_detector_no_ground_effects,
+            [np.amax, np.mean],
+            window_len_s=self._config.params.ecl_window_len_s,
+        )
 
-        # calculates peak and mean for IMU vibration checks
-        for signal, result in [
-            ("vibe[0]", "imu_coning"),
-            ("vibe[1]", "imu_hfdang"),
-            ("vibe[2]", "imu_hfdvel"),
-        ]:
-
-            imu_metrics[
-                f"{result:s}_windowed_mean"
-            ] = calculate_windowed_mean_per_airphase(
-                estimator_status_data,
-                "estimator_status",
-                signal,
-                self._in_air_detector_no_ground_effects,
-                window_len_s=params.ecl_window_len_s(),
-            )
+        imu_metrics = {}
+        for i, (signal, result) in enumerate(self.vibration_signals):
+            imu_metrics[f"{result:s}_windowed_mean"] = windowed_means[signal]
+            imu_metrics[f"{result:s}_max"] = float(maxima[i])
+            imu_metrics[f"{result:s}_mean"] = float(means[i])
 
         return imu_metrics
 
-    def calc_coning_statistics(
-        self, imu_metrics: dict, estimator_status_data: dict
-    ) -> None:
+    def calc_coning_statistics(self, imu_metrics: dict) -> None:
         """
         calculates the statistics for the coning metric
-        :param estimator_status_data:
+        :param imu_metrics:
         :return:
         """
         # max coning
         imu_coning_max = self.add_statistic(
             CheckStatisticType.IMU_CONING_MAX, statistic_instance=0
         )
-        imu_coning_max.value = float(
-            calculate_stat_from_signal(
-                estimator_status_data,
-                "estimator_status",
-                "vibe[0]",
-                self._in_air_detector_no_ground_effects,
-                np.amax,
-            )
-        )
-        imu_coning_max.thresholds.warning = thresholds.imu_coning_warning_max()
+        imu_coning_max.value = imu_metrics["imu_coning_max"]
 
         # avg coning
         imu_coning_avg = self.add_statistic(
@@ -443,19 +384,12 @@ class IMU_Vibration_Check(Check):
         imu_coning_avg.value = float(0.0)
 
         if imu_coning_max.value > 0.0:
-            imu_coning_avg.value = float(
-                calculate_stat_from_signal(
-                    estimator_status_data,
-                    "estimator_status",
-                    "vibe[0]",
-                    self._in_air_detector_no_ground_effects,
-                    np.mean,
-                )
-            )
+            imu_coning_avg.value = imu_metrics["imu_coning_mean"]
 
         # windowed avg coning
         imu_coning_windowed_avg = self.add_statistic(
-            CheckStatisticType.IMU_CONING_WINDOWED_AVG, statistic_instance=0
+            CheckStatisticType.IMU_CONING_WINDOWED_AVG,
+            statistic_instance=0,
         )
         imu_coning_windowed_avg.value = float(
             max(
@@ -465,33 +399,17 @@ class IMU_Vibration_Check(Check):
                 ]
             )
         )
-        imu_coning_windowed_avg.thresholds.warning = (
-            thresholds.imu_coning_warning_rolling_avg()
-        )
 
-    def calc_high_freq_delta_angle_statistics(
-        self, imu_metrics: dict, estimator_status_data: dict
-    ) -> None:
+    def calc_high_freq_delta_angle_statistics(self, imu_metrics: dict) -> None:
         """
         calculates the statistics for the high frequency delta angle metric
-        :param estimator_status_data:
+        :param imu_metrics:
         :return:
         """
         # max high frequency delta angle
         imu_high_freq_delta_angle_max = self.add_statistic(
             CheckStatisticType.IMU_HIGH_FREQ_DELTA_ANGLE_MAX, statistic_instance=0)
-        imu_high_freq_delta_angle_max.value = float(
-            calculate_stat_from_signal(
-                estimator_status_data,
-                "estimator_status",
-                "vibe[1]",
-                self._in_air_detector_no_ground_effects,
-                np.amax,
-            )
-        )
-        imu_high_freq_delta_angle_max.thresholds.warning = (
-            thresholds.imu_high_freq_delta_angle_warning_max()
-        )
+        imu_high_freq_delta_angle_max.value = imu_metrics["imu_hfdang_max"]
 
         # avg high frequency delta angle
         imu_high_freq_delta_angle_avg = self.add_statistic(
@@ -499,15 +417,7 @@ class IMU_Vibration_Check(Check):
         imu_high_freq_delta_angle_avg.value = float(0.0)
 
         if imu_high_freq_delta_angle_max.value > 0.0:
-            imu_high_freq_delta_angle_avg.value = float(
-                calculate_stat_from_signal(
-                    estimator_status_data,
-                    "estimator_status",
-                    "vibe[1]",
-                    self._in_air_detector_no_ground_effects,
-                    np.mean,
-                )
-            )
+            imu_high_freq_delta_angle_avg.value = imu_metrics["imu_hfdang_mean"]
 
         # windowed avg high frequency delta angle
         imu_high_freq_delta_angle_windowed_avg = self.add_statistic(
@@ -522,33 +432,17 @@ class IMU_Vibration_Check(Check):
                 ]
             )
         )
-        imu_high_freq_delta_angle_windowed_avg.thresholds.warning = (
-            thresholds.imu_high_freq_delta_angle_warning_rolling_avg()
-        )
 
-    def calc_high_freq_delta_velocity_statistics(
-        self, imu_metrics: dict, estimator_status_data: dict
-    ) -> None:
+    def calc_high_freq_delta_velocity_statistics(self, imu_metrics: dict) -> None:
         """
         calculates the statistics for the high frequency delta velocity metric
-        :param estimator_status_data:
+        :param imu_metrics:
         :return:
         """
         # max high frequency delta velocity
         imu_high_freq_delta_velocity_max = self.add_statistic(
             CheckStatisticType.IMU_HIGH_FREQ_DELTA_VELOCITY_MAX, statistic_instance=0)
-        imu_high_freq_delta_velocity_max.value = float(
-            calculate_stat_from_signal(
-                estimator_status_data,
-                "estimator_status",
-                "vibe[2]",
-                self._in_air_detector_no_ground_effects,
-                np.amax,
-            )
-        )
-        imu_high_freq_delta_velocity_max.thresholds.warning = (
-            thresholds.imu_high_freq_delta_velocity_warning_max()
-        )
+        imu_high_freq_delta_velocity_max.value = imu_metrics["imu_hfdvel_max"]
 
         # avg high frequency delta velocity
         imu_high_freq_delta_velocity_avg = self.add_statistic(
@@ -556,15 +450,7 @@ class IMU_Vibration_Check(Check):
         imu_high_freq_delta_velocity_avg.value = float(0.0)
 
         if imu_high_freq_delta_velocity_max.value > 0.0:
-            imu_high_freq_delta_velocity_avg.value = float(
-                calculate_stat_from_signal(
-                    estimator_status_data,
-                    "estimator_status",
-                    "vibe[2]",
-                    self._in_air_detector_no_ground_effects,
-                    np.mean,
-                )
-            )
+            imu_high_freq_delta_velocity_avg.value = imu_metrics["imu_hfdvel_mean"]
 
         # windowed avg high frequency delta velocity
         imu_high_freq_delta_velocity_windowed_avg = self.add_statistic(
@@ -579,20 +465,13 @@ class IMU_Vibration_Check(Check):
                 ]
             )
         )
-        imu_high_freq_delta_velocity_windowed_avg.thresholds.warning = (
-            thresholds.imu_high_freq_delta_velocity_warning_rolling_avg()
-        )
 
     def calc_statistics(self) -> None:
         """
         :return:
         """
         imu_metrics = self.calculate_metrics()
-        estimator_status_data = self.ulog.get_dataset("estimator_status").data
 
-        self.calc_coning_statistics(imu_metrics, estimator_status_data)
-        self.calc_high_freq_delta_angle_statistics(
-            imu_metrics, estimator_status_data)
-        self.calc_high_freq_delta_velocity_statistics(
-            imu_metrics, estimator_status_data
-        )
+        self.calc_coning_statistics(imu_metrics)
+        self.calc_high_freq_delta_angle_statistics(imu_metrics)
+        self.calc_high_freq_delta_velocity_statistics(imu_metrics)
@@ -0,0 +1,420 @@
+# /usr/bin/env/ python3
+"""
+a runner evaluating the estimator checks on a log that is still being written
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ecl_ekf_analysis.analysis.in_air_detector import StreamingInAirDetector
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult, CheckStatisticType, \
+    CheckStatus, CheckType
+from ecl_ekf_analysis.check_data_interfaces.check_data_utils import deserialize_check_results
+from ecl_ekf_analysis.checks.check_thresholds import apply_thresholds, evaluate_check_status, \
+    get_threshold_table
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig, default_config
+from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
+from ecl_ekf_analysis.log_processing.data_version_handling import \
+    get_innovation_message_and_field_names
+from ecl_ekf_analysis.log_processing.streaming_analysis import StreamingSignal, \
+    StreamingSignalStatistics, StreamingWindowedMean
+from ecl_ekf_analysis.log_processing.ulog_stream import MAX_READ_SIZE, ULogStream
+
+
+#pylint: disable=too-few-public-methods,too-many-instance-attributes
+class LiveEstimatorCheck():
+    """
+    the definition of an estimator check for the live analysis, see the corresponding check in
+    estimator_analysis.
+    """
+
+    def __init__(
+            self, check_type: CheckType, test_ratio_name: Optional[str],
+            innov_fail_names: Sequence[str] = (), no_ground_effects: bool = False,
+            status_flags: Sequence[str] = (), requires_innovations: bool = False,
+            requires_test_ratio: bool = False,
+            applies: Optional[Callable[[AnalysisConfig], bool]] = None) -> None:
+        """
+        :param check_type:
+        :param test_ratio_name:
+        :param innov_fail_names:
+        :param no_ground_effects: use the in air detector with the in air margin for the test
+        ratios
+        :param status_flags: the check applies if any of these control status flags was set
+        :param requires_innovations: the check applies only to logs with estimator_innovations
+        :param requires_test_ratio: the check applies only if the test ratio was positive
+        :param applies: the check applies if this returns True for the configuration of the
+        analysis, independent of the status flags
+        """
+        self.check_type = check_type
+        self.test_ratio_name = test_ratio_name
+        self.innov_fail_names = list(innov_fail_names)
+        self.no_ground_effects = no_ground_effects
+        self.status_flags = list(status_flags)
+        self.requires_innovations = requires_innovations
+        self.requires_test_ratio = requires_test_ratio
+        self.applies = applies
+
+
+# the estimator checks in the order of the results of the EclCheckRunner
+LIVE_ESTIMATOR_CHECKS = (
+    LiveEstimatorCheck(
+        CheckType.MAGNETOMETER_STATUS, 'mag_field',
+        innov_fail_names=['reject_mag_x', 'reject_mag_y', 'reject_mag_z'],
+        no_ground_effects=True, status_flags=['cs_yaw_align']),
+    LiveEstimatorCheck(
+        CheckType.MAGNETIC_HEADING_STATUS, 'heading', innov_fail_names=['reject_yaw'],
+        no_ground_effects=True, status_flags=['cs_yaw_align']),
+    LiveEstimatorCheck(
+        CheckType.VELOCITY_SENSOR_STATUS, 'vel',
+        innov_fail_names=['reject_hor_vel', 'reject_ver_vel'], status_flags=['cs_gps']),
+    LiveEstimatorCheck(
+        CheckType.POSITION_SENSOR_STATUS, 'pos', innov_fail_names=['reject_hor_pos'],
+        status_flags=['cs_gps', 'cs_ev_pos'],
+        applies=lambda config: config.params.ecl_pos_checks_when_sensors_not_fused),
+    LiveEstimatorCheck(
+        CheckType.HEIGHT_SENSOR_STATUS, 'hgt', innov_fail_names=['reject_ver_pos'],
+        no_ground_effects=True, applies=lambda config: True),
+    LiveEstimatorCheck(
+        CheckType.HEIGHT_ABOVE_GROUND_SENSOR_STATUS, 'hagl', innov_fail_names=['reject_hagl'],
+        requires_test_ratio=True),
+    LiveEstimatorCheck(
+        CheckType.AIRSPEED_SENSOR_STATUS, 'airspeed', innov_fail_names=['reject_airspeed'],
+        requires_test_ratio=True),
+    LiveEstimatorCheck(
+        CheckType.SIDESLIP_SENSOR_STATUS, 'beta', innov_fail_names=['reject_sideslip'],
+        requires_test_ratio=True),
+    LiveEstimatorCheck(
+        CheckType.OPTICAL_FLOW_STATUS, None,
+        innov_fail_names=['reject_optflow_x', 'reject_optflow_y'], no_ground_effects=True,
+        status_flags=['cs_opt_flow']),
+    LiveEstimatorCheck(
+        CheckType.GPS_VELOCITY_STATUS, 'gps_vel', status_flags=['cs_gps'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.EXTERNAL_VISION_VELOCITY_STATUS, 'ev_vel', status_flags=['cs_ev_vel'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.GPS_POSITION_STATUS, 'gps_hpos', status_flags=['cs_gps'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.EXTERNAL_VISION_POSITION_STATUS, 'ev_hpos', status_flags=['cs_ev_pos'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.GPS_HEIGHT_STATUS, 'gps_vpos', status_flags=['cs_gps_hgt'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.EXTERNAL_VISION_HEIGHT_STATUS, 'ev_vpos', status_flags=['cs_ev_hgt'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.BAROMETER_HEIGHT_STATUS, 'baro_vpos', status_flags=['cs_baro_hgt'],
+        requires_innovations=True),
+    LiveEstimatorCheck(
+        CheckType.RANGE_SENSOR_HEIGHT_STATUS, 'rng_vpos', status_flags=['cs_rng_hgt'],
+        requires_innovations=True),
+)
+
+
+class _LiveCheck():
+    """
+    the signals of a live estimator check.
+    """
+
+    def __init__(self, definition: LiveEstimatorCheck) -> None:
+        self.definition = definition
+        self.test_ratio_message: Optional[str] = None
+        self.test_ratio_signals: List[Tuple[str, StreamingSignal]] = []
+        self.innovation_signals: List[Tuple[str, StreamingSignal]] = []
+        # the max of the first test ratio over the complete log
+        self.test_ratio_max = -np.inf
+
+    @property
+    def signals(self) -> List[StreamingSignal]:
+        """
+        :return:
+        """
+        return [signal for _, signal in self.test_ratio_signals + self.innovation_signals]
+
+
+class LiveEclCheckRunner():
+    """
+    evaluates the estimator checks on a log that is still being written. Every update decodes the
+    data appended to the log file and updates the statistics of the checks incrementally. The
+    memory does not grow with the length of the log: the statistics only keep the samples of
+    the rolling windows and of the in air margin.
+
+    The windowed statistics are approximations of the batch analysis (see streaming_analysis),
+    the imu and the numerical checks are not evaluated. The final results of a completed log are
+    given by the batch analysis, see live_process_logdata_ekf.
+    """
+
+    required_topics = (
+        'vehicle_land_detected', 'estimator_status', 'estimator_status_flags',
+        'estimator_innovations', 'estimator_innovation_test_ratios')
+
+    def __init__(
+            self, filename: str, max_read_size: int = MAX_READ_SIZE,
+            config: Optional[AnalysisConfig] = None) -> None:
+        """
+        :param filename: the (growing) ulog file
+        :param max_read_size: the maximum number of bytes decoded by an update
+        :param config: the parameters and thresholds of the checks, the current configuration of
+        the params and thresholds modules (see default_config) if not specified
+        """
+        self._stream = ULogStream(
+            filename, message_name_filter_list=self.required_topics, max_read_size=max_read_size)
+        self._config = config if config is not None else default_config()
+        self._threshold_table = get_threshold_table(self._config)
+        self._in_air_detectors: Dict[bool, StreamingInAirDetector] = {}
+        self._checks: List[_LiveCheck] = []
+        self._status_flag_maxima: Dict[str, float] = {}
+
+    @property
+    def log_time(self) -> float:
+        """
+        :return: the time of the last decoded sample in seconds since the log start
+        """
+        if self._stream.start_timestamp is None:
+            return 0.0
+        return max(0, self._stream.last_timestamp - self._stream.start_timestamp) / 1.0e6
+
+    @property
+    def bytes_read(self) -> int:
+        """
+        :return:
+        """
+        return self._stream.bytes_read
+
+    def _create_in_air_detector(self, no_ground_effects: bool) -> StreamingInAirDetector:
+        """
+        :param no_ground_effects: use the in air margin
+        :return: the in air detector of the checks
+        """
+        return StreamingInAirDetector(
+            self._stream.start_timestamp,
+            min_flight_time_seconds=self._config.params.iad_min_flight_duration_seconds,
+            in_air_margin_seconds=self._config.params.iad_in_air_margin_seconds
+            if no_ground_effects else 0.0)
+
+    def _create_windowed_mean(
+            self, window_len_s: float, message: str,
+            no_ground_effects: bool) -> StreamingWindowedMean:
+        """
+        :param window_len_s:
+        :param message: the topic of the signal
+        :param no_ground_effects: the signal uses the in air detector with the in air margin
+        :return: the windowed mean of a signal
+        """
+        # pylint: disable=unused-argument
+        return StreamingWindowedMean(window_len_s)
+
+    def _init_checks(self) -> None:
+        """
+        creates the signals of the checks. The topics and fields of the test ratios are resolved
+        from the subscriptions, which the logger writes before the data.
+        :return:
+        """
+        for no_ground_effects in [False, True]:
+            self._in_air_detectors[no_ground_effects] = self._create_in_air_detector(
+                no_ground_effects)
+
+        params = self._config.params
+        messages = {elem.name for elem in self._stream.data_list}
+        for definition in LIVE_ESTIMATOR_CHECKS:
+            check = _LiveCheck(definition)
+            test_ratio_name = definition.test_ratio_name
+            if definition.check_type == CheckType.MAGNETIC_HEADING_STATUS and \
+                    'estimator_innovation_test_ratios' not in messages:
+                test_ratio_name = None
+
+            if test_ratio_name is not None:
+                try:
+                    check.test_ratio_message, test_ratio_names = \
+                        get_innovation_message_and_field_names(
+                            self._stream, test_ratio_name, topic='innovation_test_ratio')
+                    test_ratio_fields = self._stream.get_dataset(check.test_ratio_message).data
+                    if not all(name in test_ratio_fields for name in test_ratio_names):
+                        raise KeyError(check.test_ratio_message)
+                except (PreconditionError, KeyError, IndexError):
+                    # the check doesn't apply to this log version
+                    test_ratio_names = []
+                for name in test_ratio_names:
+                    check.test_ratio_signals.append((name, StreamingSignal(
+                        self._in_air_detectors[definition.no_ground_effects],
+                        StreamingSignalStatistics(
+                            thresholds=[params.ecl_red_thresh, params.ecl_amb_thresh],
+                            windows=[(threshold, self._create_windowed_mean(
+                                params.ecl_window_len_s, check.test_ratio_message,
+                                definition.no_ground_effects)) for threshold in [
+                                    params.ecl_red_thresh, params.ecl_amb_thresh, None]]))))
+
+            for name in definition.innov_fail_names:
+                check.innovation_signals.append((name, StreamingSignal(
+                    self._in_air_detectors[True],
+                    StreamingSignalStatistics(
+                        thresholds=[0.5],
+                        windows=[(0.5, self._create_windowed_mean(
+                            window_len_s, 'estimator_status_flags', True)) for window_len_s in [
+                                params.ecl_short_rolling_window_len_s,
+                                params.ecl_long_rolling_window_len_s]]))))
+
+            self._checks.append(check)
+
+    def update(self) -> bool:
+        """
+        decodes the data appended to the log and updates the check statistics.
+        :return: True if the log file has grown
+        """
+        bytes_read = self._stream.bytes_read
+        datasets = {dataset.name: dataset for dataset in self._stream.poll()
+                    if dataset.multi_id == 0}
+        if not datasets:
+            return self._stream.bytes_read > bytes_read
+        if not self._checks:
+            self._init_checks()
+
+        if 'vehicle_land_detected' in datasets:
+            self._update_in_air_detectors(datasets['vehicle_land_detected'].data)
+
+        if 'estimator_status_flags' in datasets:
+            status_flags = datasets['estimator_status_flags'].data
+            for flag in {flag for check in self._checks for flag in
+                         check.definition.status_flags}:
+                if flag in status_flags and len(status_flags[flag]) > 0:
+                    self._status_flag_maxima[flag] = max(
+                        self._status_flag_maxima.get(flag, -np.inf),
+                        float(np.amax(status_flags[flag])))
+
+        self._append_data(datasets)
+        return True
+
+    def _update_in_air_detectors(self, land_detected: dict) -> None:
+        """
+        :param land_detected: the new samples of vehicle_land_detected
+        :return:
+        """
+        for in_air_detector in self._in_air_detectors.values():
+            in_air_detector.update(land_detected['timestamp'], land_detected['landed'])
+
+    def _append_data(self, datasets: dict) -> None:
+        """
+        :param datasets: the datasets with new data by name
+        :return:
+        """
+        for check in self._checks:
+            self._append_check_data(check, datasets)
+
+    def _append_check_data(self, check: _LiveCheck, datasets: dict) -> None:
+        """
+        :param check:
+        :param datasets: the datasets with new data by name
+        :return:
+        """
+        for message, signals in [(check.test_ratio_message, check.test_ratio_signals),
+                                 ('estimator_status_flags', check.innovation_signals)]:
+            if message in datasets:
+                data = datasets[message].data
+                relative_time = (data['timestamp'] - self._stream.start_timestamp) * 1.0e-6
+                for name, signal in signals:
+                    signal.append(relative_time, data[name])
+                if signals is check.test_ratio_signals and signals:
+                    check.test_ratio_max = max(
+                        check.test_ratio_max, float(np.amax(data[signals[0][0]])))
+
+        for signal in check.signals:
+            signal.update()
+
+    def finish(self) -> None:
+        """
+        ends the log: the rest of the file is decoded and ongoing flights end at the last land
+        detector sample.
+        :return:
+        """
+        while self.update():
+            pass
+        for in_air_detector in self._in_air_detectors.values():
+            in_air_detector.finish()
+        for check in self._checks:
+            for signal in check.signals:
+                signal.update(finished=True)
+
+    def _run_precondition(self, check: _LiveCheck) -> bool:
+        """
+        :param check:
+        :return: whether the check applies to the data received so far
+        """
+        definition = check.definition
+        if definition.requires_test_ratio:
+            return check.test_ratio_max > 0.0
+        if definition.requires_innovations:
+            try:
+                if self._stream.get_dataset('estimator_innovations').n_samples == 0:
+                    return False
+            except IndexError:
+                return False
+        if definition.applies is not None and definition.applies(self._config):
+            return True
+        return any(self._status_flag_maxima.get(flag, 0.0) > 0.5
+                   for flag in definition.status_flags)
+
+    def _get_check_result(self, check: _LiveCheck) -> CheckResult:
+        """
+        :param check:
+        :return: the check result from the statistics of the data received so far
+        """
+        check_result = CheckResult(check_type=check.definition.check_type)
+        if not self._run_precondition(check):
+            check_result.status = CheckStatus.DOES_NOT_APPLY
+            return check_result
+
+        test_ratio_statistics = [signal.get_statistics() for _, signal in check.test_ratio_signals]
+        innovation_statistics = [signal.get_statistics() for _, signal in check.innovation_signals]
+        if any(statistics.n_samples == 0 for statistics in
+               test_ratio_statistics + innovation_statistics):
+            # no in air data (yet)
+            return check_result
+
+        def add_statistic(statistic_type: CheckStatisticType, instance: int, value: float):
+            statistic = check_result.statistics.add()
+            statistic.statistic_type = statistic_type
+            statistic.statistic_instance = instance
+            statistic.value = float(value)
+
+        for i, statistics in enumerate(test_ratio_statistics):
+            red_pct, amber_pct = statistics.pct
+            add_statistic(CheckStatisticType.INNOVATION_RED_PCT, i, red_pct)
+            add_statistic(CheckStatisticType.INNOVATION_AMBER_PCT, i, amber_pct - red_pct)
+            add_statistic(
+                CheckStatisticType.INNOVATION_RED_WINDOWED_PCT, i, statistics.windowed_max[0])
+            add_statistic(
+                CheckStatisticType.INNOVATION_AMBER_WINDOWED_PCT, i, statistics.windowed_max[1])
+            add_statistic(CheckStatisticType.ESTIMATOR_FAILURE_MAX, i, statistics.max)
+            add_statistic(CheckStatisticType.ESTIMATOR_FAILURE_AVG, i,
+                          statistics.mean if statistics.max > 0.0 else 0.0)
+            add_statistic(
+                CheckStatisticType.ESTIMATOR_FAILURE_WINDOWED_AVG, i, statistics.windowed_mean[2])
+
+        for i, statistics in enumerate(innovation_statistics):
+            add_statistic(CheckStatisticType.FAIL_RATIO_PCT, i, statistics.pct[0])
+            add_statistic(
+                CheckStatisticType.FAIL_RATIO_SHORT_WINDOW_PCT, i, statistics.windowed_max[0])
+            add_statistic(
+                CheckStatisticType.FAIL_RATIO_LONG_WINDOW_PCT, i, statistics.windowed_max[1])
+
+        apply_thresholds(check_result, threshold_table=self._threshold_table)
+        evaluate_check_status(check_result)
+        return check_result
+
+    @property
+    def results(self) -> List[CheckResult]:
+        """
+        :return: the results of the estimator checks for the data received so far
+        """
+        return [self._get_check_result(check) for check in self._checks]
+
+    @property
+    def results_deserialized(self) -> List[dict]:
+        """
+        :return:
+        """
+        return deserialize_check_results(self.results)
@@ -0,0 +1,118 @@
+# /usr/bin/env/ python3
+"""
+a check runner for all estimator instances of multi-EKF logs
+"""
+from typing import Dict, List, Optional, Sequence
+
+from pyulog import ULog
+
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetectorRegistry
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult
+from ecl_ekf_analysis.check_data_interfaces.check_data_utils import deserialize_check_result
+from ecl_ekf_analysis.checks.base_check import Check
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.log_processing.estimator_instances import EstimatorInstanceULog, \
+    get_estimator_instances
+from ecl_ekf_analysis.log_processing.instrumentation import Instrumentation
+
+
+def get_check_name(test_result: dict) -> str:
+    """
+    :param test_result: a deserialized check result
+    :return: the check type, followed by the estimator instance for the results of
+    MultiEkfCheckRunner, e.g. 'MAGNETOMETER_STATUS[1]'
+    """
+    if 'estimator_instance' not in test_result:
+        return test_result['type']
+    return f'{test_result["type"]:s}[{test_result["estimator_instance"]:d}]'
+
+
+class MultiEkfCheckRunner(EclCheckRunner):
+    """
+    runs the checks of EclCheckRunner for every estimator instance of a log. The log is parsed
+    and the airtimes are detected once for all instances instead of analysing the log once per
+    instance. run_checks runs the checks of all instances one after another on the calling
+    thread, or on a shared thread pool with n_threads > 1. The deserialized results are tagged
+    with the estimator instance.
+    """
+
+    def __init__(
+            self, ulog: ULog, instrumentation: Optional[Instrumentation] = None,
+            config: Optional[AnalysisConfig] = None,
+            estimator_instances: Optional[Sequence[int]] = None):
+        """
+        :param ulog:
+        :param instrumentation: see EclCheckRunner. the checks are measured per instance.
+        :param config: see EclCheckRunner
+        :param estimator_instances: the multi ids of the estimator instances to analyse, all
+        instances of the log if not specified
+        """
+        self._estimator_instances = list(estimator_instances) \
+            if estimator_instances is not None else get_estimator_instances(ulog)
+        super().__init__(ulog, instrumentation=instrumentation, config=config)
+
+    def _init_checks(self, ulog: ULog, config: AnalysisConfig) -> None:
+        """
+        constructs the checks of every estimator instance on a view of the log. The in air
+        detectors of the instances share the airtimes detected on the log.
+        :param ulog:
+        :param config:
+        :return:
+        """
+        in_air_detectors = InAirDetectorRegistry(ulog)
+        for estimator_instance in self._estimator_instances:
+            estimator_ulog = EstimatorInstanceULog(ulog, estimator_instance)
+            super()._init_checks(
+                estimator_ulog, config, in_air_detectors=in_air_detectors.for_view(estimator_ulog))
+
+    def _get_check_name(self, check: Check) -> str:
+        """
+        :param check:
+        :return: the name of the check and its estimator instance in the instrumentation
+        """
+        return f'{check.check_type.name:s}[{check.ulog.estimator_instance:d}]'
+
+    def _get_estimator_instances(self) -> Dict[int, int]:
+        """
+        :return: the estimator instance by the id of the check result
+        """
+        return {id(check.result): check.ulog.estimator_instance for check in self.checks}
+
+    def _create_results_table(self) -> Dict[str, tuple]:
+        """
+        :return: the results table, keyed by the check type and the estimator instance
+        """
+        estimator_instances = self._get_estimator_instances()
+        return {
+            f'{check_result.check_type.name:s}[{estimator_instances[id(check_result)]:d}]': (
+                check_result.status.legacy_name, '', deserialize_check_result(check_result))
+            for check_result in self._check_results}
+
+    @property
+    def estimator_instances(self) -> List[int]:
+        """
+        :return: the multi ids of the analysed estimator instances
+        """
+        return self._estimator_instances
+
+    @property
+    def results_per_instance(self) -> Dict[int, List[CheckResult]]:
+        """
+        :return: the check results by estimator instance
+        """
+        estimator_instances = self._get_estimator_instances()
+        results = {estimator_instance: [] for estimator_instance in self._estimator_instances}
+        for check_result in self._check_results:
+            results[estimator_instances[id(check_result)]].append(check_result)
+        return results
+
+    @property
+    def results_deserialized(self) -> List[dict]:
+        """
+        :return: the check results of all instances with the entry 'estimator_instance'
+        """
+        estimator_instances = self._get_estimator_instances()
+        return [dict(test_result, estimator_instance=estimator_instances[id(check_result)])
+                for check_result, test_result in zip(
+                    self._check_results, super().results_deserialized)]
@@ -2,12 +2,15 @@
 """
 the numerical analysis
 """
+from typing import Optional
+
 from pyulog import ULog
-import numpy as np
 
 from ecl_ekf_analysis.checks.base_check import Check
 from ecl_ekf_analysis.check_data_interfaces.check_data import CheckType, CheckStatisticType
-from ecl_ekf_analysis.config import thresholds
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetectorRegistry
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
 
 
 class NumericalCheck(Check):
@@ -15,23 +18,10 @@ class NumericalCheck(Check):
     the numerical check.
     """
 
-    def __init__(self, ulog: ULog):
-        """
-        :param ulog:
-        """
-        super().__init__(
-            ulog, check_type=CheckType.FILTER_FAULT_STATUS)
-
-    def calc_statistics(self) -> None:
-        """
-        :return:
-        """
-        estimator_status_data = self.ulog.get_dataset('estimator_status_flags').data
-
-        filter_fault_flag = self.add_statistic(
-            CheckStatisticType.FILTER_FAULT_FLAG)
+    required_topics = ('estimator_status_flags',)
 
-        flags = [
+    # the fault flags of the estimator_status_flags indicating numerical issues
+    filter_fault_flags = (
         "fs_bad_mag_x",
         "fs_bad_mag_y",
         "fs_bad_mag_z",
@@ -51,13 +41,34 @@ class NumericalCheck(Check):
         # "fs_bad_acc_bias",
         # "fs_bad_acc_vertical",
         # "fs_bad_acc_clipping",
-        ]
+    )
+    required_status_flags = filter_fault_flags
+
+    def __init__(
+            self, ulog: ULog, in_air_detectors: Optional[InAirDetectorRegistry] = None,
+            config: Optional[AnalysisConfig] = None,
+            status_flags: Optional[FlagMatrix] = None):
+        """
+        :param ulog:
+        :param in_air_detectors:
+        :param config:
+        :param status_flags: the packed estimator_status_flags shared between the checks of a log.
+        if not specified, the check packs the fault flags itself.
+        """
+        super().__init__(
+            ulog, check_type=CheckType.FILTER_FAULT_STATUS, in_air_detectors=in_air_detectors,
+            config=config)
+        self._status_flags = status_flags
 
-        filter_fault_flag.value = 0.0
+    def calc_statistics(self) -> None:
+        """
+        :return:
+        """
+        status_flags = self._status_flags if self._status_flags is not None else \
+            FlagMatrix.from_fields(self.ulog.get_dataset('estimator_status_flags').data,
+                                   self.required_status_flags)
 
-        for flag in flags:
-            if np.any(estimator_status_data[flag]):
-                filter_fault_flag.value = 1.0
-                break
+        filter_fault_flag = self.add_statistic(
+            CheckStatisticType.FILTER_FAULT_FLAG)
 
-        filter_fault_flag.thresholds.failure = thresholds.ecl_filter_fault_flag_failure()
+        filter_fault_flag.value = 1.0 if status_flags.any(self.filter_fault_flags) else 0.0
@@ -0,0 +1,239 @@
+#! /usr/bin/env python3
+"""
+an immutable, pre-parsed configuration of the analysis: the parameters of params.ini and the
+thresholds of thresholds.ini. The configuration is parsed once and then passed to the check
+runners and the checks, such that the checks don't parse strings and different configurations
+(e.g. the thresholds of different airframes) can be used concurrently in the same process.
+"""
+import configparser
+import json
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from ecl_ekf_analysis.config import params as params_ini
+from ecl_ekf_analysis.config import thresholds as thresholds_ini
+
+
+def _to_bool(value: Any) -> bool:
+    """
+    :param value: a bool or a string in the format of configparser
+    :return:
+    """
+    if isinstance(value, str):
+        if value.lower() not in configparser.ConfigParser.BOOLEAN_STATES:
+            raise ValueError(f'not a boolean: {value:s}')
+        return configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+    return bool(value)
+
+
+class AnalysisParams(NamedTuple):
+    """
+    the parameters of the analysis, named as the functions of the params module.
+    """
+    iad_min_flight_duration_seconds: float
+    iad_in_air_margin_seconds: float
+    warn_altitude: float
+    warn_duration_s: int
+    gps_ts_rejection_h: int
+    ecl_red_thresh: float
+    ecl_amb_thresh: float
+    ecl_pos_checks_when_sensors_not_fused: bool
+    ecl_window_len_s: float
+    ecl_short_rolling_window_len_s: float
+    ecl_long_rolling_window_len_s: float
+    of_min_ground_distance_meters: float
+    of_min_flight_phase_duration_seconds: float
+
+
+# the section, the option and the type of the parameters in params.ini
+_PARAMS_OPTIONS: Dict[str, Tuple[str, str, Callable[[Any], Any]]] = {
+    'iad_min_flight_duration_seconds': ('in-air-detector', 'min_flight_duration_seconds', float),
+    'iad_in_air_margin_seconds': ('in-air-detector', 'in_air_margin_seconds', float),
+    'warn_altitude': ('log-processing', 'warn_altitude', float),
+    'warn_duration_s': ('log-processing', 'warn_duration_s', int),
+    'gps_ts_rejection_h': ('log-processing', 'gps_timestamp_rejection_hours', int),
+    'ecl_red_thresh': ('ecl-analysis', 'red_thresh', float),
+    'ecl_amb_thresh': ('ecl-analysis', 'amb_thresh', float),
+    'ecl_pos_checks_when_sensors_not_fused': (
+        'ecl-analysis', 'ecl_pos_checks_when_sensors_not_fused', _to_bool),
+    'ecl_window_len_s': ('ecl-analysis', 'window_len_s', float),
+    'ecl_short_rolling_window_len_s': ('ecl-analysis', 'short_rolling_window_len_s', float),
+    'ecl_long_rolling_window_len_s': ('ecl-analysis', 'long_rolling_window_len_s', float),
+    'of_min_ground_distance_meters': ('optical-flow', 'min_ground_distance_meters', float),
+    'of_min_flight_phase_duration_seconds': (
+        'optical-flow', 'min_flight_phase_duration_seconds', float),
+}
+
+# the overrides of the parameters and thresholds in the format of to_dict, e.g.
+# {'params': {'ecl-analysis': {'red_thresh': 1.5}}, 'thresholds': {'yaw_amber_warning_pct': 10.0}}
+ConfigOverrides = Mapping[str, Mapping[str, Any]]
+
+
+class AnalysisConfig():
+    """
+    the parameters and the thresholds of the analysis. The values are parsed when the
+    configuration is created and can't be changed afterwards, a configuration with other values
+    is created by with_overrides.
+    """
+    __slots__ = ('_params', '_thresholds')
+
+    def __init__(self, params: AnalysisParams, thresholds: Mapping[str, float]) -> None:
+        """
+        use the from_* class methods to parse a configuration.
+        :param params:
+        :param thresholds: the thresholds by their name in thresholds.ini
+        """
+        self._params = params
+        self._thresholds = dict(thresholds)
+
+    def __getstate__(self) -> Tuple[AnalysisParams, Dict[str, float]]:
+        return self._params, self._thresholds
+
+    def __setstate__(self, state: Tuple[AnalysisParams, Dict[str, float]]) -> None:
+        self._params, self._thresholds = state
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AnalysisConfig) and self._params == other._params and \
+            self._thresholds == other._thresholds
+
+    def __repr__(self) -> str:
+        return f'AnalysisConfig({self.to_dict()!r})'
+
+    @property
+    def params(self) -> AnalysisParams:
+        """
+        :return: the parameters of the analysis
+        """
+        return self._params
+
+    def threshold(self, name: str) -> Optional[float]:
+        """
+        :param name: the name of the threshold in thresholds.ini, e.g. 'yaw_amber_warning_pct'
+        :return: the threshold or None, if it is not configured
+        """
+        return self._thresholds.get(name)
+
+    @property
+    def threshold_names(self) -> Tuple[str, ...]:
+        """
+        :return: the names of the configured thresholds
+        """
+        return tuple(sorted(self._thresholds))
+
+    @classmethod
+    def from_config_parsers(
+            cls, params: configparser.ConfigParser,
+            thresholds: configparser.ConfigParser) -> 'AnalysisConfig':
+        """
+        :param params: the parsed params.ini
+        :param thresholds: the parsed thresholds.ini
+        :return: the configuration
+        """
+        return cls(
+            AnalysisParams(**{
+                name: convert(params.get(section, option))
+                for name, (section, option, convert) in _PARAMS_OPTIONS.items()}),
+            {name: float(value) for name, value in thresholds.defaults().items()})
+
+    @classmethod
+    def from_ini(
+            cls, params_file: Optional[str] = None,
+            thresholds_file: Optional[str] = None) -> 'AnalysisConfig':
+        """
+        parses the configuration from .ini files, which may contain a subset of the options. The
+        other options are taken from the default params.ini and thresholds.ini.
+        :param params_file: a params .ini file
+        :param thresholds_file: a thresholds .ini file
+        :raises FileNotFoundError: if a file can't be read
+        :return: the configuration
+        """
+        parsers = []
+        for default_file, filename in [
+                (params_ini.default_params_file(), params_file),
+                (thresholds_ini.default_thresholds_file(), thresholds_file)]:
+            parser = configparser.ConfigParser()
+            parser.read([default_file])
+            if filename is not None and not parser.read([filename]):
+                raise FileNotFoundError(f'could not read the configuration file {filename:s}')
+            parsers.append(parser)
+        return cls.from_config_parsers(*parsers)
+
+    @classmethod
+    def from_dict(cls, overrides: ConfigOverrides) -> 'AnalysisConfig':
+        """
+        :param overrides: the options overriding those of default_config in the format of
+        to_dict, may contain a subset of the options
+        :return: the configuration
+        """
+        return default_config().with_overrides(overrides)
+
+    @classmethod
+    def from_json(cls, filename: str) -> 'AnalysisConfig':
+        """
+        :param filename: a .json file with the options overriding the defaults, see from_dict
+        :return: the configuration
+        """
+        with open(filename, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+    def with_overrides(self, overrides: ConfigOverrides) -> 'AnalysisConfig':
+        """
+        :param overrides: the options to change in the format of to_dict, may contain a subset
+        of the options
+        :raises ValueError: if an option is unknown or its value has the wrong type, thresholds
+        are known if they are configured or looked up by the checks
+        :return: a new configuration with the options of this configuration and the overrides
+        """
+        unknown_keys = set(overrides) - {'params', 'thresholds'}
+        if unknown_keys:
+            raise ValueError(f'unknown configuration keys: {", ".join(sorted(unknown_keys))}')
+
+        params = self._params._asdict()
+        options = {(section, option): (name, convert)
+                   for name, (section, option, convert) in _PARAMS_OPTIONS.items()}
+        for section, section_overrides in overrides.get('params', {}).items():
+            for option, value in section_overrides.items():
+                if (section, option) not in options:
+                    raise ValueError(f'unknown parameter {section:s}.{option:s}')
+                name, convert = options[(section, option)]
+                params[name] = convert(value)
+
+        # imported here, as the check thresholds import the configuration
+        # pylint: disable=import-outside-toplevel
+        from ecl_ekf_analysis.checks.check_thresholds import THRESHOLD_NAMES
+
+        thresholds = dict(self._thresholds)
+        for name, value in overrides.get('thresholds', {}).items():
+            if name not in thresholds and name not in THRESHOLD_NAMES:
+                raise ValueError(f'unknown threshold {name:s}')
+            thresholds[name] = float(value)
+
+        return AnalysisConfig(AnalysisParams(**params), thresholds)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: the configuration as a JSON serializable dict in the format of the .ini files
+        """
+        params: Dict[str, Dict[str, Any]] = {}
+        for name, (section, option, _) in _PARAMS_OPTIONS.items():
+            params.setdefault(section, {})[option] = getattr(self._params, name)
+        return {'params': params, 'thresholds': dict(sorted(self._thresholds.items()))}
+
+
+# the parsers of the params and thresholds modules and the configuration created from them
+_default_config: Optional[Tuple[configparser.ConfigParser, configparser.ConfigParser,
+                                AnalysisConfig]] = None
+
+
+def default_config() -> AnalysisConfig:
+    """
+    :return: the configuration of the params and thresholds modules, i.e. of the default .ini
+    files. It is parsed again only if these are reloaded (see params.reload_params and
+    thresholds.reload_thresholds).
+    """
+    global _default_config  # pylint: disable=global-statement,invalid-name
+    params, thresholds = params_ini.get_params(), thresholds_ini.get_thresholds()
+    if _default_config is None or _default_config[0] is not params or \
+            _default_config[1] is not thresholds:
+        _default_config = params, thresholds, AnalysisConfig.from_config_parsers(
+            params, thresholds)
+    return _default_config[2]
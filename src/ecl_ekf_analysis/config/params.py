@@ -4,45 +4,68 @@ returns environment parameters
 """
 import os
 import configparser
+import functools
 
-_params = configparser.ConfigParser()
-_params.read([os.path.join(os.path.dirname(__file__), 'params.ini')])
+_PARAMS_FILE = os.path.join(os.path.dirname(__file__), 'params.ini')
+
+def default_params_file() -> str:
+    """
+    :return: the params.ini file of the default parameters
+    """
+    return _PARAMS_FILE
+
+@functools.lru_cache(maxsize=None)
+def get_params() -> configparser.ConfigParser:
+    """
+    parses the parameters on first use, such that importing the module is cheap.
+    :return:
+    """
+    params = configparser.ConfigParser()
+    params.read([_PARAMS_FILE])
+    return params
+
+def reload_params() -> None:
+    """
+    parses the parameters file again on the next use, e.g. after it was changed.
+    :return:
+    """
+    get_params.cache_clear()
 
 def iad_min_flight_duration_seconds() -> float:
-    return _params.getfloat('in-air-detector', 'min_flight_duration_seconds')
+    return get_params().getfloat('in-air-detector', 'min_flight_duration_seconds')
 
 def iad_in_air_margin_seconds() -> float:
-    return _params.getfloat('in-air-detector', 'in_air_margin_seconds')
+    return get_params().getfloat('in-air-detector', 'in_air_margin_seconds')
 
 def warn_altitude() -> float:
-    return _params.getfloat('log-processing', 'warn_altitude')
+    return get_params().getfloat('log-processing', 'warn_altitude')
 
 def warn_duration_s() -> int:
-    return _params.getint('log-processing', 'warn_duration_s')
+    return get_params().getint('log-processing', 'warn_duration_s')
 
 def gps_ts_rejection_h() -> int:
-    return _params.getint('log-processing', 'gps_timestamp_rejection_hours')
+    return get_params().getint('log-processing', 'gps_timestamp_rejection_hours')
 
 def ecl_red_thresh() -> float:
-    return _params.getfloat('ecl-analysis', 'red_thresh')
+    return get_params().getfloat('ecl-analysis', 'red_thresh')
 
 def ecl_amb_thresh() -> float:
-    return _params.getfloat('ecl-analysis', 'amb_thresh')
+    return get_params().getfloat('ecl-analysis', 'amb_thresh')
 
 def ecl_pos_checks_when_sensors_not_fused() -> bool:
-    return _params.getboolean('ecl-analysis', 'ecl_pos_checks_when_sensors_not_fused')
+    return get_params().getboolean('ecl-analysis', 'ecl_pos_checks_when_sensors_not_fused')
 
 def ecl_window_len_s() -> float:
-    return _params.getfloat('ecl-analysis', 'window_len_s')
+    return get_params().getfloat('ecl-analysis', 'window_len_s')
 
 def ecl_short_rolling_window_len_s() -> float:
-    return _params.getfloat('ecl-analysis', 'short_rolling_window_len_s')
+    return get_params().getfloat('ecl-analysis', 'short_rolling_window_len_s')
 
 def ecl_long_rolling_window_len_s() -> float:
-    return _params.getfloat('ecl-analysis', 'long_rolling_window_len_s')
+    return get_params().getfloat('ecl-analysis', 'long_rolling_window_len_s')
 
 def of_min_ground_distance_meters() -> float:
-    return _params.getfloat('optical-flow', 'min_ground_distance_meters')
+    return get_params().getfloat('optical-flow', 'min_ground_distance_meters')
 
 def of_min_flight_phase_duration_seconds() -> float:
-    return _params.getfloat('optical-flow', 'min_flight_phase_duration_seconds')
+    return get_params().getfloat('optical-flow', 'min_flight_phase_duration_seconds')
@@ -6,107 +6,130 @@ returns thresholds
 
 import os
 import configparser
-
-_thresholds = configparser.ConfigParser()
-_thresholds.read([os.path.join(os.path.dirname(__file__), 'thresholds.ini')])
+import functools
+
+_DEFAULT_THRESHOLDS_FILE = os.path.join(os.path.dirname(__file__), 'thresholds.ini')
+
+def default_thresholds_file() -> str:
+    """
+    :return: the thresholds.ini file of the default thresholds
+    """
+    return _DEFAULT_THRESHOLDS_FILE
+
+@functools.lru_cache(maxsize=None)
+def get_thresholds() -> configparser.ConfigParser:
+    """
+    parses the thresholds on first use, such that importing the module is cheap.
+    :return:
+    """
+    thresholds = configparser.ConfigParser()
+    thresholds.read([_DEFAULT_THRESHOLDS_FILE])
+    return thresholds
+
+def reload_thresholds() -> None:
+    """
+    parses the thresholds file again on the next use, e.g. after it was changed.
+    :return:
+    """
+    get_thresholds.cache_clear()
 
 def ecl_innovation_failure_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option('DEFAULT', f'{innovation_name:s}_innovation_failure_pct')
+    return get_thresholds().has_option('DEFAULT', f'{innovation_name:s}_innovation_failure_pct')
 
 def ecl_innovation_failure_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat('DEFAULT', f'{innovation_name:s}_innovation_failure_pct')
+    return get_thresholds().getfloat('DEFAULT', f'{innovation_name:s}_innovation_failure_pct')
 
 def ecl_short_rolling_innovation_failure_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option(
+    return get_thresholds().has_option(
         'DEFAULT',
         f'{innovation_name:s}_short_rolling_innovation_failure_pct'
     )
 
 def ecl_short_rolling_innovation_failure_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat(
+    return get_thresholds().getfloat(
         'DEFAULT',
         f'{innovation_name:s}_short_rolling_innovation_failure_pct'
     )
 
 def ecl_long_rolling_innovation_warning_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option(
+    return get_thresholds().has_option(
         'DEFAULT', f'{innovation_name:s}_long_rolling_innovation_warning_pct'
     )
 
 def ecl_long_rolling_innovation_warning_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat(
+    return get_thresholds().getfloat(
         'DEFAULT',
         f'{innovation_name:s}_long_rolling_innovation_warning_pct'
     )
 
 def ecl_amber_warning_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat('DEFAULT', f'{innovation_name:s}_amber_warning_pct')
+    return get_thresholds().getfloat('DEFAULT', f'{innovation_name:s}_amber_warning_pct')
 
 def ecl_amber_warning_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option('DEFAULT', f'{innovation_name:s}_amber_warning_pct')
+    return get_thresholds().has_option('DEFAULT', f'{innovation_name:s}_amber_warning_pct')
 
 def ecl_amber_failure_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat('DEFAULT', f'{innovation_name:s}_amber_failure_pct')
+    return get_thresholds().getfloat('DEFAULT', f'{innovation_name:s}_amber_failure_pct')
 
 def ecl_amber_failure_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option('DEFAULT', f'{innovation_name:s}_amber_failure_pct')
+    return get_thresholds().has_option('DEFAULT', f'{innovation_name:s}_amber_failure_pct')
 
 def ecl_amber_warning_windowed_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat(
+    return get_thresholds().getfloat(
         'DEFAULT',
         f'{innovation_name:s}_amber_warning_windowed_pct'
     )
 
 def ecl_amber_warning_windowed_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option(
+    return get_thresholds().has_option(
         'DEFAULT',
         f'{innovation_name:s}_amber_warning_windowed_pct'
     )
 
 def ecl_amber_failure_windowed_pct(innovation_name: str) -> float:
-    return _thresholds.getfloat(
+    return get_thresholds().getfloat(
         'DEFAULT',
         f'{innovation_name:s}_amber_failure_windowed_pct'
     )
 
 def ecl_amber_failure_windowed_pct_exists(innovation_name: str) -> bool:
-    return _thresholds.has_option(
+    return get_thresholds().has_option(
         'DEFAULT',
         f'{innovation_name:s}_amber_failure_windowed_pct'
     )
 
 def ecl_filter_fault_flag_failure() -> float:
-    return _thresholds.getfloat('DEFAULT', 'filter_fault_flag_failure')
+    return get_thresholds().getfloat('DEFAULT', 'filter_fault_flag_failure')
 
 def imu_coning_warning_max() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_coning_warning_max')
+    return get_thresholds().getfloat('DEFAULT', 'imu_coning_warning_max')
 
 def imu_coning_warning_rolling_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_coning_warning_rolling_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_coning_warning_rolling_avg')
 
 def imu_high_freq_delta_angle_warning_max() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_high_freq_delta_angle_warning_max')
+    return get_thresholds().getfloat('DEFAULT', 'imu_high_freq_delta_angle_warning_max')
 
 def imu_high_freq_delta_angle_warning_rolling_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_high_freq_delta_angle_warning_rolling_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_high_freq_delta_angle_warning_rolling_avg')
 
 def imu_high_freq_delta_velocity_warning_max() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_high_freq_delta_velocity_warning_max')
+    return get_thresholds().getfloat('DEFAULT', 'imu_high_freq_delta_velocity_warning_max')
 
 def imu_high_freq_delta_velocity_warning_rolling_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_high_freq_delta_velocity_warning_rolling_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_high_freq_delta_velocity_warning_rolling_avg')
 
 def imu_observed_angle_error_warning_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_observed_angle_error_warning_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_observed_angle_error_warning_avg')
 
 def imu_observed_velocity_error_warning_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_observed_velocity_error_warning_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_observed_velocity_error_warning_avg')
 
 def imu_observed_position_error_warning_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_observed_position_error_warning_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_observed_position_error_warning_avg')
 
 def imu_delta_angle_bias_warning_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_delta_angle_bias_warning_avg')
+    return get_thresholds().getfloat('DEFAULT', 'imu_delta_angle_bias_warning_avg')
 
 def imu_delta_velocity_bias_warning_avg() -> float:
-    return _thresholds.getfloat('DEFAULT', 'imu_delta_velocity_bias_warning_avg')
\ No newline at end of file
+    return get_thresholds().getfloat('DEFAULT', 'imu_delta_velocity_bias_warning_avg')
\ No newline at end of file
@@ -0,0 +1,135 @@
+#! /usr/bin/env python3
+"""
+Follows a ULog file while it is being written (e.g. by the PX4 logger during a flight) and prints
+the status of the estimator checks periodically. When the file stops growing, the log is analysed
+by process_logdata_ekf, such that the final results are those of the batch analysis.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckResult, CheckStatus
+from ecl_ekf_analysis.checks.live_check_runner import LiveEclCheckRunner
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf, \
+    get_master_status_from_test_results, add_config_arguments, get_config
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Follow a ulog file while it is being written and print the status of the '
+                    'estimator checks periodically.')
+    parser.add_argument('filename', metavar='file.ulg', help='ULog input file')
+    parser.add_argument(
+        '--interval', type=float, default=5.0,
+        help='The interval in seconds between printing the check statuses.')
+    parser.add_argument(
+        '--poll-interval', type=float, default=0.5,
+        help='The interval in seconds between reading the data appended to the file.')
+    parser.add_argument(
+        '--idle-timeout', type=float, default=10.0,
+        help='The log is considered complete if the file did not grow for this many seconds.')
+    add_config_arguments(parser)
+    return parser.parse_args()
+
+
+def format_check_statuses(log_time: float, check_results: List[CheckResult]) -> str:
+    """
+    :param log_time: the time of the log in seconds
+    :param check_results:
+    :return: the statuses of the checks that apply as a single line
+    """
+    statuses = ', '.join(
+        f'{check_result.check_type.name:s}: {check_result.status.name:s}'
+        for check_result in check_results if check_result.status != CheckStatus.DOES_NOT_APPLY)
+    return f'{log_time:8.1f} s  {statuses:s}'
+
+
+def print_check_statuses(log_time: float, check_results: List[CheckResult]) -> None:
+    """
+    :param log_time: the time of the log in seconds
+    :param check_results:
+    :return:
+    """
+    print(format_check_statuses(log_time, check_results))
+
+
+def follow_logdata_ekf(
+        filename: str, interval_s: float = 5.0, poll_interval_s: float = 0.5,
+        idle_timeout_s: float = 10.0,
+        on_update: Callable[[float, List[CheckResult]], None] = print_check_statuses,
+        config: Optional[AnalysisConfig] = None) -> List[dict]:
+    """
+    follows a ulog file until it stops growing and reports the check results periodically.
+    :param filename:
+    :param interval_s: the interval between the reports
+    :param poll_interval_s: the interval between reading the data appended to the file
+    :param idle_timeout_s: the log is complete if the file did not grow for this duration
+    :param on_update: called with the log time and the check results of the data received so
+    far
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :return: the results of the batch analysis of the complete log
+    """
+    live_check_runner = LiveEclCheckRunner(filename, config=config)
+    last_report = None
+    last_growth = time.monotonic()
+    while True:
+        has_grown = live_check_runner.update()
+        now = time.monotonic()
+        if has_grown:
+            last_growth = now
+        elif now - last_growth >= idle_timeout_s:
+            break
+
+        if last_report is None or now - last_report >= interval_s:
+            on_update(live_check_runner.log_time, live_check_runner.results)
+            last_report = now
+
+        if not has_grown:
+            time.sleep(poll_interval_s)
+
+    live_check_runner.finish()
+    on_update(live_check_runner.log_time, live_check_runner.results)
+
+    return process_logdata_ekf(filename, config=config)
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+
+    args = get_arguments()
+
+    try:
+        test_results = follow_logdata_ekf(
+            args.filename, interval_s=args.interval, poll_interval_s=args.poll_interval,
+            idle_timeout_s=args.idle_timeout, config=get_config(args))
+    except Exception as e:
+        print(str(e))
+        sys.exit(-1)
+
+    master_status = get_master_status_from_test_results(test_results)
+
+    # print master test status to console
+    if master_status == 'Pass':
+        print('No anomalies detected')
+    elif master_status == 'Warning':
+        print('Minor anomalies detected')
+    elif master_status == 'Fail':
+        print('Major anomalies detected')
+        sys.exit(-1)
+
+
+if __name__ == '__main__':
+    main()
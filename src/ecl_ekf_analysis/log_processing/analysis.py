@@ -2,12 +2,14 @@
 """
 function collection for calculation ecl ekf metrics.
 """
-from typing import Dict, Callable, Tuple, List, Optional
+from typing import Dict, Callable, Tuple, List, Optional, Sequence, Union
 
 import numpy as np
 
 from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector, Airtime
-from ecl_ekf_analysis.signal_processing.smooth_filt_rolling import smooth_1d_boundaries
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
+from ecl_ekf_analysis.signal_processing.smooth_filt_rolling import smooth_1d_boundaries, \
+    moving_average_1d_boundaries, moving_average_columns, windowed_sum_1d
 
 
 def calculate_stat_from_signal(
@@ -19,8 +21,31 @@ def calculate_stat_from_signal(
     :param in_air_detector:
     :return:
     """
+    # a view of the signal if the airtime is contiguous
+    return float(stat_function(data[variable][in_air_det.get_airtime_selection(dataset)]))
 
-    return float(stat_function(data[variable][in_air_det.get_airtime(dataset)]))
+
+def get_airphase_window(
+        airtime: Airtime, n_samples: int, window_len_s: float) -> Tuple[int, Airtime]:
+    """
+    calculates the (odd) window length in samples for a window of window_len_s seconds and the
+    airtime covered by the windowed mean of an airphase (see calculate_windowed_mean_per_airphase).
+    :param airtime:
+    :param n_samples: the number of samples of the airphase. needs to be positive.
+    :param window_len_s:
+    :return: the window length and the airtime of the windowed mean
+    """
+    duration_s = airtime.landing - airtime.take_off
+    window_len = int((window_len_s / duration_s) * n_samples)
+    if (window_len % 2) == 0:
+        window_len += 1
+
+    window_len_after_s = duration_s * (window_len / float(n_samples))
+    smoothed_airtime = Airtime(
+        take_off=airtime.take_off + min(window_len_after_s, duration_s) / 2.0,
+        landing=airtime.landing - min(window_len_after_s, duration_s) / 2.0)
+
+    return window_len, smoothed_airtime
 
 
 def calculate_windowed_mean_per_airphase(
@@ -40,27 +65,250 @@ def calculate_windowed_mean_per_airphase(
 
     windowed_stats = []
 
-    for airtime, at_indices in zip(in_air_det.airtimes, in_air_det.get_airtime_per_phase(dataset)):
+    for airtime, at_selection in zip(
+            in_air_det.airtimes, in_air_det.get_airtime_selection_per_phase(dataset)):
 
-        duration_s = airtime.landing - airtime.take_off
-        window_len = int((window_len_s / duration_s) * len(at_indices))
-        if (window_len % 2) == 0:
-            window_len += 1
+        input_signal = data[variable][at_selection]
 
-        if len(at_indices) > 0:
-            window_len_after_s = duration_s * (window_len / float(len(at_indices)))
+        if len(input_signal) > 0:
+            window_len, smoothed_airtime = get_airphase_window(
+                airtime, len(input_signal), window_len_s)
 
-            input_signal = data[variable][at_indices]
             if threshold is not None:
                 input_signal = 100.0 * (input_signal > threshold)
 
             smoothed_air_phase = smooth_1d_boundaries(
                 input_signal, window_len=window_len, mode='valid', mean_for_short_signals=True)
 
-            smoothed_airtime = Airtime(
-                take_off=airtime.take_off + min(window_len_after_s, duration_s) / 2.0,
-                landing=airtime.landing - min(window_len_after_s, duration_s) / 2.0)
-
             windowed_stats.append((smoothed_airtime, smoothed_air_phase))
 
     return windowed_stats
+
+
+def calculate_flag_percentage(
+        flags: FlagMatrix, dataset: str, variable: str, in_air_det: InAirDetector) -> float:
+    """
+    calculates the percentage of the in air samples with an active flag from the popcounts of the
+    packed flags. Equal to calculate_stat_from_signal with 100 * np.mean(x > threshold) for the
+    threshold of the flag matrix.
+    :param flags: the packed flags of the dataset
+    :param dataset:
+    :param variable: the flag
+    :param in_air_det:
+    :return: the percentage, nan if there are no in air samples
+    """
+    n_samples, n_active = 0, 0
+    for at_selection in in_air_det.get_airtime_selection_per_phase(dataset):
+        n_samples += len(range(flags.n_samples)[at_selection]) \
+            if isinstance(at_selection, slice) else len(at_selection)
+        n_active += flags.count(variable, at_selection)
+
+    return 100.0 * (n_active / n_samples) if n_samples > 0 else float('nan')
+
+
+def calculate_windowed_flag_percentages_per_airphase(
+        flags: FlagMatrix, dataset: str, variable: str, in_air_det: InAirDetector,
+        window_lens_s: Sequence[float]) -> List[List[Tuple[Airtime, np.ndarray]]]:
+    """
+    calculates the windowed percentages of the active samples of a flag per airphase for several
+    window lengths at once. The number of active samples per window are the differences of the
+    prefix counts of the packed flag (see FlagMatrix.get_prefix_counts), which are computed once
+    per airphase for all window lengths. Equal to calculate_windowed_mean_per_airphase with the
+    threshold of the flag matrix for every window length.
+    :param flags: the packed flags of the dataset
+    :param dataset:
+    :param variable: the flag
+    :param in_air_det:
+    :param window_lens_s: the window lengths in seconds
+    :return: the windowed percentages per airphase for every window length
+    """
+    windowed_percentages = [[] for _ in window_lens_s]
+
+    for airtime, at_selection in zip(
+            in_air_det.airtimes, in_air_det.get_airtime_selection_per_phase(dataset)):
+
+        prefix_counts = flags.get_prefix_counts(variable, at_selection)
+        n_samples = len(prefix_counts) - 1
+
+        if n_samples > 0:
+            for percentages, window_len_s in zip(windowed_percentages, window_lens_s):
+                window_len, smoothed_airtime = get_airphase_window(
+                    airtime, n_samples, window_len_s)
+
+                if n_samples < window_len:
+                    # the mean for short signals of smooth_1d_boundaries
+                    percentage = np.float64(100.0 * prefix_counts[-1]) / n_samples
+                else:
+                    # the weight of the normalized float32 convolution filter
+                    weight = float(np.float32(1.0) / np.float32(window_len))
+                    percentage = 100.0 * (
+                        prefix_counts[window_len:] - prefix_counts[:-window_len])
+                    np.multiply(weight, percentage, out=percentage)
+
+                percentages.append((smoothed_airtime, percentage))
+
+    return windowed_percentages
+
+
+def get_in_air_signal_block(
+        data: Dict[str, np.ndarray], dataset: str, variables: Sequence[str],
+        in_air_det: InAirDetector) -> Tuple[np.ndarray, List[slice]]:
+    """
+    gathers the in air samples of several signals of a dataset, e.g. the axes of a vector signal,
+    into a single (n_samples, n_channels) block. The block is in Fortran order, such that the
+    samples of every channel are contiguous. The in air samples are the concatenation of the
+    samples of the airphases, hence the samples of every airphase are a range of rows of the block.
+    :param data:
+    :param dataset:
+    :param variables: the signals, e.g. ['vibe[0]', 'vibe[1]', 'vibe[2]']
+    :param in_air_det:
+    :return: the block and the rows of the block per airphase
+    """
+    airtime_selections = in_air_det.get_airtime_selection_per_phase(dataset)
+    signals = [data[variable] for variable in variables]
+    phase_lengths = [len(signals[0][at_selection]) for at_selection in airtime_selections]
+    phase_ends = np.cumsum([0] + phase_lengths)
+    phase_rows = [slice(start, end) for start, end in zip(phase_ends[:-1], phase_ends[1:])]
+
+    block = np.empty((phase_ends[-1], len(signals)), dtype=np.result_type(*signals), order='F')
+    for i, signal in enumerate(signals):
+        for rows, at_selection in zip(phase_rows, airtime_selections):
+            block[rows, i] = signal[at_selection]
+
+    return block, phase_rows
+
+
+def calculate_multi_channel_statistics(
+        data: Dict[str, np.ndarray], dataset: str, variables: Sequence[str],
+        in_air_det: InAirDetector, stat_functions: Sequence[Callable] = (),
+        threshold: Optional[float] = None, window_len_s: float = 30.0
+) -> Tuple[Dict[str, List[Tuple[Airtime, np.ndarray]]], List[np.ndarray]]:
+    """
+    calculates the windowed means per airphase and statistics of the in air samples of several
+    signals of a dataset in one call. The in air samples are gathered once into a block (see
+    get_in_air_signal_block), which is shared by the windowed means of all channels and all
+    statistics. The results are equal to calculate_windowed_mean_per_airphase and
+    calculate_stat_from_signal per signal.
+    :param data:
+    :param dataset:
+    :param variables:
+    :param in_air_det:
+    :param stat_functions: reductions with an axis argument, e.g. [np.amax, np.mean]
+    :param threshold: the threshold of the windowed means, see
+    calculate_windowed_mean_per_airphase
+    :param window_len_s:
+    :return: the windowed means per airphase by signal and the values of every signal per
+    statistic
+    """
+    input_block, phase_rows = get_in_air_signal_block(data, dataset, variables, in_air_det)
+
+    windowed_stats = {variable: [] for variable in variables}
+    for airtime, rows in zip(in_air_det.airtimes, phase_rows):
+
+        phase_block = input_block[rows]
+
+        if len(phase_block) > 0:
+            window_len, smoothed_airtime = get_airphase_window(
+                airtime, len(phase_block), window_len_s)
+
+            if threshold is not None:
+                phase_block = 100.0 * (phase_block > threshold)
+
+            if len(phase_block) < window_len:
+                # the mean for short signals, as smooth_1d_boundaries
+                smoothed_air_phases = np.mean(phase_block, axis=0)
+            else:
+                smoothed_air_phases = moving_average_columns(phase_block, window_len).T
+
+            for variable, smoothed_air_phase in zip(variables, smoothed_air_phases):
+                windowed_stats[variable].append((smoothed_airtime, smoothed_air_phase))
+
+    return windowed_stats, [stat_function(input_block, axis=0) for stat_function in stat_functions]
+
+
+#pylint: disable=too-few-public-methods,too-many-instance-attributes
+class TestRatioStatistics():
+    """
+    the statistics of a test ratio signal, see calculate_test_ratio_statistics.
+    """
+
+    def __init__(self):
+        self.red_pct = np.nan
+        self.amber_pct = np.nan
+        self.max = None
+        self.mean = None
+        self.red_windowed: List[Tuple[Airtime, Union[float, np.ndarray]]] = []
+        self.amber_windowed: List[Tuple[Airtime, Union[float, np.ndarray]]] = []
+        self.windowed_mean: List[Tuple[Airtime, Union[float, np.ndarray]]] = []
+
+
+def calculate_test_ratio_statistics(
+        data: Dict[str, np.ndarray], dataset: str, variable: str,
+        in_air_det: InAirDetector, red_threshold: float, amber_threshold: float,
+        window_len_s: float = 30.0) -> TestRatioStatistics:
+    """
+    calculates the statistics of a test ratio signal with a single pass over the samples of each
+    airphase, which is equivalent to (but faster than) using calculate_stat_from_signal and
+    calculate_windowed_mean_per_airphase for each statistic:
+    - the percentage of in air samples above the red and amber thresholds
+    - the max and the mean of the in air samples
+    - the windowed percentages above the red and amber thresholds and the windowed mean per
+      airphase. these are computed from the prefix sums of the threshold masks and the signal.
+    :param data:
+    :param dataset:
+    :param variable:
+    :param in_air_det:
+    :param red_threshold:
+    :param amber_threshold:
+    :param window_len_s:
+    :return:
+    """
+    statistics = TestRatioStatistics()
+    n_samples = 0
+    n_red = 0
+    n_amber = 0
+    maxima = []
+
+    for airtime, at_selection in zip(
+            in_air_det.airtimes, in_air_det.get_airtime_selection_per_phase(dataset)):
+
+        input_signal = data[variable][at_selection]
+        if len(input_signal) == 0:
+            continue
+
+        window_len, smoothed_airtime = get_airphase_window(
+            airtime, len(input_signal), window_len_s)
+
+        is_red = input_signal > red_threshold
+        is_amber = input_signal > amber_threshold
+        n_samples += len(input_signal)
+        n_red += np.count_nonzero(is_red)
+        n_amber += np.count_nonzero(is_amber)
+        maxima.append(np.amax(input_signal))
+
+        if len(input_signal) < window_len:
+            # the mean for short signals, as smooth_1d_boundaries
+            statistics.red_windowed.append(
+                (smoothed_airtime, 100.0 * np.count_nonzero(is_red) / len(input_signal)))
+            statistics.amber_windowed.append(
+                (smoothed_airtime, 100.0 * np.count_nonzero(is_amber) / len(input_signal)))
+            statistics.windowed_mean.append((smoothed_airtime, np.mean(input_signal)))
+        else:
+            # the weight of the flat smoothing window of smooth_1d_boundaries
+            weight = float(np.float32(1.0) / np.float32(window_len))
+            statistics.red_windowed.append(
+                (smoothed_airtime, (100.0 * weight) * windowed_sum_1d(is_red, window_len)))
+            statistics.amber_windowed.append(
+                (smoothed_airtime, (100.0 * weight) * windowed_sum_1d(is_amber, window_len)))
+            statistics.windowed_mean.append(
+                (smoothed_airtime, moving_average_1d_boundaries(
+                    input_signal, window_len=window_len, mode='valid')))
+
+    if n_samples > 0:
+        statistics.red_pct = 100.0 * (n_red / n_samples)
+        statistics.amber_pct = 100.0 * (n_amber / n_samples)
+        statistics.max = max(maxima)
+        # the mean of all in air samples with the summation order of numpy
+        statistics.mean = np.mean(data[variable][in_air_det.get_airtime_selection(dataset)])
+
+    return statistics
@@ -0,0 +1,228 @@
+#! /usr/bin/env python3
+"""
+A persistent manifest of the log files analysed by the batch processing. For every log file, the
+manifest records its size, modification time and content hash, the version of the analysis and
+the result status, such that a re-run of the batch processing only analyses new or changed log
+files. Unchanged files are detected by their size and modification time alone, the content is
+only hashed if these changed (e.g. a log file that was copied again with the same content).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.log_processing.topic_cache import get_parser_version, hash_file
+
+# increase when the layout of the manifest changes
+MANIFEST_FORMAT_VERSION = 1
+
+# the status of a log file whose analysis failed
+STATUS_ERROR = 'Error'
+
+_CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'config')
+_CONFIG_FILES = ['params.ini', 'thresholds.ini']
+
+_SCHEMA = f"""
+PRAGMA user_version = {MANIFEST_FORMAT_VERSION:d};
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    analyzer_version TEXT NOT NULL,
+    status TEXT NOT NULL,
+    analysed_at REAL NOT NULL
+);
+"""
+
+
+def get_analyzer_version(config: Optional[AnalysisConfig] = None) -> str:
+    """
+    :param config: the configuration of the analysis, if it overrides the defaults
+    :return: the version of the analysis, given by the versions of this package and of the ulog
+    parser and by the default parameters and thresholds or the configuration
+    """
+    try:
+        from importlib.metadata import version  # pylint: disable=import-outside-toplevel
+        package_version = version('ecl_ekf_analysis')
+    except Exception:  # pylint: disable=broad-except
+        package_version = 'unknown'
+
+    config_hash = hashlib.blake2b(digest_size=8)
+    if config is not None:
+        config_hash.update(json.dumps(config.to_dict(), sort_keys=True).encode())
+    else:
+        for config_file in _CONFIG_FILES:
+            with open(os.path.join(_CONFIG_DIR, config_file), 'rb') as file:
+                config_hash.update(file.read())
+
+    return f'{package_version:s}-{get_parser_version():s}-{config_hash.hexdigest():s}'
+
+
+class LogFileState(NamedTuple):
+    """
+    the state of a log file recorded in the manifest, which detects a later change of the file.
+    """
+    size: int
+    mtime_ns: int
+    content_hash: str
+
+
+def get_log_file_state(ulog_file: str) -> LogFileState:
+    """
+    :param ulog_file:
+    :raises FileNotFoundError: if the log file doesn't exist
+    :return: the size, the modification time and the content hash of the log file
+    """
+    stat = os.stat(ulog_file)
+    return LogFileState(stat.st_size, stat.st_mtime_ns, hash_file(ulog_file))
+
+
+def walk_ulog_files(directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    finds the ulog files in the directory and its subdirectories. The directory entries are
+    read with os.scandir, which avoids a separate lookup per file.
+    :param directory:
+    :return: the absolute paths and the stat results of the ulog files
+    """
+    directories = [os.path.abspath(directory)]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    directories.append(entry.path)
+                elif entry.name.endswith('.ulg') and entry.is_file():
+                    yield entry.path, entry.stat()
+
+
+class BatchManifest():
+    """
+    the manifest of the analysed log files, stored in an SQLite database.
+    """
+    def __init__(self, filename: str, analyzer_version: Optional[str] = None) -> None:
+        """
+        opens the manifest, which is created if it doesn't exist.
+        :param filename: the manifest database file
+        :param analyzer_version: the version of the analysis, see get_analyzer_version.
+        Log files analysed by another version are analysed again.
+        """
+        self._analyzer_version = analyzer_version if analyzer_version is not None \
+            else get_analyzer_version()
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        user_version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+        has_tables = self._connection.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] > 0
+        if has_tables and user_version != MANIFEST_FORMAT_VERSION:
+            self._connection.close()
+            raise ValueError(
+                f'{filename:s} has the manifest format {user_version:d}, '
+                f'expected {MANIFEST_FORMAT_VERSION:d}')
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> 'BatchManifest':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        closes the manifest.
+        :return:
+        """
+        self._connection.close()
+
+    @property
+    def analyzer_version(self) -> str:
+        """
+        :return: the version of the analysis recorded for analysed files
+        """
+        return self._analyzer_version
+
+    def get(self, ulog_file: str) -> Optional[dict]:
+        """
+        :param ulog_file:
+        :return: the manifest entry of the log file with the keys path, size, mtime_ns,
+        content_hash, analyzer_version, status and analysed_at, or None
+        """
+        cursor = self._connection.execute(
+            'SELECT * FROM files WHERE path = ?', (os.path.abspath(ulog_file),))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in cursor.description], row))
+
+    def scan(
+            self, directory: str, overwrite: bool = False, retry_failed: bool = False
+    ) -> List[str]:
+        """
+        finds the ulog files in the directory and its subdirectories that need to be analysed:
+        new files, files whose content changed and files analysed by another analyzer version.
+        Entries of files that were removed from the directory are removed from the manifest.
+        :param directory:
+        :param overwrite: analyse all files again
+        :param retry_failed: analyse the files again whose analysis failed
+        :return: the absolute paths of the files to analyse
+        """
+        directory = os.path.abspath(directory)
+        known_files = {
+            row[0]: row[1:] for row in self._connection.execute(
+                'SELECT path, size, mtime_ns, content_hash, analyzer_version, status FROM files '
+                'WHERE substr(path, 1, ?) = ?',
+                (len(directory) + 1, os.path.join(directory, '')))}
+
+        ulog_files = []
+        touched_files = []
+        for path, stat in walk_ulog_files(directory):
+            known_file = known_files.pop(path, None)
+            if overwrite or known_file is None:
+                ulog_files.append(path)
+                continue
+            size, mtime_ns, content_hash, analyzer_version, status = known_file
+            if analyzer_version != self._analyzer_version or \
+                    (retry_failed and status == STATUS_ERROR):
+                ulog_files.append(path)
+            elif (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                if stat.st_size == size and hash_file(path) == content_hash:
+                    touched_files.append((stat.st_mtime_ns, path))
+                else:
+                    ulog_files.append(path)
+
+        with self._connection:
+            self._connection.executemany(
+                'UPDATE files SET mtime_ns = ? WHERE path = ?', touched_files)
+            self._connection.executemany(
+                'DELETE FROM files WHERE path = ?', [(path,) for path in known_files])
+
+        return sorted(ulog_files)
+
+    def record(
+            self, ulog_file: str, status: str, file_state: Optional[LogFileState] = None
+    ) -> None:
+        """
+        records the analysis of a log file.
+        :param ulog_file:
+        :param status: the result status of the analysis (see
+        get_master_status_from_test_results) or STATUS_ERROR
+        :param file_state: the state of the log file when it was analysed (see
+        get_log_file_state), such that a change during the analysis is detected by the next
+        scan. The current state of the log file if not specified.
+        :return:
+        """
+        path = os.path.abspath(ulog_file)
+        if file_state is None:
+            try:
+                file_state = get_log_file_state(path)
+            except FileNotFoundError:
+                # the file was removed in the meantime
+                return
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (path, file_state.size, file_state.mtime_ns, file_state.content_hash,
+                 self._analyzer_version, status, time.time()))
@@ -0,0 +1,59 @@
+#! /usr/bin/env python3
+"""
+the estimator instances of multi-EKF logs. PX4 publishes the estimator topics once per EKF
+instance (multi_id), while the checks read the first instance of every topic. A view of the log
+per estimator instance resolves the estimator topics to the datasets of that instance, such
+that the unchanged checks analyse any instance.
+"""
+from typing import List
+
+from pyulog import ULog
+
+# the topics published per estimator instance
+ESTIMATOR_TOPICS = frozenset([
+    'estimator_status', 'estimator_status_flags', 'estimator_innovations',
+    'estimator_innovation_variances', 'estimator_innovation_test_ratios',
+    'estimator_sensor_bias',
+])
+
+
+def get_estimator_instances(ulog: ULog) -> List[int]:
+    """
+    :param ulog:
+    :return: the sorted multi ids of the estimator_status datasets of the log, [0] if the log
+    doesn't contain estimator_status
+    """
+    instances = sorted({elem.multi_id for elem in ulog.data_list
+                        if elem.name == 'estimator_status'})
+    return instances if instances else [0]
+
+
+class EstimatorInstanceULog():
+    """
+    a view of a ulog with the estimator topics of a single estimator instance. Provides the parts
+    of the pyulog ULog interface that are used by the analysis: the estimator topics are resolved
+    to the datasets of the instance, the other topics to those of the log.
+    """
+
+    def __init__(self, ulog: ULog, estimator_instance: int) -> None:
+        """
+        :param ulog: the parsed log, which is shared between the views of its instances
+        :param estimator_instance: the multi id of the estimator topics
+        """
+        self._ulog = ulog
+        self.estimator_instance = estimator_instance
+        self.start_timestamp = ulog.start_timestamp
+        self.last_timestamp = ulog.last_timestamp
+        self.data_list = [elem for elem in ulog.data_list
+                          if elem.name not in ESTIMATOR_TOPICS or
+                          elem.multi_id == estimator_instance]
+
+    def get_dataset(self, name: str, multi_instance: int = 0):
+        """
+        :param name: the topic name
+        :param multi_instance: the multi id of the topics that aren't estimator topics
+        :return: the dataset, the dataset of the estimator instance for the estimator topics
+        """
+        if name in ESTIMATOR_TOPICS:
+            multi_instance = self.estimator_instance
+        return self._ulog.get_dataset(name, multi_instance=multi_instance)
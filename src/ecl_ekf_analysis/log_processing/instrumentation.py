@@ -0,0 +1,208 @@
+#! /usr/bin/env python3
+"""
+Instrumentation of the analysis: records the wall time, the cpu time and the peak allocated memory
+of the pipeline stages (e.g. parsing the log, running the checks) and of every check.
+"""
+import contextlib
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+# the groups of measurements
+STAGES = 'stages'
+CHECKS = 'checks'
+
+
+#pylint: disable=too-few-public-methods
+class Measurement():
+    """
+    the resources used by a stage or a check.
+    """
+
+    def __init__(
+            self, wall_time_s: float = 0.0, cpu_time_s: float = 0.0,
+            peak_memory_mb: Optional[float] = None) -> None:
+        """
+        :param wall_time_s:
+        :param cpu_time_s: the cpu time of the measuring thread
+        :param peak_memory_mb: the peak of the memory allocated in addition to the memory
+        allocated at the start of the measurement, None if the memory is not tracked
+        """
+        self.wall_time_s = wall_time_s
+        self.cpu_time_s = cpu_time_s
+        self.peak_memory_mb = peak_memory_mb
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        """
+        :return:
+        """
+        return {
+            'wall_time_s': self.wall_time_s,
+            'cpu_time_s': self.cpu_time_s,
+            'peak_memory_mb': self.peak_memory_mb
+        }
+
+
+class _MemoryFrame():
+    """
+    the traced memory of an active measurement.
+    """
+
+    def __init__(self, start: int) -> None:
+        self.start = start
+        self.peak = start
+
+
+class Instrumentation():
+    """
+    collects the measurements of an analysis. Measurements can be nested, e.g. the checks are
+    measured within the stage running them.
+    """
+
+    def __init__(self, track_memory: bool = True) -> None:
+        """
+        :param track_memory: track the peak allocated memory with tracemalloc. tracing the
+        allocations slows down the analysis, disable it to only record the times.
+        """
+        self._track_memory = track_memory
+        self._measurements: Dict[str, Dict[str, Measurement]] = {STAGES: {}, CHECKS: {}}
+        self._memory_frames: List[_MemoryFrame] = []
+        self._started_tracing = False
+
+    def _enter_memory_frame(self) -> None:
+        """
+        starts tracking the memory of a new measurement.
+        :return:
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_frames:
+            # the peak since the last reset belongs to the enclosing measurement
+            self._memory_frames[-1].peak = max(self._memory_frames[-1].peak, peak)
+        tracemalloc.reset_peak()
+        self._memory_frames.append(_MemoryFrame(current))
+
+    def _exit_memory_frame(self) -> float:
+        """
+        stops tracking the memory of the innermost measurement.
+        :return: the peak of the additionally allocated memory in MB
+        """
+        _, peak = tracemalloc.get_traced_memory()
+        frame = self._memory_frames.pop()
+        frame.peak = max(frame.peak, peak)
+        if self._memory_frames:
+            self._memory_frames[-1].peak = max(self._memory_frames[-1].peak, frame.peak)
+            tracemalloc.reset_peak()
+        elif self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return (frame.peak - frame.start) / 1e6
+
+    @contextlib.contextmanager
+    def measure(
+            self, name: str, group: str = STAGES, track_memory: bool = True) -> Iterator[None]:
+        """
+        measures the resources used by the enclosed block. The measurement is recorded even if
+        the block raises.
+        :param name: the name of the stage or the check
+        :param group: the group of the measurement, STAGES or CHECKS
+        :param track_memory: track the memory of this block, if the instrumentation tracks the
+        memory. The allocations of concurrent blocks can't be told apart, such that the memory of
+        blocks running concurrently to other measured blocks must not be tracked.
+        :return:
+        """
+        track_memory = track_memory and self._track_memory
+        if track_memory:
+            self._enter_memory_frame()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            measurement = Measurement(
+                wall_time_s=time.perf_counter() - wall_start,
+                cpu_time_s=time.thread_time() - cpu_start)
+            if track_memory:
+                measurement.peak_memory_mb = self._exit_memory_frame()
+            self._measurements.setdefault(group, {})[name] = measurement
+
+    @property
+    def measurements(self) -> Dict[str, Dict[str, Measurement]]:
+        """
+        :return: the measurements by group and name
+        """
+        return self._measurements
+
+    def to_dict(self) -> Dict[str, Dict[str, dict]]:
+        """
+        :return: the measurements as a python dictionary by group and name
+        """
+        return {group: {name: measurement.to_dict() for name, measurement in measurements.items()}
+                for group, measurements in self._measurements.items()}
+
+
+def measure(
+        instrumentation: Optional[Instrumentation], name: str, group: str = STAGES,
+        track_memory: bool = True):
+    """
+    :param instrumentation: the instrumentation or None, if the analysis is not instrumented
+    :param name:
+    :param group:
+    :param track_memory: see Instrumentation.measure
+    :return: a context manager measuring the enclosed block if instrumentation is not None
+    """
+    if instrumentation is None:
+        return contextlib.nullcontext()
+    return instrumentation.measure(name, group=group, track_memory=track_memory)
+
+
+def summarize_timings(
+        timings: List[Dict[str, Dict[str, dict]]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    summarizes the timings of many analysed log files.
+    :param timings: the timings (see Instrumentation.to_dict) per log file
+    :return: the number of samples and the median and 95th percentile of the wall time and the
+    peak memory by group and name
+    """
+    samples: Dict[str, Dict[str, List[dict]]] = {}
+    for log_timings in timings:
+        for group, measurements in log_timings.items():
+            for name, measurement in measurements.items():
+                samples.setdefault(group, {}).setdefault(name, []).append(measurement)
+
+    summary = {}
+    for group, group_samples in samples.items():
+        summary[group] = {}
+        for name, measurements in group_samples.items():
+            wall_times = [measurement['wall_time_s'] for measurement in measurements]
+            peak_memory = [measurement['peak_memory_mb'] for measurement in measurements
+                           if measurement['peak_memory_mb'] is not None]
+            wall_time_p50, wall_time_p95 = np.percentile(wall_times, [50.0, 95.0])
+            summary[group][name] = {
+                'n': len(measurements),
+                'wall_time_s_p50': float(wall_time_p50),
+                'wall_time_s_p95': float(wall_time_p95),
+                'peak_memory_mb_p95':
+                    float(np.percentile(peak_memory, 95.0)) if peak_memory else None,
+            }
+    return summary
+
+
+def format_timing_summary(summary: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+    """
+    :param summary: see summarize_timings
+    :return: the summary as a table
+    """
+    lines = [f'{"":>40s} {"n":>6s} {"p50 [ms]":>10s} {"p95 [ms]":>10s} {"p95 mem [MB]":>13s}']
+    for group, group_summary in summary.items():
+        for name, stats in group_summary.items():
+            peak_memory = f'{stats["peak_memory_mb_p95"]:13.2f}' \
+                if stats['peak_memory_mb_p95'] is not None else f'{"-":>13s}'
+            label = f'{group:s}/{name:s}'
+            lines.append(
+                f'{label:>40s} {stats["n"]:6d} {1e3 * stats["wall_time_s_p50"]:10.2f} '
+                f'{1e3 * stats["wall_time_s_p95"]:10.2f} {peak_memory:s}')
+    return '\n'.join(lines)
@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+"""
+reading and writing the results file of an analysed log. The results are written as an indented
+.json file (the default, readable by humans and other tools) or as a binary .npz file with the
+check results as structured arrays (see check_data_utils.check_results_to_arrays), which is much
+faster to write and to read for large numbers of logs.
+"""
+import os
+from typing import List
+
+import numpy as np
+import simplejson as json
+
+from ecl_ekf_analysis.check_data_interfaces.check_data_utils import CHECK_RESULT_DTYPE, \
+    CHECK_STATISTIC_DTYPE, deserialized_results_to_arrays, deserialized_results_from_arrays
+
+# the formats of the results file, which are also the file extensions
+RESULTS_FORMATS = ('json', 'npz')
+
+# the entries of a deserialized check result, which are stored in the structured arrays
+_ARRAY_KEYS = {'status', 'type', 'statistics'}
+
+
+def get_results_filename(ulog_file: str, output_format: str = 'json') -> str:
+    """
+    :param ulog_file:
+    :param output_format: one of RESULTS_FORMATS
+    :return: the results file next to the log file
+    """
+    if output_format not in RESULTS_FORMATS:
+        raise ValueError(f'unknown results format {output_format:s}')
+    return f'{os.path.splitext(ulog_file)[0]:s}.{output_format:s}'
+
+
+def write_results_file(filename: str, test_results: List[dict]) -> None:
+    """
+    writes the check results in the format given by the extension of the file name.
+    :param filename: a .json or .npz file
+    :param test_results: the deserialized check results. Additional entries of the check
+    results (e.g. the timings) are kept in both formats.
+    :return:
+    """
+    if not filename.endswith('.npz'):
+        with open(filename, 'w') as file:
+            json.dump(test_results, file, indent=2)
+        return
+
+    results, statistics = deserialized_results_to_arrays(test_results)
+    extra = [{key: value for key, value in test_result.items() if key not in _ARRAY_KEYS}
+             for test_result in test_results]
+    arrays = {'results': results, 'statistics': statistics}
+    if any(extra):
+        arrays['extra'] = np.array(json.dumps(extra))
+    with open(filename, 'wb') as file:
+        np.savez(file, **arrays)
+
+
+def read_results_file(filename: str) -> List[dict]:
+    """
+    reads the check results in the format given by the extension of the file name.
+    :param filename: a .json or .npz file
+    :raises ValueError: if the arrays of the .npz file have another layout
+    :return: the deserialized check results
+    """
+    if not filename.endswith('.npz'):
+        with open(filename, 'r') as file:
+            return json.load(file)
+
+    with np.load(filename, allow_pickle=False) as arrays:
+        # the dtypes of the arrays identify the layout, reading another member per file would
+        # cost as much as reading the arrays
+        results, statistics = arrays['results'], arrays['statistics']
+        if results.dtype != CHECK_RESULT_DTYPE or statistics.dtype != CHECK_STATISTIC_DTYPE:
+            raise ValueError(f'{filename:s} is not a results file of this version')
+        test_results = deserialized_results_from_arrays(results, statistics)
+        if 'extra' in arrays:
+            for test_result, extra in zip(test_results, json.loads(str(arrays['extra']))):
+                test_result.update(extra)
+    return test_results
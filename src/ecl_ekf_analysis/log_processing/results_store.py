@@ -0,0 +1,286 @@
+#! /usr/bin/env python3
+"""
+A fleet-wide store of the check results of many log files in a single SQLite database, as an
+alternative to one .json file per log. Every check statistic is stored as one row per (log,
+check, statistic, instance, estimator instance), with indexes on the check type and the check
+status, such that queries over all analysed logs (e.g. all logs with a failed
+MAGNETOMETER_STATUS check in the last month) don't need to read the results of every log. The
+check types, statuses and statistic types are stored as the integer values of their enums.
+"""
+import argparse
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckStatisticType, CheckStatus, \
+    CheckType
+
+# increase when the layout of the database changes
+RESULTS_STORE_FORMAT_VERSION = 2
+
+_SCHEMA = f"""
+PRAGMA user_version = {RESULTS_STORE_FORMAT_VERSION:d};
+CREATE TABLE IF NOT EXISTS logs (
+    log_id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    log_time REAL NOT NULL,
+    analysed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checks (
+    log_id INTEGER NOT NULL REFERENCES logs(log_id),
+    check_type INTEGER NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statistics (
+    log_id INTEGER NOT NULL REFERENCES logs(log_id),
+    check_type INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    statistic_type INTEGER NOT NULL,
+    instance INTEGER NOT NULL,
+    estimator_instance INTEGER NOT NULL,
+    value REAL,
+    warning REAL,
+    failure REAL
+);
+CREATE INDEX IF NOT EXISTS logs_log_time ON logs(log_time);
+CREATE INDEX IF NOT EXISTS checks_log_id ON checks(log_id);
+CREATE INDEX IF NOT EXISTS checks_check_type_status ON checks(check_type, status, log_id);
+CREATE INDEX IF NOT EXISTS statistics_log_id ON statistics(log_id);
+CREATE INDEX IF NOT EXISTS statistics_check_type_status ON statistics(
+    check_type, status, statistic_type);
+"""
+
+_STATISTIC_COLUMNS = [
+    'filename', 'log_time', 'check_type', 'status', 'statistic_type', 'instance',
+    'estimator_instance', 'value', 'warning', 'failure']
+
+
+class ResultsStore():
+    """
+    stores the check results of log files in an SQLite database. The results of a log file are
+    replaced when the log is added again.
+    """
+    def __init__(self, filename: str) -> None:
+        """
+        opens the database, which is created if it doesn't exist.
+        :param filename: the database file, or ':memory:' for an in-memory database
+        """
+        self._connection = sqlite3.connect(filename)
+        # the inserts of a batch are written in one transaction
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        user_version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+        has_tables = self._connection.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] > 0
+        if has_tables and user_version != RESULTS_STORE_FORMAT_VERSION:
+            self._connection.close()
+            raise ValueError(
+                f'{filename:s} has the results store format {user_version:d}, '
+                f'expected {RESULTS_STORE_FORMAT_VERSION:d}')
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        closes the database.
+        :return:
+        """
+        self._connection.close()
+
+    @staticmethod
+    def log_key(filename: str) -> str:
+        """
+        :param filename:
+        :return: the key of a log file in the store
+        """
+        return os.path.abspath(filename)
+
+    def add_results(
+            self, results: Iterable[Tuple[str, List[dict]]],
+            log_times: Optional[Iterable[float]] = None) -> int:
+        """
+        inserts the results of many log files in a single transaction, replacing any results of
+        these log files stored before.
+        :param results: the log file names and their deserialized check results
+        :param log_times: the times of the logs as unix timestamps, the modification times of
+        the log files by default.
+        :return: the number of inserted statistics
+        """
+        results = list(results)
+        if log_times is None:
+            log_times = [os.path.getmtime(filename) if os.path.exists(filename) else time.time()
+                         for filename, _ in results]
+        analysed_at = time.time()
+
+        n_statistics = 0
+        with self._connection:
+            cursor = self._connection.cursor()
+            for (filename, test_results), log_time in zip(results, log_times):
+                key = self.log_key(filename)
+                row = cursor.execute(
+                    'SELECT log_id FROM logs WHERE filename = ?', (key,)).fetchone()
+                if row is not None:
+                    log_id = row[0]
+                    cursor.execute('DELETE FROM checks WHERE log_id = ?', (log_id,))
+                    cursor.execute('DELETE FROM statistics WHERE log_id = ?', (log_id,))
+                    cursor.execute(
+                        'UPDATE logs SET log_time = ?, analysed_at = ? WHERE log_id = ?',
+                        (log_time, analysed_at, log_id))
+                else:
+                    log_id = cursor.execute(
+                        'INSERT INTO logs (filename, log_time, analysed_at) VALUES (?, ?, ?)',
+                        (key, log_time, analysed_at)).lastrowid
+
+                check_rows = [
+                    (log_id, CheckType[test_result['type']].value,
+                     CheckStatus[test_result['status']].value) for test_result in test_results]
+                cursor.executemany('INSERT INTO checks VALUES (?, ?, ?)', check_rows)
+                statistic_rows = [
+                    (log_id, check_type, status, CheckStatisticType[statistic['type']].value,
+                     statistic.get('instance', 0), test_result.get('estimator_instance', 0),
+                     statistic.get('value'),
+                     statistic['thresholds'].get('warning'),
+                     statistic['thresholds'].get('failure'))
+                    for (_, check_type, status), test_result in zip(check_rows, test_results)
+                    for statistic in test_result['statistics']]
+                cursor.executemany(
+                    'INSERT INTO statistics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', statistic_rows)
+                n_statistics += len(statistic_rows)
+
+        return n_statistics
+
+    def filenames(self) -> List[str]:
+        """
+        :return: the keys of all log files in the store
+        """
+        return [row[0] for row in self._connection.execute('SELECT filename FROM logs')]
+
+    def __contains__(self, filename: str) -> bool:
+        return self._connection.execute(
+            'SELECT 1 FROM logs WHERE filename = ?', (self.log_key(filename),)).fetchone() \
+            is not None
+
+    @staticmethod
+    def _time_conditions(
+            since: Optional[float], until: Optional[float]) -> Tuple[List[str], List[float]]:
+        """
+        :param since:
+        :param until:
+        :return: the sql conditions on the log time and their parameters
+        """
+        conditions, parameters = [], []
+        if since is not None:
+            conditions.append('logs.log_time >= ?')
+            parameters.append(since)
+        if until is not None:
+            conditions.append('logs.log_time < ?')
+            parameters.append(until)
+        return conditions, parameters
+
+    def query_logs(
+            self, check_type: str, status: Optional[str] = None, since: Optional[float] = None,
+            until: Optional[float] = None) -> List[str]:
+        """
+        finds the log files with a check of the given type and status.
+        :param check_type: the name of the check type, e.g. 'MAGNETOMETER_STATUS'
+        :param status: the name of the check status, e.g. 'FAIL'. Any status if not specified.
+        :param since: only logs with a log time at or after this unix timestamp
+        :param until: only logs with a log time before this unix timestamp
+        :return: the keys of the log files, latest first
+        """
+        conditions, parameters = self._time_conditions(since, until)
+        conditions.insert(0, 'checks.check_type = ?')
+        parameters.insert(0, CheckType[check_type].value)
+        if status is not None:
+            conditions.insert(1, 'checks.status = ?')
+            parameters.insert(1, CheckStatus[status].value)
+        rows = self._connection.execute(
+            'SELECT DISTINCT logs.filename, logs.log_time FROM checks '
+            'JOIN logs ON logs.log_id = checks.log_id '
+            f'WHERE {" AND ".join(conditions):s} ORDER BY logs.log_time DESC', parameters)
+        return [row[0] for row in rows]
+
+    def query_statistics(
+            self, check_type: Optional[str] = None, statistic_type: Optional[str] = None,
+            status: Optional[str] = None, since: Optional[float] = None,
+            until: Optional[float] = None) -> List[dict]:
+        """
+        selects check statistics of all logs.
+        :param check_type: the name of the check type. Any check if not specified.
+        :param statistic_type: the name of the statistic type. Any statistic if not specified.
+        :param status: the name of the status of the check. Any status if not specified.
+        :param since: only logs with a log time at or after this unix timestamp
+        :param until: only logs with a log time before this unix timestamp
+        :return: the statistics as dicts with the keys filename, log_time, check_type, status,
+        statistic_type, instance, estimator_instance, value, warning and failure, latest log
+        first and in the order of the check results per log
+        """
+        conditions, parameters = self._time_conditions(since, until)
+        for column, enum, name in [('check_type', CheckType, check_type),
+                                   ('status', CheckStatus, status),
+                                   ('statistic_type', CheckStatisticType, statistic_type)]:
+            if name is not None:
+                conditions.append(f'statistics.{column:s} = ?')
+                parameters.append(enum[name].value)
+        where = f'WHERE {" AND ".join(conditions):s} ' if conditions else ''
+        rows = self._connection.execute(
+            'SELECT logs.filename, logs.log_time, statistics.check_type, statistics.status, '
+            'statistics.statistic_type, statistics.instance, statistics.estimator_instance, '
+            'statistics.value, statistics.warning, statistics.failure FROM statistics '
+            f'JOIN logs ON logs.log_id = statistics.log_id {where:s}'
+            'ORDER BY logs.log_time DESC, statistics.rowid', parameters)
+        return [dict(zip(_STATISTIC_COLUMNS, (
+            filename, log_time, CheckType(check_type).name, CheckStatus(status).name,
+            CheckStatisticType(statistic_type).name, *values)))
+                for filename, log_time, check_type, status, statistic_type, *values in rows]
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Query the logs with a check of a given type and status in a results store.')
+    parser.add_argument('database', help='the results store database file')
+    parser.add_argument('check_type', choices=[check_type.name for check_type in CheckType],
+                        metavar='check_type', help='the check type, e.g. MAGNETOMETER_STATUS')
+    parser.add_argument('--status', default='FAIL',
+                        choices=[status.name for status in CheckStatus],
+                        help='the check status. Defaults to FAIL.')
+    parser.add_argument('--days', type=float, default=None,
+                        help='only logs of the last days. All logs if not specified.')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    if not os.path.isfile(args.database):
+        print(f'{args.database:s} does not exist')
+        return
+
+    since = time.time() - args.days * 86400.0 if args.days is not None else None
+    with ResultsStore(args.database) as results_store:
+        start = time.perf_counter()
+        filenames = results_store.query_logs(args.check_type, status=args.status, since=since)
+        query_time = time.perf_counter() - start
+
+    for filename in filenames:
+        print(filename)
+    print(f'{len(filenames):d} logs with {args.check_type:s} {args.status:s} '
+          f'({1e3 * query_time:.1f} ms)')
+
+
+if __name__ == '__main__':
+    main()
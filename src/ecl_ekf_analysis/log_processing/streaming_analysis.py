@@ -0,0 +1,494 @@
+#! /usr/bin/env python3
+"""
+incremental calculation of the in air statistics of signals that are received in chunks (e.g. from
+a log that is still being written). The memory per signal is bounded by the samples of the longest
+rolling window (plus the samples of the in air margin that are not yet decided), independent of
+the length of the log.
+
+The rolling windows of StreamingWindowedMean are trailing time windows of window_len_s seconds,
+while the batch analysis (see calculate_test_ratio_statistics) uses centered windows with a length
+in samples that is derived from the sample rate of the complete airphase. The windowed statistics
+of a growing log are therefore close to, but not identical with the results of the batch analysis.
+If the number of samples per airphase is known in advance (e.g. from a first pass over a complete
+log), AirphaseWindowedMean evaluates the windows of the batch analysis.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ecl_ekf_analysis.analysis.in_air_detector import Airtime, StreamingInAirDetector
+from ecl_ekf_analysis.log_processing.analysis import get_airphase_window
+from ecl_ekf_analysis.signal_processing.smooth_filt_rolling import windowed_sum_1d
+
+
+class StreamingWindowedMean():
+    """
+    the mean of a signal over a trailing time window per flight. The max and the mean of the
+    windowed mean are reduced per flight and then over the flights as by the batch analysis.
+    Flights shorter than the window use the mean of the flight.
+    """
+
+    def __init__(self, window_len_s: float) -> None:
+        """
+        :param window_len_s:
+        """
+        self._window_len_s = window_len_s
+        self._max: Optional[float] = None
+        self._mean: Optional[float] = None
+        self._take_off = 0.0
+        self._reset_flight()
+
+    def _reset_flight(self) -> None:
+        """
+        :return:
+        """
+        self._window_time = np.zeros(0)
+        self._window_values = np.zeros(0)
+        self._flight_sum = 0.0
+        self._flight_n = 0
+        self._windows_max = -np.inf
+        self._windows_sum = 0.0
+        self._windows_n = 0
+
+    def start_flight(self, flight_index: int, airtime: Airtime) -> None:
+        """
+        :param flight_index: the index of the flight in the in air detector
+        :param airtime: the airtime of the flight
+        :return:
+        """
+        self._reset_flight()
+        self._take_off = airtime.take_off
+
+    def append(self, relative_time: np.ndarray, values: np.ndarray) -> None:
+        """
+        :param relative_time: the sorted sample times in seconds
+        :param values:
+        :return:
+        """
+        if len(values) == 0:
+            return
+        n_window = len(self._window_time)
+        all_time = np.concatenate((self._window_time, relative_time))
+        all_values = np.concatenate((self._window_values, values))
+        prefix_sums = np.concatenate(([0.0], np.cumsum(all_values)))
+
+        # the window of a sample covers the samples in (t - window_len_s, t]
+        window_starts = np.searchsorted(
+            all_time, relative_time - self._window_len_s, side='right')
+        window_ends = np.arange(n_window + 1, len(all_time) + 1)
+        is_full = relative_time - self._window_len_s >= self._take_off
+        if np.any(is_full):
+            windowed_mean = (prefix_sums[window_ends[is_full]] -
+                             prefix_sums[window_starts[is_full]]) / \
+                (window_ends[is_full] - window_starts[is_full])
+            self._windows_max = max(self._windows_max, float(np.amax(windowed_mean)))
+            self._windows_sum += float(np.sum(windowed_mean))
+            self._windows_n += len(windowed_mean)
+
+        self._flight_sum += float(np.sum(values))
+        self._flight_n += len(values)
+
+        in_window = all_time > all_time[-1] - self._window_len_s
+        self._window_time = all_time[in_window]
+        self._window_values = all_values[in_window]
+
+    def _get_flight_values(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        :return: the max and the mean of the windowed mean of the current flight
+        """
+        if self._windows_n > 0:
+            return self._windows_max, self._windows_sum / self._windows_n
+        if self._flight_n > 0:
+            flight_mean = self._flight_sum / self._flight_n
+            return flight_mean, flight_mean
+        return None, None
+
+    def end_flight(self, keep: bool) -> None:
+        """
+        :param keep: add the current flight to the statistics, e.g. if it is long enough
+        :return:
+        """
+        if keep:
+            self._max, self._mean = self.get_values(include_current=True)
+        self._reset_flight()
+
+    def get_values(self, include_current: bool = False) -> Tuple[Optional[float], Optional[float]]:
+        """
+        :param include_current: include the current flight
+        :return: the max over the flights of the max and of the mean of the windowed mean, None if
+        there are no samples
+        """
+        if not include_current:
+            return self._max, self._mean
+        flight_max, flight_mean = self._get_flight_values()
+        return (_max_or_none(self._max, flight_max), _max_or_none(self._mean, flight_mean))
+
+
+class AirphaseWindowedMean(StreamingWindowedMean):
+    """
+    the windowed mean of a signal per airphase as by the batch analysis (see
+    calculate_windowed_mean_per_airphase): a centered window with a length in samples that is
+    derived from the number of samples of the airphase, which needs to be known when the flight
+    starts. The windows are evaluated per chunk, carrying the last window_len - 1 samples over to
+    the next chunk, such that a chunk boundary does not change the windowed means.
+    """
+
+    def __init__(self, window_len_s: float, n_samples_per_flight: Dict[int, int]) -> None:
+        """
+        :param window_len_s:
+        :param n_samples_per_flight: the number of samples of the signal by flight index
+        """
+        self._n_samples_per_flight = n_samples_per_flight
+        self._window_len = 1
+        self._weight = 1.0
+        self._overlap: Optional[np.ndarray] = None
+        super().__init__(window_len_s)
+
+    def _reset_flight(self) -> None:
+        """
+        :return:
+        """
+        super()._reset_flight()
+        self._overlap = None
+
+    def start_flight(self, flight_index: int, airtime: Airtime) -> None:
+        """
+        :param flight_index: the index of the flight in the in air detector
+        :param airtime: the airtime of the flight
+        :return:
+        """
+        super().start_flight(flight_index, airtime)
+        n_samples = self._n_samples_per_flight.get(flight_index, 0)
+        self._window_len = get_airphase_window(airtime, n_samples, self._window_len_s)[0] \
+            if n_samples > 0 else 1
+        # the weight of the flat smoothing window of smooth_1d_boundaries
+        self._weight = float(np.float32(1.0) / np.float32(self._window_len))
+
+    def append(self, relative_time: np.ndarray, values: np.ndarray) -> None:
+        """
+        :param relative_time: the sorted sample times in seconds
+        :param values:
+        :return:
+        """
+        if len(values) == 0:
+            return
+        all_values = np.concatenate((self._overlap, values)) if self._overlap is not None \
+            else values
+        if len(all_values) >= self._window_len:
+            windowed_mean = (self._weight * windowed_sum_1d(all_values, self._window_len)).astype(
+                np.result_type(all_values.dtype, np.float32), copy=False)
+            self._windows_max = max(self._windows_max, float(np.amax(windowed_mean)))
+            self._windows_sum += float(np.sum(windowed_mean, dtype=np.float64))
+            self._windows_n += len(windowed_mean)
+
+        self._flight_sum += float(np.sum(values, dtype=np.float64))
+        self._flight_n += len(values)
+        self._overlap = all_values[len(all_values) - self._window_len + 1:] \
+            if len(all_values) >= self._window_len else all_values
+
+
+def _max_or_none(first: Optional[float], second: Optional[float]) -> Optional[float]:
+    """
+    :param first:
+    :param second:
+    :return: the max of the values that are not None, None if both are None
+    """
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return max(first, second)
+
+
+#pylint: disable=too-few-public-methods
+class StreamingStatistics():
+    """
+    the in air statistics of a signal, see StreamingSignalStatistics.
+    """
+
+    def __init__(self, n_samples: int = 0) -> None:
+        self.n_samples = n_samples
+        self.pct: List[float] = []
+        self.max: Optional[float] = None
+        self.mean: Optional[float] = None
+        self.windowed_max: List[Optional[float]] = []
+        self.windowed_mean: List[Optional[float]] = []
+
+
+class StreamingSignalStatistics():
+    """
+    the in air statistics of a signal that are updated per chunk of samples:
+    - the percentages of samples above thresholds
+    - the max and the mean of the samples
+    - the max and the mean of windowed means of the signal (or of the percentage of samples above
+      a threshold)
+    The statistics of a flight are only added when the flight ended and is long enough.
+    """
+
+    def __init__(
+            self, thresholds: Sequence[float] = (),
+            windows: Sequence[Tuple[Optional[float], StreamingWindowedMean]] = ()) -> None:
+        """
+        :param thresholds: the thresholds of the percentages
+        :param windows: the (threshold, windowed mean) of the windowed statistics. if threshold is
+        not None, the windowed percentage of samples above the threshold is calculated.
+        """
+        self._thresholds = list(thresholds)
+        self._window_thresholds = [threshold for threshold, _ in windows]
+        self._windows = [window for _, window in windows]
+        self._n = 0
+        self._sum = 0.0
+        self._max: Optional[float] = None
+        self._counts = np.zeros(len(self._thresholds), dtype=np.int64)
+        self._reset_flight()
+
+    def _reset_flight(self) -> None:
+        """
+        :return:
+        """
+        self._flight_n = 0
+        self._flight_sum = 0.0
+        self._flight_max: Optional[float] = None
+        self._flight_counts = np.zeros(len(self._thresholds), dtype=np.int64)
+
+    def start_flight(self, flight_index: int, airtime: Airtime) -> None:
+        """
+        :param flight_index: the index of the flight in the in air detector
+        :param airtime: the airtime of the flight
+        :return:
+        """
+        self._reset_flight()
+        for window in self._windows:
+            window.start_flight(flight_index, airtime)
+
+    def append(self, relative_time: np.ndarray, values: np.ndarray) -> None:
+        """
+        appends in air samples of the current flight.
+        :param relative_time: the sorted sample times in seconds
+        :param values:
+        :return:
+        """
+        if len(values) == 0:
+            return
+        self._flight_n += len(values)
+        self._flight_sum += float(np.sum(values, dtype=np.float64))
+        self._flight_max = _max_or_none(self._flight_max, float(np.amax(values)))
+        for i, threshold in enumerate(self._thresholds):
+            self._flight_counts[i] += np.count_nonzero(values > threshold)
+        for threshold, window in zip(self._window_thresholds, self._windows):
+            window.append(relative_time, 100.0 * (values > threshold) if threshold is not None
+                          else values)
+
+    def end_flight(self, keep: bool) -> None:
+        """
+        :param keep: add the current flight to the statistics, e.g. if it is long enough
+        :return:
+        """
+        if keep:
+            self._n += self._flight_n
+            self._sum += self._flight_sum
+            self._max = _max_or_none(self._max, self._flight_max)
+            self._counts += self._flight_counts
+        for window in self._windows:
+            window.end_flight(keep)
+        self._reset_flight()
+
+    def get_statistics(self, include_current: bool = False) -> StreamingStatistics:
+        """
+        :param include_current: include the current flight
+        :return:
+        """
+        n_samples = self._n + (self._flight_n if include_current else 0)
+        statistics = StreamingStatistics(n_samples=n_samples)
+        if n_samples == 0:
+            return statistics
+
+        counts = self._counts + self._flight_counts if include_current else self._counts
+        statistics.pct = [100.0 * float(count) / n_samples for count in counts]
+        statistics.max = _max_or_none(self._max, self._flight_max) if include_current \
+            else self._max
+        statistics.mean = (self._sum + (self._flight_sum if include_current else 0.0)) / n_samples
+        for window in self._windows:
+            windowed_max, windowed_mean = window.get_values(include_current=include_current)
+            statistics.windowed_max.append(windowed_max)
+            statistics.windowed_mean.append(windowed_mean)
+        return statistics
+
+
+class StreamingSignal():
+    """
+    routes the chunks of a signal to its statistics: the samples are kept until their in air state
+    is decided by the in air detector and the in air samples are added per flight.
+    """
+
+    def __init__(
+            self, in_air_detector: StreamingInAirDetector,
+            statistics: StreamingSignalStatistics) -> None:
+        """
+        :param in_air_detector:
+        :param statistics:
+        """
+        self._in_air_detector = in_air_detector
+        self._statistics = statistics
+        self._pending_time = np.zeros(0)
+        self._pending_values = np.zeros(0)
+        self._flight_index: Optional[int] = None
+
+    @property
+    def n_pending(self) -> int:
+        """
+        :return: the number of samples with an undecided in air state
+        """
+        return len(self._pending_time)
+
+    def append(self, relative_time: np.ndarray, values: np.ndarray) -> None:
+        """
+        :param relative_time: the sorted sample times in seconds since the log start
+        :param values:
+        :return:
+        """
+        self._pending_time = np.concatenate((self._pending_time, relative_time))
+        self._pending_values = np.concatenate((self._pending_values, values)) \
+            if len(self._pending_values) > 0 else np.asarray(values)
+
+    def _end_flight(self) -> None:
+        """
+        :return:
+        """
+        if self._flight_index is not None:
+            self._statistics.end_flight(
+                bool(self._in_air_detector.flight_qualifies(self._flight_index)))
+            self._flight_index = None
+
+    def update(self, finished: bool = False) -> None:
+        """
+        adds the samples with a decided in air state to the statistics.
+        :param finished: the log ended, the in air detector needs to be finished
+        :return:
+        """
+        n_decided = self._in_air_detector.get_decided_count(self._pending_time)
+        relative_time = self._pending_time[:n_decided]
+        values = self._pending_values[:n_decided]
+        self._pending_time = self._pending_time[n_decided:]
+        self._pending_values = self._pending_values[n_decided:]
+
+        flight_indices = self._in_air_detector.get_flight_indices(relative_time)
+        for flight_index in np.unique(flight_indices[flight_indices >= 0]):
+            if flight_index != self._flight_index:
+                self._end_flight()
+                self._flight_index = int(flight_index)
+                self._statistics.start_flight(
+                    self._flight_index, self._in_air_detector.get_airtime(self._flight_index))
+            in_flight = flight_indices == flight_index
+            self._statistics.append(relative_time[in_flight], values[in_flight])
+
+        if finished:
+            self._end_flight()
+
+    def get_statistics(self) -> StreamingStatistics:
+        """
+        :return: the statistics of the flights that are known to be long enough
+        """
+        include_current = self._flight_index is not None and \
+            bool(self._in_air_detector.flight_qualifies(self._flight_index))
+        return self._statistics.get_statistics(include_current=include_current)
+
+
+# the number of bins of the histogram approximating the median of a signal
+MEDIAN_HISTOGRAM_BINS = 1 << 12
+
+
+class StreamingMedian():
+    """
+    the median of the in air samples of a signal in bounded memory, which is updated per flight as
+    StreamingSignalStatistics. The number of samples and their value range need to be known in
+    advance (e.g. from a first pass over a complete log):
+    - exact: if there are at most max_samples samples, they are kept and the median is given by
+      np.median as in the batch analysis.
+    - approximate: otherwise, the samples are counted in a histogram of n_bins equal bins over the
+      value range and the median is the center of the bin containing it (the mean of the centers
+      of the bins containing the two middle samples for an even number of samples). The error is
+      at most half a bin width, (value_max - value_min) / (2 * n_bins).
+    """
+
+    def __init__(
+            self, n_samples: int, value_range: Tuple[float, float], dtype: np.dtype,
+            max_samples: int, n_bins: int = MEDIAN_HISTOGRAM_BINS) -> None:
+        """
+        :param n_samples: the number of samples that will be appended, at least those of the
+        flights that are kept
+        :param value_range: the min and the max of the samples of the flights that are kept
+        :param dtype: the type of the samples
+        :param max_samples: the maximum number of samples that are kept for the exact median
+        :param n_bins: the number of bins of the histogram of the approximate median
+        """
+        self._value_min, self._value_max = value_range
+        self._n_bins = n_bins
+        self.is_exact = n_samples <= max_samples
+        self._samples = np.empty(n_samples if self.is_exact else 0, dtype=dtype)
+        self._histogram = np.zeros(0 if self.is_exact else n_bins, dtype=np.int64)
+        self._flight_histogram = np.zeros_like(self._histogram)
+        self._n = 0
+        self._flight_start = 0
+
+    @property
+    def bin_width(self) -> float:
+        """
+        :return: the width of the bins of the histogram, 0 for the exact median
+        """
+        if self.is_exact:
+            return 0.0
+        return (self._value_max - self._value_min) / self._n_bins
+
+    def start_flight(self, flight_index: int, airtime: Airtime) -> None:
+        """
+        :param flight_index: the index of the flight in the in air detector
+        :param airtime: the airtime of the flight
+        :return:
+        """
+        # pylint: disable=unused-argument
+        self._flight_start = self._n
+        self._flight_histogram[:] = 0
+
+    def append(self, relative_time: np.ndarray, values: np.ndarray) -> None:
+        """
+        appends in air samples of the current flight.
+        :param relative_time: the sorted sample times in seconds
+        :param values:
+        :return:
+        """
+        # pylint: disable=unused-argument
+        if self.is_exact:
+            self._samples[self._n:self._n + len(values)] = values
+        elif self.bin_width > 0.0:
+            bins = np.clip(((np.asarray(values, dtype=np.float64) - self._value_min) /
+                            self.bin_width).astype(np.int64),
+                           0, self._n_bins - 1)
+            self._flight_histogram += np.bincount(bins, minlength=self._n_bins)
+        self._n += len(values)
+
+    def end_flight(self, keep: bool) -> None:
+        """
+        :param keep: add the current flight to the median, e.g. if it is long enough
+        :return:
+        """
+        if not keep:
+            self._n = self._flight_start
+        elif not self.is_exact:
+            self._histogram += self._flight_histogram
+
+    @property
+    def median(self) -> float:
+        """
+        :return: the median of the samples of the flights that were kept, nan if there are none
+        """
+        if self._n == 0:
+            return np.nan
+        if self.is_exact:
+            return float(np.median(self._samples[:self._n]))
+        if self.bin_width == 0.0:
+            return float(self._value_min)
+        # the bins containing the two middle samples
+        bins = np.searchsorted(
+            np.cumsum(self._histogram), [(self._n - 1) // 2 + 1, self._n // 2 + 1], side='left')
+        return float(self._value_min + (np.mean(bins) + 0.5) * self.bin_width)
@@ -0,0 +1,340 @@
+#! /usr/bin/env python3
+"""
+An on-disk cache of the decoded topics of ulog files. The topics are stored as .npy files per
+field, which are memory-mapped when the log is loaded again, such that a re-analysis of a log
+(e.g. after changing thresholds) skips the ulog parsing. Cache entries are keyed by the content
+hash of the log file, the pyulog version and the set of loaded topics, and the cache is bounded
+in size by evicting the least recently used entries.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from pyulog import ULog
+
+# increase when the layout of the cache entries changes
+CACHE_FORMAT_VERSION = 1
+
+_META_FILE = 'meta.json'
+_HASH_CHUNK_SIZE = 1 << 20
+# the prefix of the entries that are being written
+_TMP_PREFIX = '.tmp-'
+
+
+def get_parser_version() -> str:
+    """
+    :return: the version of the installed pyulog parser
+    """
+    try:
+        from importlib.metadata import version  # pylint: disable=import-outside-toplevel
+        return version('pyulog')
+    except Exception:  # pylint: disable=broad-except
+        return 'unknown'
+
+
+def hash_file(filename: str) -> str:
+    """
+    :param filename:
+    :return: the hex digest of the content of the file
+    """
+    file_hash = hashlib.blake2b(digest_size=20)
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+#pylint: disable=too-few-public-methods
+class CachedDataset():
+    """
+    a dataset of a cached log, see pyulog's ULog.Data.
+    """
+
+    def __init__(self, name: str, multi_id: int, data: Dict[str, np.ndarray]):
+        self.name = name
+        self.multi_id = multi_id
+        self.data = data
+
+
+class CachedULog():
+    """
+    the decoded topics of a ulog file loaded from the cache. Provides the parts of the pyulog
+    ULog interface that are used by the analysis.
+    """
+
+    def __init__(
+            self, start_timestamp: int, last_timestamp: int,
+            data_list: List[CachedDataset]) -> None:
+        """
+        :param start_timestamp:
+        :param last_timestamp:
+        :param data_list:
+        """
+        self.start_timestamp = start_timestamp
+        self.last_timestamp = last_timestamp
+        self.data_list = data_list
+
+    def get_dataset(self, name: str, multi_instance: int = 0) -> CachedDataset:
+        """
+        get a specific dataset.
+        :param name: name of the dataset
+        :param multi_instance: the multi_id, defaults to the first
+        :raises IndexError: if name or instance not found
+        """
+        return [elem for elem in self.data_list
+                if elem.name == name and elem.multi_id == multi_instance][0]
+
+
+class TopicCache():
+    """
+    an on-disk cache of decoded ulog topics.
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: Optional[int] = None) -> None:
+        """
+        :param cache_dir: the cache directory. it is created if it does not exist.
+        :param max_size_bytes: the maximum size of the cache. the least recently used entries are
+        evicted when a new entry exceeds it. unbounded if not specified.
+        """
+        self._cache_dir = cache_dir
+        self._max_size_bytes = max_size_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        :return: the cache directory
+        """
+        return self._cache_dir
+
+    def _entry_prefix(self, file_hash: str) -> str:
+        """
+        :param file_hash:
+        :return: the prefix of the entries of a log file
+        """
+        return f'{file_hash:s}-{CACHE_FORMAT_VERSION:d}-{get_parser_version():s}-'
+
+    @staticmethod
+    def _topics_digest(topics: Optional[Iterable[str]]) -> str:
+        """
+        :param topics: the loaded topics or None for all topics
+        :return: a short digest of the set of topics
+        """
+        topics_key = '*' if topics is None else ','.join(sorted(set(topics)))
+        return hashlib.blake2b(topics_key.encode(), digest_size=8).hexdigest()
+
+    def entries(self) -> List[str]:
+        """
+        :return: the paths of all complete cache entries
+        """
+        return [os.path.join(self._cache_dir, entry) for entry in os.listdir(self._cache_dir)
+                if not entry.startswith(_TMP_PREFIX) and
+                os.path.isfile(os.path.join(self._cache_dir, entry, _META_FILE))]
+
+    def _find_entry(self, file_hash: str, topics: Optional[Iterable[str]]) -> Optional[str]:
+        """
+        finds an entry of the log file containing at least the requested topics.
+        :param file_hash:
+        :param topics:
+        :return: the path of the entry or None
+        """
+        prefix = self._entry_prefix(file_hash)
+        exact_entry = os.path.join(self._cache_dir, prefix + self._topics_digest(topics))
+        if os.path.isfile(os.path.join(exact_entry, _META_FILE)):
+            return exact_entry
+
+        for entry in self.entries():
+            if not os.path.basename(entry).startswith(prefix):
+                continue
+            with open(os.path.join(entry, _META_FILE), 'r') as file:
+                entry_topics = json.load(file)['topics']
+            if entry_topics is None or (topics is not None and set(topics) <= set(entry_topics)):
+                return entry
+
+        return None
+
+    @staticmethod
+    def _read_entry(entry: str, topics: Optional[Iterable[str]]) -> CachedULog:
+        """
+        memory-maps the topics of a cache entry.
+        :param entry:
+        :param topics: the requested topics or None for all topics
+        :return:
+        """
+        meta_file = os.path.join(entry, _META_FILE)
+        with open(meta_file, 'r') as file:
+            meta = json.load(file)
+        # mark the entry as recently used
+        os.utime(meta_file)
+
+        requested_topics = None if topics is None else set(topics)
+        data_list = []
+        for i, dataset in enumerate(meta['datasets']):
+            if requested_topics is not None and dataset['name'] not in requested_topics:
+                continue
+            data = {}
+            for j, field_name in enumerate(dataset['fields']):
+                field_file = os.path.join(entry, f'{i:d}_{j:d}.npy')
+                # empty arrays can't be memory-mapped
+                data[field_name] = np.load(
+                    field_file, mmap_mode='r' if dataset['n_samples'] > 0 else None)
+            data_list.append(CachedDataset(dataset['name'], dataset['multi_id'], data))
+
+        return CachedULog(meta['start_timestamp'], meta['last_timestamp'], data_list)
+
+    def _write_entry(
+            self, entry: str, ulog: ULog, topics: Optional[Iterable[str]],
+            source: str) -> None:
+        """
+        writes the topics of a parsed log to a new cache entry. The entry is written to a
+        temporary directory first, such that concurrent readers never see incomplete entries.
+        :param entry:
+        :param ulog:
+        :param topics:
+        :param source: the log file name
+        :return:
+        """
+        tmp_entry = tempfile.mkdtemp(dir=self._cache_dir, prefix=_TMP_PREFIX)
+        try:
+            datasets = []
+            for i, dataset in enumerate(ulog.data_list):
+                field_names = list(dataset.data.keys())
+                for j, field_name in enumerate(field_names):
+                    np.save(os.path.join(tmp_entry, f'{i:d}_{j:d}.npy'),
+                            np.ascontiguousarray(dataset.data[field_name]))
+                datasets.append({
+                    'name': dataset.name, 'multi_id': dataset.multi_id, 'fields': field_names,
+                    'n_samples': len(dataset.data[field_names[0]]) if field_names else 0})
+            meta = {
+                'format_version': CACHE_FORMAT_VERSION, 'parser_version': get_parser_version(),
+                'source': source, 'topics': None if topics is None else sorted(set(topics)),
+                'start_timestamp': ulog.start_timestamp, 'last_timestamp': ulog.last_timestamp,
+                'datasets': datasets}
+            with open(os.path.join(tmp_entry, _META_FILE), 'w') as file:
+                json.dump(meta, file, indent=2)
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # e.g. another process stored the same entry in the meantime
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            if not os.path.isfile(os.path.join(entry, _META_FILE)):
+                raise
+
+    def load_ulog(self, filename: str, topics: Optional[Iterable[str]] = None) -> CachedULog:
+        """
+        loads the topics of a ulog file from the cache. On a cache miss, the log file is parsed
+        and its topics are stored in the cache first.
+        :param filename: the ulog file
+        :param topics: the topics to load, all topics if not specified
+        :return:
+        """
+        topics = None if topics is None else sorted(set(topics))
+        file_hash = hash_file(filename)
+        entry = self._find_entry(file_hash, topics)
+
+        if entry is None:
+            ulog = ULog(filename, message_name_filter_list=topics)
+            entry = os.path.join(
+                self._cache_dir, self._entry_prefix(file_hash) + self._topics_digest(topics))
+            self._write_entry(entry, ulog, topics, os.path.basename(filename))
+            if self._max_size_bytes is not None:
+                self.prune(self._max_size_bytes, keep=[entry])
+
+        return self._read_entry(entry, topics)
+
+    @staticmethod
+    def entry_size(entry: str) -> int:
+        """
+        :param entry:
+        :return: the size of a cache entry in bytes
+        """
+        return sum(os.path.getsize(os.path.join(entry, filename))
+                   for filename in os.listdir(entry))
+
+    def size(self) -> int:
+        """
+        :return: the total size of the cache entries in bytes
+        """
+        return sum(self.entry_size(entry) for entry in self.entries())
+
+    def prune(self, max_size_bytes: int, keep: Optional[List[str]] = None) -> int:
+        """
+        evicts the least recently used entries until the cache is not larger than max_size_bytes.
+        Leftovers of interrupted writes are removed as well.
+        :param max_size_bytes:
+        :param keep: entries that are not evicted
+        :return: the number of evicted entries
+        """
+        for entry in os.listdir(self._cache_dir):
+            path = os.path.join(self._cache_dir, entry)
+            # incomplete entries older than an hour
+            if entry.startswith(_TMP_PREFIX) and os.path.getmtime(path) < time.time() - 3600.0:
+                shutil.rmtree(path, ignore_errors=True)
+
+        keep = keep if keep is not None else []
+        entries = sorted(
+            ((os.path.getmtime(os.path.join(entry, _META_FILE)), entry)
+             for entry in self.entries()), reverse=True)
+        sizes = {entry: self.entry_size(entry) for _, entry in entries}
+        total_size = sum(sizes.values())
+
+        n_evicted = 0
+        for _, entry in reversed(entries):
+            if total_size <= max_size_bytes:
+                break
+            if entry in keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= sizes[entry]
+            n_evicted += 1
+
+        return n_evicted
+
+    def clear(self) -> int:
+        """
+        removes all cache entries.
+        :return: the number of removed entries
+        """
+        return self.prune(0)
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Prune the cache of decoded ulog topics.')
+    parser.add_argument('cache_dir', help='the cache directory')
+    parser.add_argument('--max-size', type=float, default=None,
+                        help='evict the least recently used entries until the cache is not '
+                             'larger than this size in MB.')
+    parser.add_argument('--clear', action='store_true', help='remove all cache entries.')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    topic_cache = TopicCache(args.cache_dir)
+    if args.clear:
+        n_evicted = topic_cache.clear()
+    elif args.max_size is not None:
+        n_evicted = topic_cache.prune(int(args.max_size * 1e6))
+    else:
+        n_evicted = 0
+
+    print(f'evicted {n_evicted:d} entries, {len(topic_cache.entries()):d} entries '
+          f'({topic_cache.size() / 1e6:.1f} MB) remaining in {args.cache_dir:s}')
+
+
+if __name__ == '__main__':
+    main()
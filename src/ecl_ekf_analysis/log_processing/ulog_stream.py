@@ -0,0 +1,192 @@
+#! /usr/bin/env python3
+"""
+An incremental decoder of ulog files that are still being written (e.g. by the PX4 logger during
+a flight). The file is followed by reading only the bytes appended since the last poll, and the
+data messages are decoded in chunks per topic, such that the memory does not grow with the length
+of the log.
+"""
+import struct
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from pyulog import ULog
+
+_FILE_HEADER_SIZE = 16
+_MESSAGE_HEADER_SIZE = 3
+MAX_READ_SIZE = 1 << 24
+
+
+#pylint: disable=too-few-public-methods
+class StreamedDataset():
+    """
+    a topic (instance) of a streamed log, see pyulog's ULog.Data. data holds the samples decoded
+    by the last poll, empty arrays of the fields if the last poll did not decode any sample.
+    """
+
+    def __init__(self, name: str, multi_id: int, dtype: np.dtype) -> None:
+        """
+        :param name:
+        :param multi_id:
+        :param dtype: the record type of the (padding stripped) data message payload
+        """
+        self.name = name
+        self.multi_id = multi_id
+        self.dtype = dtype
+        self.n_samples = 0
+        self.data: Dict[str, np.ndarray] = {}
+        self.set_records(np.zeros(0, dtype=dtype))
+
+    def set_records(self, records: np.ndarray) -> None:
+        """
+        :param records: the decoded samples
+        :return:
+        """
+        self.data = {field_name: records[field_name] for field_name in self.dtype.names}
+
+
+class ULogStream():
+    """
+    follows a growing ulog file. Provides the parts of the pyulog ULog interface that are used for
+    resolving the topic and field names of the analysis (start_timestamp, data_list, get_dataset).
+    Appended data is skipped and corrupt messages are skipped by their size, without trying to
+    recover from the sync messages.
+    """
+
+    def __init__(
+            self, filename: str, message_name_filter_list: Optional[Iterable[str]] = None,
+            max_read_size: int = MAX_READ_SIZE) -> None:
+        """
+        :param filename:
+        :param message_name_filter_list: the topics to decode, all topics if not specified
+        :param max_read_size: the maximum number of bytes read by a poll, which bounds the memory
+        when catching up with a large file
+        """
+        self._filename = filename
+        self._max_read_size = max_read_size
+        self._message_name_filter_list = set(message_name_filter_list) \
+            if message_name_filter_list is not None else None
+        self._file_position = 0
+        self._buffer = bytearray()
+        self._message_formats: Dict[str, ULog.MessageFormat] = {}
+        self._subscriptions: Dict[int, StreamedDataset] = {}
+        self._max_data_sizes: Dict[int, int] = {}
+        self.start_timestamp: Optional[int] = None
+        self.last_timestamp = 0
+
+    @property
+    def bytes_read(self) -> int:
+        """
+        :return: the number of bytes of the file read so far
+        """
+        return self._file_position
+
+    @property
+    def data_list(self) -> List[StreamedDataset]:
+        """
+        :return: the subscribed topics (instances)
+        """
+        return list(self._subscriptions.values())
+
+    def get_dataset(self, name: str, multi_instance: int = 0) -> StreamedDataset:
+        """
+        get a specific dataset.
+        :param name: name of the dataset
+        :param multi_instance: the multi_id, defaults to the first
+        :raises IndexError: if name or instance not found
+        """
+        return [elem for elem in self.data_list
+                if elem.name == name and elem.multi_id == multi_instance][0]
+
+    def _read_appended_bytes(self) -> bool:
+        """
+        appends the bytes written to the file since the last read (at most max_read_size bytes)
+        to the buffer.
+        :return: True if new bytes were read
+        """
+        with open(self._filename, 'rb') as file:
+            file.seek(self._file_position)
+            new_bytes = file.read(self._max_read_size)
+        self._buffer += new_bytes
+        self._file_position += len(new_bytes)
+        return len(new_bytes) > 0
+
+    def _read_file_header(self) -> bool:
+        """
+        :return: True if the file header is complete
+        """
+        if len(self._buffer) < _FILE_HEADER_SIZE:
+            return False
+        if bytes(self._buffer[:7]) != ULog.HEADER_BYTES:
+            raise TypeError('Invalid file format (Failed to parse header)')
+        self.start_timestamp, = struct.unpack('<Q', self._buffer[8:16])
+        del self._buffer[:_FILE_HEADER_SIZE]
+        return True
+
+    def _add_subscription(self, data: bytes) -> None:
+        """
+        :param data: the payload of an add logged message
+        :return:
+        """
+        try:
+            # pylint: disable=protected-access
+            add_logged = ULog._MessageAddLogged(data, None, self._message_formats)
+        except KeyError:
+            # the format of the topic is not defined (corrupt log)
+            return
+        if self._message_name_filter_list is None or \
+                add_logged.message_name in self._message_name_filter_list:
+            self._subscriptions[add_logged.msg_id] = StreamedDataset(
+                add_logged.message_name, add_logged.multi_id, add_logged.dtype)
+            self._max_data_sizes[add_logged.msg_id] = add_logged.max_data_size
+
+    def poll(self) -> List[StreamedDataset]:
+        """
+        decodes the complete messages appended to the file since the last poll. A message that is
+        only partially written is kept until the next poll. Polling a large file repeatedly
+        catches up with it in steps of max_read_size bytes.
+        :return: the datasets with new samples, their data holds the new samples
+        """
+        if not self._read_appended_bytes():
+            return []
+        if self.start_timestamp is None and not self._read_file_header():
+            return []
+
+        payloads: Dict[int, bytearray] = {}
+        buffer = memoryview(bytes(self._buffer))
+        position = 0
+        while position + _MESSAGE_HEADER_SIZE <= len(buffer):
+            msg_size, msg_type = struct.unpack_from('<HB', buffer, position)
+            end = position + _MESSAGE_HEADER_SIZE + msg_size
+            if end > len(buffer):
+                break
+            data = buffer[position + _MESSAGE_HEADER_SIZE:end]
+            position = end
+
+            if msg_type == ord('D'):
+                msg_id, = struct.unpack_from('<H', data)
+                if msg_id in self._subscriptions:
+                    item_size = self._subscriptions[msg_id].dtype.itemsize
+                    # corrupt messages are skipped and trailing padding is stripped as by pyulog
+                    if item_size <= len(data) - 2 <= self._max_data_sizes[msg_id]:
+                        payloads.setdefault(msg_id, bytearray()).extend(data[2:2 + item_size])
+            elif msg_type == ord('F'):
+                message_format = ULog.MessageFormat(bytes(data), None)
+                self._message_formats[message_format.name] = message_format
+            elif msg_type == ord('A'):
+                self._add_subscription(bytes(data))
+        del self._buffer[:position]
+
+        updated = []
+        for msg_id, dataset in self._subscriptions.items():
+            if msg_id in payloads:
+                records = np.frombuffer(bytes(payloads[msg_id]), dtype=dataset.dtype)
+                dataset.set_records(records)
+                dataset.n_samples += len(records)
+                if 'timestamp' in dataset.data:
+                    self.last_timestamp = max(
+                        self.last_timestamp, int(dataset.data['timestamp'][-1]))
+                updated.append(dataset)
+            elif len(dataset.data[dataset.dtype.names[0]]) > 0:
+                dataset.set_records(np.zeros(0, dtype=dataset.dtype))
+
+        return updated
@@ -5,13 +5,22 @@ Outputs a health assessment summary in a csv file named <inputfilename>.mdat.csv
 """
 
 from __future__ import print_function
+from ecl_ekf_analysis.checks.chunked_check_runner import ChunkedEclCheckRunner, \
+    DEFAULT_MEMORY_BUDGET_MB
 from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.multi_ekf_check_runner import MultiEkfCheckRunner, get_check_name
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
 from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
+from ecl_ekf_analysis.log_processing.instrumentation import Instrumentation, measure, CHECKS, \
+    summarize_timings, format_timing_summary
+from ecl_ekf_analysis.log_processing.results_file import RESULTS_FORMATS, get_results_filename, \
+    write_results_file
+from ecl_ekf_analysis.log_processing.topic_cache import TopicCache
 
 import argparse
 import os
 import sys
-from typing import List
+from typing import List, Optional
 
 from pyulog import ULog
 import simplejson as json
@@ -28,23 +37,226 @@ def get_arguments():
         description='Analyse the estimator_status and ekf2_innovation message data for a single'
                     'ulog file.')
     parser.add_argument('filename', metavar='file.ulg', help='ULog input file')
-    return parser.parse_args()
+    add_topic_cache_arguments(parser)
+    add_timings_argument(parser)
+    add_threads_argument(parser)
+    add_memory_budget_argument(parser)
+    add_config_arguments(parser)
+    add_output_format_argument(parser)
+    add_all_instances_argument(parser)
+    args = parser.parse_args()
+    check_all_instances_argument(parser, args)
+    return args
 
 
-def analyse_logdata_ekf(ulog: ULog) -> List[dict]:
+def add_all_instances_argument(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line argument analysing all estimator instances of multi-EKF logs
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--all-instances', action='store_true',
+        help='Analyse all estimator instances of multi-EKF logs instead of the first. The '
+             'results of every check are tagged with their "estimator_instance". Can\'t be '
+             'combined with --memory-budget.')
+
+
+def check_all_instances_argument(
+        parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """
+    exits with a usage error if all instances are analysed within a memory budget, which the
+    chunked analysis doesn't support
+    :param parser:
+    :param args: the parsed arguments
+    :return:
+    """
+    if args.all_instances and args.memory_budget is not None:
+        parser.error('--all-instances can\'t be combined with --memory-budget')
+
+
+def add_output_format_argument(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line argument selecting the format of the results file
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--output-format', choices=RESULTS_FORMATS, default='json',
+        help='The format of the results file next to the log file: an indented .json file '
+             '(default) or a binary .npz file with the check results as structured arrays, which '
+             'is faster to write and read.')
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line arguments overriding the default parameters and thresholds
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--params', default=None,
+        help='A params .ini file overriding (a subset of) the default parameters.')
+    parser.add_argument(
+        '--thresholds', default=None,
+        help='A thresholds .ini file overriding (a subset of) the default thresholds.')
+    parser.add_argument(
+        '--config', default=None,
+        help='A .json file overriding parameters and thresholds, e.g. '
+             '{"params": {"ecl-analysis": {"red_thresh": 1.5}}, '
+             '"thresholds": {"yaw_amber_warning_pct": 10.0}}. Applied after --params and '
+             '--thresholds.')
+
+
+def get_config(args: argparse.Namespace) -> Optional[AnalysisConfig]:
+    """
+    :param args: the parsed command line arguments
+    :return: the configuration of the analysis or None, if the defaults are not overridden
+    """
+    if args.params is None and args.thresholds is None and args.config is None:
+        return None
+
+    config = AnalysisConfig.from_ini(params_file=args.params, thresholds_file=args.thresholds)
+    if args.config is not None:
+        with open(args.config, 'r') as file:
+            config = config.with_overrides(json.load(file))
+    return config
+
+
+def add_topic_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line arguments of the topic cache
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--cache-dir', default=None,
+        help='Cache the decoded topics of the log files in this directory, such that a repeated '
+             'analysis of a log file skips the parsing. Disabled if not specified.')
+    parser.add_argument(
+        '--cache-max-size', type=float, default=None,
+        help='The maximum size of the topic cache in MB. The least recently used log files are '
+             'evicted from the cache. Unbounded if not specified.')
+
+
+def add_threads_argument(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line argument for running the checks of a log concurrently
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--threads', type=int, default=1,
+        help='The number of threads running the checks of a log concurrently. Defaults to 1, '
+             'which runs the checks one after the other.')
+
+
+def add_memory_budget_argument(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line argument of the chunked analysis
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--memory-budget', type=float, default=None,
+        help='Analyse the log file in blocks with a bounded memory in MB instead of loading the '
+             'complete log, e.g. for multi-hour logs. The log file is decoded twice and the topic '
+             'cache and the threads are not used. Disabled if not specified.')
+
+
+def add_timings_argument(parser: argparse.ArgumentParser) -> None:
+    """
+    adds the command line argument enabling the instrumentation of the analysis
+    :param parser:
+    :return:
+    """
+    parser.add_argument(
+        '--timings', action='store_true',
+        help='Record the wall time and cpu time of the analysis stages and of every check. The '
+             'measurements of a check are added to its results as a "timings" block.')
+    parser.add_argument(
+        '--timings-memory', action='store_true',
+        help='As --timings, but also record the peak allocated memory. Tracing the allocations '
+             'slows down the analysis considerably.')
+
+
+def get_instrumentation(args: argparse.Namespace) -> Optional[Instrumentation]:
+    """
+    :param args: the parsed command line arguments
+    :return: the instrumentation or None, if the analysis is not instrumented
+    """
+    if not args.timings and not args.timings_memory:
+        return None
+    return Instrumentation(track_memory=args.timings_memory)
+
+
+def get_topic_cache(args: argparse.Namespace) -> Optional[TopicCache]:
+    """
+    :param args: the parsed command line arguments
+    :return: the topic cache or None, if the cache is disabled
+    """
+    if args.cache_dir is None:
+        return None
+
+    return TopicCache(
+        args.cache_dir,
+        max_size_bytes=int(args.cache_max_size * 1e6) if args.cache_max_size is not None else None)
+
+
+def analyse_logdata_ekf(
+        ulog: ULog, instrumentation: Optional[Instrumentation] = None,
+        n_threads: int = 1, config: Optional[AnalysisConfig] = None,
+        all_instances: bool = False) -> List[dict]:
     """
     perform the analysis
     :param ulog:
+    :param instrumentation: records the time and memory used by the stages and the checks of the
+    analysis if specified. the measurements of every check are added to its results.
+    :param n_threads: the number of threads running the checks concurrently
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :param all_instances: analyse all estimator instances of the log (see MultiEkfCheckRunner)
+    instead of the first
     :return:
     """
+    runner_class = MultiEkfCheckRunner if all_instances else EclCheckRunner
+    ecl_check_runner = runner_class(ulog, instrumentation=instrumentation, config=config)
+    with measure(instrumentation, 'checks'):
+        ecl_check_runner.run_checks(n_threads=n_threads)
+    with measure(instrumentation, 'serialize'):
+        test_results = ecl_check_runner.results_deserialized
 
-    ecl_check_runner = EclCheckRunner(ulog)
-    ecl_check_runner.run_checks()
-    test_results = ecl_check_runner.results_deserialized
+    if instrumentation is not None:
+        check_timings = instrumentation.to_dict()[CHECKS]
+        for test_result in test_results:
+            if get_check_name(test_result) in check_timings:
+                test_result['timings'] = check_timings[get_check_name(test_result)]
 
     return test_results
 
 
+def analyse_logdata_ekf_chunked(
+        filename: str, memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+        config: Optional[AnalysisConfig] = None) -> List[dict]:
+    """
+    perform the analysis of a log file in blocks within a memory budget, see
+    ChunkedEclCheckRunner. The results equal those of analyse_logdata_ekf up to the rounding of
+    the means and, if the samples of the imu medians exceed the memory budget, the approximation
+    of these medians.
+    :param filename:
+    :param memory_budget_mb: the memory budget of the analysis in MB
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :return:
+    """
+    ecl_check_runner = ChunkedEclCheckRunner(
+        filename, memory_budget_mb=memory_budget_mb, config=config)
+    try:
+        ecl_check_runner.run_checks()
+    except (OSError, TypeError) as e:
+        raise PreconditionError(f'could not open {filename:s}') from e
+
+    return ecl_check_runner.results_deserialized
+
+
 def get_master_status_from_test_results(test_results: List[dict]) -> str:
     """
     :param test_results:
@@ -60,21 +272,57 @@ def get_master_status_from_test_results(test_results: List[dict]) -> str:
     return master_status
 
 
-def process_logdata_ekf(filename: str) -> List[dict]:
+def process_logdata_ekf(
+        filename: str, topic_cache: Optional[TopicCache] = None,
+        instrumentation: Optional[Instrumentation] = None, n_threads: int = 1,
+        memory_budget_mb: Optional[float] = None, write_json: bool = True,
+        config: Optional[AnalysisConfig] = None, output_format: str = 'json',
+        all_instances: bool = False) -> List[dict]:
     """
     main function for processing the logdata for ekf analysis.
     :param filename:
+    :param topic_cache: an optional cache of the decoded topics
+    :param instrumentation: records the time and memory used by the stages and the checks of the
+    analysis if specified
+    :param n_threads: the number of threads running the checks concurrently
+    :param memory_budget_mb: if specified, the log is analysed in blocks within this memory
+    budget in MB (see analyse_logdata_ekf_chunked) instead of being loaded completely
+    :param write_json: write the results file next to the log file
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :param output_format: the format of the results file, <filename>.json or <filename>.npz
+    (see results_file)
+    :param all_instances: analyse all estimator instances of multi-EKF logs, can't be combined
+    with a memory budget
+    :raises ValueError: if all instances are analysed within a memory budget
     :return:
     """
-    try:
-        ulog = ULog(filename)
-    except Exception as e:
-        raise PreconditionError(f'could not open {filename:s}') from e
+    if memory_budget_mb is not None and all_instances:
+        raise ValueError('the analysis within a memory budget only analyses the first estimator '
+                         'instance, all_instances is not supported')
 
-    test_results = analyse_logdata_ekf(ulog)
+    if memory_budget_mb is not None:
+        with measure(instrumentation, 'checks'):
+            test_results = analyse_logdata_ekf_chunked(
+                filename, memory_budget_mb=memory_budget_mb, config=config)
+    else:
+        # only decode the topics used by the checks
+        topics = sorted(EclCheckRunner.required_topics())
+        try:
+            with measure(instrumentation, 'parse'):
+                if topic_cache is not None:
+                    ulog = topic_cache.load_ulog(filename, topics=topics)
+                else:
+                    ulog = ULog(filename, message_name_filter_list=topics)
+        except Exception as e:
+            raise PreconditionError(f'could not open {filename:s}') from e
 
-    with open(f'{os.path.splitext(filename)[0]:s}.json', 'w') as file:
-        json.dump(test_results, file, indent=2)
+        test_results = analyse_logdata_ekf(
+            ulog, instrumentation=instrumentation, n_threads=n_threads, config=config,
+            all_instances=all_instances)
+
+    if write_json:
+        with measure(instrumentation, 'write'):
+            write_results_file(get_results_filename(filename, output_format), test_results)
 
     return test_results
 
@@ -87,12 +335,19 @@ def main() -> None:
 
     args = get_arguments()
 
+    instrumentation = get_instrumentation(args)
     try:
-        test_results = process_logdata_ekf(args.filename)
+        test_results = process_logdata_ekf(
+            args.filename, topic_cache=get_topic_cache(args), instrumentation=instrumentation,
+            n_threads=args.threads, memory_budget_mb=args.memory_budget, config=get_config(args),
+            output_format=args.output_format, all_instances=args.all_instances)
     except Exception as e:
         print(str(e))
         sys.exit(-1)
 
+    if instrumentation is not None:
+        print(format_timing_summary(summarize_timings([instrumentation.to_dict()])))
+
     master_status = get_master_status_from_test_results(test_results)
 
     # print master test status to console
@@ -0,0 +1,161 @@
+#! /usr/bin/env python3
+"""
+Re-evaluates the check results of already analysed ulog files with the current (or a custom set of)
+thresholds. The statistic values are read from the <inputfilename>.json (or .npz) results written
+by process_logdata_ekf.py, such that the ulog files are neither parsed nor required. The
+thresholds and statuses in the results files are rewritten.
+"""
+
+import argparse
+import functools
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from ecl_ekf_analysis.check_data_interfaces.check_data_utils import serialize_check_results, \
+    deserialize_check_results
+from ecl_ekf_analysis.checks.check_thresholds import apply_thresholds, evaluate_check_status, \
+    get_threshold_table, ThresholdTable
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.log_processing.results_file import RESULTS_FORMATS, read_results_file, \
+    write_results_file
+from ecl_ekf_analysis.process_logdata_ekf import get_master_status_from_test_results
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Re-apply the thresholds to the results of already analysed ulog files '
+                    'without analysing the ulog files again.')
+    parser.add_argument(
+        'paths', nargs='+',
+        help='.json or .npz result files or directories, which are searched recursively for '
+             '.json and .npz result files')
+    parser.add_argument(
+        '-t', '--thresholds', default=None,
+        help='A thresholds .ini file overriding (a subset of) the default thresholds.')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='The number of worker processes used to rewrite the result files in parallel. '
+             'Defaults to 1, which rewrites the files one after the other in this process.')
+    return parser.parse_args()
+
+
+def find_result_files(paths: List[str]) -> List[str]:
+    """
+    :param paths: result files or directories
+    :return: the result files and the .json and .npz files found in the directories and their
+    subdirectories
+    """
+    result_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            result_files.extend(sorted(
+                result_file for output_format in RESULTS_FORMATS
+                for result_file in glob.glob(
+                    os.path.join(path, f'**/*.{output_format:s}'), recursive=True)))
+        else:
+            result_files.append(path)
+    return result_files
+
+
+def rethreshold_test_results(
+        test_results: List[dict], threshold_table: Optional[ThresholdTable] = None) -> List[dict]:
+    """
+    applies the current thresholds to deserialized check results and re-evaluates the statuses.
+    :param test_results: the check results, see process_logdata_ekf
+    :param threshold_table: the thresholds from get_threshold_table, looked up if not specified
+    :return: the re-evaluated check results. additional entries of the check results (e.g. the
+    timings) are kept.
+    """
+    check_results = serialize_check_results(test_results)
+    for check_result in check_results:
+        apply_thresholds(check_result, threshold_table=threshold_table)
+        evaluate_check_status(check_result)
+    return [{**test_result, **new_test_result} for test_result, new_test_result in zip(
+        test_results, deserialize_check_results(check_results))]
+
+
+def rethreshold_result_file(
+        result_file: str,
+        threshold_table: Optional[ThresholdTable] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    re-evaluates and rewrites a .json or .npz results file. Exceptions are caught, such that a
+    single file can't stop the re-evaluation of the other files.
+    :param result_file:
+    :param threshold_table: the thresholds from get_threshold_table, looked up if not specified
+    :return: the master status before and after the re-evaluation, or None and the error message
+    if the file is not a valid results file.
+    """
+    try:
+        test_results = read_results_file(result_file)
+        new_test_results = rethreshold_test_results(test_results, threshold_table)
+    except Exception as e:  # pylint: disable=broad-except
+        return None, f'skipping {result_file:s}: {str(e):s}'
+
+    write_results_file(result_file, new_test_results)
+
+    return get_master_status_from_test_results(test_results), \
+        get_master_status_from_test_results(new_test_results)
+
+
+def rethreshold_result_files(
+        result_files: List[str], jobs: int = 1,
+        thresholds_file: Optional[str] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    re-evaluates and rewrites the result files.
+    :param result_files:
+    :param jobs: the number of worker processes. The files are processed in this process if 1.
+    :param thresholds_file: an optional thresholds .ini file overriding the default thresholds.
+    the thresholds of this process are not changed.
+    :return: the results of rethreshold_result_file per file
+    """
+    threshold_table = get_threshold_table(
+        AnalysisConfig.from_ini(thresholds_file=thresholds_file)
+        if thresholds_file is not None else None)
+
+    if jobs <= 1 or len(result_files) <= 1:
+        return [rethreshold_result_file(result_file, threshold_table)
+                for result_file in result_files]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(result_files))) as executor:
+        # large chunks amortize the inter process communication of the short tasks
+        chunk_size = max(1, len(result_files) // (4 * jobs))
+        return list(executor.map(
+            functools.partial(rethreshold_result_file, threshold_table=threshold_table),
+            result_files, chunksize=chunk_size))
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    result_files = find_result_files(args.paths)
+    print(f'found {len(result_files):d} result files')
+
+    n_rethresholded, n_changed = 0, 0
+    for old_status, new_status in rethreshold_result_files(
+            result_files, jobs=args.jobs, thresholds_file=args.thresholds):
+        if old_status is None:
+            print(new_status)
+            continue
+        n_rethresholded += 1
+        if new_status != old_status:
+            n_changed += 1
+
+    print(f'rethresholded {n_rethresholded:d} result files, the master status of '
+          f'{n_changed:d} files changed')
+
+
+if __name__ == '__main__':
+    main()
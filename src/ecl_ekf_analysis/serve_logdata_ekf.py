@@ -0,0 +1,346 @@
+#! /usr/bin/env python3
+"""
+Runs the analysis as a long-running local HTTP service, such that the analysis of a log doesn't
+pay the interpreter start-up and the imports of numpy, scipy and pyulog. The logs are analysed on
+a pool of pre-warmed worker processes. Requests are queued while all workers are busy and are
+rejected once the queue is full.
+
+POST /analyse with a JSON body {"filename": "path/to/log.ulg"} analyses a log file accessible by
+the service, any other body is analysed as the content of an uploaded log file. The response is
+the list of check results as written to the .json file by process_logdata_ekf. The parameters and
+thresholds of a request can be overridden by the "config" entry of the JSON body or, for uploads,
+by an X-Analysis-Config header with the overrides as JSON, in the format of
+AnalysisConfig.to_dict.
+GET /health returns the number of workers and of pending requests.
+"""
+
+import argparse
+import io
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+from pyulog import ULog
+import simplejson as json
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig, default_config
+from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf, process_logdata_ekf, \
+    add_config_arguments, get_config
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+
+def get_arguments():
+    """
+    parses the command line arguments
+    :return:
+    """
+    parser = argparse.ArgumentParser(
+        description='Serve the analysis of ulog files over HTTP on a pool of worker processes.')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='The address to listen on. Defaults to the local host.')
+    parser.add_argument('--port', type=int, default=8090, help='The port to listen on.')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=os.cpu_count(),
+        help='The number of worker processes analysing logs concurrently. Defaults to the number '
+             'of cpus.')
+    parser.add_argument(
+        '--max-queued', type=int, default=32,
+        help='The number of requests waiting for a worker. Further requests are rejected with '
+             'the status 503.')
+    parser.add_argument(
+        '--timeout', type=float, default=600.0,
+        help='The time in seconds a request waits for its results before it fails with the '
+             'status 504.')
+    parser.add_argument(
+        '--max-upload-size', type=float, default=1000.0,
+        help='The maximum size of an uploaded log file in MB.')
+    parser.add_argument('--quiet', action='store_true', help='Do not log the requests.')
+    add_config_arguments(parser)
+    return parser.parse_args()
+
+
+def analyse_request(
+        filename: Optional[str], data: Optional[bytes],
+        config: Optional[AnalysisConfig] = None) -> List[dict]:
+    """
+    analyses a log file or the content of an uploaded log file. Runs in the worker processes.
+    :param filename: the log file
+    :param data: the content of a log file, used if filename is None
+    :param config: the parameters and thresholds of the analysis, the defaults if not specified
+    :return: the check results
+    """
+    if filename is not None:
+        return process_logdata_ekf(filename, write_json=False, config=config)
+
+    try:
+        ulog = ULog(io.BytesIO(data),
+                    message_name_filter_list=sorted(EclCheckRunner.required_topics()))
+    except Exception as e:
+        raise PreconditionError('could not open the uploaded log') from e
+    return analyse_logdata_ekf(ulog, config=config)
+
+
+def _warm_up_worker() -> int:
+    """
+    runs in a new worker process, the modules of the analysis are imported when the function is
+    unpickled.
+    :return: the process id of the worker
+    """
+    return os.getpid()
+
+
+class ServiceBusyError(Exception):
+    """
+    raised if a request is rejected, because the request queue is full.
+    """
+
+
+class AnalysisService():
+    """
+    a pool of worker processes with a bounded queue of requests.
+    """
+    def __init__(self, n_workers: int = 1, max_queued: int = 32) -> None:
+        """
+        :param n_workers: the number of worker processes
+        :param max_queued: the number of requests waiting for a worker
+        """
+        self._n_workers = n_workers
+        self._executor = ProcessPoolExecutor(max_workers=n_workers)
+        self._slots = threading.BoundedSemaphore(n_workers + max_queued)
+        self._lock = threading.Lock()
+        self._n_pending = 0
+
+    @property
+    def n_workers(self) -> int:
+        """
+        :return: the number of worker processes
+        """
+        return self._n_workers
+
+    @property
+    def n_pending(self) -> int:
+        """
+        :return: the number of requests being analysed or waiting for a worker
+        """
+        with self._lock:
+            return self._n_pending
+
+    def warm_up(self) -> None:
+        """
+        starts all worker processes and waits until they imported the analysis.
+        :return:
+        """
+        futures = [self._executor.submit(_warm_up_worker) for _ in range(self._n_workers)]
+        for future in futures:
+            future.result()
+
+    def submit(
+            self, filename: Optional[str] = None, data: Optional[bytes] = None,
+            config: Optional[AnalysisConfig] = None) -> Future:
+        """
+        queues the analysis of a log file or of the content of a log file.
+        :param filename:
+        :param data:
+        :param config: the parameters and thresholds of the analysis, the defaults if not
+        specified
+        :raises ServiceBusyError: if the queue is full
+        :return: the future of the check results
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusyError(
+                f'{self.n_pending:d} requests pending, the request queue is full')
+        with self._lock:
+            self._n_pending += 1
+        try:
+            future = self._executor.submit(analyse_request, filename, data, config)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self._n_pending -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        """
+        stops the worker processes after the pending requests.
+        :return:
+        """
+        self._executor.shutdown(wait=True)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    handles the requests of the analysis service, see the module docstring.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status: int, content, headers: Optional[dict] = None) -> None:
+        """
+        :param status: the HTTP status code
+        :param content: the JSON serializable content
+        :param headers: additional headers
+        :return:
+        """
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, headers: Optional[dict] = None) -> None:
+        self._send_json(status, {'error': message}, headers=headers)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        handles GET /health
+        :return:
+        """
+        if self.path != '/health':
+            self._send_error(404, f'unknown path {self.path:s}')
+            return
+        service = self.server.service
+        self._send_json(200, {
+            'status': 'ok', 'workers': service.n_workers, 'pending': service.n_pending})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """
+        handles POST /analyse
+        :return:
+        """
+        if self.path != '/analyse':
+            self._send_error(404, f'unknown path {self.path:s}')
+            self.close_connection = True
+            return
+
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self._send_error(400, 'invalid Content-Length')
+            # the body can't be read
+            self.close_connection = True
+            return
+        if content_length > self.server.max_upload_bytes:
+            self._send_error(
+                413, f'the request exceeds the maximum size of {self.server.max_upload_bytes:d} '
+                     f'bytes')
+            # the body is not read
+            self.close_connection = True
+            return
+        body = self.rfile.read(content_length)
+
+        filename, data, overrides = None, body, self.headers.get('X-Analysis-Config')
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            try:
+                request = json.loads(body)
+                filename, data, overrides = request['filename'], None, request.get('config')
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._send_error(400, 'expected a JSON object {"filename": "path/to/log.ulg"}')
+                return
+
+        config = self.server.config
+        if overrides is not None:
+            try:
+                config = config.with_overrides(
+                    json.loads(overrides) if isinstance(overrides, str) else overrides)
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send_error(400, f'invalid configuration overrides: {str(e):s}')
+                return
+
+        try:
+            future = self.server.service.submit(filename=filename, data=data, config=config)
+        except ServiceBusyError as e:
+            self._send_error(503, str(e), headers={'Retry-After': '1'})
+            return
+
+        try:
+            test_results = future.result(timeout=self.server.request_timeout)
+        except FutureTimeoutError:
+            # a request still waiting for a worker is removed from the queue, a running
+            # analysis can't be stopped
+            future.cancel()
+            self._send_error(504, f'no results after {self.server.request_timeout:.1f} s')
+            return
+        except PreconditionError as e:
+            self._send_error(422, str(e))
+            return
+        except Exception as e:  # pylint: disable=broad-except
+            self._send_error(500, f'the analysis failed: {str(e):s}')
+            return
+
+        self._send_json(200, test_results)
+
+    def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    an HTTP server handling every connection in a thread, the analysis runs on the processes of
+    the analysis service.
+    """
+    daemon_threads = True
+
+    def __init__(
+            self, address, service: AnalysisService, request_timeout: float = 600.0,
+            max_upload_bytes: int = 1 << 30, quiet: bool = False,
+            config: Optional[AnalysisConfig] = None) -> None:
+        """
+        :param address: the host and the port to listen on
+        :param service:
+        :param request_timeout: the time in seconds a request waits for its results
+        :param max_upload_bytes: the maximum size of an uploaded log file
+        :param quiet: don't log the requests
+        :param config: the parameters and thresholds of the analysis, which are overridden per
+        request. the defaults if not specified.
+        """
+        super().__init__(address, AnalysisRequestHandler)
+        self.service = service
+        self.config = config if config is not None else default_config()
+        self.request_timeout = request_timeout
+        self.max_upload_bytes = max_upload_bytes
+        self.quiet = quiet
+
+
+def main() -> None:
+    """
+    main entry point
+    :return:
+    """
+    args = get_arguments()
+
+    service = AnalysisService(n_workers=args.jobs, max_queued=args.max_queued)
+    service.warm_up()
+    server = AnalysisServer(
+        (args.host, args.port), service, request_timeout=args.timeout,
+        max_upload_bytes=int(args.max_upload_size * 1e6), quiet=args.quiet,
+        config=get_config(args))
+    host, port = server.server_address[:2]
+    print(f'serving the analysis on http://{host:s}:{port:d} with {args.jobs:d} workers')
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    main()
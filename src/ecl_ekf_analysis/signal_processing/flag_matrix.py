@@ -0,0 +1,215 @@
+# /usr/bin/env python3
+"""
+a bit-packed matrix of boolean flags, e.g. the cs_*, fs_* and reject_* flags of the
+estimator_status_flags or the bits of a bitfield such as the gps_check_fail_flags of the
+estimator_status. pyulog keeps every flag as an array of (at least) one byte per sample, the
+matrix keeps a single bit per sample and flag (np.packbits) and is built once per log. The
+statistics of the flags are computed on the packed bytes:
+- any: whether any of the flags was active, tested on the packed bytes.
+- count: the number of active samples of a range of samples from the popcounts of its bytes.
+- get_prefix_counts: the number of active samples before every sample of a range (the rank of the
+  packed bits), the windowed counts of any window length are the differences of the prefix counts.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# the number of set bits among the first k bits (k = 0..8) of every byte value. The first bit is
+# the most significant bit, the bit order of np.packbits.
+_PREFIX_POPCOUNT = np.zeros((256, 9), dtype=np.uint8)
+np.cumsum(np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1), axis=1,
+          dtype=np.uint8, out=_PREFIX_POPCOUNT[:, 1:])
+# the number of set bits of every byte value
+_POPCOUNT = np.ascontiguousarray(_PREFIX_POPCOUNT[:, 8])
+
+# the number of samples of the blocks of samples packed at once. The flags of pyulog are strided
+# views of the records of a dataset, all flags are packed block by block such that the records of
+# a block (about 1 MB for the estimator_status_flags) stay in the cache.
+_BLOCK_SIZE = 2**14
+
+
+def _set_active(out: np.ndarray, flag: np.ndarray, threshold: float) -> None:
+    """
+    sets the active samples (> threshold) of a flag. Boolean flags are copied as they are.
+    :param out:
+    :param flag:
+    :param threshold:
+    :return:
+    """
+    if flag.dtype == np.bool_:
+        out[...] = flag
+    else:
+        np.greater(flag, threshold, out=out)
+
+
+class FlagMatrix():
+    """
+    the active samples of several flags of the same length, packed into a (n_flags, n_bytes)
+    matrix of bits. Every row is padded with at least one byte of inactive samples.
+    """
+
+    def __init__(self, packed: np.ndarray, fields: Sequence[str], n_samples: int) -> None:
+        """
+        :param packed: the (n_flags, n_samples // 8 + 1) packed active samples per flag
+        :param fields: the names of the flags
+        :param n_samples: the number of samples per flag
+        """
+        if packed.shape != (len(fields), n_samples // 8 + 1):
+            raise ValueError(f'FlagMatrix: {packed.shape} packed bytes do not match '
+                             f'{len(fields):d} flags of {n_samples:d} samples')
+        self._packed = packed
+        self._rows = {field: i for i, field in enumerate(fields)}
+        self._n_samples = n_samples
+
+    @classmethod
+    def from_fields(
+            cls, data: Dict[str, np.ndarray], fields: Optional[Sequence[str]] = None,
+            threshold: float = 0.5) -> 'FlagMatrix':
+        """
+        packs the flag fields of a dataset.
+        :param data: the data of a dataset, e.g. of the estimator_status_flags
+        :param fields: the flag fields, all fields but the timestamp if not specified
+        :param threshold: samples above the threshold are active
+        :return:
+        """
+        if fields is None:
+            fields = [field for field in data if field != 'timestamp']
+        n_samples = len(next(iter(data.values()))) if data else 0
+        packed = np.zeros((len(fields), n_samples // 8 + 1), dtype=np.uint8)
+        active = np.empty(min(n_samples, _BLOCK_SIZE), dtype=np.bool_)
+        for block_start in range(0, n_samples, _BLOCK_SIZE):
+            block_end = min(n_samples, block_start + _BLOCK_SIZE)
+            block_active = active[:block_end - block_start]
+            for i, field in enumerate(fields):
+                _set_active(block_active, np.asarray(data[field])[block_start:block_end],
+                            threshold)
+                packed[i, block_start // 8:(block_end + 7) // 8] = np.packbits(block_active)
+        return cls(packed, fields, n_samples)
+
+    @classmethod
+    def from_bitfield(cls, bitfield: np.ndarray, bit_names: Sequence[str]) -> 'FlagMatrix':
+        """
+        packs the bits of an unsigned integer bitfield, e.g. the gps_check_fail_flags.
+        :param bitfield: the bitfield samples
+        :param bit_names: the names of the bits, starting with the least significant bit
+        :return:
+        """
+        bitfield = np.asarray(bitfield)
+        if len(bit_names) > 8 * bitfield.dtype.itemsize:
+            raise ValueError(f'FlagMatrix: {len(bit_names):d} bits exceed a bitfield of '
+                             f'{bitfield.dtype.itemsize:d} bytes')
+        n_samples = len(bitfield)
+        packed = np.zeros((len(bit_names), n_samples // 8 + 1), dtype=np.uint8)
+        for bit in range(len(bit_names)):
+            packed[bit, :(n_samples + 7) // 8] = np.packbits(
+                np.bitwise_and(bitfield, 1 << bit) > 0)
+        return cls(packed, bit_names, n_samples)
+
+    @property
+    def fields(self) -> List[str]:
+        """
+        :return: the names of the flags
+        """
+        return list(self._rows)
+
+    @property
+    def n_samples(self) -> int:
+        """
+        :return: the number of samples per flag
+        """
+        return self._n_samples
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: the size of the packed flags in bytes
+        """
+        return self._packed.nbytes
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_flag(self, field: str) -> np.ndarray:
+        """
+        :param field:
+        :return: the unpacked active samples of a flag
+        """
+        return np.unpackbits(self._packed[self._rows[field]])[:self._n_samples].view(np.bool_)
+
+    def any(self, fields: Optional[Iterable[str]] = None) -> bool:
+        """
+        :param fields: the flags to test, all flags if not specified
+        :return: whether any sample of any of the flags is active
+        """
+        if fields is None:
+            return bool(self._packed.any())
+        return any(self._packed[self._rows[field]].any() for field in fields)
+
+    def _get_range(self, selection: slice) -> range:
+        """
+        :param selection: a slice of the samples without a step
+        :return: the range of the samples selected by the slice
+        """
+        samples = range(self._n_samples)[selection]
+        if samples.step != 1:
+            raise ValueError('FlagMatrix: only slices of consecutive samples are supported')
+        return samples
+
+    def count(self, field: str, selection: Union[slice, np.ndarray] = slice(None)) -> int:
+        """
+        :param field:
+        :param selection: a slice or the indices of the selected samples
+        :return: the number of active samples of the selection
+        """
+        if not isinstance(selection, slice):
+            return int(np.count_nonzero(self.get_flag(field)[selection]))
+
+        samples = self._get_range(selection)
+        if len(samples) == 0:
+            return 0
+
+        row = self._packed[self._rows[field]]
+        start, stop = samples.start, samples.stop
+        # the popcounts of the bytes before the byte of the stop sample, corrected by the bits
+        # before the start sample and the bits of the byte of the stop sample
+        return int(np.sum(_POPCOUNT[row[start >> 3:stop >> 3]], dtype=np.int64)) + \
+            int(_PREFIX_POPCOUNT[row[stop >> 3], stop & 7]) - \
+            int(_PREFIX_POPCOUNT[row[start >> 3], start & 7])
+
+    def get_prefix_counts(
+            self, field: str, selection: Union[slice, np.ndarray] = slice(None)) -> np.ndarray:
+        """
+        the number of active samples of the selection before every selected sample and in total,
+        i.e. the prefix sums of the selected samples starting with zero. The number of active
+        samples of the windows of window_len samples is
+        prefix_counts[window_len:] - prefix_counts[:-window_len].
+        :param field:
+        :param selection: a slice or the indices of the selected samples
+        :return: the n_selected + 1 prefix counts
+        """
+        count_dtype = np.int32 if self._n_samples < 2**31 else np.int64
+
+        if not isinstance(selection, slice):
+            selected_flag = self.get_flag(field)[selection]
+            prefix_counts = np.zeros(len(selected_flag) + 1, dtype=count_dtype)
+            np.cumsum(selected_flag, dtype=count_dtype, out=prefix_counts[1:])
+            return prefix_counts
+
+        samples = self._get_range(selection)
+        start, stop = samples.start, max(samples.start, samples.stop)
+        # the bytes of the samples start to stop, the row is padded such that there is a byte
+        # for the stop sample
+        row_bytes = self._packed[self._rows[field], start >> 3:(stop >> 3) + 1]
+
+        # the rank of every bit: the popcounts of all previous bytes plus the set bits before the
+        # bit within its byte
+        byte_ranks = np.zeros(len(row_bytes), dtype=count_dtype)
+        np.cumsum(_POPCOUNT[row_bytes[:-1]], dtype=count_dtype, out=byte_ranks[1:])
+        ranks = (byte_ranks[:, None] + _PREFIX_POPCOUNT[row_bytes, :8]).reshape(-1)
+
+        offset = start & 7
+        ranks -= ranks[offset]
+        return ranks[offset:offset + stop - start + 1]
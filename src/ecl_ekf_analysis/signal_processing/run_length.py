@@ -0,0 +1,172 @@
+# /usr/bin/env python3
+"""
+run length encoding of flags: the runs of consecutive active samples of boolean series, e.g. the
+airtimes of the land detector, the phases of a range finder above a min ground distance or the
+phases of the estimator_status_flags. The runs are found from the changes of the padded flag in a
+single vectorized pass and are kept as index arrays.
+- find_runs: the runs of a single flag.
+- find_runs_of_columns / find_runs_of_fields: the runs of many flags at once, e.g. all flags of
+  the estimator_status_flags.
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# the number of padded samples of the blocks of flags processed at once, 1 MB of flags
+_BLOCK_SIZE = 2**20
+
+
+class FlagRuns():
+    """
+    the runs of consecutive active samples of a flag: the index of the first sample of every run
+    and the index after its last sample.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray) -> None:
+        """
+        :param starts: the index of the first sample per run
+        :param ends: the index after the last sample per run
+        """
+        self._starts = starts
+        self._ends = ends
+
+    @property
+    def starts(self) -> np.ndarray:
+        """
+        :return: the index of the first sample per run
+        """
+        return self._starts
+
+    @property
+    def ends(self) -> np.ndarray:
+        """
+        :return: the index after the last sample per run, i.e. the sample at which the flag
+        changes back. equal to the number of samples for a run that lasts until the end.
+        """
+        return self._ends
+
+    @property
+    def last_indices(self) -> np.ndarray:
+        """
+        :return: the index of the last sample per run
+        """
+        return self._ends - 1
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """
+        :return: the number of samples per run
+        """
+        return self._ends - self._starts
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def get_start_times(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        :param timestamps: the timestamps of the samples of the flag
+        :return: the timestamp of the first sample per run
+        """
+        return timestamps[self._starts]
+
+    def get_end_times(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        :param timestamps: the timestamps of the samples of the flag
+        :return: the timestamp at which the flag changes back per run, the last timestamp for a
+        run that lasts until the end.
+        """
+        return timestamps[np.minimum(self._ends, len(timestamps) - 1)]
+
+    def get_durations(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        :param timestamps: the timestamps of the samples of the flag
+        :return: the duration per run, see get_start_times and get_end_times
+        """
+        return self.get_end_times(timestamps) - self.get_start_times(timestamps)
+
+
+def _set_active(out: np.ndarray, flag: np.ndarray) -> None:
+    """
+    sets the active samples (> 0) of a flag, boolean flags are copied as they are.
+    :param out:
+    :param flag:
+    :return:
+    """
+    if flag.dtype == np.bool_:
+        out[...] = flag
+    else:
+        np.greater(flag, 0, out=out)
+
+
+def _find_runs_of_padded_flags(padded_flags: np.ndarray) -> List[FlagRuns]:
+    """
+    :param padded_flags: the (n_flags, n_samples + 2) active samples of the flags, padded with
+    an inactive sample at both ends, such that every run starts and ends with a change.
+    :return: the runs per flag
+    """
+    # the changes of all flags in a single pass over the flattened flags. The padding separates
+    # the flags, hence there is no change between the last sample of a flag and the next flag.
+    n_padded_samples = padded_flags.shape[1]
+    flat_flags = padded_flags.reshape(-1)
+    changes = np.flatnonzero(flat_flags[1:] != flat_flags[:-1])
+    flag_indices = changes[0::2] // n_padded_samples
+    offsets = flag_indices * n_padded_samples
+    starts, ends = changes[0::2] - offsets, changes[1::2] - offsets
+    bounds = np.searchsorted(flag_indices, np.arange(len(padded_flags) + 1))
+
+    return [FlagRuns(starts[first:last], ends[first:last])
+            for first, last in zip(bounds[:-1], bounds[1:])]
+
+
+def find_runs(flag: np.ndarray) -> FlagRuns:
+    """
+    :param flag: a boolean or integer series, samples > 0 are active.
+    :return: the runs of consecutive active samples
+    """
+    padded_flag = np.zeros((1, len(flag) + 2), dtype=bool)
+    _set_active(padded_flag[0, 1:-1], np.asarray(flag))
+    return _find_runs_of_padded_flags(padded_flag)[0]
+
+
+def _find_runs_of_flags(flags: Sequence[np.ndarray], block_size: int) -> List[FlagRuns]:
+    """
+    finds the runs of many flags of the same length at once. The flags are padded into blocks of
+    at most block_size samples (but at least one flag), such that a block stays in the cache
+    while its changes are found.
+    :param flags:
+    :param block_size: the number of padded samples of a block
+    :return: the runs per flag
+    """
+    n_samples = len(flags[0]) if flags else 0
+    n_block_flags = max(1, block_size // (n_samples + 2))
+    padded_flags = np.zeros((min(n_block_flags, len(flags)), n_samples + 2), dtype=bool)
+
+    runs = []
+    for block_start in range(0, len(flags), n_block_flags):
+        block_flags = flags[block_start:block_start + n_block_flags]
+        for i, flag in enumerate(block_flags):
+            _set_active(padded_flags[i, 1:-1], flag)
+        runs.extend(_find_runs_of_padded_flags(padded_flags[:len(block_flags)]))
+
+    return runs
+
+
+def find_runs_of_columns(flags: np.ndarray, block_size: int = _BLOCK_SIZE) -> List[FlagRuns]:
+    """
+    :param flags: the (n_samples, n_flags) block of the flags, samples > 0 are active.
+    :param block_size: the number of padded samples processed at once
+    :return: the runs of consecutive active samples per flag (column)
+    """
+    return _find_runs_of_flags([flags[:, i] for i in range(flags.shape[1])], block_size)
+
+
+def find_runs_of_fields(
+        data: Dict[str, np.ndarray], fields: Sequence[str],
+        block_size: int = _BLOCK_SIZE) -> Dict[str, FlagRuns]:
+    """
+    :param data: the data of a dataset, e.g. of the estimator_status_flags
+    :param fields: the flag fields, e.g. ['cs_gps', 'fs_bad_mag_x', 'reject_hor_vel']
+    :param block_size: the number of padded samples processed at once
+    :return: the runs of consecutive active samples by field
+    """
+    return dict(zip(fields, _find_runs_of_flags([data[field] for field in fields], block_size)))
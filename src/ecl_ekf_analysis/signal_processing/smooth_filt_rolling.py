@@ -3,9 +3,14 @@
 This library contains helper functions for smoothing, filtering and applying functions to rolling
 windows.
 
-- For applying any function over a rolling window: use apply_rolling_run_1d_boundaries.
+- For applying any function over a rolling window: use apply_rolling_run_1d_boundaries. The mean,
+  max, min, median, std and percentiles (np.mean, np.amax, np.amin, np.median, np.std and
+  functools.partial(np.percentile, q=...)) are computed by vectorized rolling reductions, any other
+  function is applied window by window.
 - For smoothing use:
-    - smooth_1d_boundaries: for a simple fast average smoother
+    - smooth_1d_boundaries: for a simple fast average smoother. The flat window is computed from
+      prefix sums in O(n), independent of the window length.
+    - moving_average_columns: for the flat window of all channels of a 2d block at once.
     - scipy.signal.savgol_filter: for a polynomial filter
 - For filtering:
     - for low-pass use:
@@ -16,11 +21,17 @@ windows.
         signal_high = scipy.signal.filtfilt(b, a, input_signal, padlen=padlen)
     use lfilter instead of filtfilt for realtime streaming processing (filtfilt works for offline
     post-processing without phase-shift)
+
+scipy is only imported by the functions using it, as importing scipy.signal takes several times
+longer than the remaining imports of the analysis.
 """
-from typing import Callable
+import functools
+from typing import Callable, Optional
 
 import numpy as np
-from scipy.signal import butter, filtfilt
+
+# the maximum number of samples of the rolling windows reduced at once by the chunked reductions
+_MAX_CHUNK_SAMPLES = 2 ** 22
 
 
 def butter_filter_1d(
@@ -38,6 +49,8 @@ def butter_filter_1d(
     :param btype: one of low, high, bandpass, bandstop
     :return:
     """
+    from scipy.signal import butter, filtfilt  # pylint: disable=import-outside-toplevel
+
     nyq_freq = 0.5 * sample_rate
     normalized_cutoff = cut_off / nyq_freq
     b, a = butter(order, normalized_cutoff, btype=btype)
@@ -120,8 +133,9 @@ def smooth_1d_boundaries(
 
     # moving average
     if window_type == 'flat':
-        c_filter = np.ones(window_len, dtype='float32')
-    elif window_type == 'hanning':
+        return moving_average_1d_boundaries(input_signal, window_len, mode=mode)
+
+    if window_type == 'hanning':
         c_filter = np.hanning(window_len)
     elif window_type == 'hamming':
         c_filter = np.hamming(window_len)
@@ -139,6 +153,85 @@ def smooth_1d_boundaries(
     return filtered_signal
 
 
+def windowed_sum_1d(input_signal: np.ndarray, window_len: int) -> np.ndarray:
+    """
+    calculates the sums of all windows of window_len samples that lie completely within the
+    signal ('valid' mode) as differences of the prefix sums of the signal in O(n). The sums are
+    exact for boolean and integer signals and computed in double precision otherwise.
+    :param input_signal: the 1d input signal.
+    :param window_len: window length in number of samples.
+    :return: the window sums.
+    """
+    sum_dtype = np.int64 if input_signal.dtype.kind in 'biu' else np.float64
+    prefix_sum = np.zeros(input_signal.shape[0] + 1, dtype=sum_dtype)
+    np.cumsum(input_signal, dtype=sum_dtype, out=prefix_sum[1:])
+    return prefix_sum[window_len:] - prefix_sum[:-window_len]
+
+
+def moving_average_1d_boundaries(
+        input_signal: np.ndarray,
+        window_len: int = 51,
+        mode: str = 'valid') -> np.ndarray:
+    """
+    a moving average with a flat window of window_len samples computed from prefix sums. This is
+    equivalent to convolving the signal with a flat window (see smooth_1d_boundaries), but takes
+    O(n) instead of O(n * window_len).
+    :param input_signal: the 1d input signal.
+    :param window_len: window length in number of samples. needs to be odd.
+    :param mode: 'valid', 'same' or 'mirror', see smooth_1d_boundaries.
+    :return: the resulting 1d output signal in the precision of the convolution.
+    """
+    half_window_len = int(window_len / 2)
+    if mode == 'mirror':
+        extended_signal = np.concatenate(
+            (input_signal[half_window_len:0:-1], input_signal,
+             input_signal[-2:-half_window_len - 2:-1]))
+    elif mode == 'same':
+        extended_signal = np.concatenate(
+            (np.zeros(half_window_len, dtype=input_signal.dtype), input_signal,
+             np.zeros(half_window_len, dtype=input_signal.dtype)))
+    elif mode == 'valid':
+        extended_signal = input_signal
+    else:
+        raise NotImplementedError(f'mode {mode:s} not implemented')
+
+    # the weight of the normalized float32 convolution filter
+    weight = float(np.float32(1.0) / np.float32(window_len))
+    filtered_signal = weight * windowed_sum_1d(extended_signal, window_len)
+
+    return filtered_signal.astype(np.result_type(input_signal.dtype, np.float32), copy=False)
+
+
+def moving_average_columns(input_block: np.ndarray, window_len: int = 51) -> np.ndarray:
+    """
+    the moving averages with a flat window of window_len samples of all columns of a 2d block.
+    Equal to moving_average_1d_boundaries of every column in 'valid' mode, but the prefix sum and
+    window sum buffers are allocated once for all columns and the averages are written directly
+    into the output block.
+    :param input_block: the (n_samples, n_channels) input block. preferably in Fortran order, i.e.
+    with contiguous columns.
+    :param window_len: window length in number of samples. needs to be odd.
+    :return: the (n_samples - window_len + 1, n_channels) output block in Fortran order, i.e.
+    every channel is contiguous.
+    """
+    n_samples, n_channels = input_block.shape
+    sum_dtype = np.int64 if input_block.dtype.kind in 'biu' else np.float64
+    prefix_sum = np.zeros(n_samples + 1, dtype=sum_dtype)
+    windowed_sum = np.empty(n_samples - window_len + 1, dtype=sum_dtype)
+    filtered_block = np.empty(
+        (n_samples - window_len + 1, n_channels),
+        dtype=np.result_type(input_block.dtype, np.float32), order='F')
+
+    # the weight of the normalized float32 convolution filter
+    weight = float(np.float32(1.0) / np.float32(window_len))
+    for channel in range(n_channels):
+        np.cumsum(input_block[:, channel], dtype=sum_dtype, out=prefix_sum[1:])
+        np.subtract(prefix_sum[window_len:], prefix_sum[:-window_len], out=windowed_sum)
+        np.multiply(windowed_sum, weight, out=filtered_block[:, channel], casting='same_kind')
+
+    return filtered_block
+
+
 def convolve_1d_boundaries(
         input_signal: np.ndarray,
         inp_filter: np.ndarray,
@@ -174,13 +267,113 @@ def rolling_window_1d(a: np.ndarray, window_len: int) -> np.ndarray:
     return np.lib.stride_tricks.as_strided(a, shape=shape, strides=strides)
 
 
+def _chunked_rolling_reduction_1d(
+        input_signal: np.ndarray, reduction: Callable, window_len: int,
+        stepsize: int) -> np.ndarray:
+    """
+    applies a numpy reduction along the window axis of the rolling windows, in chunks of windows
+    to bound the memory of reductions that copy their input (e.g. np.median).
+    :param input_signal:
+    :param reduction: a reduction with an axis argument
+    :param window_len:
+    :param stepsize:
+    :return:
+    """
+    signal_windows = rolling_window_1d(input_signal, window_len)[::stepsize, :]
+    chunk_len = max(1, _MAX_CHUNK_SAMPLES // window_len)
+    return np.concatenate([
+        reduction(signal_windows[start:start + chunk_len], axis=1)
+        for start in range(0, signal_windows.shape[0], chunk_len)])
+
+
+def _rolling_mean_1d(input_signal: np.ndarray, window_len: int, stepsize: int) -> np.ndarray:
+    """
+    :param input_signal:
+    :param window_len:
+    :param stepsize:
+    :return:
+    """
+    return (windowed_sum_1d(input_signal, window_len) / window_len)[::stepsize]
+
+
+def _rolling_max_1d(input_signal: np.ndarray, window_len: int, stepsize: int) -> np.ndarray:
+    """
+    :param input_signal:
+    :param window_len:
+    :param stepsize:
+    :return:
+    """
+    from scipy.ndimage import maximum_filter1d  # pylint: disable=import-outside-toplevel
+
+    half_window_len = int(window_len / 2)
+    return maximum_filter1d(input_signal, window_len)[
+        half_window_len:input_signal.shape[0] - half_window_len:stepsize]
+
+
+def _rolling_min_1d(input_signal: np.ndarray, window_len: int, stepsize: int) -> np.ndarray:
+    """
+    :param input_signal:
+    :param window_len:
+    :param stepsize:
+    :return:
+    """
+    from scipy.ndimage import minimum_filter1d  # pylint: disable=import-outside-toplevel
+
+    half_window_len = int(window_len / 2)
+    return minimum_filter1d(input_signal, window_len)[
+        half_window_len:input_signal.shape[0] - half_window_len:stepsize]
+
+
+def _rolling_percentile_1d(
+        input_signal: np.ndarray, window_len: int, stepsize: int, q: float) -> np.ndarray:
+    """
+    :param input_signal:
+    :param window_len:
+    :param stepsize:
+    :param q: the percentile
+    :return:
+    """
+    return _chunked_rolling_reduction_1d(
+        input_signal, functools.partial(np.percentile, q=q), window_len, stepsize)
+
+
+_ROLLING_REDUCTIONS = {
+    np.mean: _rolling_mean_1d,
+    np.amax: _rolling_max_1d,
+    np.max: _rolling_max_1d,
+    np.amin: _rolling_min_1d,
+    np.min: _rolling_min_1d,
+    np.median: functools.partial(_chunked_rolling_reduction_1d, reduction=np.median),
+    np.std: functools.partial(_chunked_rolling_reduction_1d, reduction=np.std),
+}
+
+
+def get_rolling_reduction_1d(fun: Callable) -> Optional[Callable]:
+    """
+    returns the vectorized rolling reduction of a function, if there is one.
+    :param fun: np.mean, np.amax, np.amin, np.median, np.std or
+        functools.partial(np.percentile, q=...)
+    :return: a function (input_signal, window_len, stepsize) -> filtered signal or None
+    """
+    if isinstance(fun, functools.partial) and fun.func is np.percentile and not fun.args and \
+            set(fun.keywords) == {'q'} and np.ndim(fun.keywords['q']) == 0:
+        return functools.partial(_rolling_percentile_1d, q=fun.keywords['q'])
+
+    try:
+        return _ROLLING_REDUCTIONS.get(fun)
+    except TypeError:
+        # unhashable callable
+        return None
+
+
 def apply_rolling_fun_1d(
         input_signal: np.ndarray,
         fun: Callable,
         window_len,
         stepsize: int = 1) -> np.ndarray:
     """
-    apply's a rolling function to 1d signals.
+    apply's a rolling function to 1d signals. Common reductions are vectorized, see
+    get_rolling_reduction_1d. Other functions are applied window by window.
     :param input_signal:
     :param fun:
     :param window_len:
@@ -191,10 +384,20 @@ def apply_rolling_fun_1d(
         raise ValueError("window length needs to be odd")
 
     if input_signal.shape[0] < window_len:
-        filtered_signal = fun(input_signal)
-    else:
-        signal_windows = rolling_window_1d(
-            input_signal, window_len)[::stepsize, :]
-        filtered_signal = np.apply_along_axis(fun, 1, signal_windows)
+        return fun(input_signal)
+
+    rolling_reduction = get_rolling_reduction_1d(fun)
+    # nans propagate differently through the vectorized reductions
+    if rolling_reduction is not None and input_signal.ndim == 1 and not (
+            input_signal.dtype.kind == 'f' and np.isnan(input_signal).any()):
+        filtered_signal = rolling_reduction(
+            input_signal, window_len=window_len, stepsize=stepsize)
+        # the type of the function applied to a single window
+        return filtered_signal.astype(
+            np.asarray(fun(input_signal[:window_len])).dtype, copy=False)
+
+    signal_windows = rolling_window_1d(
+        input_signal, window_len)[::stepsize, :]
+    filtered_signal = np.apply_along_axis(fun, 1, signal_windows)
 
     return filtered_signal
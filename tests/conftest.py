@@ -0,0 +1,70 @@
+#! /usr/bin/env python3
+"""
+The synthetic log fixtures shared between the tests. The log of a test module is written once
+with the keyword arguments of write_synthetic_ulog given by synthetic_log_options, which a test
+module overrides (and may parametrize) to test another log, e.g.
+
+@pytest.fixture(scope="module", params=[False, True], ids=['current_format', 'legacy_format'])
+def synthetic_log_options(request):
+    return {'duration_s': 60.0, 'legacy_format': request.param}
+"""
+import os
+
+import pytest
+from pyulog import ULog
+
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+@pytest.fixture(scope="module")
+def synthetic_log_options():
+    """
+    the options of the synthetic log of a test module, a log of 60 s with a single flight.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 60.0}
+
+
+@pytest.fixture(scope="module")
+def synthetic_log_file(synthetic_log_options, tmp_path_factory):
+    """
+    a synthetic log file written with the synthetic_log_options.
+    :return: the file name
+    """
+    filename = str(tmp_path_factory.mktemp('logs') / 'synthetic.ulg')
+    write_synthetic_ulog(filename, **synthetic_log_options)
+    return filename
+
+
+@pytest.fixture(scope="module")
+def synthetic_ulog(synthetic_log_file):
+    """
+    the parsed synthetic log file.
+    :return: the parsed log
+    """
+    return ULog(synthetic_log_file)
+
+
+@pytest.fixture(scope="module")
+def analysed_log(synthetic_log_file):
+    """
+    the analysed synthetic log file, without writing a results file.
+    :return: the log file and the results of the analysis
+    """
+    return synthetic_log_file, process_logdata_ekf(synthetic_log_file, write_json=False)
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """
+    a directory with two synthetic log files and an invalid log file in a subdirectory.
+    :return: the directory
+    """
+    os.makedirs(str(tmp_path / 'logs' / 'sub'))
+    for seed in range(2):
+        write_synthetic_ulog(str(tmp_path / 'logs' / f'synthetic_{seed:d}.ulg'),
+                             duration_s=20.0, seed=seed)
+    with open(str(tmp_path / 'logs' / 'sub' / 'broken.ulg'), 'wb') as file:
+        file.write(b'not a ulog file')
+    return str(tmp_path / 'logs')
@@ -0,0 +1,321 @@
+#! /usr/bin/env python3
+"""
+Writes synthetic PX4 ULog files for testing and benchmarking. The files contain the estimator
+topics used by the ecl checks with reproducible random content, so the analysis can be run
+without the (large) flight logs.
+"""
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_HEADER_BYTES = b'\x55\x4c\x6f\x67\x01\x12\x35'
+
+_NUMPY_TYPES = {
+    'int8_t': '<i1',
+    'uint8_t': '<u1',
+    'int16_t': '<i2',
+    'uint16_t': '<u2',
+    'int32_t': '<i4',
+    'uint32_t': '<u4',
+    'int64_t': '<i8',
+    'uint64_t': '<u8',
+    'float': '<f4',
+    'double': '<f8',
+    'bool': '<u1',
+}
+
+_TEST_RATIO_FIELDS = [
+    ('float', 'gps_hvel', 2), ('float', 'gps_vvel', 0), ('float', 'gps_hpos', 2),
+    ('float', 'gps_vpos', 0), ('float', 'ev_hvel', 2), ('float', 'ev_vvel', 0),
+    ('float', 'ev_hpos', 2), ('float', 'ev_vpos', 0), ('float', 'fake_hvel', 2),
+    ('float', 'fake_vvel', 0), ('float', 'fake_hpos', 2), ('float', 'fake_vpos', 0),
+    ('float', 'rng_vpos', 0), ('float', 'baro_vpos', 0), ('float', 'aux_hvel', 2),
+    ('float', 'aux_vvel', 0), ('float', 'flow', 2), ('float', 'heading', 0),
+    ('float', 'mag_field', 3), ('float', 'drag', 2), ('float', 'airspeed', 0),
+    ('float', 'beta', 0), ('float', 'hagl', 0), ('float', 'hagl_rate', 0),
+]
+
+_LEGACY_TEST_RATIO_FIELDS = [
+    ('float', 'vel_test_ratio', 0), ('float', 'pos_test_ratio', 0),
+    ('float', 'hgt_test_ratio', 0), ('float', 'mag_test_ratio', 0),
+    ('float', 'tas_test_ratio', 0), ('float', 'hagl_test_ratio', 0),
+    ('float', 'beta_test_ratio', 0),
+]
+
+CONTROL_STATUS_FLAGS = [
+    'cs_tilt_align', 'cs_yaw_align', 'cs_gps', 'cs_opt_flow', 'cs_mag_hdg', 'cs_mag_3d',
+    'cs_mag_dec', 'cs_in_air', 'cs_wind', 'cs_baro_hgt', 'cs_rng_hgt', 'cs_gps_hgt',
+    'cs_ev_pos', 'cs_ev_yaw', 'cs_ev_hgt', 'cs_fuse_beta', 'cs_mag_field_disturbed',
+    'cs_fixed_wing', 'cs_mag_fault', 'cs_fuse_aspd', 'cs_gnd_effect', 'cs_rng_stuck',
+    'cs_gps_yaw', 'cs_mag_aligned_in_flight', 'cs_ev_vel', 'cs_synthetic_mag_z',
+]
+
+FAULT_STATUS_FLAGS = [
+    'fs_bad_mag_x', 'fs_bad_mag_y', 'fs_bad_mag_z', 'fs_bad_hdg', 'fs_bad_mag_decl',
+    'fs_bad_airspeed', 'fs_bad_sideslip', 'fs_bad_optflow_x', 'fs_bad_optflow_y',
+    'fs_bad_vel_n', 'fs_bad_vel_e', 'fs_bad_vel_d', 'fs_bad_pos_n', 'fs_bad_pos_e',
+    'fs_bad_pos_d', 'fs_bad_acc_bias', 'fs_bad_acc_vertical', 'fs_bad_acc_clipping',
+]
+
+REJECT_STATUS_FLAGS = [
+    'reject_hor_vel', 'reject_ver_vel', 'reject_hor_pos', 'reject_ver_pos', 'reject_mag_x',
+    'reject_mag_y', 'reject_mag_z', 'reject_yaw', 'reject_airspeed', 'reject_sideslip',
+    'reject_hagl', 'reject_optflow_x', 'reject_optflow_y',
+]
+
+_ACTIVE_CONTROL_STATUS_FLAGS = [
+    'cs_tilt_align', 'cs_yaw_align', 'cs_gps', 'cs_mag_3d', 'cs_baro_hgt', 'cs_gps_hgt',
+]
+
+
+class SyntheticTopic():
+    """
+    a topic description: the field definitions (type, name, array size) and the data per
+    (flattened) field name.
+    """
+
+    def __init__(
+            self, name: str, fields: List[Tuple[str, str, int]], data: Dict[str, np.ndarray],
+            multi_id: int = 0) -> None:
+        self.name = name
+        self.fields = [('uint64_t', 'timestamp', 0)] + fields
+        self.data = data
+        self.multi_id = multi_id
+
+    @property
+    def format_string(self) -> str:
+        """
+        :return: the ulog format definition of the topic
+        """
+        field_strings = [
+            f'{field_type:s}[{array_size:d}] {field_name:s};' if array_size > 0 else
+            f'{field_type:s} {field_name:s};' for field_type, field_name, array_size in self.fields]
+        return f'{self.name:s}:' + ''.join(field_strings)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        :return: the packed numpy record type of a data message payload
+        """
+        dtype_list = []
+        for field_type, field_name, array_size in self.fields:
+            if array_size > 0:
+                dtype_list.extend([(f'{field_name:s}[{i:d}]', _NUMPY_TYPES[field_type])
+                                   for i in range(array_size)])
+            else:
+                dtype_list.append((field_name, _NUMPY_TYPES[field_type]))
+        return np.dtype(dtype_list)
+
+    def records(self) -> np.ndarray:
+        """
+        :return: the data of the topic as packed records
+        """
+        timestamps = self.data['timestamp']
+        records = np.zeros(len(timestamps), dtype=self.dtype)
+        for field_name in self.dtype.names:
+            if field_name in self.data:
+                records[field_name] = self.data[field_name]
+        return records
+
+
+def _message(msg_type: str, payload: bytes) -> bytes:
+    """
+    :return: a ulog message with header
+    """
+    return struct.pack('<HB', len(payload), ord(msg_type)) + payload
+
+
+def write_ulog(filename: str, topics: List[SyntheticTopic], start_timestamp: int = 0,
+               block_duration_us: int = 1000000) -> None:
+    """
+    writes the topics into a ULog file. The data messages are written in blocks of
+    block_duration_us, topic after topic, to interleave the topics as in real logs.
+    :param filename:
+    :param topics:
+    :param start_timestamp:
+    :param block_duration_us:
+    :return:
+    """
+    with open(filename, 'wb') as file:
+        file.write(_HEADER_BYTES + struct.pack('<BQ', 1, start_timestamp))
+        file.write(_message('B', bytes(16) + bytes(24)))
+        formats = {topic.name: topic.format_string for topic in topics}
+        for format_string in formats.values():
+            file.write(_message('F', format_string.encode('ascii')))
+        key = b'char[3] ver_sw'
+        file.write(_message('I', struct.pack('<B', len(key)) + key + b'sim'))
+
+        packed = []
+        for msg_id, topic in enumerate(topics):
+            file.write(_message(
+                'A', struct.pack('<BH', topic.multi_id, msg_id) + topic.name.encode('ascii')))
+            records = topic.records()
+            message_type = np.dtype([('msg_size', '<u2'), ('msg_type', 'u1'),
+                                     ('msg_id', '<u2'), ('payload', records.dtype)])
+            messages = np.zeros(len(records), dtype=message_type)
+            messages['msg_size'] = 2 + records.dtype.itemsize
+            messages['msg_type'] = ord('D')
+            messages['msg_id'] = msg_id
+            messages['payload'] = records
+            packed.append((records['timestamp'], messages))
+
+        last_timestamp = max(
+            [int(timestamps[-1]) for timestamps, _ in packed if len(timestamps) > 0],
+            default=start_timestamp)
+        for block_start in range(start_timestamp, last_timestamp + 1, block_duration_us):
+            for timestamps, messages in packed:
+                lower, upper = np.searchsorted(
+                    timestamps, [block_start, block_start + block_duration_us])
+                file.write(messages[lower:upper].tobytes())
+
+
+def _landed_pattern(
+        timestamps_s: np.ndarray, flights: List[Tuple[float, float]]) -> np.ndarray:
+    """
+    :return: the landed flag for a list of (take off, landing) times in seconds.
+    """
+    landed = np.ones(len(timestamps_s), dtype=np.uint8)
+    for take_off, landing in flights:
+        landed[(timestamps_s >= take_off) & (timestamps_s < landing)] = 0
+    return landed
+
+
+def _test_ratios(rng: np.random.RandomState, n_samples: int, scale: float = 0.3) -> np.ndarray:
+    """
+    :return: a test ratio signal with some excursions above the amber and red thresholds.
+    """
+    signal = rng.gamma(2.0, scale / 2.0, n_samples)
+    n_bursts = max(1, n_samples // 5000)
+    for start in rng.randint(0, max(1, n_samples - 200), n_bursts):
+        signal[start:start + rng.randint(20, 200)] += rng.uniform(0.5, 2.0)
+    return signal.astype(np.float32)
+
+
+def _reject_flags(rng: np.random.RandomState, n_samples: int, n_toggles: int) -> np.ndarray:
+    """
+    :return: a boolean flag signal with n_toggles short activations
+    """
+    flag = np.zeros(n_samples, dtype=np.uint8)
+    for start in rng.randint(0, max(1, n_samples - 50), n_toggles):
+        flag[start:start + rng.randint(1, 50)] = 1
+    return flag
+
+
+def create_synthetic_topics(
+        duration_s: float = 120.0, rate_hz: float = 100.0,
+        flights: Optional[List[Tuple[float, float]]] = None, n_estimator_instances: int = 1,
+        legacy_format: bool = False, n_flag_toggles: int = 20, seed: int = 0,
+        start_timestamp: int = 1000000) -> List[SyntheticTopic]:
+    """
+    creates the estimator topics of a synthetic log.
+    :param duration_s: the log duration in seconds
+    :param rate_hz: the rate of the estimator topics
+    :param flights: a list of (take off, landing) times in seconds after log start. default:
+    a single flight from 10 % to 90 % of the log duration.
+    :param n_estimator_instances: the number of estimator instances (multi ids)
+    :param legacy_format: write the legacy ekf2_innovations log format without
+    estimator_innovation_test_ratios
+    :param n_flag_toggles: the number of innovation rejections per reject flag
+    :param seed: the random seed
+    :param start_timestamp: the log start timestamp in microseconds
+    :return:
+    """
+    rng = np.random.RandomState(seed)
+    if flights is None:
+        flights = [(0.1 * duration_s, 0.9 * duration_s)]
+
+    n_samples = int(duration_s * rate_hz)
+    timestamps = (start_timestamp + np.arange(n_samples) * (1.0e6 / rate_hz)).astype(np.uint64)
+    land_timestamps = (start_timestamp + np.arange(int(duration_s * 10.0)) * 1.0e5).astype(
+        np.uint64)
+
+    topics = [SyntheticTopic(
+        'vehicle_land_detected', [('bool', 'landed', 0), ('bool', 'maybe_landed', 0)],
+        {'timestamp': land_timestamps,
+         'landed': _landed_pattern(
+             (land_timestamps - start_timestamp) / 1.0e6, flights)})]
+
+    for instance in range(n_estimator_instances):
+        estimator_status = {
+            'timestamp': timestamps,
+            'vibe[0]': rng.gamma(2.0, 1e-5, n_samples).astype(np.float32),
+            'vibe[1]': rng.gamma(2.0, 2e-3, n_samples).astype(np.float32),
+            'vibe[2]': rng.gamma(2.0, 2e-2, n_samples).astype(np.float32),
+        }
+        for i in range(3):
+            estimator_status[f'output_tracking_error[{i:d}]'] = \
+                rng.gamma(2.0, 1e-3 * (i + 1), n_samples).astype(np.float32)
+        status_fields = [('float', 'vibe', 3), ('float', 'output_tracking_error', 3)]
+        if legacy_format:
+            for _, field_name, _ in _LEGACY_TEST_RATIO_FIELDS:
+                estimator_status[field_name] = _test_ratios(rng, n_samples)
+            status_fields += _LEGACY_TEST_RATIO_FIELDS
+        topics.append(SyntheticTopic(
+            'estimator_status', status_fields, estimator_status, multi_id=instance))
+
+        flags = {'timestamp': timestamps}
+        for flag in _ACTIVE_CONTROL_STATUS_FLAGS:
+            flags[flag] = np.ones(n_samples, dtype=np.uint8)
+        for flag in REJECT_STATUS_FLAGS:
+            flags[flag] = _reject_flags(rng, n_samples, n_flag_toggles)
+        topics.append(SyntheticTopic(
+            'estimator_status_flags',
+            [('bool', flag, 0) for flag in
+             CONTROL_STATUS_FLAGS + FAULT_STATUS_FLAGS + REJECT_STATUS_FLAGS], flags,
+            multi_id=instance))
+
+        bias = {'timestamp': timestamps}
+        for i in range(3):
+            bias[f'gyro_bias[{i:d}]'] = (1e-3 * rng.randn() + np.cumsum(
+                rng.randn(n_samples)) * 1e-6).astype(np.float32)
+            bias[f'accel_bias[{i:d}]'] = (1e-2 * rng.randn() + np.cumsum(
+                rng.randn(n_samples)) * 1e-5).astype(np.float32)
+        topics.append(SyntheticTopic(
+            'estimator_sensor_bias', [('float', 'gyro_bias', 3), ('float', 'accel_bias', 3)],
+            bias, multi_id=instance))
+
+        if legacy_format:
+            innovations = {'timestamp': timestamps}
+            for i in range(3):
+                innovations[f'output_tracking_error[{i:d}]'] = \
+                    estimator_status[f'output_tracking_error[{i:d}]']
+            topics.append(SyntheticTopic(
+                'ekf2_innovations', [('float', 'output_tracking_error', 3),
+                                     ('float', 'mag_innov', 3), ('float', 'mag_innov_var', 3)],
+                innovations, multi_id=instance))
+        else:
+            test_ratios = {'timestamp': timestamps}
+            for _, field_name, array_size in _TEST_RATIO_FIELDS:
+                if array_size > 0:
+                    for i in range(array_size):
+                        test_ratios[f'{field_name:s}[{i:d}]'] = _test_ratios(rng, n_samples)
+                else:
+                    test_ratios[field_name] = _test_ratios(rng, n_samples)
+            test_ratios['airspeed'] = np.zeros(n_samples, dtype=np.float32)
+            test_ratios['beta'] = np.zeros(n_samples, dtype=np.float32)
+            test_ratios['hagl'] = np.zeros(n_samples, dtype=np.float32)
+            for name in ['estimator_innovations', 'estimator_innovation_variances',
+                         'estimator_innovation_test_ratios']:
+                topics.append(SyntheticTopic(
+                    name, _TEST_RATIO_FIELDS,
+                    test_ratios if name == 'estimator_innovation_test_ratios'
+                    else {'timestamp': timestamps}, multi_id=instance))
+
+    sensor_combined = {'timestamp': (start_timestamp + np.arange(
+        int(duration_s * 4 * rate_hz)) * (1.0e6 / (4 * rate_hz))).astype(np.uint64)}
+    topics.append(SyntheticTopic(
+        'sensor_combined', [('float', 'gyro_rad', 3), ('float', 'accelerometer_m_s2', 3)],
+        sensor_combined))
+
+    return topics
+
+
+def write_synthetic_ulog(filename: str, **kwargs) -> None:
+    """
+    writes a synthetic log file, see create_synthetic_topics for the arguments.
+    :param filename:
+    :return:
+    """
+    start_timestamp = kwargs.get('start_timestamp', 1000000)
+    write_ulog(filename, create_synthetic_topics(**kwargs), start_timestamp=start_timestamp)
@@ -0,0 +1,126 @@
+#! /usr/bin/env python3
+"""
+Testing the ecl ekf metrics calculation.
+"""
+import numpy as np
+import pytest
+
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
+from ecl_ekf_analysis.log_processing.analysis import calculate_stat_from_signal, \
+    calculate_windowed_mean_per_airphase, calculate_test_ratio_statistics, \
+    calculate_multi_channel_statistics, calculate_flag_percentage, \
+    calculate_windowed_flag_percentages_per_airphase
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
+
+
+@pytest.fixture(scope="module")
+def synthetic_log_options():
+    """
+    a synthetic log file with a long, a short and a very short flight.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 200.0, 'flights': [(5.0, 120.0), (130.0, 150.0), (160.0, 161.0)]}
+
+
+@pytest.mark.parametrize("variable", ['mag_field[0]', 'gps_hvel[1]', 'baro_vpos'])
+def test_test_ratio_statistics(synthetic_ulog, variable):
+    """
+    Test that the fused test ratio statistics equal the statistics calculated one by one.
+    """
+    in_air_detector = InAirDetector(synthetic_ulog)
+    assert len(in_air_detector.airtimes) == 3
+    dataset = 'estimator_innovation_test_ratios'
+    data = synthetic_ulog.get_dataset(dataset).data
+
+    statistics = calculate_test_ratio_statistics(
+        data, dataset, variable, in_air_detector, red_threshold=1.0, amber_threshold=0.5,
+        window_len_s=10.0)
+
+    assert statistics.red_pct == calculate_stat_from_signal(
+        data, dataset, variable, in_air_detector, lambda x: 100.0 * np.mean(x > 1.0))
+    assert statistics.amber_pct == calculate_stat_from_signal(
+        data, dataset, variable, in_air_detector, lambda x: 100.0 * np.mean(x > 0.5))
+    assert statistics.max == calculate_stat_from_signal(
+        data, dataset, variable, in_air_detector, np.amax)
+    assert statistics.mean == calculate_stat_from_signal(
+        data, dataset, variable, in_air_detector, np.mean)
+
+    for windowed, threshold in [(statistics.red_windowed, 1.0),
+                                (statistics.amber_windowed, 0.5),
+                                (statistics.windowed_mean, None)]:
+        expected_windowed = calculate_windowed_mean_per_airphase(
+            data, dataset, variable, in_air_detector, threshold=threshold, window_len_s=10.0)
+        assert len(windowed) == len(expected_windowed) == 3
+        for (airtime, metric), (expected_airtime, expected_metric) in zip(
+                windowed, expected_windowed):
+            assert airtime.take_off == expected_airtime.take_off
+            assert airtime.landing == expected_airtime.landing
+            assert np.shape(metric) == np.shape(expected_metric)
+            np.testing.assert_allclose(metric, expected_metric, rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize("dataset,variables", [
+    ('estimator_status', ['vibe[0]', 'vibe[1]', 'vibe[2]']),
+    ('estimator_sensor_bias', ['gyro_bias[0]', 'gyro_bias[1]', 'gyro_bias[2]', 'accel_bias[0]',
+                               'accel_bias[1]', 'accel_bias[2]'])])
+def test_multi_channel_statistics(synthetic_ulog, dataset, variables):
+    """
+    Test that the windowed means and statistics of several signals calculated at once equal those
+    calculated signal by signal.
+    """
+    in_air_detector = InAirDetector(synthetic_ulog, in_air_margin_seconds=0.3)
+    data = synthetic_ulog.get_dataset(dataset).data
+    stat_functions = [np.median, np.mean, np.amax]
+
+    for threshold in [None, 1e-3]:
+        windowed_means, statistics = calculate_multi_channel_statistics(
+            data, dataset, variables, in_air_detector, stat_functions, threshold=threshold,
+            window_len_s=5.0)
+        assert list(windowed_means) == variables
+        for variable in variables:
+            expected_windowed = calculate_windowed_mean_per_airphase(
+                data, dataset, variable, in_air_detector, threshold=threshold, window_len_s=5.0)
+            assert len(windowed_means[variable]) == len(expected_windowed) == 3
+            for (airtime, metric), (expected_airtime, expected_metric) in zip(
+                    windowed_means[variable], expected_windowed):
+                assert airtime.take_off == expected_airtime.take_off
+                assert airtime.landing == expected_airtime.landing
+                assert np.shape(metric) == np.shape(expected_metric)
+                np.testing.assert_array_equal(metric, expected_metric)
+
+        for stat_function, values in zip(stat_functions, statistics):
+            assert values.tolist() == [calculate_stat_from_signal(
+                data, dataset, variable, in_air_detector, stat_function)
+                                       for variable in variables]
+
+
+@pytest.mark.parametrize("variable", ['reject_hor_vel', 'reject_yaw', 'cs_gps', 'fs_bad_mag_x'])
+def test_flag_percentages(synthetic_ulog, variable):
+    """
+    Test that the in air and windowed percentages of the packed flags equal the thresholded
+    statistics of the flags.
+    """
+    in_air_detector = InAirDetector(synthetic_ulog, in_air_margin_seconds=0.3)
+    dataset = 'estimator_status_flags'
+    data = synthetic_ulog.get_dataset(dataset).data
+    flags = FlagMatrix.from_fields(data)
+
+    assert calculate_flag_percentage(flags, dataset, variable, in_air_detector) == \
+        calculate_stat_from_signal(
+            data, dataset, variable, in_air_detector, lambda x: 100.0 * np.mean(x > 0.5))
+
+    # the long window exceeds the very short flight
+    window_lens_s = [1.0, 5.0]
+    windowed_percentages = calculate_windowed_flag_percentages_per_airphase(
+        flags, dataset, variable, in_air_detector, window_lens_s)
+    assert len(windowed_percentages) == len(window_lens_s)
+    for windowed, window_len_s in zip(windowed_percentages, window_lens_s):
+        expected_windowed = calculate_windowed_mean_per_airphase(
+            data, dataset, variable, in_air_detector, threshold=0.5, window_len_s=window_len_s)
+        assert len(windowed) == len(expected_windowed) == 3
+        for (airtime, metric), (expected_airtime, expected_metric) in zip(
+                windowed, expected_windowed):
+            assert airtime.take_off == expected_airtime.take_off
+            assert airtime.landing == expected_airtime.landing
+            assert np.shape(metric) == np.shape(expected_metric)
+            np.testing.assert_array_equal(metric, expected_metric)
@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+"""
+Testing the pre-parsed configuration of the analysis.
+"""
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckStatisticType, CheckType
+from ecl_ekf_analysis.checks.check_thresholds import get_statistic_thresholds
+from ecl_ekf_analysis.config import params, thresholds
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig, default_config
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf, \
+    get_master_status_from_test_results
+
+
+def test_default_config():
+    """
+    Test that the default configuration equals the values of the params and thresholds modules.
+    """
+    config = default_config()
+    assert config == AnalysisConfig.from_ini()
+    assert config.params.ecl_red_thresh == params.ecl_red_thresh()
+    assert config.params.ecl_pos_checks_when_sensors_not_fused is \
+        params.ecl_pos_checks_when_sensors_not_fused()
+    assert config.params.warn_duration_s == params.warn_duration_s()
+    assert config.threshold('yaw_amber_warning_windowed_pct') == \
+        thresholds.ecl_amber_warning_windowed_pct('yaw')
+    assert config.threshold('yaw_amber_warning_pct') is None
+    # the default configuration is only parsed again if the .ini files are reloaded
+    assert default_config() is config
+    thresholds.reload_thresholds()
+    params.reload_params()
+    assert default_config() is not config
+    assert default_config() == config
+
+
+def test_config_overrides(tmp_path):
+    """
+    Test that the overrides create a new configuration and leave the original unchanged.
+    """
+    config = default_config()
+    new_config = config.with_overrides({
+        'params': {'ecl-analysis': {'red_thresh': '2.5',
+                                    'ecl_pos_checks_when_sensors_not_fused': 'no'}},
+        'thresholds': {'yaw_amber_warning_pct': 3}})
+    assert new_config.params.ecl_red_thresh == 2.5
+    assert new_config.params.ecl_pos_checks_when_sensors_not_fused is False
+    assert new_config.threshold('yaw_amber_warning_pct') == 3.0
+    assert config.params.ecl_red_thresh == 1.0
+    assert config.threshold('yaw_amber_warning_pct') is None
+
+    assert AnalysisConfig.from_dict(new_config.to_dict()) == new_config
+    assert pickle.loads(pickle.dumps(new_config)) == new_config
+
+    params_file = str(tmp_path / 'params.ini')
+    with open(params_file, 'w') as file:
+        file.write('[ecl-analysis]\nred_thresh = 2.5\necl_pos_checks_when_sensors_not_fused = no\n')
+    thresholds_file = str(tmp_path / 'thresholds.ini')
+    with open(thresholds_file, 'w') as file:
+        file.write('[DEFAULT]\nyaw_amber_warning_pct = 3.0\n')
+    assert AnalysisConfig.from_ini(
+        params_file=params_file, thresholds_file=thresholds_file) == new_config
+
+    with pytest.raises(ValueError):
+        config.with_overrides({'params': {'ecl-analysis': {'unknown': 1.0}}})
+    with pytest.raises(ValueError):
+        config.with_overrides({'unknown': {}})
+    with pytest.raises(ValueError, match='unknown threshold yaw_amber_warnng_pct'):
+        config.with_overrides({'thresholds': {'yaw_amber_warnng_pct': 3}})
+    # the thresholds of a thresholds file can be overridden even if the checks don't use them
+    custom_config = AnalysisConfig(config.params, {'custom_warning_pct': 1.0})
+    assert custom_config.with_overrides(
+        {'thresholds': {'custom_warning_pct': 2.0}}).threshold('custom_warning_pct') == 2.0
+    with pytest.raises(FileNotFoundError):
+        AnalysisConfig.from_ini(thresholds_file=str(tmp_path / 'missing.ini'))
+
+
+def test_statistic_thresholds_config():
+    """
+    Test that the thresholds are looked up in the given configuration.
+    """
+    config = default_config().with_overrides(
+        {'thresholds': {'magnetometer_amber_failure_pct': 20.0, 'filter_fault_flag_failure': 0.5}})
+    assert get_statistic_thresholds(
+        CheckType.MAGNETOMETER_STATUS, CheckStatisticType.INNOVATION_AMBER_PCT,
+        config=config) == (15.0, 20.0)
+    assert get_statistic_thresholds(
+        CheckType.MAGNETOMETER_STATUS, CheckStatisticType.INNOVATION_AMBER_PCT) == (15.0, 50.0)
+    assert get_statistic_thresholds(
+        CheckType.FILTER_FAULT_STATUS, CheckStatisticType.FILTER_FAULT_FLAG,
+        config=config) == (None, 0.5)
+
+
+def test_concurrent_configs(synthetic_ulog):
+    """
+    Test that logs can be analysed with different configurations concurrently.
+    """
+    strict_config = default_config().with_overrides(
+        {'thresholds': {'imu_delta_angle_bias_warning_avg': 0.0}})
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        default_results, strict_results = executor.map(
+            lambda config: analyse_logdata_ekf(synthetic_ulog, config=config),
+            [None, strict_config])
+
+    assert default_results == analyse_logdata_ekf(synthetic_ulog)
+    assert strict_results == analyse_logdata_ekf(synthetic_ulog, config=strict_config)
+    assert strict_results != default_results
+    [imu_bias_result] = [result for result in strict_results if result['type'] == 'IMU_BIAS_STATUS']
+    assert imu_bias_result['status'] == 'WARNING'
+    assert get_master_status_from_test_results(strict_results) != 'Pass'
@@ -0,0 +1,173 @@
+#! /usr/bin/env python3
+"""
+Testing the local analysis service.
+"""
+import http.client
+import threading
+import urllib.error
+from concurrent.futures import Future
+import urllib.request
+
+import pytest
+import simplejson as json
+
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf
+from ecl_ekf_analysis.serve_logdata_ekf import AnalysisServer, AnalysisService, ServiceBusyError
+
+
+@pytest.fixture(scope="module")
+def synthetic_log_options():
+    """
+    a short synthetic log file.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 20.0}
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    """
+    runs the analysis service with a single worker on a free port.
+    :return: the url of the service
+    """
+    service = AnalysisService(n_workers=1, max_queued=1)
+    service.warm_up()
+    server = AnalysisServer(('127.0.0.1', 0), service, max_upload_bytes=1 << 24, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]:d}'
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def request(url: str, data: bytes = None, content_type: str = 'application/octet-stream'):
+    """
+    :return: the status code and the decoded JSON response
+    """
+    http_request = urllib.request.Request(
+        url, data=data, headers={'Content-Type': content_type} if data is not None else {})
+    try:
+        with urllib.request.urlopen(http_request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_analyse_file_and_upload(server_url, synthetic_log_file):
+    """
+    Test that a log file and an uploaded log give the results of process_logdata_ekf.
+    """
+    expected_results = json.loads(json.dumps(
+        process_logdata_ekf(synthetic_log_file, write_json=False)))
+
+    status, results = request(
+        f'{server_url:s}/analyse', json.dumps({'filename': synthetic_log_file}).encode(),
+        content_type='application/json')
+    assert status == 200
+    assert results == expected_results
+
+    with open(synthetic_log_file, 'rb') as file:
+        status, results = request(f'{server_url:s}/analyse', file.read())
+    assert status == 200
+    assert results == expected_results
+
+    status, health = request(f'{server_url:s}/health')
+    assert status == 200
+    assert health == {'status': 'ok', 'workers': 1, 'pending': 0}
+
+
+def test_request_errors(server_url, tmp_path):
+    """
+    Test the status codes of invalid requests.
+    """
+    assert request(f'{server_url:s}/analyse', b'not a ulog file')[0] == 422
+    missing_file = json.dumps({'filename': str(tmp_path / 'missing.ulg')}).encode()
+    assert request(f'{server_url:s}/analyse', missing_file,
+                   content_type='application/json')[0] == 422
+    assert request(f'{server_url:s}/analyse', b'{}', content_type='application/json')[0] == 400
+    assert request(f'{server_url:s}/unknown')[0] == 404
+
+    # the service responds before the upload exceeding the maximum size is sent
+    connection = http.client.HTTPConnection(server_url[len('http://'):])
+    connection.putrequest('POST', '/analyse')
+    connection.putheader('Content-Length', str(1 << 25))
+    connection.endheaders()
+    assert connection.getresponse().status == 413
+    connection.close()
+
+    connection = http.client.HTTPConnection(server_url[len('http://'):])
+    connection.putrequest('POST', '/analyse')
+    connection.putheader('Content-Length', '-1')
+    connection.endheaders()
+    assert connection.getresponse().status == 400
+    connection.close()
+
+
+def test_request_timeout(synthetic_log_file, monkeypatch):
+    """
+    Test that a request without results in time fails and is removed from the queue.
+    """
+    service = AnalysisService(n_workers=1)
+    future = Future()
+    monkeypatch.setattr(service, 'submit', lambda **kwargs: future)
+    server = AnalysisServer(('127.0.0.1', 0), service, request_timeout=0.01, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        status, response = request(
+            f'http://127.0.0.1:{server.server_address[1]:d}/analyse',
+            json.dumps({'filename': synthetic_log_file}).encode(),
+            content_type='application/json')
+        assert status == 504 and 'error' in response
+        assert future.cancelled()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+
+
+def test_request_queue_limit(synthetic_log_file):
+    """
+    Test that requests are rejected once all workers are busy and the queue is full.
+    """
+    service = AnalysisService(n_workers=1, max_queued=1)
+    try:
+        futures = [service.submit(filename=synthetic_log_file) for _ in range(2)]
+        with pytest.raises(ServiceBusyError):
+            service.submit(filename=synthetic_log_file)
+        for future in futures:
+            assert future.result()
+        # the slots are released once the requests are done
+        assert service.submit(filename=synthetic_log_file).result()
+    finally:
+        service.shutdown()
+
+
+def test_config_overrides(server_url, synthetic_log_file):
+    """
+    Test that the parameters and thresholds can be overridden per request.
+    """
+    overrides = {'thresholds': {'imu_delta_angle_bias_warning_avg': 0.0}}
+    expected_results = json.loads(json.dumps(process_logdata_ekf(
+        synthetic_log_file, write_json=False, config=AnalysisConfig.from_dict(overrides))))
+
+    status, results = request(
+        f'{server_url:s}/analyse',
+        json.dumps({'filename': synthetic_log_file, 'config': overrides}).encode(),
+        content_type='application/json')
+    assert status == 200
+    assert results == expected_results
+
+    status, results = request(
+        f'{server_url:s}/analyse', json.dumps({'filename': synthetic_log_file}).encode(),
+        content_type='application/json')
+    assert status == 200
+    assert results != expected_results
+
+    invalid_overrides = {'params': {'ecl-analysis': {'unknown': 1.0}}}
+    assert request(
+        f'{server_url:s}/analyse',
+        json.dumps({'filename': synthetic_log_file, 'config': invalid_overrides}).encode(),
+        content_type='application/json')[0] == 400
@@ -0,0 +1,72 @@
+#! /usr/bin/env python3
+"""
+Testing the manifest of the incremental batch processing.
+"""
+import os
+import shutil
+
+from ecl_ekf_analysis.batch_process_logdata_ekf import analyse_ulog_files
+from ecl_ekf_analysis.log_processing.batch_manifest import BatchManifest, STATUS_ERROR, \
+    get_log_file_state
+
+
+def test_manifest_change_detection(log_dir, tmp_path):
+    """
+    Test that only new, changed and removed log files and files analysed by another analyzer
+    version are detected by a re-scan.
+    """
+    synthetic_files = [os.path.join(log_dir, f'synthetic_{seed:d}.ulg') for seed in range(2)]
+    broken_file = os.path.join(log_dir, 'sub', 'broken.ulg')
+    manifest_file = str(tmp_path / 'manifest.db')
+
+    with BatchManifest(manifest_file, analyzer_version='1') as manifest:
+        ulog_files = manifest.scan(log_dir)
+        assert ulog_files == sorted(synthetic_files + [broken_file])
+        assert analyse_ulog_files(ulog_files, manifest=manifest, write_json=False) == 1
+        assert manifest.get(broken_file)['status'] == STATUS_ERROR
+        assert manifest.get(synthetic_files[0])['status'] in ['Pass', 'Warning', 'Fail']
+        assert manifest.get(synthetic_files[0])['analyzer_version'] == '1'
+
+        # nothing changed
+        assert manifest.scan(log_dir) == []
+        assert manifest.scan(log_dir, retry_failed=True) == [broken_file]
+        assert manifest.scan(log_dir, overwrite=True) == ulog_files
+
+        # the same content with a new modification time is not analysed again
+        stat = os.stat(synthetic_files[0])
+        os.utime(synthetic_files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert manifest.scan(log_dir) == []
+        assert manifest.get(synthetic_files[0])['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+        # replaced, new and removed files
+        shutil.copyfile(synthetic_files[0], synthetic_files[1])
+        new_file = os.path.join(log_dir, 'sub', 'new.ulg')
+        shutil.copyfile(synthetic_files[0], new_file)
+        os.remove(broken_file)
+        assert manifest.scan(log_dir) == sorted([synthetic_files[1], new_file])
+        assert manifest.get(broken_file) is None
+
+    # another analyzer version analyses all files again
+    with BatchManifest(manifest_file, analyzer_version='2') as manifest:
+        assert manifest.scan(log_dir) == sorted(synthetic_files + [new_file])
+
+
+def test_manifest_records_analysed_state(log_dir, tmp_path):
+    """
+    Test that the manifest records the state of a log file when it was analysed, such that a
+    change during the analysis is detected by the next scan.
+    """
+    synthetic_file = os.path.join(log_dir, 'synthetic_0.ulg')
+
+    with BatchManifest(str(tmp_path / 'manifest.db'), analyzer_version='1') as manifest:
+        file_state = get_log_file_state(synthetic_file)
+        # the log file is replaced while it is analysed
+        shutil.copyfile(os.path.join(log_dir, 'synthetic_1.ulg'), synthetic_file)
+        manifest.record(synthetic_file, 'Pass', file_state=file_state)
+        assert manifest.get(synthetic_file)['content_hash'] == file_state.content_hash
+        assert synthetic_file in manifest.scan(log_dir)
+
+        manifest.record(synthetic_file, 'Pass')
+        assert manifest.get(synthetic_file)['content_hash'] == \
+            get_log_file_state(synthetic_file).content_hash
+        assert synthetic_file not in manifest.scan(log_dir)
@@ -0,0 +1,70 @@
+#! /usr/bin/env python3
+"""
+Testing the batch processing of log files on a pool of worker processes.
+"""
+import os
+import shutil
+
+from ecl_ekf_analysis.batch_process_logdata_ekf import analyse_ulog_files, find_ulog_files
+from ecl_ekf_analysis.log_processing.batch_manifest import BatchManifest
+from ecl_ekf_analysis.log_processing.results_file import get_results_filename, \
+    read_results_file
+from ecl_ekf_analysis.log_processing.results_store import ResultsStore
+
+
+def analyse_log_dir(log_dir, jobs):
+    """
+    analyses the log files of a directory into a manifest and a results store next to it.
+    :return: the number of skipped files, the results files, the manifest entries and the
+    stored statistics, by the log file name relative to the directory. The results files are
+    returned without the timings of the checks, which differ between runs.
+    """
+    ulog_files = sorted(find_ulog_files(log_dir))
+    with BatchManifest(log_dir + '.manifest.db', analyzer_version='1') as manifest, \
+            ResultsStore(log_dir + '.results.db') as results_store:
+        timings = []
+        n_skipped = analyse_ulog_files(
+            ulog_files, jobs=jobs, timings=timings, results_store=results_store,
+            manifest=manifest)
+        assert len(timings) == len(ulog_files) - n_skipped
+
+        results_files = {
+            os.path.relpath(ulog_file, log_dir): [
+                {key: value for key, value in test_result.items() if key != 'timings'}
+                for test_result in read_results_file(get_results_filename(ulog_file))]
+            for ulog_file in ulog_files if os.path.exists(get_results_filename(ulog_file))}
+        manifest_entries = {}
+        for ulog_file in ulog_files:
+            entry = manifest.get(ulog_file)
+            del entry['path'], entry['analysed_at']
+            manifest_entries[os.path.relpath(ulog_file, log_dir)] = entry
+        statistics = {}
+        for statistic in results_store.query_statistics():
+            statistics.setdefault(os.path.relpath(statistic.pop('filename'), log_dir), []) \
+                .append(statistic)
+
+    return n_skipped, results_files, manifest_entries, statistics
+
+
+def test_process_pool_equals_serial_analysis(log_dir, tmp_path):
+    """
+    Test that the analysis on a pool of worker processes gives the results of the analysis in
+    this process and that an invalid log file only skips this file.
+    """
+    serial_log_dir = str(tmp_path / 'serial_logs')
+    shutil.copytree(log_dir, serial_log_dir)
+    broken_file = os.path.join('sub', 'broken.ulg')
+    synthetic_files = [f'synthetic_{seed:d}.ulg' for seed in range(2)]
+
+    n_skipped, results_files, manifest_entries, statistics = analyse_log_dir(log_dir, jobs=2)
+    assert n_skipped == 1
+    assert sorted(results_files) == synthetic_files
+    assert sorted(statistics) == synthetic_files
+    assert manifest_entries[broken_file]['status'] == 'Error'
+    assert (n_skipped, results_files, manifest_entries, statistics) == \
+        analyse_log_dir(serial_log_dir, jobs=1)
+
+    # the analysed files are skipped unless they are overwritten
+    assert find_ulog_files(log_dir) == [os.path.join(log_dir, broken_file)]
+    assert sorted(find_ulog_files(log_dir, overwrite=True)) == sorted(
+        os.path.join(log_dir, filename) for filename in synthetic_files + [broken_file])
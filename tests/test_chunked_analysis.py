@@ -0,0 +1,131 @@
+#! /usr/bin/env python3
+"""
+Testing the analysis of a log file in blocks within a memory budget.
+"""
+import tracemalloc
+
+import numpy as np
+import pytest
+from pyulog import ULog
+
+from ecl_ekf_analysis.analysis.in_air_detector import Airtime
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckStatisticType
+from ecl_ekf_analysis.checks.chunked_check_runner import ChunkedEclCheckRunner
+from ecl_ekf_analysis.log_processing.streaming_analysis import StreamingMedian
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf, process_logdata_ekf
+from tests.synthetic_ulog import write_synthetic_ulog
+
+# the statistics derived from the medians of the imu checks
+_MEDIAN_STATISTICS = {
+    CheckStatisticType.IMU_DELTA_ANGLE_BIAS_AVG.name,
+    CheckStatisticType.IMU_DELTA_VELOCITY_BIAS_AVG.name,
+    CheckStatisticType.IMU_OBSERVED_ANGLE_ERROR_AVG.name,
+    CheckStatisticType.IMU_OBSERVED_VELOCITY_ERROR_AVG.name,
+    CheckStatisticType.IMU_OBSERVED_POSITION_ERROR_AVG.name,
+}
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=['current_format', 'legacy_format'])
+def synthetic_log_options(request):
+    """
+    two flights in the current and the legacy estimator format.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 60.0, 'flights': [(5.0, 25.0), (30.0, 55.0)],
+            'legacy_format': request.param}
+
+
+@pytest.mark.parametrize('memory_budget_mb', [256.0, 0.001], ids=['exact', 'approximate'])
+def test_chunked_check_runner(synthetic_log_file, memory_budget_mb):
+    """
+    Test that the analysis in blocks gives the check statuses and statistics of the analysis of
+    the complete log. A tiny memory budget decodes the log in many blocks and approximates the
+    medians.
+    """
+    chunked_check_runner = ChunkedEclCheckRunner(
+        synthetic_log_file, memory_budget_mb=memory_budget_mb)
+    chunked_check_runner.run_checks()
+    chunked_results = chunked_check_runner.results_deserialized
+
+    batch_results = analyse_logdata_ekf(ULog(synthetic_log_file))
+    assert [test_result['type'] for test_result in chunked_results] == \
+        [test_result['type'] for test_result in batch_results]
+    for chunked_result, batch_result in zip(chunked_results, batch_results):
+        assert chunked_result['status'] == batch_result['status']
+        assert [statistic['type'] for statistic in chunked_result['statistics']] == \
+            [statistic['type'] for statistic in batch_result['statistics']]
+        for statistic, batch_statistic in zip(
+                chunked_result['statistics'], batch_result['statistics']):
+            assert statistic['instance'] == batch_statistic['instance']
+            assert statistic['thresholds'] == batch_statistic['thresholds']
+            if statistic['type'] in _MEDIAN_STATISTICS and memory_budget_mb < 1.0:
+                assert statistic['value'] == pytest.approx(batch_statistic['value'], rel=1e-3)
+            else:
+                assert statistic['value'] == pytest.approx(batch_statistic['value'], rel=1e-5)
+
+
+def test_process_logdata_ekf_chunked(synthetic_log_file):
+    """
+    Test that process_logdata_ekf analyses the log in blocks if a memory budget is given.
+    """
+    chunked_results = process_logdata_ekf(synthetic_log_file, memory_budget_mb=16.0)
+    batch_results = process_logdata_ekf(synthetic_log_file)
+    assert [(test_result['type'], test_result['status']) for test_result in chunked_results] == \
+        [(test_result['type'], test_result['status']) for test_result in batch_results]
+
+
+def test_process_logdata_ekf_chunked_all_instances(synthetic_log_file):
+    """
+    Test that the analysis within a memory budget rejects the analysis of all estimator
+    instances instead of ignoring it.
+    """
+    with pytest.raises(ValueError):
+        process_logdata_ekf(synthetic_log_file, memory_budget_mb=16.0, all_instances=True)
+
+
+def test_chunked_memory_budget(tmp_path):
+    """
+    Test that the memory allocated by the analysis in blocks stays within the memory budget,
+    while the analysis of the complete log exceeds it.
+    """
+    filename = str(tmp_path / 'synthetic.ulg')
+    write_synthetic_ulog(filename, duration_s=300.0)
+    memory_budget_mb = 8.0
+
+    tracemalloc.start()
+    chunked_check_runner = ChunkedEclCheckRunner(filename, memory_budget_mb=memory_budget_mb)
+    chunked_check_runner.run_checks()
+    assert chunked_check_runner.results
+    _, chunked_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    analyse_logdata_ekf(ULog(filename))
+    _, batch_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert chunked_peak < memory_budget_mb * 1e6 < batch_peak
+
+
+@pytest.mark.parametrize('n_samples', [1, 2, 1000, 1001])
+def test_streaming_median(n_samples):
+    """
+    Test the exact and the approximate median of the samples of the flights that are kept.
+    """
+    rng = np.random.RandomState(n_samples)
+    flights = [rng.normal(1.0, 0.1, n_samples).astype(np.float32) for _ in range(3)]
+    kept = [True, False, True]
+    samples = np.concatenate([values for values, keep in zip(flights, kept) if keep])
+    value_range = (float(np.amin(samples)), float(np.amax(samples)))
+
+    for max_samples in [3 * n_samples, 0]:
+        median = StreamingMedian(3 * n_samples, value_range, np.float32, max_samples=max_samples)
+        for flight_index, (values, keep) in enumerate(zip(flights, kept)):
+            median.start_flight(flight_index, Airtime(take_off=0.0, landing=1.0))
+            for chunk in np.array_split(values, 3):
+                median.append(np.zeros(len(chunk)), chunk)
+            median.end_flight(keep)
+
+        assert median.is_exact == (max_samples > 0)
+        assert median.median == pytest.approx(
+            float(np.median(samples)), abs=median.bin_width / 2.0 + 1e-7)
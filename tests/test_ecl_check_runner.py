@@ -0,0 +1,131 @@
+#! /usr/bin/env python3
+"""
+Testing the ecl check runner.
+"""
+import time
+
+import numpy as np
+import pytest
+from pyulog import ULog
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckStatisticType, CheckStatus, \
+    CheckType
+from ecl_ekf_analysis.checks.base_check import Check
+from ecl_ekf_analysis.checks.base_runner import AnalysisStatus, CheckRunner
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.estimator_analysis import EstimatorCheck
+from ecl_ekf_analysis.log_processing.custom_exceptions import PreconditionError
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=['current_format', 'legacy_format'])
+def synthetic_log_options(request):
+    """
+    two flights in the current and the legacy estimator format.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 60.0, 'flights': [(5.0, 25.0), (30.0, 55.0)],
+            'legacy_format': request.param}
+
+
+def test_required_topics_results(synthetic_log_file):
+    """
+    Test that loading only the required topics gives the same results as loading all topics.
+    """
+    ulog_filtered = ULog(
+        synthetic_log_file, message_name_filter_list=sorted(EclCheckRunner.required_topics()))
+    assert len(ulog_filtered.data_list) < len(ULog(synthetic_log_file).data_list)
+
+    assert analyse_logdata_ekf(ulog_filtered) == \
+        analyse_logdata_ekf(ULog(synthetic_log_file))
+
+
+def test_required_status_flags(synthetic_log_file):
+    """
+    Test that the estimator checks only read their required status flags, which are the control
+    status, fault status and innovation reject flags.
+    """
+    required_status_flags = EclCheckRunner.required_status_flags()
+    assert all(field.startswith(('cs_', 'fs_', 'reject_')) for field in required_status_flags)
+
+    ulog = ULog(synthetic_log_file)
+    for check_class in EclCheckRunner.check_classes:
+        if issubclass(check_class, EstimatorCheck):
+            fields = check_class.required_status_flags
+            assert set(fields) <= set(required_status_flags)
+            # inactive flags, such that the preconditions read all their flags
+            check = check_class(ulog, FlagMatrix(
+                np.zeros((len(fields), 1), dtype=np.uint8), fields, 0))
+            check.run_precondition()
+            assert set(check._innov_fail_names) <= set(fields)  # pylint: disable=protected-access
+
+
+def test_concurrent_checks(synthetic_log_file):
+    """
+    Test that running the checks on a thread pool gives the results of running them one after
+    the other.
+    """
+    ulog = ULog(synthetic_log_file)
+    assert analyse_logdata_ekf(ulog, n_threads=4) == analyse_logdata_ekf(ulog)
+
+
+class FailingCheck(Check):
+    """
+    a check raising an exception.
+    """
+
+    def __init__(self, ulog: ULog, check_type: CheckType, exception: Exception) -> None:
+        super().__init__(ulog, check_type=check_type)
+        self._exception = exception
+
+    def calc_statistics(self) -> None:
+        """
+        :return:
+        """
+        raise self._exception
+
+
+class PassingCheck(Check):
+    """
+    a check passing after some time.
+    """
+
+    def calc_statistics(self) -> None:
+        """
+        :return:
+        """
+        time.sleep(0.01)
+        self.add_statistic(CheckStatisticType.FILTER_FAULT_FLAG).value = 0.0
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_check_status_merging(n_threads):
+    """
+    Test the order of the results and the merging of the check statuses.
+    """
+    check_runner = CheckRunner()
+    check_runner.append(FailingCheck(
+        None, CheckType.MAGNETOMETER_STATUS, PreconditionError('precondition')))
+    check_runner.append(PassingCheck(None, check_type=CheckType.FILTER_FAULT_STATUS))
+    check_runner.append(FailingCheck(
+        None, CheckType.VELOCITY_SENSOR_STATUS, RuntimeError('runtime')))
+    check_runner.append(PassingCheck(None, check_type=CheckType.IMU_BIAS_STATUS))
+    check_runner.run_checks(n_threads=n_threads)
+
+    assert check_runner.analysis_status == AnalysisStatus.SUCCESS
+    assert [result.check_type for result in check_runner.results] == \
+        [CheckType.FILTER_FAULT_STATUS, CheckType.IMU_BIAS_STATUS]
+    assert all(result.status == CheckStatus.PASS for result in check_runner.results)
+    assert [check.status for check in check_runner.checks] == [
+        CheckStatus.DOES_NOT_APPLY, CheckStatus.PASS, CheckStatus.DOES_NOT_APPLY,
+        CheckStatus.PASS]
+    assert check_runner.error_message == 'precondition; runtime; '
+
+    check_runner = CheckRunner()
+    check_runner.append(FailingCheck(
+        None, CheckType.MAGNETOMETER_STATUS, PreconditionError('precondition')))
+    check_runner.append(FailingCheck(None, CheckType.VELOCITY_SENSOR_STATUS, ValueError('value')))
+    check_runner.run_checks(n_threads=n_threads)
+    assert check_runner.analysis_status == AnalysisStatus.UNEXPECTED_ERROR
+    assert check_runner.results == []
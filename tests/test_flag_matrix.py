@@ -0,0 +1,80 @@
+#! /usr/bin/env python3
+"""
+Testing the bit-packed flag matrix.
+"""
+import numpy as np
+import pytest
+
+from ecl_ekf_analysis.analysis.post_processing import get_gps_check_fail_flags
+from ecl_ekf_analysis.checks.numerical_analysis import NumericalCheck
+from ecl_ekf_analysis.signal_processing.flag_matrix import FlagMatrix
+
+
+@pytest.mark.parametrize("n_samples", [0, 1, 7, 8, 9, 1001])
+def test_flag_statistics(n_samples):
+    """
+    Test the unpacked flags, counts and prefix counts of slices and indices against the flags.
+    """
+    random_state = np.random.RandomState(n_samples)
+    data = {
+        'timestamp': np.arange(n_samples, dtype=np.uint64),
+        'bool_flag': random_state.uniform(size=n_samples) < 0.3,
+        'uint8_flag': (random_state.uniform(size=n_samples) < 0.5).astype(np.uint8),
+        'float_flag': random_state.uniform(size=n_samples),
+    }
+    flags = FlagMatrix.from_fields(data)
+    assert flags.fields == ['bool_flag', 'uint8_flag', 'float_flag']
+    assert flags.n_samples == n_samples
+    assert flags.nbytes == 3 * (n_samples // 8 + 1)
+
+    for field in flags.fields:
+        active = data[field] > 0.5
+        np.testing.assert_array_equal(flags.get_flag(field), active)
+        assert flags.any([field]) == active.any()
+        selections = [slice(None), slice(3, None), slice(None, -2), slice(n_samples, None),
+                      np.flatnonzero(random_state.uniform(size=n_samples) < 0.5)]
+        selections += [slice(*sorted(random_state.randint(0, n_samples + 1, size=2)))
+                       for _ in range(50)]
+        for selection in selections:
+            assert flags.count(field, selection) == np.count_nonzero(active[selection])
+            np.testing.assert_array_equal(
+                flags.get_prefix_counts(field, selection),
+                np.concatenate(([0], np.cumsum(active[selection]))))
+
+    assert flags.any() == any(flags.any([field]) for field in flags.fields)
+    with pytest.raises(ValueError):
+        flags.count('bool_flag', slice(None, None, 2))
+
+
+def test_bitfield():
+    """
+    Test that the bits of a bitfield unpacked at once equal the bits unpacked one at a time.
+    """
+    bitfield = np.random.RandomState(0).randint(0, 2**16, size=1003).astype(np.uint16)
+    flags = FlagMatrix.from_bitfield(bitfield, [f'bit_{i:d}' for i in range(16)])
+    for i in range(16):
+        np.testing.assert_array_equal(flags.get_flag(f'bit_{i:d}'), (bitfield & 2**i) > 0)
+    with pytest.raises(ValueError):
+        FlagMatrix.from_bitfield(bitfield.astype(np.uint8), [f'bit_{i:d}' for i in range(9)])
+
+    gps_fail_flags = get_gps_check_fail_flags({'gps_check_fail_flags': bitfield})
+    assert len(gps_fail_flags) == 10
+    for i, gps_fail_flag in enumerate(gps_fail_flags.values()):
+        np.testing.assert_array_equal(gps_fail_flag, ((2**i & bitfield) > 0) * 1)
+
+
+@pytest.mark.parametrize("fault_flag", [None, 'fs_bad_hdg', 'fs_bad_acc_bias'])
+def test_numerical_check(fault_flag):
+    """
+    Test the filter fault flag of the numerical check on the packed estimator_status_flags.
+    """
+    n_samples = 100
+    data = {flag: np.zeros(n_samples, dtype=np.uint8)
+            for flag in NumericalCheck.filter_fault_flags + ('fs_bad_acc_bias',)}
+    if fault_flag is not None:
+        data[fault_flag][50] = 1
+
+    check = NumericalCheck(None, status_flags=FlagMatrix.from_fields(data))
+    check.calc_statistics()
+    # the acceleration bias is not a numerical fault
+    assert check.result.statistics[0].value == (1.0 if fault_flag == 'fs_bad_hdg' else 0.0)
@@ -7,7 +7,9 @@ import pytest
 import numpy as np
 from pyulog import ULog
 
-from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector, InAirDetectorRegistry, \
+    StreamingInAirDetector
+from tests.synthetic_ulog import write_synthetic_ulog
 
 @pytest.fixture(scope="module")
 def testing_args():
@@ -20,6 +22,15 @@ def testing_args():
             'dummy_log_file': 'short_f450_log.ulg'}
 
 
+@pytest.fixture(scope="module")
+def synthetic_log_options():
+    """
+    a synthetic log file with two flights.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 60.0, 'flights': [(5.0, 25.0), (30.0, 55.0)]}
+
+
 def original_take_offs(ulog):
     """
 
@@ -169,3 +180,159 @@ def test_basics_in_air_detector(testing_args):
     start_in_air(ulog)
     take_off_at_second_time_stamp(ulog)
     multiple_take_offs(ulog)
+
+
+def test_in_air_detector_registry(synthetic_ulog):
+    """
+    tests that the registry shares the in air detectors per parameter set and that the airtime
+    indices are cached per dataset.
+    :param synthetic_ulog:
+    :return:
+    """
+    registry = InAirDetectorRegistry(synthetic_ulog)
+    in_air_detector = registry.get(min_flight_time_seconds=1.0, in_air_margin_seconds=0.5)
+
+    assert registry.get(min_flight_time_seconds=1.0, in_air_margin_seconds=0.5) \
+        is in_air_detector, 'the registry did not share the in air detector'
+    assert registry.get(min_flight_time_seconds=1.0) is not in_air_detector, \
+        'different parameters returned the same in air detector'
+    assert len(in_air_detector.airtimes) == 2
+
+    airtime = in_air_detector.get_airtime('estimator_status')
+    assert in_air_detector.get_airtime('estimator_status') is airtime, \
+        'the airtime indices were not cached'
+
+    new_in_air_detector = InAirDetector(
+        synthetic_ulog, min_flight_time_seconds=1.0, in_air_margin_seconds=0.5)
+    np.testing.assert_array_equal(
+        new_in_air_detector.get_airtime('estimator_status'), airtime)
+    for phase, new_phase in zip(
+            in_air_detector.get_airtime_per_phase('estimator_status'),
+            new_in_air_detector.get_airtime_per_phase('estimator_status')):
+        np.testing.assert_array_equal(phase, new_phase)
+
+
+def test_airtime_bounds(tmp_path):
+    """
+    tests that the airtime indices found by the binary search are identical to comparing all
+    timestamps against the airtimes, also for many flights and unsorted timestamps.
+    :param tmp_path:
+    :return:
+    """
+    filename = str(tmp_path / 'many_flights.ulg')
+    write_synthetic_ulog(filename, duration_s=200.0,
+                         flights=[(2.0 + 4.0 * i, 4.5 + 4.0 * i) for i in range(48)])
+    in_air_detector = InAirDetector(
+        ULog(filename), min_flight_time_seconds=0.5, in_air_margin_seconds=0.3)
+    assert len(in_air_detector.airtimes) == 48
+
+    timestamps = np.arange(1000000, 201000000, 10000, dtype=np.uint64)
+
+    def reference_indices(timestamps):
+        return [np.where(((timestamps - 1000000) * 1.0e-6 >= airtime.take_off) &
+                         ((timestamps - 1000000) * 1.0e-6 < airtime.landing))[0]
+                for airtime in in_air_detector.airtimes]
+
+    bounds = in_air_detector.get_airtime_bounds_for_timestamp(
+        timestamps, start_time=1000000, conversion_factor=1.0e-6)
+    for (start, end), reference in zip(bounds, reference_indices(timestamps)):
+        np.testing.assert_array_equal(np.arange(start, end), reference)
+
+    np.testing.assert_array_equal(
+        in_air_detector.get_total_airtime_for_timestamp(
+            timestamps, start_time=1000000, conversion_factor=1.0e-6),
+        np.concatenate(reference_indices(timestamps)))
+
+    unsorted_timestamps = timestamps.copy()
+    unsorted_timestamps[[100, 5000]] = unsorted_timestamps[[5000, 100]]
+    assert in_air_detector.get_airtime_bounds_for_timestamp(
+        unsorted_timestamps, start_time=1000000, conversion_factor=1.0e-6) is None
+    for phase, reference in zip(
+            in_air_detector.get_airtime_per_phase_for_timestamp(
+                unsorted_timestamps, start_time=1000000, conversion_factor=1.0e-6),
+            reference_indices(unsorted_timestamps)):
+        np.testing.assert_array_equal(phase, reference)
+
+
+def test_airtime_selection(synthetic_ulog, tmp_path):
+    """
+    tests that the airtime selection is a slice for a single flight and selects the same samples
+    as the airtime indices.
+    :param synthetic_ulog:
+    :param tmp_path:
+    :return:
+    """
+    filename = str(tmp_path / 'single_flight.ulg')
+    write_synthetic_ulog(filename, duration_s=60.0)
+
+    for ulog, n_airtimes in [(ULog(filename), 1), (synthetic_ulog, 2)]:
+        in_air_detector = InAirDetector(ulog, min_flight_time_seconds=1.0)
+        assert len(in_air_detector.airtimes) == n_airtimes
+        signal = ulog.get_dataset('estimator_status').data['timestamp']
+
+        selection = in_air_detector.get_airtime_selection('estimator_status')
+        assert isinstance(selection, slice) == (n_airtimes == 1)
+        np.testing.assert_array_equal(
+            signal[selection], signal[in_air_detector.get_airtime('estimator_status')])
+
+        for phase_selection, phase_indices in zip(
+                in_air_detector.get_airtime_selection_per_phase('estimator_status'),
+                in_air_detector.get_airtime_per_phase('estimator_status')):
+            assert isinstance(phase_selection, slice)
+            np.testing.assert_array_equal(signal[phase_selection], signal[phase_indices])
+
+
+@pytest.mark.parametrize("landed_pattern", ['flights', 'start_in_air', 'no_final_landing'])
+def test_streaming_in_air_detector(tmp_path, landed_pattern):
+    """
+    tests that the streaming in air detector fed with chunks of the landed flag finds the airtimes
+    of the in air detector and decides the in air state of the samples correctly.
+    :param tmp_path:
+    :param landed_pattern:
+    :return:
+    """
+    filename = str(tmp_path / 'flights.ulg')
+    write_synthetic_ulog(filename, duration_s=60.0,
+                         flights=[(2.0, 2.5), (5.0, 25.0), (30.0, 45.0), (50.0, 55.0)])
+    ulog = ULog(filename)
+    land_detected = ulog.get_dataset('vehicle_land_detected').data
+    if landed_pattern == 'start_in_air':
+        land_detected['landed'][:100] = 0
+    elif landed_pattern == 'no_final_landing':
+        land_detected['landed'][-300:] = 0
+
+    relative_time = np.arange(0.0, 60.0, 0.01)
+    for min_flight_time_seconds, in_air_margin_seconds in [(0.0, 0.0), (1.0, 0.5), (10.0, 2.0)]:
+        in_air_detector = InAirDetector(
+            ulog, min_flight_time_seconds=min_flight_time_seconds,
+            in_air_margin_seconds=in_air_margin_seconds)
+        streaming_in_air_detector = StreamingInAirDetector(
+            ulog.start_timestamp, min_flight_time_seconds=min_flight_time_seconds,
+            in_air_margin_seconds=in_air_margin_seconds)
+
+        decided_in_air = []
+        n_decided = 0
+        for start in range(0, len(land_detected['landed']), 137):
+            streaming_in_air_detector.update(
+                land_detected['timestamp'][start:start + 137],
+                land_detected['landed'][start:start + 137])
+            n_new_decided = streaming_in_air_detector.get_decided_count(relative_time)
+            decided_in_air.append(streaming_in_air_detector.get_flight_indices(
+                relative_time[n_decided:n_new_decided]))
+            n_decided = n_new_decided
+        streaming_in_air_detector.finish()
+        decided_in_air.append(
+            streaming_in_air_detector.get_flight_indices(relative_time[n_decided:]))
+
+        airtimes = streaming_in_air_detector.airtimes
+        assert [(airtime.take_off, airtime.landing) for airtime in airtimes] == \
+            [(airtime.take_off, airtime.landing) for airtime in in_air_detector.airtimes]
+
+        # the samples of flights that are too short are not in air
+        flight_indices = np.concatenate(decided_in_air)
+        in_air = np.array([flight_index >= 0 and
+                           streaming_in_air_detector.flight_qualifies(flight_index)
+                           for flight_index in flight_indices])
+        np.testing.assert_array_equal(
+            np.nonzero(in_air)[0],
+            in_air_detector.get_total_airtime_for_timestamp(relative_time, start_time=0.0))
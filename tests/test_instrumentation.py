@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+"""
+Testing the instrumentation of the analysis.
+"""
+import numpy as np
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.log_processing.instrumentation import Instrumentation, summarize_timings, \
+    STAGES, CHECKS
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+
+
+def test_nested_peak_memory():
+    """
+    Test that the peak memory of nested measurements is attributed to all enclosing measurements.
+    """
+    instrumentation = Instrumentation()
+    with instrumentation.measure('outer'):
+        with instrumentation.measure('inner', group=CHECKS):
+            data = np.ones(1000000)
+            del data
+        with instrumentation.measure('small', group=CHECKS):
+            data = np.ones(10)
+
+    measurements = instrumentation.measurements
+    assert measurements[CHECKS]['inner'].peak_memory_mb >= 8.0
+    assert measurements[CHECKS]['small'].peak_memory_mb < 1.0
+    assert measurements[STAGES]['outer'].peak_memory_mb >= 8.0
+    assert measurements[STAGES]['outer'].wall_time_s >= measurements[CHECKS]['inner'].wall_time_s
+
+
+def test_instrumented_analysis(synthetic_ulog):
+    """
+    Test that every check and stage is measured and that the results are otherwise unchanged.
+    """
+    instrumentation = Instrumentation()
+    test_results = analyse_logdata_ekf(synthetic_ulog, instrumentation=instrumentation)
+
+    timings = instrumentation.to_dict()
+    assert set(timings[STAGES]) == {'init', 'checks', 'serialize'}
+    assert [test_result['type'] for test_result in test_results] == list(timings[CHECKS])
+    assert len(timings[CHECKS]) == len(EclCheckRunner.check_classes)
+    for test_result in test_results:
+        assert test_result['timings'] == timings[CHECKS][test_result['type']]
+        assert test_result['timings']['wall_time_s'] >= 0.0
+        assert test_result['timings']['peak_memory_mb'] >= 0.0
+        del test_result['timings']
+
+    assert test_results == analyse_logdata_ekf(synthetic_ulog)
+
+    summary = summarize_timings([timings, timings])
+    assert summary[CHECKS]['MAGNETOMETER_STATUS']['n'] == 2
+    assert summary[CHECKS]['MAGNETOMETER_STATUS']['wall_time_s_p95'] == \
+        timings[CHECKS]['MAGNETOMETER_STATUS']['wall_time_s']
+
+
+def test_summarize_timings():
+    """
+    Test the percentiles of the summary.
+    """
+    timings = [{CHECKS: {'check': {'wall_time_s': float(i), 'cpu_time_s': float(i),
+                                   'peak_memory_mb': None}}} for i in range(101)]
+    summary = summarize_timings(timings)
+    assert summary[CHECKS]['check']['n'] == 101
+    assert summary[CHECKS]['check']['wall_time_s_p50'] == 50.0
+    assert summary[CHECKS]['check']['wall_time_s_p95'] == 95.0
+    assert summary[CHECKS]['check']['peak_memory_mb_p95'] is None
@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+"""
+Testing the array based interval set.
+"""
+import numpy as np
+import pytest
+
+from ecl_ekf_analysis.analysis.interval_set import IntervalSet, get_index_bounds
+
+
+def contains(interval_set: IntervalSet, points: np.ndarray) -> np.ndarray:
+    """
+    :param interval_set:
+    :param points:
+    :return: whether the points are within any closed interval of the set
+    """
+    return np.any((points[:, None] >= interval_set.starts) &
+                  (points[:, None] <= interval_set.ends), axis=1)
+
+
+def test_normalization():
+    """
+    Test that overlapping and touching intervals are merged and empty intervals dropped.
+    """
+    assert IntervalSet().is_empty()
+    assert IntervalSet.closed(2.0, 1.0).is_empty()
+    assert list(IntervalSet([5.0, 0.0, 1.0, 8.0, 9.0], [6.0, 1.0, 2.0, 7.0, 9.0])) == \
+        [(0.0, 2.0), (5.0, 6.0), (9.0, 9.0)]
+    assert list(IntervalSet([0.0, 1.0, 3.0], [10.0, 2.0, 4.0])) == [(0.0, 10.0)]
+    with pytest.raises(ValueError):
+        IntervalSet([0.0, 1.0], [2.0])
+
+
+def test_set_operations():
+    """
+    Test the union and intersection against the membership of the points of a fine grid.
+    """
+    intervals = IntervalSet([0.0, 4.0], [2.0, 6.0])
+    assert list(intervals | IntervalSet.closed(2.0, 3.0)) == [(0.0, 3.0), (4.0, 6.0)]
+    assert list(intervals & IntervalSet.closed(1.0, 4.0)) == [(1.0, 2.0), (4.0, 4.0)]
+    assert (intervals & IntervalSet()).is_empty()
+    assert (IntervalSet() | intervals) == intervals
+
+    random_state = np.random.RandomState(0)
+    points = np.arange(-1.0, 101.0, 0.5)
+    for _ in range(50):
+        sets = []
+        for n_intervals in random_state.randint(0, 30, size=2):
+            starts = random_state.randint(0, 100, size=n_intervals).astype(float)
+            sets.append(IntervalSet(starts, starts + random_state.randint(0, 8, size=n_intervals)))
+        union, intersection = sets[0] | sets[1], sets[0] & sets[1]
+        for result in [union, intersection]:
+            assert np.all(result.starts[1:] > result.ends[:-1])
+        np.testing.assert_array_equal(
+            contains(union, points), contains(sets[0], points) | contains(sets[1], points))
+        np.testing.assert_array_equal(
+            contains(intersection, points), contains(sets[0], points) & contains(sets[1], points))
+
+
+def test_shrink_and_min_duration():
+    """
+    Test the margin shrink and the minimum duration filter.
+    """
+    intervals = IntervalSet([0.0, 10.0, 20.0], [5.0, 11.0, 30.0])
+    assert list(intervals.shrink(1.0)) == [(1.0, 4.0), (21.0, 29.0)]
+    assert list(intervals.shrink(-3.0)) == [(-3.0, 14.0), (17.0, 33.0)]
+    assert list(intervals.filter_min_duration(5.0)) == [(0.0, 5.0), (20.0, 30.0)]
+    np.testing.assert_array_equal(intervals.durations, [5.0, 1.0, 10.0])
+
+
+@pytest.mark.parametrize("sorted_times", [True, False])
+def test_indices(sorted_times):
+    """
+    Test that the indices of the samples within the intervals equal a comparison of all samples.
+    """
+    times = np.linspace(0.0, 100.0, 1001)
+    if not sorted_times:
+        times = np.random.RandomState(0).permutation(times)
+    intervals = IntervalSet([-5.0, 10.05, 40.0, 99.95], [1.0, 20.0, 40.0, 150.0])
+
+    expected = [np.where((times >= start) & (times < end))[0] for start, end in intervals]
+    indices_per_interval = intervals.get_indices_per_interval(times)
+    assert len(indices_per_interval) == len(expected)
+    for indices, expected_indices in zip(indices_per_interval, expected):
+        np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_array_equal(intervals.get_indices(times), np.concatenate(expected))
+    assert IntervalSet().get_indices(times).size == 0
+
+    if sorted_times:
+        assert get_index_bounds(times, intervals.starts, intervals.ends).tolist() == \
+            [[0, 10], [101, 200], [400, 400], [1000, 1001]]
+    else:
+        assert intervals.get_index_bounds(times) is None
@@ -0,0 +1,39 @@
+#! /usr/bin/env python3
+"""
+Testing that the command line entry points don't import the heavy optional dependencies.
+"""
+import subprocess
+import sys
+
+import pytest
+
+# the modules of the command line entry points, see setup.py
+_ENTRY_POINTS = [
+    'ecl_ekf_analysis.process_logdata_ekf',
+    'ecl_ekf_analysis.batch_process_logdata_ekf',
+    'ecl_ekf_analysis.live_process_logdata_ekf',
+    'ecl_ekf_analysis.rethreshold_logdata_ekf',
+    'ecl_ekf_analysis.serve_logdata_ekf',
+    'ecl_ekf_analysis.log_processing.topic_cache',
+    'ecl_ekf_analysis.log_processing.results_store',
+]
+# packages only needed by code paths outside of the default analysis
+_LAZY_PACKAGES = ['scipy', 'matplotlib', 'intervals']
+
+
+@pytest.mark.parametrize('entry_point', _ENTRY_POINTS)
+def test_entry_point_imports(entry_point):
+    """
+    Test that importing an entry point neither imports the lazily loaded packages nor parses the
+    parameters and thresholds.
+    """
+    code = (
+        f'import sys, {entry_point:s}\n'
+        'from ecl_ekf_analysis.config import params, thresholds\n'
+        f'print(sorted(name for name in sys.modules if name.split(".")[0] in {_LAZY_PACKAGES!r}))\n'
+        'print(params.get_params.cache_info().currsize,\n'
+        '      thresholds.get_thresholds.cache_info().currsize)\n')
+    output = subprocess.run(
+        [sys.executable, '-c', code], stdout=subprocess.PIPE, check=True,
+        universal_newlines=True).stdout.splitlines()
+    assert output == ['[]', '0 0']
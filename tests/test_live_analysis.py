@@ -0,0 +1,137 @@
+#! /usr/bin/env python3
+"""
+Testing the live analysis of a log that is still being written.
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+from pyulog import ULog
+
+from ecl_ekf_analysis.check_data_interfaces.check_data import CheckStatisticType
+from ecl_ekf_analysis.checks.live_check_runner import LiveEclCheckRunner
+from ecl_ekf_analysis.live_process_logdata_ekf import follow_logdata_ekf
+from ecl_ekf_analysis.log_processing.ulog_stream import ULogStream
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+
+# the statistics of rolling windows, which are approximated by the live analysis
+_WINDOWED_STATISTICS = {
+    CheckStatisticType.INNOVATION_RED_WINDOWED_PCT.name,
+    CheckStatisticType.INNOVATION_AMBER_WINDOWED_PCT.name,
+    CheckStatisticType.ESTIMATOR_FAILURE_WINDOWED_AVG.name,
+    CheckStatisticType.FAIL_RATIO_SHORT_WINDOW_PCT.name,
+    CheckStatisticType.FAIL_RATIO_LONG_WINDOW_PCT.name,
+}
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=['current_format', 'legacy_format'])
+def synthetic_log_options(request):
+    """
+    two flights in the current and the legacy estimator format.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 60.0, 'flights': [(5.0, 25.0), (30.0, 55.0)],
+            'legacy_format': request.param}
+
+
+def append_in_chunks(source_filename: str, filename: str, chunk_size: int):
+    """
+    writes a log file in chunks.
+    :param source_filename: the complete log file
+    :param filename: the growing log file
+    :param chunk_size:
+    :return: a generator, which appends the next chunk on every step
+    """
+    with open(source_filename, 'rb') as source_file:
+        content = source_file.read()
+    open(filename, 'wb').close()
+    for start in range(0, len(content), chunk_size):
+        with open(filename, 'ab') as file:
+            file.write(content[start:start + chunk_size])
+        yield
+
+
+def test_ulog_stream(synthetic_log_file, tmp_path):
+    """
+    Test that decoding a growing log in chunks gives the data of pyulog.
+    """
+    filename = str(tmp_path / 'growing.ulg')
+    ulog_stream = ULogStream(filename)
+    chunks = {}
+    for _ in append_in_chunks(synthetic_log_file, filename, 10007):
+        for dataset in ulog_stream.poll():
+            for field_name, values in dataset.data.items():
+                chunks.setdefault((dataset.name, dataset.multi_id), {}).setdefault(
+                    field_name, []).append(values)
+
+    ulog = ULog(synthetic_log_file)
+    assert ulog_stream.start_timestamp == ulog.start_timestamp
+    assert ulog_stream.last_timestamp == ulog.last_timestamp
+    assert len(chunks) == len(ulog.data_list)
+    for dataset in ulog.data_list:
+        assert ulog_stream.get_dataset(
+            dataset.name, multi_instance=dataset.multi_id).n_samples == len(
+                dataset.data['timestamp'])
+        for field_name, values in dataset.data.items():
+            np.testing.assert_array_equal(
+                np.concatenate(chunks[(dataset.name, dataset.multi_id)][field_name]), values)
+
+
+def test_live_check_runner(synthetic_log_file, tmp_path):
+    """
+    Test that the live analysis of a growing log ends with the check statuses and statistics of
+    the batch analysis. The windowed statistics are approximated.
+    """
+    filename = str(tmp_path / 'growing.ulg')
+    live_check_runner = LiveEclCheckRunner(filename)
+    log_times = []
+    for _ in append_in_chunks(synthetic_log_file, filename, 50000):
+        live_check_runner.update()
+        log_times.append(live_check_runner.log_time)
+        assert len(live_check_runner.results) == len(live_check_runner.results_deserialized)
+    live_check_runner.finish()
+    assert np.all(np.diff(log_times) >= 0.0) and log_times[-1] > 59.0
+
+    batch_results = {test_result['type']: test_result
+                     for test_result in analyse_logdata_ekf(ULog(synthetic_log_file))}
+    for live_result in live_check_runner.results_deserialized:
+        batch_result = batch_results[live_result['type']]
+        assert live_result['status'] == batch_result['status']
+
+        batch_statistics = {(statistic['type'], statistic['instance']): statistic
+                            for statistic in batch_result['statistics']}
+        assert len(live_result['statistics']) == len(batch_statistics)
+        for statistic in live_result['statistics']:
+            batch_statistic = batch_statistics[(statistic['type'], statistic['instance'])]
+            assert statistic['thresholds'] == batch_statistic['thresholds']
+            if statistic['type'] in _WINDOWED_STATISTICS:
+                assert statistic['value'] == pytest.approx(batch_statistic['value'], abs=1.0)
+            else:
+                assert statistic['value'] == pytest.approx(batch_statistic['value'], rel=1e-5)
+
+
+def test_follow_logdata_ekf(synthetic_log_file, tmp_path):
+    """
+    Test that following a log reports the check statuses while the log is being written and
+    returns the results of the batch analysis.
+    """
+    filename = str(tmp_path / 'growing.ulg')
+    writer = append_in_chunks(synthetic_log_file, filename, 200000)
+    next(writer)
+
+    def write_log():
+        for _ in writer:
+            time.sleep(0.01)
+
+    writer_thread = threading.Thread(target=write_log)
+    writer_thread.start()
+    updates = []
+    test_results = follow_logdata_ekf(
+        filename, interval_s=0.0, poll_interval_s=0.01, idle_timeout_s=0.5,
+        on_update=lambda log_time, check_results: updates.append(log_time))
+    writer_thread.join()
+
+    assert len(updates) > 2
+    assert updates[-1] > 59.0
+    assert test_results == analyse_logdata_ekf(ULog(synthetic_log_file))
@@ -0,0 +1,110 @@
+#! /usr/bin/env python3
+"""
+Testing the analysis of all estimator instances of multi-EKF logs.
+"""
+import numpy as np
+import pytest
+
+from ecl_ekf_analysis.analysis.in_air_detector import InAirDetector, InAirDetectorRegistry
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.checks.multi_ekf_check_runner import MultiEkfCheckRunner, get_check_name
+from ecl_ekf_analysis.log_processing.estimator_instances import EstimatorInstanceULog, \
+    get_estimator_instances
+from ecl_ekf_analysis.log_processing.instrumentation import CHECKS, Instrumentation
+from ecl_ekf_analysis.log_processing.results_store import ResultsStore
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+
+
+@pytest.fixture(scope="module")
+def synthetic_log_options():
+    """
+    a synthetic log with three estimator instances.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 60.0, 'n_estimator_instances': 3, 'flights': [(5.0, 25.0), (30.0, 55.0)]}
+
+
+def test_estimator_instance_view(synthetic_ulog):
+    """
+    Test that the view of an instance resolves the estimator topics to that instance.
+    """
+    assert get_estimator_instances(synthetic_ulog) == [0, 1, 2]
+    view = EstimatorInstanceULog(synthetic_ulog, 2)
+    assert view.get_dataset('estimator_status').multi_id == 2
+    assert view.get_dataset('estimator_status_flags').multi_id == 2
+    assert view.get_dataset('vehicle_land_detected').multi_id == 0
+    assert sorted(elem.name for elem in view.data_list) == \
+        sorted({elem.name for elem in synthetic_ulog.data_list})
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_multi_ekf_results(synthetic_ulog, n_threads):
+    """
+    Test that the results of every instance equal the analysis of that instance alone and are
+    tagged with the instance.
+    """
+    test_results = analyse_logdata_ekf(synthetic_ulog, n_threads=n_threads, all_instances=True)
+    assert [test_result['estimator_instance'] for test_result in test_results] == \
+        [instance for instance in range(3) for _ in EclCheckRunner.check_classes]
+
+    results_per_instance = {}
+    for test_result in test_results:
+        results_per_instance.setdefault(test_result.pop('estimator_instance'), []).append(
+            test_result)
+    assert results_per_instance[0] == analyse_logdata_ekf(synthetic_ulog)
+    for instance in [1, 2]:
+        ecl_check_runner = EclCheckRunner(EstimatorInstanceULog(synthetic_ulog, instance))
+        ecl_check_runner.run_checks()
+        assert results_per_instance[instance] == ecl_check_runner.results_deserialized
+        assert results_per_instance[instance] != results_per_instance[0]
+
+
+def test_shared_in_air_detection(synthetic_ulog, monkeypatch):
+    """
+    Test that the airtimes are detected once for all instances and that the in air detectors of
+    an instance look up the datasets of that instance.
+    """
+    detected_airtimes = []
+    detect_airtime = InAirDetector._detect_airtime
+
+    def count_detect_airtime(in_air_detector):
+        detected_airtimes.append(in_air_detector)
+        return detect_airtime(in_air_detector)
+
+    monkeypatch.setattr(InAirDetector, '_detect_airtime', count_detect_airtime)
+    EclCheckRunner(synthetic_ulog)
+    n_detections = len(detected_airtimes)
+    assert n_detections > 0
+    MultiEkfCheckRunner(synthetic_ulog)
+    assert len(detected_airtimes) == 2 * n_detections
+
+    registry = InAirDetectorRegistry(synthetic_ulog)
+    view = EstimatorInstanceULog(synthetic_ulog, 2)
+    in_air_detector = registry.for_view(view).get(in_air_margin_seconds=1.0)
+    assert in_air_detector.airtimes is registry.get(in_air_margin_seconds=1.0).airtimes
+    np.testing.assert_array_equal(
+        in_air_detector.get_airtime('estimator_innovations'),
+        InAirDetector(view, in_air_margin_seconds=1.0).get_airtime('estimator_innovations'))
+
+
+def test_multi_ekf_timings_and_store(synthetic_ulog):
+    """
+    Test that the checks of every instance are timed and stored apart.
+    """
+    instrumentation = Instrumentation()
+    test_results = analyse_logdata_ekf(
+        synthetic_ulog, instrumentation=instrumentation, all_instances=True)
+    assert get_check_name(test_results[-1]) == 'RANGE_SENSOR_HEIGHT_STATUS[2]'
+    assert set(instrumentation.to_dict()[CHECKS]) == \
+        {get_check_name(test_result) for test_result in test_results}
+    assert all('timings' in test_result for test_result in test_results)
+
+    multi_ekf_check_runner = MultiEkfCheckRunner(synthetic_ulog, estimator_instances=[1])
+    multi_ekf_check_runner.run_checks()
+    assert list(multi_ekf_check_runner.results_per_instance) == [1]
+    assert all(name.endswith('[1]') for name in multi_ekf_check_runner.results_table)
+
+    with ResultsStore(':memory:') as results_store:
+        results_store.add_results([('multi_ekf.ulg', test_results)])
+        statistics = results_store.query_statistics(check_type='MAGNETOMETER_STATUS')
+    assert sorted({statistic['estimator_instance'] for statistic in statistics}) == [0, 1, 2]
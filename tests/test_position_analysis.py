@@ -3,6 +3,7 @@
 Testing some specific functions for signal processing.
 """
 import os
+from types import SimpleNamespace
 
 import pytest
 import numpy as np
@@ -85,3 +86,66 @@ def test_position_analyzer(testing_args):
     position_analyzer.set_min_ground_distance(0.2)
     assert not position_analyzer.get_valid_position('sensor_combined'), \
         'returned valid positions were not empty'
+
+
+class LocalPositionULog():
+    """
+    a minimal log with vehicle_local_position and sensor_combined datasets.
+    """
+
+    def __init__(self, datasets: dict, start_timestamp: int, last_timestamp: int) -> None:
+        self._datasets = datasets
+        self.start_timestamp = start_timestamp
+        self.last_timestamp = last_timestamp
+
+    def get_dataset(self, name: str, multi_instance: int = 0):
+        """
+        :param name:
+        :param multi_instance:
+        :return:
+        """
+        assert multi_instance == 0
+        return SimpleNamespace(data=self._datasets[name])
+
+
+def test_noisy_range_finder_position_intervals():
+    """
+    Test the valid position intervals of a noisy range finder signal against the phases above the
+    min ground distance selected one by one.
+    """
+    random_state = np.random.RandomState(0)
+    start_timestamp = 10**12
+    timestamp = start_timestamp + np.arange(0, 200 * 10**6, 20000, dtype=np.uint64)
+    dist_bottom = 0.5 + 0.5 * np.sin(np.arange(len(timestamp)) / 300.0) + \
+        random_state.normal(scale=0.1, size=len(timestamp))
+    ulog = LocalPositionULog({
+        'vehicle_local_position': {
+            'timestamp': timestamp, 'dist_bottom': dist_bottom,
+            'dist_bottom_valid': random_state.uniform(size=len(timestamp)) > 0.01},
+        'sensor_combined': {'timestamp': timestamp[::2] + 1000},
+    }, int(start_timestamp), int(timestamp[-1]))
+
+    position_analyzer = PositionAnalyzer(ulog)
+    position_analyzer.set_min_ground_distance(
+        0.6, phase_change_margin_seconds=0.02, min_interval_duration_seconds=0.1)
+
+    valid = ulog.get_dataset('vehicle_local_position').data['dist_bottom_valid']
+    phase_timestamp = timestamp[valid]
+    relative_time = (phase_timestamp - start_timestamp) / 1.0e6
+    phase_starts, phase_ends = detect_flag_value_changes((dist_bottom[valid] > 0.6).astype(int))
+    expected_intervals = [
+        (relative_time[start] + 0.02, relative_time[end] - 0.02)
+        for start, end in zip(phase_starts, phase_ends)
+        if (relative_time[end] - 0.02) - (relative_time[start] + 0.02) >= 0.1]
+    assert len(expected_intervals) > 20
+
+    sensor_time = (ulog.get_dataset('sensor_combined').data['timestamp'] -
+                   start_timestamp) / 1.0e6
+    expected_indices = [np.where((sensor_time >= start) & (sensor_time < end))[0]
+                        for start, end in expected_intervals]
+    position_intervals = position_analyzer.get_position_intervals('sensor_combined')
+    assert len(position_intervals) == len(expected_indices)
+    for indices, expected in zip(position_intervals, expected_indices):
+        np.testing.assert_array_equal(indices, expected)
+    assert position_analyzer.get_valid_position('sensor_combined') == \
+        np.concatenate(expected_indices).tolist()
@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+"""
+Testing the structured arrays of the check results and the results files.
+"""
+import os
+
+import pytest
+
+from ecl_ekf_analysis.check_data_interfaces.check_data_utils import check_results_to_arrays, \
+    check_results_from_arrays, deserialize_check_results, deserialized_results_to_arrays, \
+    deserialized_results_from_arrays
+from ecl_ekf_analysis.log_processing.results_file import get_results_filename, \
+    read_results_file, write_results_file
+from ecl_ekf_analysis.process_logdata_ekf import process_logdata_ekf
+from ecl_ekf_analysis.rethreshold_logdata_ekf import find_result_files, rethreshold_result_files
+
+
+def test_arrays_round_trip(analysed_log):
+    """
+    Test that the structured arrays give back the check results.
+    """
+    _, test_results = analysed_log
+    results, statistics = deserialized_results_to_arrays(test_results)
+    assert len(results) == len(test_results)
+    assert len(statistics) == sum(len(test_result['statistics']) for test_result in test_results)
+    assert deserialized_results_from_arrays(results, statistics) == test_results
+
+    check_results = check_results_from_arrays(results, statistics)
+    assert deserialize_check_results(check_results) == test_results
+    for array, expected_array in zip(
+            check_results_to_arrays(check_results), (results, statistics)):
+        assert array.tobytes() == expected_array.tobytes()
+
+    # values and thresholds that are not set are kept apart from nan
+    test_results = [{'status': 'PASS', 'type': 'MAGNETOMETER_STATUS', 'statistics': [
+        {'type': 'INNOVATION_RED_PCT', 'value': None, 'instance': 1,
+         'thresholds': {'warning': float('inf'), 'failure': None}}]},
+                    {'status': 'DOES_NOT_APPLY', 'type': 'IMU_BIAS_STATUS', 'statistics': []}]
+    assert deserialized_results_from_arrays(
+        *deserialized_results_to_arrays(test_results)) == test_results
+    assert deserialized_results_from_arrays(*deserialized_results_to_arrays([])) == []
+
+
+@pytest.mark.parametrize('output_format', ['json', 'npz'])
+def test_results_file(analysed_log, tmp_path, output_format):
+    """
+    Test that the results files of both formats give back the check results.
+    """
+    filename, test_results = analysed_log
+    test_results = [dict(test_result, timings={'wall_time': 0.1}) for test_result in test_results]
+    results_file = get_results_filename(str(tmp_path / 'synthetic.ulg'), output_format)
+    assert results_file.endswith(f'synthetic.{output_format:s}')
+
+    write_results_file(results_file, test_results)
+    assert read_results_file(results_file) == test_results
+
+    assert process_logdata_ekf(filename, output_format=output_format) == analysed_log[1]
+    assert read_results_file(get_results_filename(filename, output_format)) == analysed_log[1]
+
+
+def test_rethreshold_npz(analysed_log, tmp_path):
+    """
+    Test that the .npz results files are re-evaluated as the .json files.
+    """
+    _, test_results = analysed_log
+    for output_format in ['json', 'npz']:
+        write_results_file(str(tmp_path / f'synthetic.{output_format:s}'), test_results)
+
+    result_files = find_result_files([str(tmp_path)])
+    assert sorted(os.path.basename(result_file) for result_file in result_files) == \
+        ['synthetic.json', 'synthetic.npz']
+    [json_status, npz_status] = rethreshold_result_files(sorted(result_files))
+    assert json_status == npz_status
+    assert json_status[0] is not None
+    assert read_results_file(str(tmp_path / 'synthetic.npz')) == \
+        read_results_file(str(tmp_path / 'synthetic.json'))
@@ -0,0 +1,109 @@
+#! /usr/bin/env python3
+"""
+Testing the fleet-wide results store.
+"""
+import os
+
+import pytest
+
+from ecl_ekf_analysis.batch_process_logdata_ekf import analyse_ulog_files, find_ulog_files
+from ecl_ekf_analysis.log_processing.results_store import ResultsStore
+from tests.synthetic_ulog import write_synthetic_ulog
+
+_DAY = 86400.0
+
+
+@pytest.fixture(scope="module")
+def synthetic_log_options():
+    """
+    a short synthetic log file.
+    :return: the keyword arguments of write_synthetic_ulog
+    """
+    return {'duration_s': 30.0}
+
+
+@pytest.fixture(scope="module")
+def test_results(analysed_log):
+    """
+    the check results of the synthetic log file.
+    :return: the results of process_logdata_ekf
+    """
+    return analysed_log[1]
+
+
+def with_status(test_results, check_type, status):
+    """
+    :return: a copy of the results with the status of a check replaced
+    """
+    return [dict(test_result, status=status) if test_result['type'] == check_type
+            else test_result for test_result in test_results]
+
+
+def test_query_results_store(test_results, tmp_path):
+    """
+    Test that the stored statistics equal the check results and that the logs are found by
+    check type, status and log time.
+    """
+    now = 100.0 * _DAY
+    logs = [(f'log_{i:d}.ulg', with_status(test_results, 'MAGNETOMETER_STATUS', status))
+            for i, status in enumerate(['FAIL', 'PASS', 'FAIL', 'WARNING'])]
+    log_times = [now - 1.0 * _DAY, now - 2.0 * _DAY, now - 40.0 * _DAY, now - 3.0 * _DAY]
+
+    with ResultsStore(str(tmp_path / 'results.db')) as results_store:
+        n_statistics = results_store.add_results(logs, log_times=log_times)
+        assert n_statistics == 4 * sum(len(result['statistics']) for result in test_results)
+        assert sorted(results_store.filenames()) == \
+            sorted(ResultsStore.log_key(filename) for filename, _ in logs)
+        assert 'log_0.ulg' in results_store and 'log_4.ulg' not in results_store
+
+        assert results_store.query_logs('MAGNETOMETER_STATUS', status='FAIL') == \
+            [ResultsStore.log_key('log_0.ulg'), ResultsStore.log_key('log_2.ulg')]
+        assert results_store.query_logs(
+            'MAGNETOMETER_STATUS', status='FAIL', since=now - 30.0 * _DAY) == \
+            [ResultsStore.log_key('log_0.ulg')]
+        assert len(results_store.query_logs('MAGNETOMETER_STATUS')) == 4
+
+        statistics = results_store.query_statistics(
+            check_type='MAGNETOMETER_STATUS', status='PASS')
+        test_result = [result for result in test_results
+                       if result['type'] == 'MAGNETOMETER_STATUS'][0]
+        assert [(statistic['statistic_type'], statistic['instance'], statistic['value'],
+                 statistic['warning'], statistic['failure']) for statistic in statistics] == \
+            [(statistic['type'], statistic['instance'], statistic['value'],
+              statistic['thresholds']['warning'], statistic['thresholds']['failure'])
+             for statistic in test_result['statistics']]
+        assert {statistic['filename'] for statistic in statistics} == \
+            {ResultsStore.log_key('log_1.ulg')}
+
+    # adding a log again replaces its results
+    with ResultsStore(str(tmp_path / 'results.db')) as results_store:
+        results_store.add_results(
+            [('log_0.ulg', with_status(test_results, 'MAGNETOMETER_STATUS', 'PASS'))],
+            log_times=[now])
+        assert len(results_store.filenames()) == 4
+        assert results_store.query_logs('MAGNETOMETER_STATUS', status='FAIL') == \
+            [ResultsStore.log_key('log_2.ulg')]
+        assert len(results_store.query_statistics()) == n_statistics
+
+
+def test_batch_processing_results_store(tmp_path):
+    """
+    Test that the batch processing inserts the results into the store without writing .json
+    files and skips the stored files on the next run.
+    """
+    ulog_files = [str(tmp_path / f'synthetic_{seed:d}.ulg') for seed in range(2)]
+    for seed, ulog_file in enumerate(ulog_files):
+        write_synthetic_ulog(ulog_file, duration_s=20.0, seed=seed)
+
+    with ResultsStore(str(tmp_path / 'results.db')) as results_store:
+        assert analyse_ulog_files(
+            ulog_files, results_store=results_store, write_json=False) == 0
+        assert not any(filename.endswith('.json') for filename in os.listdir(str(tmp_path)))
+        assert sorted(results_store.filenames()) == sorted(
+            ResultsStore.log_key(ulog_file) for ulog_file in ulog_files)
+        assert find_ulog_files(str(tmp_path), results_store=results_store) == []
+        assert sorted(find_ulog_files(str(tmp_path), overwrite=True,
+                                      results_store=results_store)) == sorted(ulog_files)
+        statistics = results_store.query_statistics(check_type='MAGNETOMETER_STATUS')
+        assert {statistic['filename'] for statistic in statistics} == \
+            set(results_store.filenames())
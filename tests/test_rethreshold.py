@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+"""
+Testing the re-evaluation of check results with new thresholds.
+"""
+import os
+
+import simplejson as json
+from pyulog import ULog
+
+from ecl_ekf_analysis.config.analysis_config import AnalysisConfig
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+from ecl_ekf_analysis.rethreshold_logdata_ekf import rethreshold_result_files, \
+    rethreshold_test_results
+
+
+def test_rethreshold_default_thresholds(analysed_log):
+    """
+    Test that re-applying the thresholds used by the analysis doesn't change the results.
+    """
+    _, test_results = analysed_log
+    assert rethreshold_test_results(test_results) == test_results
+
+
+def test_rethreshold_custom_thresholds(analysed_log, tmp_path):
+    """
+    Test that re-applying new thresholds gives the results of analysing the log with them.
+    """
+    filename, test_results = analysed_log
+    thresholds_file = str(tmp_path / 'thresholds.ini')
+    with open(thresholds_file, 'w') as file:
+        file.write('[DEFAULT]\n'
+                   'yaw_short_rolling_innovation_failure_pct = 100.0\n'
+                   'position_short_rolling_innovation_failure_pct = 100.0\n'
+                   'imu_delta_angle_bias_warning_avg = 0.0\n')
+
+    result_file = str(tmp_path / 'synthetic.json')
+    with open(result_file, 'w') as file:
+        json.dump(test_results, file, indent=2)
+
+    [(old_status, new_status)] = rethreshold_result_files(
+        [result_file], thresholds_file=thresholds_file)
+    assert old_status == 'Fail'
+    assert new_status == 'Warning'
+
+    with open(result_file, 'r') as file:
+        new_test_results = json.load(file)
+    assert new_test_results != test_results
+    assert new_test_results == analyse_logdata_ekf(
+        ULog(filename), config=AnalysisConfig.from_ini(thresholds_file=thresholds_file))
+
+    # files that are not check results are skipped
+    other_file = str(tmp_path / 'other.json')
+    with open(other_file, 'w') as file:
+        json.dump({'some': 'data'}, file)
+    [(old_status, _)] = rethreshold_result_files([other_file])
+    assert old_status is None
+    assert os.path.getsize(other_file) > 0
+
+
+def test_rethreshold_keeps_default_thresholds(analysed_log, tmp_path):
+    """
+    Test that a thresholds file used to re-evaluate results doesn't change the thresholds of
+    later analyses.
+    """
+    filename, test_results = analysed_log
+    thresholds_file = str(tmp_path / 'thresholds.ini')
+    with open(thresholds_file, 'w') as file:
+        file.write('[DEFAULT]\n'
+                   'yaw_short_rolling_innovation_failure_pct = 100.0\n'
+                   'position_short_rolling_innovation_failure_pct = 100.0\n')
+
+    result_file = str(tmp_path / 'synthetic.json')
+    with open(result_file, 'w') as file:
+        json.dump(test_results, file, indent=2)
+    [(_, new_status)] = rethreshold_result_files([result_file], thresholds_file=thresholds_file)
+    assert new_status == 'Warning'
+
+    assert analyse_logdata_ekf(ULog(filename)) == test_results
+    assert rethreshold_test_results(test_results) == test_results
@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+"""
+Testing the run length encoding of flags.
+"""
+import numpy as np
+import pytest
+
+from ecl_ekf_analysis.signal_processing.run_length import find_runs, find_runs_of_columns, \
+    find_runs_of_fields
+
+
+def reference_runs(flag: np.ndarray) -> list:
+    """
+    :param flag:
+    :return: the (start, end) indices of the runs of active samples found sample by sample
+    """
+    runs = []
+    for i, value in enumerate(flag > 0):
+        if value and (i == 0 or not flag[i - 1] > 0):
+            runs.append([i, len(flag)])
+        elif not value and i > 0 and flag[i - 1] > 0:
+            runs[-1][1] = i
+    return runs
+
+
+@pytest.mark.parametrize("flag,expected", [
+    (np.empty(0, dtype=int), []),
+    (np.zeros(5, dtype=int), []),
+    (np.ones(5, dtype=bool), [[0, 5]]),
+    (np.array([0, 1, 1, 0, 0, 1]), [[1, 3], [5, 6]]),
+    (np.array([1, 0, 1, 0, 1], dtype=np.int8), [[0, 1], [2, 3], [4, 5]]),
+    (np.array([0.0, 0.5, -1.0]), [[1, 2]]),
+])
+def test_find_runs(flag, expected):
+    """
+    Test the corner cases of the runs of a flag.
+    """
+    runs = find_runs(flag)
+    assert np.stack((runs.starts, runs.ends), axis=-1).tolist() == expected
+    assert len(runs) == len(expected)
+    np.testing.assert_array_equal(runs.lengths, runs.ends - runs.starts)
+    np.testing.assert_array_equal(runs.last_indices, runs.ends - 1)
+
+
+def test_run_times():
+    """
+    Test the start and end times of the runs, the end time of a run that lasts until the end is
+    the last timestamp.
+    """
+    timestamps = np.arange(10, dtype=np.uint64) * 1000
+    runs = find_runs(np.array([1, 1, 0, 0, 1, 1, 1, 0, 1, 1]))
+    assert runs.get_start_times(timestamps).tolist() == [0, 4000, 8000]
+    assert runs.get_end_times(timestamps).tolist() == [2000, 7000, 9000]
+    assert runs.get_durations(timestamps).tolist() == [2000, 3000, 1000]
+
+
+def test_find_runs_of_many_flags():
+    """
+    Test that the runs of many flags found at once equal the runs of every flag.
+    """
+    random_state = np.random.RandomState(0)
+    flags = np.cumsum(random_state.uniform(size=(2000, 40)) < np.linspace(0.0, 0.2, 40),
+                      axis=0) % 2
+    flags[:, 0] = 1
+    flags[:, 1] = 0
+    fields = [f'flag_{i:d}' for i in range(flags.shape[1])]
+    data = {field: flags[:, i].astype(bool) for i, field in enumerate(fields)}
+
+    runs_of_columns = find_runs_of_columns(flags)
+    runs_of_fields = find_runs_of_fields(data, fields)
+    # blocks of three flags
+    runs_of_blocks = find_runs_of_fields(data, fields, block_size=3 * 2002)
+    assert list(runs_of_fields) == fields
+    for i, field in enumerate(fields):
+        expected = reference_runs(flags[:, i])
+        for runs in [find_runs(flags[:, i]), runs_of_columns[i], runs_of_fields[field],
+                     runs_of_blocks[field]]:
+            assert np.stack((runs.starts, runs.ends), axis=-1).reshape(-1, 2).tolist() == expected
+    assert find_runs_of_fields(data, []) == {}
@@ -0,0 +1,110 @@
+#! /usr/bin/env python3
+"""
+Testing the smoothing and rolling window functions.
+"""
+import functools
+
+import numpy as np
+import pytest
+
+from ecl_ekf_analysis.signal_processing.smooth_filt_rolling import smooth_1d_boundaries, \
+    convolve_1d_boundaries, windowed_sum_1d, apply_rolling_fun_1d, rolling_window_1d, \
+    moving_average_1d_boundaries, moving_average_columns
+
+
+def smooth_1d_boundaries_convolution(input_signal, window_len, mode):
+    """
+    the flat window smoothing by convolution.
+    """
+    c_filter = np.ones(window_len, dtype='float32')
+    return convolve_1d_boundaries(input_signal, c_filter / c_filter.sum(), mode=mode)
+
+
+test_data = [
+    (signal_type, n_samples, window_len, mode)
+    for signal_type in ['float32', 'float64', 'flags']
+    for n_samples, window_len in [(1, 1), (11, 11), (1000, 1), (1000, 51), (5000, 3001)]
+    for mode in ['valid', 'same', 'mirror']
+]
+
+
+@pytest.mark.parametrize("signal_type,n_samples,window_len,mode", test_data)
+def test_flat_smoothing_equals_convolution(signal_type, n_samples, window_len, mode):
+    """
+    Test that the flat window smoothing by prefix sums equals the smoothing by convolution.
+    """
+    rng = np.random.RandomState(0)
+    if signal_type == 'flags':
+        input_signal = 100.0 * (rng.uniform(size=n_samples) > 0.7)
+    else:
+        input_signal = (10.0 + rng.normal(size=n_samples)).astype(signal_type)
+
+    smoothed = smooth_1d_boundaries(input_signal, window_len=window_len, mode=mode)
+    expected = smooth_1d_boundaries_convolution(input_signal, window_len, mode)
+
+    assert smoothed.shape == expected.shape
+    assert smoothed.dtype == expected.dtype
+    np.testing.assert_allclose(
+        smoothed, expected, rtol=1e-5 if signal_type == 'float32' else 1e-10, atol=1e-9)
+
+
+def test_windowed_sum_1d():
+    """
+    Test the window sums of boolean signals.
+    """
+    flags = np.array([True, False, True, True, False, False, True])
+    np.testing.assert_array_equal(windowed_sum_1d(flags, 3), [2, 2, 2, 1, 1])
+    np.testing.assert_array_equal(windowed_sum_1d(flags, 7), [4])
+
+
+@pytest.mark.parametrize("dtype", ['float32', 'float64', 'bool'])
+def test_moving_average_columns(dtype):
+    """
+    Test that the moving averages of the columns of a block equal those of the 1d columns.
+    """
+    block = np.random.RandomState(0).normal(size=(1000, 6)) > 0.5 if dtype == 'bool' else \
+        np.random.RandomState(0).normal(size=(1000, 6)).astype(dtype)
+    for order in ['C', 'F']:
+        smoothed = moving_average_columns(np.asarray(block, order=order), window_len=51)
+        assert smoothed.shape == (950, 6)
+        for i in range(6):
+            expected = moving_average_1d_boundaries(block[:, i], window_len=51, mode='valid')
+            assert smoothed[:, i].dtype == expected.dtype
+            np.testing.assert_array_equal(smoothed[:, i], expected)
+
+
+rolling_test_data = [
+    (fun, dtype, window_len, stepsize)
+    for fun in [np.mean, np.amax, np.amin, np.median, np.std,
+                functools.partial(np.percentile, q=95.0), lambda x: np.mean(x ** 2)]
+    for dtype in ['float32', 'float64', 'int32']
+    for window_len, stepsize in [(1, 1), (51, 1), (51, 7), (1001, 1)]
+]
+
+
+@pytest.mark.parametrize("fun,dtype,window_len,stepsize", rolling_test_data)
+def test_rolling_reductions(fun, dtype, window_len, stepsize):
+    """
+    Test that the vectorized rolling reductions equal applying the function window by window.
+    """
+    input_signal = (100.0 * np.random.RandomState(0).normal(size=3000)).astype(dtype)
+
+    filtered_signal = apply_rolling_fun_1d(input_signal, fun, window_len, stepsize=stepsize)
+    expected = np.apply_along_axis(
+        fun, 1, rolling_window_1d(input_signal, window_len)[::stepsize, :])
+
+    assert filtered_signal.shape == expected.shape
+    assert filtered_signal.dtype == expected.dtype
+    np.testing.assert_allclose(filtered_signal, expected, rtol=1e-5, atol=1e-4)
+
+
+def test_rolling_reductions_nan():
+    """
+    Test that nans propagate as if the function is applied window by window.
+    """
+    input_signal = np.arange(100, dtype=float)
+    input_signal[10] = np.nan
+    for fun in [np.mean, np.amax]:
+        filtered_signal = apply_rolling_fun_1d(input_signal, fun, 5)
+        assert np.isnan(filtered_signal[6:11]).all()
+        assert not np.isnan(filtered_signal[11:]).any()
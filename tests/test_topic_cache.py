@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+"""
+Testing the on-disk cache of decoded ulog topics.
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+from pyulog import ULog
+
+from ecl_ekf_analysis.checks.ecl_check_runner import EclCheckRunner
+from ecl_ekf_analysis.log_processing import topic_cache as tc
+from ecl_ekf_analysis.process_logdata_ekf import analyse_logdata_ekf
+from tests.synthetic_ulog import write_synthetic_ulog
+
+
+@pytest.fixture(scope="module")
+def log_files(tmp_path_factory):
+    """
+    two synthetic log files with different content.
+    :return: the file names
+    """
+    log_dir = tmp_path_factory.mktemp('logs')
+    filenames = []
+    for seed in range(2):
+        filename = str(log_dir / f'synthetic_{seed:d}.ulg')
+        write_synthetic_ulog(filename, duration_s=30.0, seed=seed)
+        filenames.append(filename)
+    return filenames
+
+
+def test_cache_hit_skips_parsing(log_files, tmp_path, monkeypatch):
+    """
+    Test that a cached log is loaded without parsing and gives the same analysis results.
+    """
+    topics = sorted(EclCheckRunner.required_topics())
+    topic_cache = tc.TopicCache(str(tmp_path / 'cache'))
+
+    cached_ulog = topic_cache.load_ulog(log_files[0], topics=topics)
+    assert len(topic_cache.entries()) == 1
+
+    def fail_parsing(*args, **kwargs):
+        raise AssertionError('the log file was parsed')
+
+    monkeypatch.setattr(tc, 'ULog', fail_parsing)
+    cached_ulog = topic_cache.load_ulog(log_files[0], topics=topics)
+    # a subset of the cached topics
+    subset_ulog = topic_cache.load_ulog(log_files[0], topics=['estimator_status'])
+    assert [dataset.name for dataset in subset_ulog.data_list] == ['estimator_status']
+    assert len(topic_cache.entries()) == 1
+    monkeypatch.undo()
+
+    ulog = ULog(log_files[0], message_name_filter_list=topics)
+    assert cached_ulog.start_timestamp == ulog.start_timestamp
+    assert cached_ulog.last_timestamp == ulog.last_timestamp
+    assert [(d.name, d.multi_id) for d in cached_ulog.data_list] == \
+        [(d.name, d.multi_id) for d in ulog.data_list]
+    for dataset in ulog.data_list:
+        cached_data = cached_ulog.get_dataset(dataset.name, dataset.multi_id).data
+        assert isinstance(cached_data['timestamp'], np.memmap)
+        for field_name, values in dataset.data.items():
+            np.testing.assert_array_equal(cached_data[field_name], values)
+            assert cached_data[field_name].dtype == values.dtype
+
+    assert analyse_logdata_ekf(cached_ulog) == analyse_logdata_ekf(ulog)
+
+    # a different log file is a cache miss
+    topic_cache.load_ulog(log_files[1], topics=topics)
+    assert len(topic_cache.entries()) == 2
+
+
+def test_cache_eviction(log_files, tmp_path):
+    """
+    Test that the least recently used entries are evicted.
+    """
+    topic_cache = tc.TopicCache(str(tmp_path / 'cache'))
+    topic_cache.load_ulog(log_files[0], topics=['estimator_status'])
+    topic_cache.load_ulog(log_files[1], topics=['estimator_status'])
+    first_hash = tc.hash_file(log_files[0])
+    first_entry, second_entry = sorted(
+        topic_cache.entries(), key=lambda entry: not os.path.basename(entry).startswith(first_hash))
+    entry_size = tc.TopicCache.entry_size(first_entry)
+
+    # use the first log file again: the second one is the least recently used entry now
+    os.utime(os.path.join(second_entry, 'meta.json'), (time.time() - 10.0,) * 2)
+    topic_cache.load_ulog(log_files[0], topics=['estimator_status'])
+
+    assert topic_cache.prune(topic_cache.size()) == 0
+    assert topic_cache.prune(entry_size) == 1
+    assert topic_cache.entries() == [first_entry]
+    assert topic_cache.clear() == 1
+    assert topic_cache.entries() == []
+
+    bounded_cache = tc.TopicCache(str(tmp_path / 'cache'), max_size_bytes=1)
+    bounded_cache.load_ulog(log_files[0], topics=['estimator_status'])
+    bounded_cache.load_ulog(log_files[1], topics=['estimator_status'])
+    # the new entry is kept even if it exceeds the maximum size
+    assert len(bounded_cache.entries()) == 1